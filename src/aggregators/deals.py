@@ -0,0 +1,117 @@
+"""
+Deal aggregation utilities.
+
+Responsible for:
+- Computing precomputed report aggregates (deal count and revenue)
+  grouped by dimensions of the normalized rows
+- Producing small summary tables ready to be written as tabs
+
+All summaries are computed in a single pass: each row updates one hash
+group at the finest grain (the union of every summary's dimensions), and
+the summaries are rolled up from those groups afterwards. The per-row cost
+is therefore one dictionary update, whatever the number of summaries.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from src.exporters.partitioning import month_partition_key
+from src.exporters.typed_values import parse_number
+
+
+# Derived dimensions; any other dimension is read from the row label
+DERIVED_DIMENSIONS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "Mês": month_partition_key("Criado em"),
+}
+
+# Column summed as revenue
+REVENUE_LABEL = "Renda"
+
+# Measure columns appended after the dimensions of every summary
+MEASURE_HEADERS = ["Negócios", "Renda Total"]
+
+# Default summaries: { tab name: dimensions }
+DEFAULT_SUMMARIES: Dict[str, List[str]] = {
+    "Resumo Pipeline x Fase": ["Pipeline", "Fase"],
+    "Resumo Mensal": ["Mês", "Pipeline", "Fase"],
+    "Resumo Responsável": ["Mês", "Responsável"],
+    "Resumo Gerência": ["Mês", "Gerência"],
+    "Resumo Completo": ["Pipeline", "Fase", "Mês", "Responsável", "Gerência"],
+}
+
+
+def _dimension_getter(dimension: str) -> Callable[[Dict[str, Any]], str]:
+    if dimension in DERIVED_DIMENSIONS:
+        return DERIVED_DIMENSIONS[dimension]
+
+    def getter(row: Dict[str, Any]) -> str:
+        value = row.get(dimension)
+        return "" if value is None else str(value)
+
+    return getter
+
+
+def aggregate_deals(
+    rows: Iterable[Dict[str, Any]],
+    summaries: Dict[str, List[str]] = DEFAULT_SUMMARIES,
+) -> Dict[str, Tuple[List[str], List[List[Any]]]]:
+    """
+    Aggregates normalized deal rows into summary tables.
+
+    Args:
+        rows: Normalized rows (iterated once, may be a stream)
+        summaries: { summary name: dimensions (row labels or "Mês") }
+
+    Returns:
+        { summary name: (headers, values) }, values sorted by dimensions
+
+    Example:
+        {
+            "Resumo Pipeline x Fase": (
+                ["Pipeline", "Fase", "Negócios", "Renda Total"],
+                [["Inside Sales", "Ganho", 42, 63000.0], ...],
+            )
+        }
+    """
+
+    dimensions = list(dict.fromkeys(
+        dimension
+        for summary_dimensions in summaries.values()
+        for dimension in summary_dimensions
+    ))
+    getters = [_dimension_getter(dimension) for dimension in dimensions]
+
+    # 1. Hash-aggregate at the finest grain: { key tuple: [count, revenue] }
+    groups: Dict[Tuple[str, ...], List[float]] = {}
+
+    for row in rows:
+        key = tuple(getter(row) for getter in getters)
+        revenue = parse_number(row.get(REVENUE_LABEL)) or 0.0
+
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [1, revenue]
+        else:
+            group[0] += 1
+            group[1] += revenue
+
+    # 2. Roll every summary up from the fine groups
+    tables: Dict[str, Tuple[List[str], List[List[Any]]]] = {}
+
+    for name, summary_dimensions in summaries.items():
+        positions = [dimensions.index(dimension) for dimension in summary_dimensions]
+        rolled: Dict[Tuple[str, ...], List[float]] = {}
+
+        for key, (count, revenue) in groups.items():
+            summary_key = tuple(key[position] for position in positions)
+            totals = rolled.setdefault(summary_key, [0, 0.0])
+            totals[0] += count
+            totals[1] += revenue
+
+        values = [
+            list(summary_key) + [count, round(revenue, 2)]
+            for summary_key, (count, revenue) in sorted(rolled.items())
+        ]
+
+        tables[name] = (list(summary_dimensions) + MEASURE_HEADERS, values)
+
+    return tables
@@ -1,7 +1,87 @@
-import requests
+import threading
 import time
-from typing import Any, Dict
-from .config import BITRIX_URL, BITRIX_USER_ID, BITRIX_WEBHOOK
+from typing import Any, Dict, Tuple
+from urllib.parse import quote
+from .cassettes import REPLAY_BITRIX_URL, active_cassette
+from .config import get_settings
+from .metrics import REGISTRY
+
+# Maximum number of commands accepted by the Bitrix "batch" method
+BATCH_LIMIT = 50
+
+# Delay between requests (~2.5 req/s, under the Bitrix leaky-bucket limit),
+# shared by every thread and client calling the same portal
+THROTTLE_SECONDS = 0.4
+
+
+def build_query(params: Dict[str, Any], prefix: str = "") -> str:
+    """
+    Encodes parameters as a PHP-style query string, as expected by the
+    commands of the Bitrix "batch" method.
+
+    Example:
+    {"id": 10, "filter": {">ID": 5}} -> "id=10&filter%5B%3EID%5D=5"
+    """
+    parts = []
+
+    for key, value in params.items():
+        name = f"{prefix}[{key}]" if prefix else str(key)
+
+        if isinstance(value, dict):
+            parts.append(build_query(value, name))
+        elif isinstance(value, (list, tuple)):
+            parts.append(build_query(dict(enumerate(value)), name))
+        else:
+            parts.append(f"{quote(name, safe='')}={quote(str(value), safe='')}")
+
+    return "&".join(part for part in parts if part)
+
+
+class Throttle:
+    """
+    Spaces the requests sharing a rate limit (every thread calling one
+    portal): each request reserves the next free slot of `interval`
+    seconds, tracked by a lock-protected next-allowed timestamp.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_allowed = 0.0
+
+    def reserve(self, interval: float) -> float:
+        """
+        Reserves the next slot; returns how long to sleep until it ends.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._next_allowed = max(self._next_allowed, now) + interval
+            return self._next_allowed - now
+
+    def defer(self, seconds: float) -> None:
+        """
+        Holds every request back for `seconds` (e.g. after a 429).
+        """
+
+        with self._lock:
+            self._next_allowed = max(self._next_allowed, time.monotonic() + seconds)
+
+
+_THROTTLES: Dict[str, Throttle] = {}
+_THROTTLES_LOCK = threading.Lock()
+
+
+def shared_throttle(base_url: str) -> Throttle:
+    """
+    Throttle of a portal (Bitrix limits requests per portal), created on
+    first use.
+    """
+
+    with _THROTTLES_LOCK:
+        if base_url not in _THROTTLES:
+            _THROTTLES[base_url] = Throttle()
+        return _THROTTLES[base_url]
+
 
 class BitrixClient:
     """
@@ -14,9 +94,11 @@ class BitrixClient:
     """
     def __init__(
         self,
-        base_url: str = BITRIX_URL,
-        user_id: str = BITRIX_USER_ID,
-        webhook: str = BITRIX_WEBHOOK,
+        base_url: str | None = None,
+        user_id: str | None = None,
+        webhook: str | None = None,
+        session=None,
+        throttle_seconds: float = THROTTLE_SECONDS,
     ):
         """
         Initializes the client with API URL, user ID, and webhook.
@@ -25,9 +107,29 @@ class BitrixClient:
         - base_url: Base URL of the Bitrix API (default: BITRIX_URL).
         - user_id: User ID for Bitrix (default: BITRIX_USER_ID).
         - webhook: Webhook for authentication (default: BITRIX_WEBHOOK).
+        - session: Optional requests.Session reused by every call, keeping
+          connections (and TLS handshakes) warm for long-running processes.
+        - throttle_seconds: Delay after each successful request (0 against
+          local fake servers, see tests/fake_bitrix_server.py). Threads and
+          clients calling the same portal share the delay, so together
+          they stay under the limit.
 
         Raises an error if any required value is missing.
         """
+        # Defaults come from the configuration, loaded on first use
+        if not base_url or not user_id or not webhook:
+            settings = get_settings()
+            base_url = base_url or settings.bitrix_url
+            user_id = user_id or settings.bitrix_user_id
+            webhook = webhook or settings.bitrix_webhook
+
+        # Replays never reach the portal (see src.cassettes)
+        cassette = active_cassette()
+        if cassette is not None and cassette.mode == "replay":
+            base_url = base_url or REPLAY_BITRIX_URL
+            user_id = user_id or "0"
+            webhook = webhook or "replay"
+
         if not base_url or not user_id or not webhook:
             raise RuntimeError("Configuration error: Missing required environment variables.")
 
@@ -35,6 +137,9 @@ class BitrixClient:
         self.base_url = base_url.rstrip("/")  # Removes any trailing slash from the URL
         self.user_id = user_id
         self.webhook = webhook
+        self.session = session
+        self.throttle_seconds = throttle_seconds
+        self._throttle = shared_throttle(self.base_url)
 
     def _get_full_url(self, method: str) -> str:
         """
@@ -66,15 +171,30 @@ class BitrixClient:
         Raises an error if the response contains an API error.
         """
 
+        import requests  # Imported on first call: keeps imports of the project fast
+
         url = self._get_full_url(method)  # Get the full URL for the method
 
+        # Recorded/replayed when a cassette is active (see src.cassettes)
+        session = self.session or requests
+        cassette = active_cassette()
+        if cassette is not None:
+            session = cassette.session("bitrix", session)
+
         max_retries = 5        # Maximum number of retries in case of rate limit
-        base_sleep = 0.4       # Base delay between requests (~2.5 req/s)
+        base_sleep = 0.4       # Base delay of the 429 backoff
+
+        labels = {"method": method}  # Metrics labels (see src.metrics)
 
         for attempt in range(1, max_retries + 1):
             try:
                 # Make the POST request
-                response = requests.post(url, json=payload or {}, timeout=60)
+                started = time.perf_counter()
+                response = session.post(url, json=payload or {}, timeout=60)
+
+                REGISTRY.observe("bitrix_request_seconds", labels, time.perf_counter() - started)
+                REGISTRY.inc("bitrix_request_bytes_total", labels, len(response.request.body or b""))
+                REGISTRY.inc("bitrix_response_bytes_total", labels, len(response.content))
 
                 # Check if there was an error in the HTTP response (e.g., 4xx or 5xx)
                 response.raise_for_status()
@@ -84,16 +204,25 @@ class BitrixClient:
 
                 # Check if the API returned an error
                 if "error" in data:
+                    REGISTRY.inc("bitrix_requests_total", {**labels, "status": "api_error"})
                     raise RuntimeError(
                         f"Bitrix API error: {data['error']} - {data.get('error_description')}"
                     )
 
-                # Small delay to respect Bitrix API rate limits
-                time.sleep(base_sleep)
+                REGISTRY.inc("bitrix_requests_total", {**labels, "status": "ok"})
+
+                # Small delay to respect Bitrix API rate limits (one slot
+                # per request across threads)
+                if self.throttle_seconds:
+                    delay = self._throttle.reserve(self.throttle_seconds)
+                    time.sleep(delay)
+                    REGISTRY.inc("bitrix_throttle_sleep_seconds_total", labels, delay)
 
                 return data
 
             except requests.HTTPError:
+                REGISTRY.inc("bitrix_requests_total", {**labels, "status": f"http_{response.status_code}"})
+
                 # Handle Bitrix rate limit (HTTP 429)
                 if response.status_code == 429:
                     wait_time = base_sleep * attempt * 2  # Exponential backoff
@@ -101,7 +230,11 @@ class BitrixClient:
                         f"\nRate limit reached (429). "
                         f"Retry {attempt}/{max_retries} in {wait_time:.1f}s..."
                     )
+                    # Other threads back off too
+                    self._throttle.defer(wait_time)
                     time.sleep(wait_time)
+                    REGISTRY.inc("bitrix_retries_total", labels)
+                    REGISTRY.inc("bitrix_rate_limit_wait_seconds_total", labels, wait_time)
                     continue
 
                 # Re-raise any other HTTP error
@@ -161,3 +294,55 @@ class BitrixClient:
             start = data["next"]
 
         return results
+
+    def call_batch(self, commands: Dict[str, tuple]) -> Dict[str, Any]:
+        """
+        Runs up to BATCH_LIMIT API calls in a single request ("batch" method).
+
+        Arguments:
+        - commands: { key: (method, params) }, e.g.
+          {"deal_10": ("crm.deal.productrows.get", {"id": 10})}
+
+        Returns:
+        - { key: result } for the commands that succeeded.
+
+        Raises an error if any command failed (see call_batch_with_errors to
+        handle failed commands one by one).
+        """
+        results, errors = self.call_batch_with_errors(commands)
+
+        if errors:
+            raise RuntimeError(f"Bitrix batch error: {errors}")
+
+        return results
+
+    def call_batch_with_errors(self, commands: Dict[str, tuple]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Like call_batch, without failing on the commands that failed.
+
+        Returns:
+        - ({ key: result }, { key: {"error": ..., "error_description": ...} })
+        """
+        if len(commands) > BATCH_LIMIT:
+            raise ValueError(f"A batch accepts at most {BATCH_LIMIT} commands")
+
+        data = self.call(
+            "batch",
+            {
+                "halt": 0,
+                "cmd": {
+                    key: f"{method}?{build_query(params)}"
+                    for key, (method, params) in commands.items()
+                },
+            },
+        )
+
+        batch_result = data.get("result", {})
+        results = batch_result.get("result") or {}
+        errors = batch_result.get("result_error") or {}
+
+        # PHP serializes an empty associative array as a list
+        return (
+            results if isinstance(results, dict) else {},
+            errors if isinstance(errors, dict) else {},
+        )
@@ -0,0 +1,418 @@
+"""
+Record/replay of API traffic (cassettes).
+
+Responsible for:
+- Recording the Bitrix and Google Sheets HTTP interactions of a run to a
+  compressed cassette (gzip JSON Lines)
+- Replaying a cassette offline, without network or credentials, so a
+  pipeline change can be timed against an identical workload
+- Optionally simulating latency and leaky-bucket rate limits (429s) on
+  replay, to exercise the throttling and retry paths
+
+Cassettes hook in at the HTTP session level, under BitrixClient.call and
+the "rest" Sheets transport (see sheets_rest_transport.create_session).
+While a cassette is active, the Sheets API always uses the "rest"
+transport: the httplib2 requests of the discovery client are not recorded.
+
+Example:
+    with use_cassette("cassettes/export.jsonl.gz", mode="record"):
+        run_export(start_date="2025-01-01")
+
+    with use_cassette("cassettes/export.jsonl.gz", latency="recorded"):
+        run_export(start_date="2025-01-01")
+
+The Bitrix portal and webhook are redacted from recorded URLs and request
+headers (OAuth tokens) are never recorded, so replays need neither. They
+need the same GOOGLE_SHEET_ID, which is part of the Sheets URLs.
+"""
+
+import gzip
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List
+
+
+CASSETTE_MODES = ("record", "replay")
+
+CASSETTE_VERSION = 2
+
+# BitrixClient settings used by replays when none are configured
+REPLAY_BITRIX_URL = "https://replay.invalid"
+
+# Response headers kept in cassettes (the others are transport details)
+RECORDED_HEADERS = ("content-type", "retry-after")
+
+# https://{portal}/rest/{user_id}/{webhook}/{method} -> bitrix:/{method}
+_WEBHOOK_PATH = re.compile(r"^.*?/rest/[^/]+/[^/]+/")
+
+# Cells of an encoded Sheets range ('Tab'!A502:Z -> 'Tab'!*), which move
+# with the chunking
+_SHEETS_RANGE_CELLS = re.compile(r"%21[A-Za-z0-9]*(?:%3A[A-Za-z0-9]*)?(?=$|[:?])")
+
+# Timestamped staging tab names (see write_via_staging_swap)
+_STAGING_TAB = re.compile(r"(__staging_)\d+")
+
+
+class CassetteMiss(RuntimeError):
+    """
+    A replayed request has no recorded interaction.
+    """
+
+
+def redact_url(url: str) -> str:
+    return _WEBHOOK_PATH.sub("bitrix:/", url, count=1)
+
+
+def _canonical_body(body: Any) -> str:
+    """
+    Request body as a stable string (JSON with sorted keys when possible).
+    """
+
+    if body is None:
+        return ""
+
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+
+    if isinstance(body, str):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            return body
+
+    return json.dumps(body, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def interaction_key(method: str, url: str, params: Dict[str, Any] | None, body: Any, api: str = "bitrix") -> str:
+    """
+    Identifies a request: method, redacted URL, query and a digest of the
+    body.
+
+    Sheets writes carry the exported rows, which change with the pipeline
+    being timed: they are matched by method, tab and sequence instead (no
+    body digest, no cell range), so a replay survives different rows, row
+    order or chunking.
+    """
+
+    url = redact_url(url)
+    query = "&".join(f"{key}={value}" for key, value in sorted((params or {}).items()))
+
+    if api == "sheets":
+        url = _STAGING_TAB.sub(r"\1*", url)
+
+        if method.upper() != "GET":
+            return f"{method.upper()} {_SHEETS_RANGE_CELLS.sub('%21*', url)}?{query} *"
+
+    digest = hashlib.sha1(_canonical_body(body).encode("utf-8")).hexdigest()
+
+    return f"{method.upper()} {url}?{query} {digest}"
+
+
+class LeakyBucket:
+    """
+    Bitrix-style request limit: every request adds one unit to the bucket,
+    which drains at `rate` units per second; requests overflowing
+    `capacity` are rejected.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._level = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """
+        Takes one unit.
+
+        Returns:
+            0 when accepted, otherwise the seconds until a unit is free.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._level = max(0.0, self._level - (now - self._updated) * self.rate)
+            self._updated = now
+
+            if self._level + 1 > self.capacity:
+                return (self._level + 1 - self.capacity) / self.rate
+
+            self._level += 1
+            return 0.0
+
+
+class Cassette:
+    """
+    Recorded interactions of one run.
+
+    Args:
+        path: Cassette file (gzip JSON Lines)
+        mode: "record" (real requests, saved by save()) or "replay"
+              (recorded responses, no network)
+        latency: Replay delay per request: None (none), "recorded" (the
+                 recorded duration) or a fixed number of seconds
+        rate_limit: Replay limit in requests per second and per API
+                    (None: unlimited); overflowing requests get a 429
+        burst: Capacity of the rate-limit bucket (Bitrix allows 50)
+
+    Repeated identical requests (e.g. the chunk writes of a tab) are
+    replayed in recorded order; once their recordings are exhausted the
+    last one is served again.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "replay",
+        latency: float | str | None = None,
+        rate_limit: float | None = None,
+        burst: float = 50,
+    ):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}'. Expected one of: {', '.join(CASSETTE_MODES)}")
+
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.burst = burst
+
+        self.interactions: List[Dict[str, Any]] = []
+        self.replayed = 0
+        self.rate_limited = 0
+
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self._buckets: Dict[str, LeakyBucket] = {}
+
+        if mode == "replay":
+            self.interactions = load_cassette(path)
+
+            for interaction in self.interactions:
+                self._pending.setdefault(interaction["key"], deque()).append(interaction)
+
+    def session(self, api: str, base=None) -> "CassetteSession":
+        """
+        Session recording `base` (record mode) or replaying (replay mode)
+        the requests of an API ("bitrix" or "sheets").
+        """
+
+        return CassetteSession(self, api, base)
+
+    def record(self, interaction: Dict[str, Any]) -> None:
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def find(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            pending = self._pending.get(key)
+
+            if pending:
+                interaction = pending.popleft()
+                self._last[key] = interaction
+            elif key in self._last:
+                interaction = self._last[key]
+            else:
+                raise CassetteMiss(f"No recorded interaction for: {key}")
+
+            self.replayed += 1
+            return interaction
+
+    def throttle(self, api: str) -> float:
+        """
+        Applies the simulated rate limit of an API.
+
+        Returns:
+            0 when the request may proceed, otherwise the seconds to wait.
+        """
+
+        if not self.rate_limit:
+            return 0.0
+
+        with self._lock:
+            if api not in self._buckets:
+                self._buckets[api] = LeakyBucket(self.rate_limit, self.burst)
+            bucket = self._buckets[api]
+
+        wait = bucket.try_acquire()
+
+        if wait:
+            with self._lock:
+                self.rate_limited += 1
+
+        return wait
+
+    def save(self) -> None:
+        """
+        Writes the recorded interactions atomically.
+        """
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = f"{self.path}.tmp"
+
+        with gzip.open(temp_path, "wt", encoding="utf-8") as file:
+            file.write(json.dumps({"version": CASSETTE_VERSION, "interactions": len(self.interactions)}))
+            file.write("\n")
+
+            for interaction in self.interactions:
+                file.write(json.dumps(interaction, ensure_ascii=False))
+                file.write("\n")
+
+        os.replace(temp_path, self.path)
+
+
+def load_cassette(path: str) -> List[Dict[str, Any]]:
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        lines = [json.loads(line) for line in file if line.strip()]
+
+    header, interactions = lines[0], lines[1:]
+
+    if header.get("version") != CASSETTE_VERSION:
+        raise ValueError(f"Unsupported cassette version in {path}: {header.get('version')}")
+
+    return interactions
+
+
+def _build_response(method: str, url: str, status: int, headers: Dict[str, str], content: bytes, body: Any):
+    """
+    requests.Response carrying a recorded (or simulated) answer.
+    """
+
+    import requests
+    from requests.structures import CaseInsensitiveDict
+
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    response.encoding = "utf-8"
+    response.url = url
+    response.request = requests.Request(
+        method,
+        url,
+        data=body if isinstance(body, (bytes, str)) else None,
+        json=body if isinstance(body, (dict, list)) else None,
+    ).prepare()
+
+    return response
+
+
+class CassetteSession:
+    """
+    Minimal requests.Session surface (request, post) backed by a cassette.
+    """
+
+    def __init__(self, cassette: Cassette, api: str, base=None):
+        self.cassette = cassette
+        self.api = api
+        self.base = base
+
+    def post(self, url: str, **kwargs: Any):
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method: str, url: str, params=None, data=None, json=None, **kwargs: Any):
+        body = json if json is not None else data
+        key = interaction_key(method, url, params, body, self.api)
+
+        if self.cassette.mode == "record":
+            started = time.perf_counter()
+            response = self.base.request(method, url, params=params, data=data, json=json, **kwargs)
+
+            self.cassette.record({
+                "key": key,
+                "api": self.api,
+                "status": response.status_code,
+                "headers": {
+                    name: response.headers[name]
+                    for name in RECORDED_HEADERS
+                    if name in response.headers
+                },
+                "content": response.content.decode("utf-8", errors="replace"),
+                "elapsed": round(time.perf_counter() - started, 4),
+            })
+
+            return response
+
+        wait = self.cassette.throttle(self.api)
+        if wait:
+            return _build_response(
+                method,
+                url,
+                429,
+                {"Content-Type": "application/json", "Retry-After": str(math.ceil(wait))},
+                b'{"error":"QUERY_LIMIT_EXCEEDED","error_description":"Too many requests"}',
+                body,
+            )
+
+        interaction = self.cassette.find(key)
+
+        latency = self.cassette.latency
+        delay = interaction.get("elapsed", 0) if latency == "recorded" else latency
+        if delay:
+            time.sleep(float(delay))
+
+        return _build_response(
+            method,
+            url,
+            interaction["status"],
+            interaction["headers"],
+            interaction["content"].encode("utf-8"),
+            body,
+        )
+
+
+# Cassette of the current run (see use_cassette)
+_ACTIVE: Cassette | None = None
+
+
+def active_cassette() -> Cassette | None:
+    return _ACTIVE
+
+
+@contextmanager
+def use_cassette(
+    path: str,
+    mode: str = "replay",
+    latency: float | str | None = None,
+    rate_limit: float | None = None,
+    burst: float = 50,
+) -> Iterator[Cassette]:
+    """
+    Records or replays every Bitrix and Google Sheets request made inside
+    the block (see Cassette for the arguments). Recordings are saved when
+    the block exits, even if it failed.
+    """
+
+    global _ACTIVE
+
+    # Cached Sheets clients hold sessions created outside the cassette
+    from src.exporters.google_sheets_exporter import clear_sheets_api_cache
+
+    cassette = Cassette(path, mode, latency, rate_limit, burst)
+
+    clear_sheets_api_cache()
+    _ACTIVE = cassette
+
+    try:
+        yield cassette
+    finally:
+        _ACTIVE = None
+        clear_sheets_api_cache()
+
+        if mode == "record":
+            cassette.save()
+            print(f"Cassette recorded: {path} ({len(cassette.interactions)} interactions)")
+
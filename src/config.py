@@ -1,12 +1,118 @@
+"""
+Application configuration.
+
+Settings are read from the environment (and a local .env file) the first
+time they are needed, not at import time, so importing any module is
+cheap and never fails. Each consumer checks only the settings it uses
+(see Settings.require): an XLSX-only run does not need GOOGLE_SHEET_ID.
+
+Example:
+    settings = get_settings().require("bitrix_url", "bitrix_user_id", "bitrix_webhook")
+    settings.bitrix_url
+"""
+
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+from functools import lru_cache
+from typing import List
+
+
+class Settings:
+    """
+    Typed application settings.
+
+    Attributes:
+        bitrix_url: Bitrix24 portal URL (BITRIX_URL)
+        bitrix_user_id: Webhook user ID (BITRIX_USER_ID)
+        bitrix_webhook: Webhook secret (BITRIX_WEBHOOK)
+        google_sheet_id: Main spreadsheet (GOOGLE_SHEET_ID)
+        google_sheet_extra_ids: Spreadsheets receiving partitions once the
+                                main spreadsheet is near its cell limit
+                                (comma-separated GOOGLE_SHEET_EXTRA_IDS)
+        bitrix_event_token: Application token of the outbound webhook,
+                            checked on received events (BITRIX_EVENT_TOKEN)
+        sync_token: Bearer token required on the daemon's POST /sync
+                    (SYNC_TOKEN)
+    """
+
+    # Attribute -> environment variable
+    ENVIRONMENT = {
+        "bitrix_url": "BITRIX_URL",
+        "bitrix_user_id": "BITRIX_USER_ID",
+        "bitrix_webhook": "BITRIX_WEBHOOK",
+        "google_sheet_id": "GOOGLE_SHEET_ID",
+        "bitrix_event_token": "BITRIX_EVENT_TOKEN",
+        "sync_token": "SYNC_TOKEN",
+    }
+
+    def __init__(
+        self,
+        bitrix_url: str | None = None,
+        bitrix_user_id: str | None = None,
+        bitrix_webhook: str | None = None,
+        google_sheet_id: str | None = None,
+        google_sheet_extra_ids: List[str] | None = None,
+        bitrix_event_token: str | None = None,
+        sync_token: str | None = None,
+    ):
+        self.bitrix_url = bitrix_url
+        self.bitrix_user_id = bitrix_user_id
+        self.bitrix_webhook = bitrix_webhook
+        self.google_sheet_id = google_sheet_id
+        self.google_sheet_extra_ids = google_sheet_extra_ids or []
+        self.bitrix_event_token = bitrix_event_token
+        self.sync_token = sync_token
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            **{name: os.getenv(variable) for name, variable in cls.ENVIRONMENT.items()},
+            google_sheet_extra_ids=[
+                sheet_id.strip()
+                for sheet_id in os.getenv("GOOGLE_SHEET_EXTRA_IDS", "").split(",")
+                if sheet_id.strip()
+            ],
+        )
+
+    def require(self, *names: str) -> "Settings":
+        """
+        Checks that the given settings are set and returns self.
+
+        Raises a RuntimeError naming the missing environment variables.
+        """
+
+        missing = [self.ENVIRONMENT[name] for name in names if not getattr(self, name)]
+
+        if missing:
+            raise RuntimeError(
+                f"Configuration error: Missing required environment variables: {', '.join(missing)}"
+            )
+
+        return self
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """
+    Loads the settings on first use (.env file, then environment).
+    """
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return Settings.from_env()
+
+
+# Former module constants (e.g. `from src.config import BITRIX_URL`), now
+# resolved on access from get_settings()
+_MODULE_SETTINGS = {
+    **{variable: name for name, variable in Settings.ENVIRONMENT.items()},
+    "GOOGLE_SHEET_EXTRA_IDS": "google_sheet_extra_ids",
+}
+
 
-BITRIX_URL = os.getenv("BITRIX_URL")
-BITRIX_USER_ID = os.getenv("BITRIX_USER_ID")
-BITRIX_WEBHOOK = os.getenv("BITRIX_WEBHOOK")
-GOOGLE_SHEET_ID = os.getenv("GOOGLE_SHEET_ID")
+def __getattr__(name: str):
+    if name in _MODULE_SETTINGS:
+        return getattr(get_settings(), _MODULE_SETTINGS[name])
 
-if not BITRIX_URL or not BITRIX_USER_ID or not BITRIX_WEBHOOK or not GOOGLE_SHEET_ID:
-    raise RuntimeError("Configuration error: Missing required environment variables.")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
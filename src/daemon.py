@@ -0,0 +1,392 @@
+"""
+Long-running sync daemon.
+
+Keeps one process alive between syncs so the Bitrix HTTP session, the
+Google Sheets credentials and clients, and the deals and lookup maps stay
+warm (see LiveDealSync), and runs an incremental sync every `--interval`
+seconds instead of a cold full export.
+
+To properly run the daemon, use the command below:
+    $ python -m src.daemon --interval 300 --port 8080
+
+HTTP endpoints:
+    GET  /health   200 while syncs succeed, 503 when the last successful
+                   sync is older than 3 intervals
+    GET  /status   JSON status (cycles, last result, next run, cache sizes)
+    GET  /metrics  Bitrix/Sheets request metrics (Prometheus text format)
+    POST /sync     Runs a sync now (409 if one is already running);
+                   needs "Authorization: Bearer <SYNC_TOKEN>" when
+                   SYNC_TOKEN is set, which is required unless --host is
+                   a loopback address
+    POST /bitrix/events
+                   Bitrix outbound events (with --events, see src.webhooks;
+                   BITRIX_EVENT_TOKEN is required unless --host is a
+                   loopback address)
+
+Syncs never overlap: a sync still running when the next one is due
+delays it, and the following one starts right after it.
+"""
+
+import argparse
+import hmac
+import ipaddress
+import json
+import threading
+import time
+import traceback
+
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+from src.metrics import REGISTRY
+from src.pipelines.live_sync import LiveDealSync
+from src.webhooks import (
+    DEFAULT_DEBOUNCE_SECONDS,
+    DEFAULT_MAX_DELAY_SECONDS,
+    DealEventProcessor,
+    DealEventQueue,
+)
+
+
+DEFAULT_INTERVAL_SECONDS = 300
+
+# /health fails once the last successful sync is older than this many intervals
+HEALTHY_INTERVALS = 3
+
+
+class SyncScheduler:
+    """
+    Runs LiveDealSync.sync() every `interval` seconds in a background
+    thread, without overlapping runs.
+    """
+
+    def __init__(self, live_sync: LiveDealSync, interval: float = DEFAULT_INTERVAL_SECONDS):
+        self.live_sync = live_sync
+        self.interval = interval
+
+        self.started_at = datetime.now(timezone.utc)
+        self.cycles = 0
+        self.failures = 0
+        self.last_result: Dict[str, Any] | None = None
+        self.last_error: str | None = None
+        self.last_started_at: datetime | None = None
+        self.last_success_at: datetime | None = None
+        self.last_duration_seconds: float | None = None
+        self.next_run_at: datetime | None = None
+
+        self._running = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._running.locked()
+
+    def run_once(self) -> Dict[str, Any] | None:
+        """
+        Runs one sync now.
+
+        Returns:
+            The sync result, or None when a sync is already running.
+        """
+
+        if not self._running.acquire(blocking=False):
+            return None
+
+        try:
+            self.last_started_at = datetime.now(timezone.utc)
+            started = time.perf_counter()
+
+            try:
+                result = self.live_sync.sync()
+            except Exception as error:
+                self.failures += 1
+                self.last_error = f"{type(error).__name__}: {error}"
+                traceback.print_exc()
+                return {"error": self.last_error}
+            finally:
+                self.cycles += 1
+                self.last_duration_seconds = round(time.perf_counter() - started, 3)
+
+            self.last_result = result
+            self.last_error = None
+            self.last_success_at = datetime.now(timezone.utc)
+
+            print(
+                f"[{self.last_success_at.isoformat(timespec='seconds')}] "
+                f"{result['mode']} sync: {result['changed']} changed, "
+                f"{result['deals']} deals, {self.last_duration_seconds:.1f}s"
+            )
+
+            return result
+        finally:
+            self._running.release()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.run_once()
+
+            # A sync longer than the interval is followed right away
+            delay = max(0.0, self.interval - (time.monotonic() - started))
+            self.next_run_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="sync-scheduler", daemon=True)
+        self._thread.start()
+
+    def trigger(self) -> None:
+        """
+        Starts the next scheduled sync now.
+        """
+
+        self._wake.set()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        self._wake.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def healthy(self) -> bool:
+        reference = self.last_success_at or self.started_at
+        age = (datetime.now(timezone.utc) - reference).total_seconds()
+
+        return age <= self.interval * HEALTHY_INTERVALS
+
+    def status(self) -> Dict[str, Any]:
+        live_sync = self.live_sync
+
+        def iso(value: datetime | None) -> str | None:
+            return value.isoformat(timespec="seconds") if value else None
+
+        return {
+            "healthy": self.healthy(),
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "started_at": iso(self.started_at),
+            "cycles": self.cycles,
+            "failures": self.failures,
+            "last_started_at": iso(self.last_started_at),
+            "last_success_at": iso(self.last_success_at),
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+            "next_run_at": iso(self.next_run_at),
+            "deals": len(live_sync.deals),
+            "companies": len(live_sync.company_map),
+            "last_sync": live_sync.last_sync,
+            "last_full_sync": iso(live_sync.last_full_sync),
+            "lookups_built_at": iso(live_sync.lookups_built_at),
+        }
+
+
+def make_handler(
+    scheduler: SyncScheduler,
+    events: DealEventProcessor | None = None,
+    sync_token: str | None = None,
+):
+    """
+    Builds the request handler class serving the scheduler endpoints (and
+    the event receiver when `events` is given).
+    """
+
+    class DaemonHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: str, content_type: str = "application/json") -> None:
+            payload = body.encode("utf-8")
+
+            self.send_response(status)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _send_json(self, status: int, data: Dict[str, Any]) -> None:
+            self._send(status, json.dumps(data, ensure_ascii=False, default=str))
+
+        def do_GET(self) -> None:
+            if self.path == "/health":
+                healthy = scheduler.healthy()
+                self._send_json(200 if healthy else 503, {"healthy": healthy})
+            elif self.path == "/status":
+                status = scheduler.status()
+                if events is not None:
+                    status["events"] = events.status()
+                self._send_json(200, status)
+            elif self.path == "/metrics":
+                self._send(200, REGISTRY.to_prometheus(), "text/plain; version=0.0.4")
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def _receive_event(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length).decode("utf-8")
+
+            try:
+                queued = events.receive(body)
+            except PermissionError as error:
+                self._send_json(403, {"error": str(error)})
+            except ValueError as error:
+                self._send_json(400, {"error": str(error)})
+            else:
+                self._send_json(200, {"queued": queued})
+
+        def _authorized(self) -> bool:
+            if not sync_token:
+                return True
+
+            # Constant-time comparison: response times must not leak the token
+            expected = f"Bearer {sync_token}".encode()
+            return hmac.compare_digest((self.headers.get("Authorization") or "").encode(), expected)
+
+        def do_POST(self) -> None:
+            if self.path == "/bitrix/events" and events is not None:
+                self._receive_event()
+            elif self.path != "/sync":
+                self._send_json(404, {"error": "not found"})
+            elif not self._authorized():
+                self._send_json(403, {"error": "Invalid sync token"})
+            elif scheduler.running:
+                self._send_json(409, {"error": "sync already running"})
+            else:
+                scheduler.trigger()
+                self._send_json(202, {"triggered": True})
+
+        def log_message(self, format: str, *args: Any) -> None:
+            # Health probes would flood the output
+            pass
+
+    return DaemonHandler
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bitrix24 deal sync daemon")
+
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL_SECONDS,
+        help=f"Seconds between incremental syncs (default: {DEFAULT_INTERVAL_SECONDS})",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Status server host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Status server port (default: 8080)")
+    parser.add_argument("--start-date", default="2025-01-01", help="Deals created from this date (default: 2025-01-01)")
+    parser.add_argument(
+        "--sheets-transport",
+        choices=("discovery", "rest"),
+        default="rest",
+        help="Google Sheets transport (default: rest, pooled session)",
+    )
+    parser.add_argument("--no-sheets", action="store_true", help="Do not export to Google Sheets")
+    parser.add_argument("--xlsx-output", metavar="PATH", help="Also refresh an XLSX file")
+    parser.add_argument(
+        "--full-sync-hours",
+        type=float,
+        default=24,
+        help="Hours between full reloads, dropping deleted deals (default: 24)",
+    )
+    parser.add_argument(
+        "--lookup-ttl-minutes",
+        type=float,
+        default=60,
+        help="Minutes before the pipeline/stage/user lookups are rebuilt (default: 60)",
+    )
+    parser.add_argument(
+        "--events",
+        action="store_true",
+        help="Receive Bitrix outbound deal events on POST /bitrix/events and refresh only those deals",
+    )
+    parser.add_argument(
+        "--event-debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE_SECONDS,
+        help=f"Seconds without events before a deal is refreshed (default: {DEFAULT_DEBOUNCE_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--event-max-delay",
+        type=float,
+        default=DEFAULT_MAX_DELAY_SECONDS,
+        help=f"Maximum seconds between a deal event and its refresh (default: {DEFAULT_MAX_DELAY_SECONDS:g})",
+    )
+
+    return parser.parse_args(argv)
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def main(argv: List[str] | None = None) -> None:
+    args = parse_args(argv)
+
+    # Imported here: `python -m src.daemon --help` stays instant
+    import requests
+
+    from src.bitrix_client import BitrixClient
+    from src.config import get_settings
+    from src.pipelines.deal_export_pipeline import build_sinks
+
+    live_sync = LiveDealSync(
+        client=BitrixClient(session=requests.Session()),
+        start_date=args.start_date,
+        sinks=build_sinks(
+            export_to_sheets=not args.no_sheets,
+            sheets_transport=args.sheets_transport,
+            xlsx_output=args.xlsx_output,
+        ),
+        lookup_ttl=timedelta(minutes=args.lookup_ttl_minutes),
+        full_sync_interval=timedelta(hours=args.full_sync_hours),
+    )
+
+    scheduler = SyncScheduler(live_sync, interval=args.interval)
+    settings = get_settings()
+
+    # Syncs triggered from other hosts must carry the token
+    if not is_loopback(args.host):
+        settings.require("sync_token")
+
+    events = None
+    if args.events:
+        # Events reachable from other hosts must prove they come from the portal
+        if not is_loopback(args.host):
+            settings.require("bitrix_event_token")
+
+        events = DealEventProcessor(
+            live_sync,
+            queue=DealEventQueue(args.event_debounce, args.event_max_delay),
+            application_token=settings.bitrix_event_token,
+        )
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(scheduler, events, settings.sync_token))
+
+    print(f"=== Bitrix Deal Sync Daemon (every {args.interval:g}s, http://{args.host}:{args.port}) ===\n")
+
+    scheduler.start()
+    if events is not None:
+        events.start()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping...")
+    finally:
+        server.server_close()
+        scheduler.stop()
+        if events is not None:
+            events.stop()
+
+
+if __name__ == "__main__":
+    main()
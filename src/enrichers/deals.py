@@ -43,9 +43,13 @@ def enrich_deals(
     user_map: Dict[int, str],
     source_status_map: Dict[str, str],
     management_enum_map: Dict[str, str],
+    activity_counts: Dict[str, Dict[str, int]] | None = None,
 ) -> List[Dict]:
     """
     Enriches raw deal data into report-ready records.
+
+    When activity_counts ({ deal_id: { type: count } }) is given, activity
+    count columns are added to every record.
     """
 
     enriched: List[Dict] = []
@@ -74,4 +78,14 @@ def enrich_deals(
             "document_type": deal.get("UF_CRM_1753968931293"),
         })
 
+        if activity_counts is not None:
+            counts = activity_counts.get(str(deal.get("ID")), {})
+
+            enriched[-1].update({
+                "calls": counts.get("calls", 0),
+                "meetings": counts.get("meetings", 0),
+                "emails": counts.get("emails", 0),
+                "activities_total": sum(counts.values()),
+            })
+
     return enriched
@@ -0,0 +1,123 @@
+"""
+Deal stage history enrichment.
+
+Responsible for:
+- Folding stage transitions into a compact per-deal state
+- Computing per-deal time spent in each stage, with stage names
+
+The per-deal state keeps accumulated seconds per stage plus the current
+stage and when it was entered. New transitions are folded into it, so
+durations are updated incrementally instead of being recomputed from the
+full history on every run:
+
+    {
+        "1234": {
+            "stage": "C8:PREPARATION",
+            "semantic": "P",
+            "since": "2025-03-15T10:00:00+03:00",
+            "seconds": {"C8:NEW": 86400.0}
+        }
+    }
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable
+
+# Final stage semantics (won, lost): time after closing is not counted
+FINAL_SEMANTICS = {"S", "F"}
+
+SECONDS_PER_DAY = 86400
+
+
+def stage_name(stage_id: str, stage_map: Dict[int, Dict[str, str]]) -> str:
+    """
+    Resolves a full STAGE_ID to its name (falls back to the ID itself).
+
+    Example:
+        "C8:WON" -> stage_map[8]["WON"]
+        "NEW" -> stage_map[0]["NEW"] (default pipeline, no prefix)
+    """
+
+    category_id = 0
+    status_id = stage_id
+
+    if stage_id.startswith("C") and ":" in stage_id:
+        prefix, status_id = stage_id.split(":", 1)
+        category_id = int(prefix[1:]) if prefix[1:].isdigit() else 0
+
+    return stage_map.get(category_id, {}).get(status_id, stage_id)
+
+
+def apply_stage_transitions(
+    deal_stages: Dict[str, Dict[str, Any]],
+    transitions: Iterable[Dict[str, Any]],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Folds transitions (ordered by ID) into the per-deal stage state.
+
+    Returns the updated state (the given dictionary, modified in place).
+    """
+
+    for transition in transitions:
+        deal_id = str(transition["OWNER_ID"])
+        entered_at = transition.get("CREATED_TIME")
+
+        if not entered_at:
+            continue
+
+        state = deal_stages.setdefault(deal_id, {"seconds": {}})
+        previous_stage = state.get("stage")
+
+        if previous_stage and state.get("semantic") not in FINAL_SEMANTICS:
+            elapsed = (
+                datetime.fromisoformat(entered_at) - datetime.fromisoformat(state["since"])
+            ).total_seconds()
+
+            state["seconds"][previous_stage] = state["seconds"].get(previous_stage, 0.0) + max(0.0, elapsed)
+
+        state["stage"] = transition.get("STAGE_ID")
+        state["semantic"] = transition.get("STAGE_SEMANTIC_ID")
+        state["since"] = entered_at
+
+    return deal_stages
+
+
+def compute_stage_durations(
+    deal_stages: Dict[str, Dict[str, Any]],
+    stage_map: Dict[int, Dict[str, str]],
+    now: datetime | None = None,
+) -> Dict[int, Dict[str, float]]:
+    """
+    Computes days spent per stage for every deal.
+
+    The current stage of open deals is counted until `now`.
+
+    Returns:
+        { deal_id: { stage_name: days } }
+
+    Example:
+        { 1234: { "Novo": 1.0, "Preparação": 3.5 } }
+    """
+
+    now = now or datetime.now(timezone.utc)
+    durations: Dict[int, Dict[str, float]] = {}
+
+    for deal_id, state in deal_stages.items():
+        seconds = dict(state.get("seconds", {}))
+        current = state.get("stage")
+
+        if current and state.get("semantic") not in FINAL_SEMANTICS:
+            open_for = (now - datetime.fromisoformat(state["since"])).total_seconds()
+            seconds[current] = seconds.get(current, 0.0) + max(0.0, open_for)
+
+        named: Dict[str, float] = {}
+        for stage_id, total in seconds.items():
+            name = stage_name(stage_id, stage_map)
+            named[name] = named.get(name, 0.0) + total
+
+        durations[int(deal_id)] = {
+            name: round(total / SECONDS_PER_DAY, 2)
+            for name, total in named.items()
+        }
+
+    return durations
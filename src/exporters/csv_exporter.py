@@ -0,0 +1,127 @@
+"""
+Streaming CSV exporter.
+
+Responsible for:
+- Writing normalized deals as gzip-compressed CSV files
+- Partitioning files by month, so downstream jobs read only what they need
+- Writing machine-readable typed values (ISO dates, dot-decimal numbers)
+
+Layout (Hive-style partitions, understood by most BI/data tools):
+    <output_dir>/month=2025-03/deals.csv.gz
+
+Rows are streamed: only one open file per partition is kept, never the
+whole dataset. Each file is written to a temporary path and renamed when
+complete, so readers never see a half-written partition; partitions
+absent from a new export are removed.
+"""
+
+import csv
+import gzip
+import os
+
+from datetime import date
+from contextlib import suppress
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, List
+
+from src.exporters.partitioning import month_partition_key, remove_partial_files, remove_stale_partitions
+from src.exporters.typed_values import DEAL_COLUMN_TYPES, typed_row
+
+
+def _csv_value(value: Any) -> Any:
+    """
+    Formats a typed value for CSV (ISO dates, empty string for None).
+    """
+
+    if value is None:
+        return ""
+
+    if isinstance(value, date):
+        return value.isoformat()
+
+    return value
+
+
+def export_rows_to_csv_partitions(
+    rows: Iterable[Dict[str, Any]],
+    output_dir: str,
+    partition_key: Callable[[Dict[str, Any]], str] = month_partition_key("Criado em"),
+    headers: List[str] | None = None,
+    column_types: Dict[str, str] = DEAL_COLUMN_TYPES,
+    file_name: str = "deals.csv.gz",
+) -> Dict[str, int]:
+    """
+    Streams rows into one gzip CSV file per partition.
+
+    Args:
+        rows: Iterable (e.g. generator) of normalized deal dictionaries
+        output_dir: Root directory of the partitioned dataset
+        partition_key: Function mapping a row to its partition (month by default)
+        headers: Column headers (defaults to the keys of the first row)
+        column_types: { header: "number" | "date" | "text" }
+        file_name: Name of the file inside each partition directory
+
+    Returns:
+        { partition_key: rows written }
+    """
+
+    rows = iter(rows)
+
+    if not headers:
+        first_row = next(rows, None)
+
+        if first_row is None:
+            raise ValueError("No deals provided for export")
+
+        headers = list(first_row.keys())
+        rows = chain([first_row], rows)
+
+    files: Dict[str, Any] = {}
+    writers: Dict[str, Any] = {}
+    counts: Dict[str, int] = {}
+
+    try:
+        for row in rows:
+            key = partition_key(row)
+            writer = writers.get(key)
+
+            if writer is None:
+                partition_dir = os.path.join(output_dir, f"month={key}")
+                os.makedirs(partition_dir, exist_ok=True)
+
+                files[key] = gzip.open(
+                    os.path.join(partition_dir, f"{file_name}.tmp"),
+                    "wt",
+                    encoding="utf-8",
+                    newline="",
+                )
+                writer = writers[key] = csv.writer(files[key])
+                writer.writerow(headers)
+                counts[key] = 0
+
+            writer.writerow([_csv_value(value) for value in typed_row(row, headers, column_types)])
+            counts[key] += 1
+
+        for file in files.values():
+            file.close()
+    except BaseException:
+        for file in files.values():
+            with suppress(Exception):
+                file.close()
+
+        # Partial files must not be left behind; published ones are kept
+        remove_partial_files(output_dir, files, file_name)
+        raise
+
+    # Publish complete files only
+    for key in files:
+        partition_dir = os.path.join(output_dir, f"month={key}")
+        os.replace(
+            os.path.join(partition_dir, f"{file_name}.tmp"),
+            os.path.join(partition_dir, file_name),
+        )
+
+    # Months absent from this export would otherwise keep outdated rows
+    remove_stale_partitions(output_dir, counts, file_name)
+
+    return dict(sorted(counts.items()))
@@ -12,14 +12,40 @@ This exporter always performs a full refresh:
 - Rewrites headers and all rows.
 
 This behavior is intentional to keep dashboards consistent.
+
+Long-running processes that own the tab layout (see src.pipelines.live_sync)
+may then rewrite single rows with update_google_sheets_rows().
+
+Optionally (use_staging_swap=True), the refresh is done off-screen:
+- Data is written into a hidden staging tab created with the right grid size.
+- The staging values are then pasted over the live tab, and the staging tab
+  deleted, in one atomic batchUpdate. The live tab keeps its sheetId, so
+  formulas and charts that reference it are not broken.
+Readers never see an empty or partially written tab, even if a run dies.
+
+Data chunks are written concurrently by a small pool of workers that share
+a per-minute write budget (see WriteQuota), so the upload finishes as fast
+as the Sheets quota allows.
+
+Two interchangeable transports are available (see build_sheets_api):
+- "discovery": googleapiclient built from the discovery document (default).
+- "rest": direct Sheets v4 REST calls over a pooled session
+  (see src.exporters.sheets_rest_transport), lighter to start and reuse.
 """
+import sys
 import time
+import random
 import socket
+import threading
 
-from typing import List
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
-from googleapiclient.errors import HttpError
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.cassettes import active_cassette
+from src.exporters.sheets_rest_transport import SheetsHttpError, SheetsRestApi, create_session
+from src.metrics import REGISTRY
 
 
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
@@ -31,34 +57,554 @@ CHUNK_SIZE = 500
 # Maximum retry attempts when hitting Google API rate limits (HTTP 429)
 MAX_RETRIES = 5
 
-# Delay (seconds) between write requests to respect Google Sheets API quotas
-WRITE_DELAY_SECONDS = 1
+# Google Sheets write quota: 60 write requests per minute per user (the
+# service account), so this is the budget shared by all workers
+WRITE_REQUESTS_PER_MINUTE = 60
+
+# Maximum number of chunk writes in flight at the same time
+MAX_CONCURRENT_WRITES = 4
+
+# Supported Sheets API transports
+TRANSPORTS = ("discovery", "rest")
+
+# Suffix of the hidden tab used by the staging-swap mode
+STAGING_SUFFIX = "__staging"
+
+# Backoff bounds (seconds) for retries; actual waits are jittered
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 32.0
+
+
+class WriteQuota:
+    """
+    Per-minute write budget shared by concurrent Sheets writers.
+
+    Keeps a sliding window of the timestamps of recent writes and blocks
+    callers once the window is full. When any writer hits a 429, the whole
+    budget is paused so other workers back off too instead of piling more
+    requests onto an exhausted quota.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = WRITE_REQUESTS_PER_MINUTE,
+        window_seconds: float = 60.0,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.window_seconds = window_seconds
+        self._timestamps: deque = deque()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Blocks until a write slot is available and reserves it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+
+                # Drop writes that left the sliding window
+                while self._timestamps and now - self._timestamps[0] >= self.window_seconds:
+                    self._timestamps.popleft()
+
+                if now < self._paused_until:
+                    wait_time = self._paused_until - now
+                elif len(self._timestamps) < self.requests_per_minute:
+                    self._timestamps.append(now)
+                    return
+                else:
+                    wait_time = self.window_seconds - (now - self._timestamps[0])
+
+            time.sleep(wait_time)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Pauses every writer for the given number of seconds (after a 429).
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+# One write budget per service account, shared by every exporter of the
+# process: sinks fanned out concurrently draw on the same per-user quota
+_WRITE_QUOTAS: Dict[str | None, WriteQuota] = {}
+_WRITE_QUOTAS_LOCK = threading.Lock()
+
+
+def shared_write_quota(credentials_path: str | None) -> WriteQuota:
+    """
+    WriteQuota of a service account (credentials file), created on first use.
+    """
+
+    with _WRITE_QUOTAS_LOCK:
+        if credentials_path not in _WRITE_QUOTAS:
+            _WRITE_QUOTAS[credentials_path] = WriteQuota()
+        return _WRITE_QUOTAS[credentials_path]
+
+
+def a1_range(sheet_name: str, cell: str | None = None) -> str:
+    """
+    Builds an A1 range with a quoted sheet name (safe for spaces and accents).
+    Without a cell, the range covers the whole sheet.
+
+    Example:
+        a1_range("Deals 2025-01", "A2") -> "'Deals 2025-01'!A2"
+    """
+    escaped = sheet_name.replace("'", "''")
+    return f"'{escaped}'!{cell}" if cell else f"'{escaped}'"
+
+
+def http_error_types() -> Tuple[type, ...]:
+    """
+    HTTP error classes of the Sheets transports, for `except` clauses.
+
+    googleapiclient is imported only by the "discovery" transport; while it
+    is not loaded, none of its errors can be raised.
+    """
+    errors = sys.modules.get("googleapiclient.errors")
+    return (SheetsHttpError, errors.HttpError) if errors else (SheetsHttpError,)
 
 
-def execute_with_retry(request):
+def timeout_error_types() -> Tuple[type, ...]:
+    """
+    Network timeout classes, requests' included once it is loaded (it is
+    imported by the transports on first use).
     """
-    Executes a Google API request with retry and exponential backoff.
+    requests = sys.modules.get("requests")
+    return (TimeoutError, socket.timeout, requests.Timeout) if requests else (TimeoutError, socket.timeout)
+
+
+def _retry_delay(attempt: int, error: Exception | None = None) -> float:
+    """
+    Computes a jittered backoff delay, honoring Retry-After when present.
+    """
+    if error is not None:
+        retry_after = error.resp.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after) + random.uniform(0, RETRY_BASE_SECONDS)
+            except ValueError:
+                pass
+
+    # "Full jitter" exponential backoff: spreads retries of concurrent workers
+    ceiling = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt)
+    return random.uniform(RETRY_BASE_SECONDS, ceiling)
+
+
+def execute_with_retry(request, quota: WriteQuota | None = None, http=None):
+    """
+    Executes a Google API request with retry and jittered exponential backoff.
 
     Handles:
-    - HTTP 429 (rate limit)
+    - HTTP 429 (rate limit), pausing the shared write quota if given
     - Network / SSL timeouts
+
+    Args:
+        request: Google API request object
+        quota: Optional write budget to acquire a slot from before each attempt
+        http: Optional transport (each worker thread needs its own)
     """
+    # Metrics labels (see src.metrics); both transports expose methodId
+    labels = {"operation": getattr(request, "methodId", None) or "unknown"}
+    body = getattr(request, "body", None) or getattr(request, "data", None)
+
     for attempt in range(1, MAX_RETRIES + 1):
+        if quota is not None:
+            waiting = time.perf_counter()
+            quota.acquire()
+            REGISTRY.inc("sheets_quota_wait_seconds_total", labels, time.perf_counter() - waiting)
+
+        started = time.perf_counter()
+
         try:
-            return request.execute()
-        except HttpError as e:
+            result = request.execute(http=http)
+            REGISTRY.inc("sheets_requests_total", {**labels, "status": "ok"})
+            return result
+        except http_error_types() as e:
+            REGISTRY.inc("sheets_requests_total", {**labels, "status": f"http_{e.resp.status}"})
+
             if e.resp.status == 429 and attempt < MAX_RETRIES:
-                sleep_time = attempt * 2
+                sleep_time = _retry_delay(attempt, e)
+                if quota is not None:
+                    quota.pause(sleep_time)
                 time.sleep(sleep_time)
+                REGISTRY.inc("sheets_retries_total", labels)
+                REGISTRY.inc("sheets_rate_limit_wait_seconds_total", labels, sleep_time)
                 continue
             raise
-        except (TimeoutError, socket.timeout):
+        except timeout_error_types():
+            REGISTRY.inc("sheets_requests_total", {**labels, "status": "timeout"})
+
             # Network timeout — retry with backoff
             if attempt < MAX_RETRIES:
-                sleep_time = attempt * 2
+                sleep_time = _retry_delay(attempt)
                 time.sleep(sleep_time)
+                REGISTRY.inc("sheets_retries_total", labels)
+                REGISTRY.inc("sheets_rate_limit_wait_seconds_total", labels, sleep_time)
                 continue
             raise
+        finally:
+            REGISTRY.observe("sheets_request_seconds", labels, time.perf_counter() - started)
+            REGISTRY.inc("sheets_request_bytes_total", labels, len(body) if body else 0)
+
+
+def _thread_local_http(credentials) -> Callable:
+    """
+    Returns a factory giving each worker thread its own authorized transport.
+
+    httplib2 connections are not thread-safe, so they cannot be shared by
+    the concurrent writers.
+    """
+    from google_auth_httplib2 import AuthorizedHttp
+    from googleapiclient.http import build_http
+
+    local = threading.local()
+
+    def get_http():
+        if not hasattr(local, "http"):
+            local.http = AuthorizedHttp(credentials, http=build_http())
+        return local.http
+
+    return get_http
+
+
+def write_chunks_concurrently(
+    sheets_api,
+    spreadsheet_id: str,
+    sheet_name: str,
+    values: List[List],
+    start_row: int,
+    get_http: Callable,
+    quota: WriteQuota,
+    max_workers: int = MAX_CONCURRENT_WRITES,
+) -> None:
+    """
+    Writes rows in CHUNK_SIZE chunks with a bounded number of parallel requests.
+
+    Every chunk targets an absolute range, so completion order does not matter.
+    The first failing chunk aborts the export by re-raising its error.
+    """
+
+    def write_chunk(offset: int) -> None:
+        chunk = values[offset : offset + CHUNK_SIZE]
+
+        execute_with_retry(
+            sheets_api.values().update(
+                spreadsheetId=spreadsheet_id,
+                range=a1_range(sheet_name, f"A{start_row + offset}"),
+                valueInputOption="RAW",
+                body={"values": chunk},
+            ),
+            quota=quota,
+            http=get_http(),
+        )
+
+    offsets = range(0, len(values), CHUNK_SIZE)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        # list() surfaces the first exception raised by a worker
+        list(executor.map(write_chunk, offsets))
+
+
+@lru_cache(maxsize=8)
+def load_credentials(credentials_path: str):
+    """
+    Service account credentials, cached per process so long-running
+    processes (see src.daemon) reuse the access token.
+    """
+
+    from google.oauth2 import service_account
+
+    return service_account.Credentials.from_service_account_file(
+        credentials_path,
+        scopes=SCOPES,
+    )
+
+
+@lru_cache(maxsize=8)
+def _build_rest_api(credentials_path: str | None, base_url: str | None) -> Tuple[Any, Callable]:
+    """
+    "rest" transport client, cached per process: its pooled session is
+    safe to share between threads and keeps connections warm.
+    """
+
+    # Cassettes hook in the session, and replays need no credentials
+    # (see src.cassettes)
+    cassette = active_cassette()
+    replaying = cassette is not None and cassette.mode == "replay"
+    credentials = load_credentials(credentials_path) if credentials_path and not replaying else None
+
+    session = create_session(credentials, pool_size=MAX_CONCURRENT_WRITES + 2)
+    sheets_api = SheetsRestApi(session, base_url) if base_url else SheetsRestApi(session)
+
+    # The pooled session is shared by all writer threads
+    return sheets_api, lambda: None
+
+
+def clear_sheets_api_cache() -> None:
+    """
+    Drops the cached clients and credentials (e.g. when a cassette starts,
+    see src.cassettes).
+    """
+
+    _build_rest_api.cache_clear()
+    load_credentials.cache_clear()
+
+
+def build_sheets_api(
+    credentials_path: str | None,
+    transport: str = "discovery",
+    base_url: str | None = None,
+) -> Tuple[Any, Callable]:
+    """
+    Authenticates with the service account and builds the Sheets API client.
+
+    Args:
+        credentials_path: Path to service account credentials JSON
+                          (None only for the "rest" transport against a
+                          local fake server)
+        transport: "discovery" or "rest"
+        base_url: Sheets API root for the "rest" transport (fake servers)
+
+    Returns:
+        (spreadsheets resource, per-thread transport factory for writers)
+
+    Credentials and "rest" clients are cached per process. Discovery
+    clients are built per call: their httplib2 connection is not thread
+    safe, and sinks export concurrently (see src.pipelines.fan_out).
+    """
+
+    if transport not in TRANSPORTS:
+        raise ValueError(
+            f"Unknown Sheets transport '{transport}'. "
+            f"Expected one of: {', '.join(TRANSPORTS)}"
+        )
+
+    # httplib2 requests of the discovery client are not recorded by
+    # cassettes: the "rest" transport is used instead
+    if active_cassette() is not None:
+        transport = "rest"
+
+    if transport == "rest":
+        return _build_rest_api(credentials_path, base_url)
+
+    credentials = load_credentials(credentials_path) if credentials_path else None
+
+    # Heavy import, only paid when the discovery transport is used
+    from googleapiclient.discovery import build
+
+    service = build(
+        "sheets",
+        "v4",
+        credentials=credentials,
+        cache_discovery=False,  # Avoids cache issues in CI environments
+    )
+
+    return service.spreadsheets(), _thread_local_http(credentials)
+
+
+def write_via_staging_swap(
+    sheets_api,
+    spreadsheet_id: str,
+    sheet_name: str,
+    headers: List[str],
+    values: List[List],
+    get_http: Callable,
+    quota: WriteQuota,
+    max_workers: int,
+) -> None:
+    """
+    Writes the dataset into a hidden staging tab and atomically swaps it live.
+
+    Only two batchUpdate calls are made besides the value writes:
+    1. addSheet with the final grid size (its response includes the
+       spreadsheet metadata, so no separate metadata read is needed).
+    2. The swap, applied atomically:
+       - Existing live tab: its grid is grown if needed, the staging values
+         are pasted over it (copyPaste), the cells left from the previous
+         data are cleared and the staging tab is deleted. The live tab
+         keeps its sheetId and formatting, so formulas and charts pointing
+         at it keep working.
+       - First run: the staging tab is unhidden and renamed.
+       Staging leftovers of dead runs are deleted in the same request.
+
+    While the swap runs, the spreadsheet briefly holds the data twice (see
+    the cell budget of the partitioned exporter).
+    """
+
+    # Unique name, so leftovers of a dead run never block a new one
+    staging_name = f"{sheet_name}{STAGING_SUFFIX}_{int(time.time())}"
+    row_count = 1 + len(values)  # header + rows
+    column_count = max(1, len(headers))
+
+    response = execute_with_retry(
+        sheets_api.batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={
+                "requests": [
+                    {
+                        "addSheet": {
+                            "properties": {
+                                "title": staging_name,
+                                "hidden": True,
+                                "gridProperties": {
+                                    "rowCount": row_count,
+                                    "columnCount": column_count,
+                                },
+                            }
+                        }
+                    }
+                ],
+                "includeSpreadsheetInResponse": True,
+                "responseIncludeGridData": False,
+            },
+        ),
+        quota=quota,
+    )
+
+    staging_id = response["replies"][0]["addSheet"]["properties"]["sheetId"]
+
+    live_properties = None
+    stale_staging = []
+
+    for sheet in response["updatedSpreadsheet"]["sheets"]:
+        properties = sheet.get("properties", {})
+        title = properties.get("title", "")
+
+        if title == sheet_name:
+            live_properties = properties
+        elif (
+            title.startswith(f"{sheet_name}{STAGING_SUFFIX}_")
+            and properties.get("sheetId") != staging_id
+        ):
+            stale_staging.append(properties)
+
+    # Header and rows go in the same chunked stream, starting at row 1
+    write_chunks_concurrently(
+        sheets_api=sheets_api,
+        spreadsheet_id=spreadsheet_id,
+        sheet_name=staging_name,
+        values=[headers] + values,
+        start_row=1,
+        get_http=get_http,
+        quota=quota,
+        max_workers=max_workers,
+    )
+
+    # Every request of a batchUpdate is applied atomically, in order
+    if live_properties is None:
+        swap_requests = [
+            {
+                "updateSheetProperties": {
+                    "properties": {"sheetId": staging_id, "title": sheet_name, "hidden": False},
+                    "fields": "title,hidden",
+                }
+            }
+        ]
+    else:
+        live_id = live_properties["sheetId"]
+        live_grid = live_properties.get("gridProperties", {})
+        live_rows = live_grid.get("rowCount", 0)
+        live_columns = live_grid.get("columnCount", 0)
+
+        swap_requests = [
+            {
+                "updateSheetProperties": {
+                    "properties": {
+                        "sheetId": live_id,
+                        "gridProperties": {
+                            "rowCount": max(live_rows, row_count),
+                            "columnCount": max(live_columns, column_count),
+                        },
+                    },
+                    "fields": "gridProperties.rowCount,gridProperties.columnCount",
+                }
+            },
+            {
+                "copyPaste": {
+                    "source": {
+                        "sheetId": staging_id,
+                        "startRowIndex": 0,
+                        "endRowIndex": row_count,
+                        "startColumnIndex": 0,
+                        "endColumnIndex": column_count,
+                    },
+                    "destination": {
+                        "sheetId": live_id,
+                        "startRowIndex": 0,
+                        "endRowIndex": row_count,
+                        "startColumnIndex": 0,
+                        "endColumnIndex": column_count,
+                    },
+                    "pasteType": "PASTE_VALUES",
+                }
+            },
+        ]
+
+        # Values of the previous data below and to the right of the new data
+        if live_rows > row_count:
+            swap_requests.append({
+                "updateCells": {
+                    "range": {"sheetId": live_id, "startRowIndex": row_count},
+                    "fields": "userEnteredValue",
+                }
+            })
+
+        if live_columns > column_count:
+            swap_requests.append({
+                "updateCells": {
+                    "range": {
+                        "sheetId": live_id,
+                        "startRowIndex": 0,
+                        "endRowIndex": row_count,
+                        "startColumnIndex": column_count,
+                    },
+                    "fields": "userEnteredValue",
+                }
+            })
+
+        swap_requests.append({"deleteSheet": {"sheetId": staging_id}})
+
+    swap_requests += [
+        {"deleteSheet": {"sheetId": stale["sheetId"]}}
+        for stale in stale_staging
+    ]
+
+    execute_with_retry(
+        sheets_api.batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={"requests": swap_requests},
+        ),
+        quota=quota,
+    )
+
+
+def delete_tabs(sheets_api, spreadsheet_id: str, titles: List[str], quota: WriteQuota) -> None:
+    """
+    Deletes tabs by title in a single batchUpdate (missing tabs are ignored).
+    """
+
+    metadata = execute_with_retry(
+        sheets_api.get(spreadsheetId=spreadsheet_id, fields="sheets.properties")
+    )
+
+    requests = [
+        {"deleteSheet": {"sheetId": sheet["properties"]["sheetId"]}}
+        for sheet in metadata.get("sheets", [])
+        if sheet["properties"].get("title") in titles
+    ]
+
+    if not requests:
+        return
+
+    execute_with_retry(
+        sheets_api.batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={"requests": requests},
+        ),
+        quota=quota,
+    )
 
 
 def export_to_google_sheets(
@@ -67,6 +613,10 @@ def export_to_google_sheets(
     rows: List[List],
     credentials_path: str,
     headers: List[str] | None = None,  # Optional
+    max_concurrent_writes: int = MAX_CONCURRENT_WRITES,
+    use_staging_swap: bool = False,
+    transport: str = "discovery",
+    api_url: str | None = None,
 ) -> None:
     """
     Exports data to a Google Sheet.
@@ -77,6 +627,11 @@ def export_to_google_sheets(
         headers: Column headers
         rows: Table rows (list of dictionaries)
         credentials_path: Path to service account credentials JSON
+        max_concurrent_writes: Number of chunk writes allowed in flight
+        use_staging_swap: Write into a hidden staging tab and swap it with
+                          the live tab atomically (no reader downtime)
+        transport: "discovery" (googleapiclient) or "rest" (direct REST calls)
+        api_url: Sheets API root for the "rest" transport (e.g. a local fake server)
     """
 
     # Auto-generate headers from the first row if not provided
@@ -86,20 +641,10 @@ def export_to_google_sheets(
 
         headers = list(rows[0].keys())
 
-    # Authenticate using Google Service Account credentials
-    credentials = service_account.Credentials.from_service_account_file(
-        credentials_path,
-        scopes=SCOPES,
-    )
+    sheets_api, get_http = build_sheets_api(credentials_path, transport, api_url)
 
-    service = build(
-        "sheets",
-        "v4",
-        credentials=credentials,
-        cache_discovery=False,  # Avoids cache issues in CI environments
-    )
-
-    sheets_api = service.spreadsheets()
+    # Write budget shared with the other exporters of the service account
+    quota = shared_write_quota(credentials_path)
 
     # Convert list of dicts into list of lists
     # Header is written separately to simplify chunking logic
@@ -107,19 +652,33 @@ def export_to_google_sheets(
     for row in rows:
         values.append([row.get(header, "") for header in headers])
 
+    if use_staging_swap:
+        write_via_staging_swap(
+            sheets_api=sheets_api,
+            spreadsheet_id=spreadsheet_id,
+            sheet_name=sheet_name,
+            headers=headers,
+            values=values,
+            get_http=get_http,
+            quota=quota,
+            max_workers=max_concurrent_writes,
+        )
+        return
+
     # Clear existing content from the sheet
-    clear_range = f"{sheet_name}!A:Z"
+    clear_range = a1_range(sheet_name, "A:Z")
 
     execute_with_retry(
         sheets_api.values().clear(
             spreadsheetId=spreadsheet_id,
             range=clear_range,
             body={},
-        )
+        ),
+        quota=quota,
     )
 
     # Write header row (single request)
-    header_range = f"{sheet_name}!A1"
+    header_range = a1_range(sheet_name, "A1")
 
     execute_with_retry(
         sheets_api.values().update(
@@ -127,19 +686,17 @@ def export_to_google_sheets(
             range=header_range,
             valueInputOption="RAW",
             body={"values": [headers]},
-        )
+        ),
+        quota=quota,
     )
 
-    # Small delay to avoid hitting write quota immediately
-    time.sleep(WRITE_DELAY_SECONDS)
-
     # Ensure the sheet has enough rows to receive all data
     # Google Sheets does NOT auto-expand grid size on values.update
     required_rows = 1 + len(values)  # 1 header row + data rows
 
-    sheet_metadata = sheets_api.get(
-        spreadsheetId=spreadsheet_id
-    ).execute()
+    sheet_metadata = execute_with_retry(
+        sheets_api.get(spreadsheetId=spreadsheet_id)
+    )
 
     sheet_id = None
     current_row_count = 0
@@ -170,30 +727,22 @@ def export_to_google_sheets(
                         }
                     ]
                 },
-            )
+            ),
+            quota=quota,
         )
 
-    # Write data rows in chunks to avoid request size and timeout issues
-    start_row = 2  # Data starts after header row
-
-    for i in range(0, len(values), CHUNK_SIZE):
-        chunk = values[i : i + CHUNK_SIZE]
-
-        write_range = f"{sheet_name}!A{start_row}"
-
-        execute_with_retry(
-            sheets_api.values().update(
-                spreadsheetId=spreadsheet_id,
-                range=write_range,
-                valueInputOption="RAW",
-                body={"values": chunk},
-            )
-        )
-
-        start_row += len(chunk)
-
-        # Delay between write requests to respect Google Sheets API rate limits
-        time.sleep(WRITE_DELAY_SECONDS)
+    # Write data rows in chunks to avoid request size and timeout issues.
+    # Chunks run in parallel, paced by the shared write quota.
+    write_chunks_concurrently(
+        sheets_api=sheets_api,
+        spreadsheet_id=spreadsheet_id,
+        sheet_name=sheet_name,
+        values=values,
+        start_row=2,  # Data starts after header row
+        get_http=get_http,
+        quota=quota,
+        max_workers=max_concurrent_writes,
+    )
 
     # Retrieve sheet metadata to get internal sheet ID
     sheet_metadata = execute_with_retry(
@@ -244,3 +793,94 @@ def export_to_google_sheets(
     #             "Warning: column auto-resize skipped due to timeout. "
     #             "Data export completed successfully."
     #         )
+
+
+def update_google_sheets_rows(
+    spreadsheet_id: str,
+    sheet_name: str,
+    updates: Dict[int, Dict[str, Any]],
+    appended: List[Dict[str, Any]],
+    row_count: int,
+    credentials_path: str,
+    transport: str = "discovery",
+    api_url: str | None = None,
+) -> int:
+    """
+    Rewrites individual rows of a tab previously written by
+    export_to_google_sheets, instead of refreshing the whole tab.
+
+    Args:
+        spreadsheet_id: Target Google Spreadsheet ID
+        sheet_name: Sheet/tab name
+        updates: { 0-based data row position: new row }
+        appended: Rows added after the last data row
+        row_count: Number of data rows before the appended ones
+        credentials_path: Path to service account credentials JSON
+        transport: "discovery" (googleapiclient) or "rest" (direct REST calls)
+        api_url: Sheets API root for the "rest" transport
+
+    Columns must be in the order of the full export (same normalizer), as
+    the header row is not read back. Every change is sent in one
+    values.batchUpdate (plus a grid resize when rows are appended).
+
+    Returns:
+        Number of rows written.
+    """
+
+    if not updates and not appended:
+        return 0
+
+    sheets_api, _ = build_sheets_api(credentials_path, transport, api_url)
+    quota = shared_write_quota(credentials_path)
+
+    headers = list(next(iter(updates.values()), None) or appended[0])
+
+    def as_values(row: Dict[str, Any]) -> List:
+        return [row.get(header, "") for header in headers]
+
+    data = [
+        {"range": a1_range(sheet_name, f"A{position + 2}"), "values": [as_values(row)]}
+        for position, row in sorted(updates.items())
+    ]
+
+    if appended:
+        # Google Sheets does NOT auto-expand grid size on values updates
+        required_rows = 1 + row_count + len(appended)
+
+        sheet_metadata = execute_with_retry(sheets_api.get(spreadsheetId=spreadsheet_id))
+
+        for sheet in sheet_metadata["sheets"]:
+            properties = sheet.get("properties", {})
+            current_row_count = properties.get("gridProperties", {}).get("rowCount", 0)
+
+            if properties.get("title") == sheet_name and required_rows > current_row_count:
+                execute_with_retry(
+                    sheets_api.batchUpdate(
+                        spreadsheetId=spreadsheet_id,
+                        body={
+                            "requests": [{
+                                "appendDimension": {
+                                    "sheetId": properties.get("sheetId"),
+                                    "dimension": "ROWS",
+                                    "length": required_rows - current_row_count,
+                                }
+                            }]
+                        },
+                    ),
+                    quota=quota,
+                )
+
+        data.append({
+            "range": a1_range(sheet_name, f"A{row_count + 2}"),
+            "values": [as_values(row) for row in appended],
+        })
+
+    execute_with_retry(
+        sheets_api.values().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={"valueInputOption": "RAW", "data": data},
+        ),
+        quota=quota,
+    )
+
+    return len(updates) + len(appended)
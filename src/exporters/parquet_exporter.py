@@ -0,0 +1,166 @@
+"""
+Parquet exporter.
+
+Responsible for:
+- Writing normalized deals as typed columnar Parquet files
+- Partitioning files by month, so downstream jobs read only what they need
+
+Layout (Hive-style partitions, understood by most BI/data tools):
+    <output_dir>/month=2025-03/deals.parquet
+
+Columns are typed: revenue as float64, dates as date32, everything else
+as strings. Rows are streamed and flushed as row groups, so memory is
+bounded by ROW_GROUP_SIZE rows per open partition. Partitions absent from
+a new export are removed.
+
+Requires the optional pyarrow package:
+    $ pip install pyarrow
+"""
+
+import os
+
+from contextlib import suppress
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, List
+
+from src.exporters.partitioning import month_partition_key, remove_partial_files, remove_stale_partitions
+from src.exporters.typed_values import DATE, DEAL_COLUMN_TYPES, NUMBER, typed_row
+
+
+# Rows buffered per partition before being flushed as a Parquet row group
+ROW_GROUP_SIZE = 10_000
+
+
+def _import_pyarrow():
+    """
+    Imports pyarrow lazily, so the rest of the project works without it.
+    """
+
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise RuntimeError(
+            "Parquet export requires pyarrow. Install it with: pip install pyarrow"
+        ) from exc
+
+    return pyarrow, pyarrow.parquet
+
+
+def export_rows_to_parquet_partitions(
+    rows: Iterable[Dict[str, Any]],
+    output_dir: str,
+    partition_key: Callable[[Dict[str, Any]], str] = month_partition_key("Criado em"),
+    headers: List[str] | None = None,
+    column_types: Dict[str, str] = DEAL_COLUMN_TYPES,
+    file_name: str = "deals.parquet",
+) -> Dict[str, int]:
+    """
+    Streams rows into one Parquet file per partition.
+
+    Args:
+        rows: Iterable (e.g. generator) of normalized deal dictionaries
+        output_dir: Root directory of the partitioned dataset
+        partition_key: Function mapping a row to its partition (month by default)
+        headers: Column headers (defaults to the keys of the first row)
+        column_types: { header: "number" | "date" | "text" }
+        file_name: Name of the file inside each partition directory
+
+    Returns:
+        { partition_key: rows written }
+    """
+
+    pa, pq = _import_pyarrow()
+
+    rows = iter(rows)
+
+    if not headers:
+        first_row = next(rows, None)
+
+        if first_row is None:
+            raise ValueError("No deals provided for export")
+
+        headers = list(first_row.keys())
+        rows = chain([first_row], rows)
+
+    arrow_types = {NUMBER: pa.float64(), DATE: pa.date32()}
+    schema = pa.schema([
+        (header, arrow_types.get(column_types.get(header), pa.string()))
+        for header in headers
+    ])
+    text_columns = [
+        index
+        for index, field in enumerate(schema)
+        if field.type == pa.string()
+    ]
+
+    writers: Dict[str, Any] = {}
+    buffers: Dict[str, List[List[Any]]] = {}
+    counts: Dict[str, int] = {}
+
+    def flush(key: str) -> None:
+        columns = list(zip(*buffers[key]))
+        table = pa.Table.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema,
+        )
+        writers[key].write_table(table)
+        buffers[key] = []
+
+    try:
+        for row in rows:
+            key = partition_key(row)
+
+            if key not in writers:
+                partition_dir = os.path.join(output_dir, f"month={key}")
+                os.makedirs(partition_dir, exist_ok=True)
+
+                writers[key] = pq.ParquetWriter(
+                    os.path.join(partition_dir, f"{file_name}.tmp"),
+                    schema,
+                    compression="snappy",
+                )
+                buffers[key] = []
+                counts[key] = 0
+
+            # Typed columns cannot hold text: invalid numbers/dates are null
+            values = typed_row(row, headers, column_types, strict=True)
+
+            # Text columns may hold non-string values (e.g. numeric IDs)
+            for index in text_columns:
+                if values[index] is not None:
+                    values[index] = str(values[index])
+
+            buffers[key].append(values)
+            counts[key] += 1
+
+            if len(buffers[key]) >= ROW_GROUP_SIZE:
+                flush(key)
+
+        for key in writers:
+            if buffers[key]:
+                flush(key)
+
+        for writer in writers.values():
+            writer.close()
+    except BaseException:
+        for writer in writers.values():
+            with suppress(Exception):
+                writer.close()
+
+        # Partial files must not be left behind; published ones are kept
+        remove_partial_files(output_dir, writers, file_name)
+        raise
+
+    # Publish complete files only
+    for key in writers:
+        partition_dir = os.path.join(output_dir, f"month={key}")
+        os.replace(
+            os.path.join(partition_dir, f"{file_name}.tmp"),
+            os.path.join(partition_dir, file_name),
+        )
+
+    # Months absent from this export would otherwise keep outdated rows
+    remove_stale_partitions(output_dir, counts, file_name)
+
+    return dict(sorted(counts.items()))
@@ -0,0 +1,342 @@
+"""
+Partitioned Google Sheets exporter.
+
+Responsible for:
+- Splitting the export into one tab per partition (month, pipeline, ...)
+- Spreading tabs across several spreadsheets before the cell cap is hit
+- Maintaining an index tab listing where every partition lives
+- Rewriting only the partitions whose content changed
+
+The index tab (in the first spreadsheet) stores a content hash per
+partition, so a cold CI run knows what is already up to date without
+any local state. Each partition tab is refreshed through a staging swap,
+which also creates tabs that do not exist yet with the right grid size.
+"""
+
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from src.exporters.google_sheets_exporter import (
+    MAX_CONCURRENT_WRITES,
+    a1_range,
+    build_sheets_api,
+    delete_tabs,
+    execute_with_retry,
+    http_error_types,
+    shared_write_quota,
+    write_via_staging_swap,
+)
+from src.exporters.partitioning import partition_fingerprint, partition_rows
+
+
+# Hard limit of cells per spreadsheet (all tabs included)
+SPREADSHEET_CELL_LIMIT = 10_000_000
+
+# Share of the cell limit used by exported partitions; the rest is left
+# for dashboard tabs living in the same spreadsheet
+CELL_BUDGET_RATIO = 0.9
+
+INDEX_SHEET_NAME = "Índice"
+
+INDEX_HEADERS = [
+    "Partição",
+    "Aba",
+    "Planilha",
+    "Linhas",
+    "Hash",
+    "Atualizado em",
+]
+
+
+def _read_index(sheets_api, spreadsheet_id: str) -> Dict[str, Dict[str, str]]:
+    """
+    Reads the index tab and returns { partition_key: entry }.
+
+    A missing index tab (first run) yields an empty index.
+    """
+
+    try:
+        response = execute_with_retry(
+            sheets_api.values().get(
+                spreadsheetId=spreadsheet_id,
+                range=a1_range(INDEX_SHEET_NAME, "A2:F"),
+            )
+        )
+    except http_error_types() as e:
+        if e.resp.status == 400:
+            return {}
+        raise
+
+    index: Dict[str, Dict[str, str]] = {}
+
+    for row in response.get("values", []):
+        row = row + [""] * (len(INDEX_HEADERS) - len(row))
+        key, tab, spreadsheet, row_count, content_hash, updated_at = row[:6]
+
+        index[key] = {
+            "tab": tab,
+            "spreadsheet": spreadsheet,
+            "rows": row_count,
+            "hash": content_hash,
+            "updated_at": updated_at,
+        }
+
+    return index
+
+
+def _assign_spreadsheets(
+    partitions: Dict[str, List[List]],
+    column_count: int,
+    spreadsheet_ids: List[str],
+    previous_index: Dict[str, Dict[str, str]],
+    keep_missing: bool,
+) -> Dict[str, str]:
+    """
+    Assigns partitions, in key order, to spreadsheets within the cell budget.
+
+    A partition stays in the spreadsheet it was exported to before while it
+    still fits there. New partitions fill the first spreadsheet with room,
+    then overflow to the next one, keeping neighbouring periods together.
+
+    A staging swap briefly holds a partition twice (staging and live tab),
+    so every spreadsheet keeps room for the largest partition.
+    """
+
+    cell_counts = {key: (1 + len(values)) * column_count for key, values in partitions.items()}  # header + rows
+    swap_reserve = max(cell_counts.values(), default=0)
+    budget = int(SPREADSHEET_CELL_LIMIT * CELL_BUDGET_RATIO) - swap_reserve
+    used_cells = {spreadsheet_id: 0 for spreadsheet_id in spreadsheet_ids}
+
+    # Index tab lives in the first spreadsheet: one row per exported
+    # partition, plus the untouched ones carried over
+    index_keys = set(partitions) | (set(previous_index) if keep_missing else set())
+    used_cells[spreadsheet_ids[0]] += (1 + len(index_keys)) * len(INDEX_HEADERS)
+
+    # Partitions kept untouched still occupy their spreadsheet
+    if keep_missing:
+        for key, entry in previous_index.items():
+            if key not in partitions and entry["spreadsheet"] in used_cells:
+                row_count = int(entry["rows"]) if str(entry["rows"]).isdigit() else 0
+                used_cells[entry["spreadsheet"]] += (1 + row_count) * column_count
+
+    assignment: Dict[str, str] = {}
+    current = 0
+
+    for key, cells in cell_counts.items():
+        if cells > budget:
+            raise RuntimeError(
+                f"Partition '{key}' needs {cells} cells, twice that while it is "
+                "swapped in, more than a whole spreadsheet allows. Use a finer "
+                "partition key."
+            )
+
+        previous_spreadsheet = previous_index.get(key, {}).get("spreadsheet")
+
+        if previous_spreadsheet in used_cells and used_cells[previous_spreadsheet] + cells <= budget:
+            target = previous_spreadsheet
+        else:
+            target = next(
+                (
+                    spreadsheet_id
+                    for spreadsheet_id in spreadsheet_ids[current:]
+                    if used_cells[spreadsheet_id] + cells <= budget
+                ),
+                None,
+            )
+
+            if target is None:
+                raise RuntimeError(
+                    "Spreadsheet cell limit reached. "
+                    "Add another spreadsheet ID to spread the partitions."
+                )
+
+            current = spreadsheet_ids.index(target)
+
+        assignment[key] = target
+        used_cells[target] += cells
+
+    return assignment
+
+
+def export_partitions_to_google_sheets(
+    spreadsheet_ids: List[str],
+    partitions: Dict[str, List[Dict[str, Any]]],
+    credentials_path: str,
+    tab_prefix: str = "Deals ",
+    headers: List[str] | None = None,
+    keep_missing: bool = False,
+    transport: str = "discovery",
+    api_url: str | None = None,
+) -> List[str]:
+    """
+    Exports already partitioned rows as one tab per partition, with an index tab.
+
+    Args:
+        spreadsheet_ids: Target spreadsheets, filled in order (the first one
+                         also hosts the index tab)
+        partitions: { partition_key: rows (list of dictionaries) }
+        credentials_path: Path to service account credentials JSON
+        tab_prefix: Prefix of the partition tab names
+        headers: Column headers (defaults to the keys of the first row)
+        keep_missing: Keep partitions absent from this export (and their
+                      index entries) instead of deleting them. Used when
+                      only a subset of partitions is refreshed.
+        transport: "discovery" (googleapiclient) or "rest" (direct REST calls)
+        api_url: Sheets API root for the "rest" transport (e.g. a local fake server)
+
+    Returns:
+        Keys of the partitions that were (re)written.
+    """
+
+    if not spreadsheet_ids:
+        raise ValueError("At least one spreadsheet ID is required")
+
+    if not headers:
+        first_rows = next((rows for rows in partitions.values() if rows), None)
+
+        if not first_rows:
+            raise ValueError("Cannot export empty dataset to Google Sheets")
+
+        headers = list(first_rows[0].keys())
+
+    sheets_api, get_http = build_sheets_api(credentials_path, transport, api_url)
+    quota = shared_write_quota(credentials_path)
+
+    partition_values = {
+        key: [[row.get(header, "") for header in headers] for row in rows]
+        for key, rows in sorted(partitions.items())
+    }
+
+    previous_index = _read_index(sheets_api, spreadsheet_ids[0])
+    assignment = _assign_spreadsheets(
+        partition_values,
+        len(headers),
+        spreadsheet_ids,
+        previous_index,
+        keep_missing,
+    )
+
+    # Tabs to drop: partitions that moved to another spreadsheet or vanished
+    obsolete_tabs: Dict[str, List[str]] = {}
+    index_rows: List[List] = []
+
+    for key, entry in previous_index.items():
+        if key not in assignment and keep_missing:
+            # Untouched partition: carried over to the new index as-is
+            index_rows.append([
+                key,
+                entry["tab"],
+                entry["spreadsheet"],
+                entry["rows"],
+                entry["hash"],
+                entry["updated_at"],
+            ])
+            continue
+
+        if assignment.get(key) != entry["spreadsheet"]:
+            obsolete_tabs.setdefault(entry["spreadsheet"], []).append(entry["tab"])
+
+    updated_at = datetime.now().strftime("%d/%m/%Y %H:%M")
+    written: List[str] = []
+
+    total = len(partition_values)
+    print(f"Exporting partitions... 0/{total}", end="", flush=True)
+
+    for position, (key, values) in enumerate(partition_values.items(), start=1):
+        tab = f"{tab_prefix}{key}"
+        spreadsheet_id = assignment[key]
+        content_hash = partition_fingerprint(headers, values)
+        previous = previous_index.get(key)
+
+        unchanged = (
+            previous is not None
+            and previous["hash"] == content_hash
+            and previous["spreadsheet"] == spreadsheet_id
+            and previous["tab"] == tab
+        )
+
+        if unchanged:
+            index_rows.append([key, tab, spreadsheet_id, len(values), content_hash, previous["updated_at"]])
+        else:
+            write_via_staging_swap(
+                sheets_api=sheets_api,
+                spreadsheet_id=spreadsheet_id,
+                sheet_name=tab,
+                headers=headers,
+                values=values,
+                get_http=get_http,
+                quota=quota,
+                max_workers=MAX_CONCURRENT_WRITES,
+            )
+            index_rows.append([key, tab, spreadsheet_id, len(values), content_hash, updated_at])
+            written.append(key)
+
+        # Dynamic progress update
+        print(f"\rExporting partitions... {position}/{total}", end="", flush=True)
+
+    print()
+
+    for spreadsheet_id, titles in obsolete_tabs.items():
+        delete_tabs(sheets_api, spreadsheet_id, titles, quota)
+
+    # The index is tiny, so it is always rewritten
+    write_via_staging_swap(
+        sheets_api=sheets_api,
+        spreadsheet_id=spreadsheet_ids[0],
+        sheet_name=INDEX_SHEET_NAME,
+        headers=INDEX_HEADERS,
+        values=sorted(index_rows, key=lambda row: row[0]),
+        get_http=get_http,
+        quota=quota,
+        max_workers=1,
+    )
+
+    print(f"Partitions rewritten: {len(written)}/{total}")
+
+    return written
+
+
+def export_partitioned_to_google_sheets(
+    spreadsheet_ids: List[str],
+    rows: List[Dict[str, Any]],
+    partition_key: Callable[[Dict[str, Any]], str],
+    credentials_path: str,
+    tab_prefix: str = "Deals ",
+    headers: List[str] | None = None,
+    transport: str = "discovery",
+    api_url: str | None = None,
+) -> List[str]:
+    """
+    Exports rows as one tab per partition, with an index tab.
+
+    Args:
+        spreadsheet_ids: Target spreadsheets, filled in order (the first one
+                         also hosts the index tab)
+        rows: Table rows (list of dictionaries)
+        partition_key: Function mapping a row to its partition key
+                       (see src.exporters.partitioning)
+        credentials_path: Path to service account credentials JSON
+        tab_prefix: Prefix of the partition tab names
+        headers: Column headers (defaults to the keys of the first row)
+        transport: "discovery" (googleapiclient) or "rest" (direct REST calls)
+        api_url: Sheets API root for the "rest" transport (e.g. a local fake server)
+
+    Returns:
+        Keys of the partitions that were (re)written.
+    """
+
+    if not headers:
+        if not rows:
+            raise ValueError("Cannot export empty dataset to Google Sheets")
+
+        headers = list(rows[0].keys())
+
+    return export_partitions_to_google_sheets(
+        spreadsheet_ids=spreadsheet_ids,
+        partitions=partition_rows(rows, partition_key),
+        credentials_path=credentials_path,
+        tab_prefix=tab_prefix,
+        headers=headers,
+        transport=transport,
+        api_url=api_url,
+    )
@@ -0,0 +1,151 @@
+"""
+Export partitioning utilities.
+
+Responsible for:
+- Splitting normalized rows into partitions by a key (month, pipeline, ...)
+- Fingerprinting partitions so unchanged ones can be skipped on export
+- Removing file partitions that are no longer part of an export
+- Removing the partial files of a failed export
+
+Partition keys are plain strings, sortable in chronological order for
+month partitions ("2025-01", "2025-02", ...).
+"""
+
+import hashlib
+import json
+import os
+
+from typing import Any, Callable, Dict, Iterable, List
+
+
+# Key used for rows whose partition date is missing or invalid
+UNKNOWN_PARTITION = "sem-data"
+
+# Key used for rows whose partition column (field_partition_key) is empty
+EMPTY_VALUE_PARTITION = "sem-valor"
+
+
+def month_partition_key(date_label: str = "Criado em") -> Callable[[Dict[str, Any]], str]:
+    """
+    Builds a key function partitioning rows by the month of a dd/mm/yyyy column.
+
+    Example:
+        "15/03/2025" -> "2025-03"
+    """
+
+    def key(row: Dict[str, Any]) -> str:
+        value = row.get(date_label) or ""
+
+        try:
+            _, month, year = str(value).split("/")
+        except ValueError:
+            return UNKNOWN_PARTITION
+
+        if not (month.isdigit() and year.isdigit()):
+            return UNKNOWN_PARTITION
+
+        return f"{year}-{month.zfill(2)}"
+
+    return key
+
+
+def field_partition_key(label: str) -> Callable[[Dict[str, Any]], str]:
+    """
+    Builds a key function partitioning rows by the value of a column.
+
+    Example:
+        field_partition_key("Pipeline") -> "Inside Sales"
+    """
+
+    def key(row: Dict[str, Any]) -> str:
+        value = row.get(label)
+        return str(value) if value not in (None, "") else EMPTY_VALUE_PARTITION
+
+    return key
+
+
+def partition_rows(
+    rows: List[Dict[str, Any]],
+    key_fn: Callable[[Dict[str, Any]], str],
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Groups rows by partition key, preserving row order inside each partition.
+
+    Returns:
+        { partition_key: [rows...] } sorted by partition key
+    """
+
+    partitions: Dict[str, List[Dict[str, Any]]] = {}
+
+    for row in rows:
+        partitions.setdefault(key_fn(row), []).append(row)
+
+    return dict(sorted(partitions.items()))
+
+
+def partition_fingerprint(headers: List[str], values: List[List]) -> str:
+    """
+    Returns a stable content hash of a partition (headers + cell values).
+    """
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps(headers, ensure_ascii=False).encode("utf-8"))
+
+    for row in values:
+        digest.update(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+def remove_stale_partitions(output_dir: str, keys: Iterable[str], file_name: str) -> List[str]:
+    """
+    Removes <output_dir>/month=<key>/<file_name> for every partition not in
+    keys (e.g. months whose deals were all deleted or moved), so readers of
+    the dataset do not see outdated rows. Other files are left alone; the
+    partition directory is removed once empty.
+
+    Returns:
+        Keys of the partitions removed, sorted
+    """
+
+    keys = set(keys)
+    removed = []
+
+    if not os.path.isdir(output_dir):
+        return removed
+
+    for entry in sorted(os.listdir(output_dir)):
+        if not entry.startswith("month=") or entry[len("month="):] in keys:
+            continue
+
+        partition_dir = os.path.join(output_dir, entry)
+        path = os.path.join(partition_dir, file_name)
+
+        if not os.path.isfile(path):
+            continue
+
+        os.remove(path)
+        removed.append(entry[len("month="):])
+
+        if not os.listdir(partition_dir):
+            os.rmdir(partition_dir)
+
+    return removed
+
+
+def remove_partial_files(output_dir: str, keys: Iterable[str], file_name: str) -> None:
+    """
+    Removes <output_dir>/month=<key>/<file_name>.tmp for every partition in
+    keys, after an export failed before publishing them. Files published by
+    previous exports are kept; partition directories are removed once empty.
+    """
+
+    for key in keys:
+        partition_dir = os.path.join(output_dir, f"month={key}")
+        path = os.path.join(partition_dir, f"{file_name}.tmp")
+
+        if os.path.isfile(path):
+            os.remove(path)
+
+        if os.path.isdir(partition_dir) and not os.listdir(partition_dir):
+            os.rmdir(partition_dir)
@@ -0,0 +1,253 @@
+"""
+Lightweight Google Sheets REST transport.
+
+Responsible for:
+- Calling the Sheets v4 REST endpoints directly, without discovery
+- Reusing one pooled, authorized HTTP session (and its token) for a run
+- Sending pre-serialized JSON bodies
+
+It mirrors the small subset of the googleapiclient `spreadsheets()`
+resource used by the exporters (get, batchUpdate, values().get/update/
+clear/batchUpdate/batchClear), so both transports are interchangeable:
+
+    sheets_api = SheetsRestApi(session)
+    execute_with_retry(sheets_api.values().update(...))
+
+Errors are raised as SheetsHttpError, which exposes the same `resp.status`
+and `resp.get()` surface as googleapiclient's HttpError, so the retry logic
+handles both transports alike.
+"""
+
+import json
+
+from typing import TYPE_CHECKING, Any, Dict
+from urllib.parse import quote
+
+from src.cassettes import active_cassette
+
+if TYPE_CHECKING:
+    import requests  # Imported by create_session() on first use
+
+
+SHEETS_API_URL = "https://sheets.googleapis.com/v4/spreadsheets"
+
+# Connections kept open per host (enough for the concurrent writers)
+POOL_SIZE = 10
+
+# Request timeout (seconds), same as googleapiclient's default
+REQUEST_TIMEOUT_SECONDS = 60
+
+
+class _ErrorResponse(dict):
+    """
+    Minimal response surface shared with httplib2 responses:
+    headers as lowercase dict keys plus a `status` attribute.
+    """
+
+    def __init__(self, status: int, headers: Dict[str, str]):
+        super().__init__({key.lower(): value for key, value in headers.items()})
+        self.status = status
+
+
+class SheetsHttpError(Exception):
+    """
+    HTTP error returned by the Sheets REST API.
+    """
+
+    def __init__(self, status: int, headers: Dict[str, str], content: bytes, url: str):
+        self.resp = _ErrorResponse(status, headers)
+        self.content = content
+        self.url = url
+
+        super().__init__(f"Sheets API error {status} for {url}: {content[:500]!r}")
+
+
+def create_session(credentials=None, pool_size: int = POOL_SIZE) -> "requests.Session":
+    """
+    Creates a pooled HTTP session, authorized when credentials are given.
+
+    The authorized session refreshes the service account token only when it
+    expires, so one token is reused for the whole run. Without credentials
+    (e.g. against a local fake server) a plain session is returned.
+
+    While a cassette is active (see src.cassettes), the session records or
+    replays its requests.
+    """
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    if credentials is not None:
+        from google.auth.transport.requests import AuthorizedSession
+
+        session = AuthorizedSession(credentials)
+    else:
+        session = requests.Session()
+
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    cassette = active_cassette()
+    if cassette is not None:
+        return cassette.session("sheets", session)
+
+    return session
+
+
+class SheetsRestRequest:
+    """
+    A prepared REST call, executed with execute() like googleapiclient requests.
+    """
+
+    def __init__(
+        self,
+        session: "requests.Session",
+        method: str,
+        url: str,
+        params: Dict[str, Any] | None = None,
+        body: Dict[str, Any] | None = None,
+        method_id: str | None = None,
+    ):
+        self.session = session
+        self.method = method
+        self.url = url
+        self.params = params
+
+        # Same name as googleapiclient's HttpRequest.methodId (used by metrics)
+        self.methodId = method_id
+
+        # Serialized once, when the request is built
+        self.data = (
+            json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            if body is not None
+            else None
+        )
+
+    def execute(self, http=None) -> Dict[str, Any]:
+        """
+        Sends the request and returns the decoded JSON response.
+
+        `http` is accepted for compatibility with googleapiclient and ignored:
+        the pooled session is safe to share between threads.
+        """
+
+        response = self.session.request(
+            self.method,
+            self.url,
+            params=self.params,
+            data=self.data,
+            headers={"Content-Type": "application/json"} if self.data is not None else None,
+            timeout=REQUEST_TIMEOUT_SECONDS,
+        )
+
+        if response.status_code >= 400:
+            raise SheetsHttpError(
+                response.status_code,
+                dict(response.headers),
+                response.content,
+                self.url,
+            )
+
+        return response.json() if response.content else {}
+
+
+class _SheetsRestValues:
+    """
+    spreadsheets.values endpoints.
+    """
+
+    def __init__(self, api: "SheetsRestApi"):
+        self.api = api
+
+    def _url(self, spreadsheet_id: str, value_range: str, suffix: str = "") -> str:
+        return (
+            f"{self.api.base_url}/{quote(spreadsheet_id, safe='')}"
+            f"/values/{quote(value_range, safe='')}{suffix}"
+        )
+
+    def get(self, spreadsheetId: str, range: str) -> SheetsRestRequest:
+        return SheetsRestRequest(
+            self.api.session,
+            "GET",
+            self._url(spreadsheetId, range),
+            method_id="sheets.spreadsheets.values.get",
+        )
+
+    def update(
+        self,
+        spreadsheetId: str,
+        range: str,
+        valueInputOption: str,
+        body: Dict[str, Any],
+    ) -> SheetsRestRequest:
+        return SheetsRestRequest(
+            self.api.session,
+            "PUT",
+            self._url(spreadsheetId, range),
+            params={"valueInputOption": valueInputOption},
+            body=body,
+            method_id="sheets.spreadsheets.values.update",
+        )
+
+    def clear(self, spreadsheetId: str, range: str, body: Dict[str, Any]) -> SheetsRestRequest:
+        return SheetsRestRequest(
+            self.api.session,
+            "POST",
+            self._url(spreadsheetId, range, ":clear"),
+            body=body,
+            method_id="sheets.spreadsheets.values.clear",
+        )
+
+    def batchUpdate(self, spreadsheetId: str, body: Dict[str, Any]) -> SheetsRestRequest:
+        return SheetsRestRequest(
+            self.api.session,
+            "POST",
+            f"{self.api.base_url}/{quote(spreadsheetId, safe='')}/values:batchUpdate",
+            body=body,
+            method_id="sheets.spreadsheets.values.batchUpdate",
+        )
+
+    def batchClear(self, spreadsheetId: str, body: Dict[str, Any]) -> SheetsRestRequest:
+        return SheetsRestRequest(
+            self.api.session,
+            "POST",
+            f"{self.api.base_url}/{quote(spreadsheetId, safe='')}/values:batchClear",
+            body=body,
+            method_id="sheets.spreadsheets.values.batchClear",
+        )
+
+
+class SheetsRestApi:
+    """
+    Drop-in replacement for googleapiclient's `service.spreadsheets()`.
+
+    Args:
+        session: Pooled (authorized) session, see create_session()
+        base_url: Sheets API root, overridable to target a local fake server
+    """
+
+    def __init__(self, session: "requests.Session", base_url: str = SHEETS_API_URL):
+        self.session = session
+        self.base_url = base_url.rstrip("/")
+
+    def values(self) -> _SheetsRestValues:
+        return _SheetsRestValues(self)
+
+    def get(self, spreadsheetId: str, fields: str | None = None) -> SheetsRestRequest:
+        return SheetsRestRequest(
+            self.session,
+            "GET",
+            f"{self.base_url}/{quote(spreadsheetId, safe='')}",
+            params={"fields": fields} if fields else None,
+            method_id="sheets.spreadsheets.get",
+        )
+
+    def batchUpdate(self, spreadsheetId: str, body: Dict[str, Any]) -> SheetsRestRequest:
+        return SheetsRestRequest(
+            self.session,
+            "POST",
+            f"{self.base_url}/{quote(spreadsheetId, safe='')}:batchUpdate",
+            body=body,
+            method_id="sheets.spreadsheets.batchUpdate",
+        )
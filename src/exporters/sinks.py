@@ -0,0 +1,252 @@
+"""
+Export sinks.
+
+Responsible for:
+- Defining a common interface for export targets (Sink)
+- Wrapping every exporter (Google Sheets, summary tabs, XLSX, CSV,
+  Parquet, local store) as a sink consuming a stream of normalized rows
+
+A sink receives the rows as an iterator and must consume it to the end.
+Streaming exporters write rows as they arrive; the Google Sheets sinks
+collect rows first (the upload needs the final row count) and upload
+once the stream is complete.
+"""
+
+import gzip
+import json
+import os
+
+from typing import Any, Callable, Dict, Iterator, List
+
+from src.aggregators.deals import aggregate_deals
+from src.exporters.csv_exporter import export_rows_to_csv_partitions
+from src.exporters.google_sheets_exporter import export_to_google_sheets, update_google_sheets_rows
+from src.exporters.parquet_exporter import export_rows_to_parquet_partitions
+from src.exporters.partitioned_sheets_exporter import export_partitioned_to_google_sheets
+from src.exporters.summary_sheets_exporter import export_summaries_to_google_sheets
+from src.exporters.xlsx_exporter import export_rows_to_xlsx_stream
+
+
+class Sink:
+    """
+    Base class of export targets.
+
+    Subclasses set `name` and implement consume().
+    """
+
+    name = "sink"
+
+    # Whether update_rows() is implemented
+    supports_row_updates = False
+
+    def consume(self, rows: Iterator[Dict[str, Any]]) -> Any:
+        """
+        Consumes the full row stream and writes it to the target.
+
+        Returns an optional summary (e.g. rows or partitions written).
+        """
+        raise NotImplementedError
+
+    def update_rows(
+        self,
+        updates: Dict[int, Dict[str, Any]],
+        appended: List[Dict[str, Any]],
+        row_count: int,
+    ) -> Any:
+        """
+        Applies row-level changes to the dataset last written by consume():
+        rewrites the rows at the given 0-based positions and appends new
+        rows after the `row_count` existing ones.
+        """
+        raise NotImplementedError
+
+
+class GoogleSheetsSink(Sink):
+    """
+    Full refresh of a single Google Sheets tab, or row-level updates.
+    """
+
+    supports_row_updates = True
+
+    def __init__(
+        self,
+        spreadsheet_id: str,
+        sheet_name: str,
+        credentials_path: str,
+        use_staging_swap: bool = False,
+        transport: str = "discovery",
+        api_url: str | None = None,
+    ):
+        self.name = f"sheets:{sheet_name}"
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet_name = sheet_name
+        self.credentials_path = credentials_path
+        self.use_staging_swap = use_staging_swap
+        self.transport = transport
+        self.api_url = api_url
+
+    def consume(self, rows: Iterator[Dict[str, Any]]) -> int:
+        collected = list(rows)
+
+        export_to_google_sheets(
+            spreadsheet_id=self.spreadsheet_id,
+            sheet_name=self.sheet_name,
+            rows=collected,
+            credentials_path=self.credentials_path,
+            use_staging_swap=self.use_staging_swap,
+            transport=self.transport,
+            api_url=self.api_url,
+        )
+
+        return len(collected)
+
+    def update_rows(
+        self,
+        updates: Dict[int, Dict[str, Any]],
+        appended: List[Dict[str, Any]],
+        row_count: int,
+    ) -> int:
+        return update_google_sheets_rows(
+            spreadsheet_id=self.spreadsheet_id,
+            sheet_name=self.sheet_name,
+            updates=updates,
+            appended=appended,
+            row_count=row_count,
+            credentials_path=self.credentials_path,
+            transport=self.transport,
+            api_url=self.api_url,
+        )
+
+
+class PartitionedGoogleSheetsSink(Sink):
+    """
+    One Google Sheets tab per partition, plus an index tab.
+    """
+
+    def __init__(
+        self,
+        spreadsheet_ids: List[str],
+        partition_key: Callable[[Dict[str, Any]], str],
+        credentials_path: str,
+        transport: str = "discovery",
+        api_url: str | None = None,
+    ):
+        self.name = "sheets:partitioned"
+        self.spreadsheet_ids = spreadsheet_ids
+        self.partition_key = partition_key
+        self.credentials_path = credentials_path
+        self.transport = transport
+        self.api_url = api_url
+
+    def consume(self, rows: Iterator[Dict[str, Any]]) -> List[str]:
+        return export_partitioned_to_google_sheets(
+            spreadsheet_ids=self.spreadsheet_ids,
+            rows=list(rows),
+            partition_key=self.partition_key,
+            credentials_path=self.credentials_path,
+            transport=self.transport,
+            api_url=self.api_url,
+        )
+
+
+class SummarySheetsSink(Sink):
+    """
+    Precomputed aggregates written as small Google Sheets summary tabs.
+
+    Rows are aggregated as they arrive, so nothing is collected in memory.
+    """
+
+    def __init__(
+        self,
+        spreadsheet_id: str,
+        summaries: Dict[str, List[str]],
+        credentials_path: str,
+        transport: str = "discovery",
+    ):
+        self.name = "sheets:summaries"
+        self.spreadsheet_id = spreadsheet_id
+        self.summaries = summaries
+        self.credentials_path = credentials_path
+        self.transport = transport
+
+    def consume(self, rows: Iterator[Dict[str, Any]]) -> Dict[str, int]:
+        tables = aggregate_deals(rows, self.summaries)
+
+        export_summaries_to_google_sheets(
+            spreadsheet_id=self.spreadsheet_id,
+            tables=tables,
+            credentials_path=self.credentials_path,
+            transport=self.transport,
+        )
+
+        return {name: len(values) for name, (_, values) in tables.items()}
+
+
+class XlsxSink(Sink):
+    """
+    Streaming XLSX file with typed cells.
+    """
+
+    def __init__(self, output_path: str):
+        self.name = "xlsx"
+        self.output_path = output_path
+
+    def consume(self, rows: Iterator[Dict[str, Any]]) -> int:
+        return export_rows_to_xlsx_stream(rows=rows, output_path=self.output_path)
+
+
+class CsvSink(Sink):
+    """
+    Month-partitioned gzip CSV dataset.
+    """
+
+    def __init__(self, output_dir: str):
+        self.name = "csv"
+        self.output_dir = output_dir
+
+    def consume(self, rows: Iterator[Dict[str, Any]]) -> Dict[str, int]:
+        return export_rows_to_csv_partitions(rows=rows, output_dir=self.output_dir)
+
+
+class ParquetSink(Sink):
+    """
+    Month-partitioned Parquet dataset.
+    """
+
+    def __init__(self, output_dir: str):
+        self.name = "parquet"
+        self.output_dir = output_dir
+
+    def consume(self, rows: Iterator[Dict[str, Any]]) -> Dict[str, int]:
+        return export_rows_to_parquet_partitions(rows=rows, output_dir=self.output_dir)
+
+
+class LocalStoreSink(Sink):
+    """
+    Local snapshot of the normalized rows as gzip JSON Lines.
+
+    Keeps the last exported dataset on disk, e.g. to inspect or re-export
+    it without calling Bitrix again.
+    """
+
+    def __init__(self, output_path: str):
+        self.name = "local_store"
+        self.output_path = output_path
+
+    def consume(self, rows: Iterator[Dict[str, Any]]) -> int:
+        directory = os.path.dirname(self.output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = f"{self.output_path}.tmp"
+        written = 0
+
+        with gzip.open(temp_path, "wt", encoding="utf-8") as file:
+            for row in rows:
+                file.write(json.dumps(row, ensure_ascii=False, default=str))
+                file.write("\n")
+                written += 1
+
+        os.replace(temp_path, self.output_path)
+
+        return written
@@ -0,0 +1,127 @@
+"""
+Summary tabs Google Sheets exporter.
+
+Responsible for:
+- Writing small precomputed summary tables, one tab each
+- Creating missing summary tabs and growing their grid when needed
+
+Summary tabs are read by dashboard formulas, so they are refreshed in
+place (tabs are never deleted, which would break references with #REF!).
+Every tab is written with a fixed number of calls, whatever the number
+of summaries: one metadata read, one batchUpdate for tab creation/resizing
+(only when needed), one values.batchClear and one values.batchUpdate.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+from src.exporters.google_sheets_exporter import (
+    a1_range,
+    build_sheets_api,
+    execute_with_retry,
+    shared_write_quota,
+)
+
+
+def export_summaries_to_google_sheets(
+    spreadsheet_id: str,
+    tables: Dict[str, Tuple[List[str], List[List[Any]]]],
+    credentials_path: str,
+    transport: str = "discovery",
+    api_url: str | None = None,
+) -> None:
+    """
+    Writes summary tables to their tabs.
+
+    Args:
+        spreadsheet_id: Target Google Spreadsheet ID
+        tables: { tab name: (headers, values) }, see aggregate_deals()
+        credentials_path: Path to service account credentials JSON
+        transport: "discovery" (googleapiclient) or "rest" (direct REST calls)
+        api_url: Sheets API root for the "rest" transport
+    """
+
+    if not tables:
+        return
+
+    sheets_api, _ = build_sheets_api(credentials_path, transport, api_url)
+    quota = shared_write_quota(credentials_path)
+
+    metadata = execute_with_retry(
+        sheets_api.get(spreadsheetId=spreadsheet_id, fields="sheets.properties")
+    )
+
+    existing = {
+        sheet["properties"]["title"]: sheet["properties"]
+        for sheet in metadata.get("sheets", [])
+    }
+
+    # 1. Create missing tabs and grow the grid of existing ones
+    structure_requests = []
+
+    for name, (headers, values) in tables.items():
+        row_count = 1 + len(values)  # header + rows
+        column_count = max(1, len(headers))
+        properties = existing.get(name)
+
+        if properties is None:
+            structure_requests.append({
+                "addSheet": {
+                    "properties": {
+                        "title": name,
+                        "gridProperties": {
+                            "rowCount": row_count,
+                            "columnCount": column_count,
+                        },
+                    }
+                }
+            })
+            continue
+
+        grid = properties.get("gridProperties", {})
+        if grid.get("rowCount", 0) < row_count or grid.get("columnCount", 0) < column_count:
+            structure_requests.append({
+                "updateSheetProperties": {
+                    "properties": {
+                        "sheetId": properties["sheetId"],
+                        "gridProperties": {
+                            "rowCount": max(grid.get("rowCount", 0), row_count),
+                            "columnCount": max(grid.get("columnCount", 0), column_count),
+                        },
+                    },
+                    "fields": "gridProperties.rowCount,gridProperties.columnCount",
+                }
+            })
+
+    if structure_requests:
+        execute_with_retry(
+            sheets_api.batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={"requests": structure_requests},
+            ),
+            quota=quota,
+        )
+
+    # 2. Clear previous contents (summaries may shrink), then write all tabs
+    execute_with_retry(
+        sheets_api.values().batchClear(
+            spreadsheetId=spreadsheet_id,
+            body={"ranges": [a1_range(name) for name in tables]},
+        ),
+        quota=quota,
+    )
+
+    execute_with_retry(
+        sheets_api.values().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={
+                "valueInputOption": "RAW",
+                "data": [
+                    {"range": a1_range(name, "A1"), "values": [headers] + values}
+                    for name, (headers, values) in tables.items()
+                ],
+            },
+        ),
+        quota=quota,
+    )
+
+    print(f"Summary tabs written: {', '.join(tables)}")
@@ -0,0 +1,118 @@
+"""
+Typed value conversion for file exporters.
+
+Responsible for:
+- Declaring the type of each export column (text, number, date)
+- Converting normalized (string) values into typed Python values
+
+Normalized deals keep every value as presented in Google Sheets
+(e.g. "1500.00", "15/03/2025"). File formats with real column types
+(XLSX, Parquet, CSV readers) get numbers and dates instead.
+"""
+
+import math
+
+from datetime import date, datetime
+from typing import Any, Dict, List
+
+
+TEXT = "text"
+NUMBER = "number"
+DATE = "date"
+
+# Column types of the normalized deal export (labels from FIELD_LABEL_MAP)
+DEAL_COLUMN_TYPES: Dict[str, str] = {
+    "Renda": NUMBER,
+    "Valor Total de Aparelhos": NUMBER,
+    "Criado em": DATE,
+    "Data de Início": DATE,
+    "Data de Fechamento": DATE,
+    "Ligações": NUMBER,
+    "Reuniões": NUMBER,
+    "E-mails": NUMBER,
+    "Total de Atividades": NUMBER,
+}
+
+
+def parse_number(value: Any) -> float | None:
+    """
+    Parses Bitrix numeric values, including money fields.
+
+    Example:
+        "1500.00" -> 1500.0
+        "1000|BRL" -> 1000.0
+    """
+
+    if value is None or value == "":
+        return None
+
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else None
+
+    text = str(value).split("|", 1)[0].strip()
+
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+
+    # "nan"/"inf" parse as floats but are not valid spreadsheet numbers
+    return number if math.isfinite(number) else None
+
+
+def parse_date(value: Any) -> date | None:
+    """
+    Parses a dd/mm/yyyy date produced by the enricher.
+    """
+
+    if not value:
+        return None
+
+    if isinstance(value, date):
+        return value
+
+    try:
+        return datetime.strptime(str(value), "%d/%m/%Y").date()
+    except ValueError:
+        return None
+
+
+def convert_value(value: Any, column_type: str, strict: bool = False) -> Any:
+    """
+    Converts a single value to its column type (empty values become None).
+
+    Text that is not a valid number or date (e.g. "a combinar") is kept as
+    is rather than lost, unless strict: formats whose columns cannot hold
+    text (Parquet) get None instead.
+    """
+
+    if value is None or value == "":
+        return None
+
+    if column_type == NUMBER:
+        converted = parse_number(value)
+    elif column_type == DATE:
+        converted = parse_date(value)
+    else:
+        return value
+
+    if converted is None and not strict and isinstance(value, str):
+        return value
+
+    return converted
+
+
+def typed_row(
+    row: Dict[str, Any],
+    headers: List[str],
+    column_types: Dict[str, str] = DEAL_COLUMN_TYPES,
+    strict: bool = False,
+) -> List[Any]:
+    """
+    Converts a normalized row into a list of typed values ordered by headers.
+    """
+
+    return [
+        convert_value(row.get(header), column_types.get(header, TEXT), strict)
+        for header in headers
+    ]
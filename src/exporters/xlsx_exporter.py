@@ -3,10 +3,21 @@ XLSX exporter.
 
 Responsible for:
 - Writing normalized deal data to an Excel file
+- Streaming large exports with typed cells in constant memory
+- Writing partitioned data as one Excel file per partition
 """
 
-from typing import List, Dict, Any
-from openpyxl import Workbook
+import os
+
+from itertools import chain
+from typing import Iterable, List, Dict, Any
+
+from src.exporters.typed_values import DEAL_COLUMN_TYPES, typed_row
+from src.exporters.xlsx_stream_writer import MAX_SHEET_TITLE_LENGTH, XlsxStreamWriter
+
+
+# Maximum number of rows of an Excel worksheet (header included)
+EXCEL_MAX_ROWS = 1_048_576
 
 
 def export_deals_to_xlsx(
@@ -24,6 +35,9 @@ def export_deals_to_xlsx(
     if not deals:
         raise ValueError("No deals provided for export")
 
+    # Imported here: the streaming exports below do not need openpyxl
+    from openpyxl import Workbook
+
     workbook = Workbook()
     sheet = workbook.active
     sheet.title = "Deals"
@@ -36,3 +50,106 @@ def export_deals_to_xlsx(
         sheet.append(row)
 
     workbook.save(output_path)
+
+
+def export_rows_to_xlsx_stream(
+    rows: Iterable[Dict[str, Any]],
+    output_path: str,
+    headers: List[str] | None = None,
+    column_types: Dict[str, str] = DEAL_COLUMN_TYPES,
+    sheet_title: str = "Deals",
+    max_rows_per_sheet: int = EXCEL_MAX_ROWS,
+) -> int:
+    """
+    Streams rows to an XLSX file with typed cells, in constant memory.
+
+    Rows are serialized as they arrive (see XlsxStreamWriter) instead of
+    being kept in an in-memory workbook. Numbers and dates are written as
+    real numeric/date cells. When a sheet reaches the row limit,
+    writing continues on "<sheet_title> 2", "<sheet_title> 3", ...
+
+    Args:
+        rows: Iterable (e.g. generator) of normalized deal dictionaries
+        output_path: Path to output XLSX file
+        headers: Column headers (defaults to the keys of the first row)
+        column_types: { header: "number" | "date" | "text" }
+        sheet_title: Title of the first sheet
+        max_rows_per_sheet: Rows per sheet, header included
+
+    Returns:
+        Number of data rows written.
+    """
+
+    rows = iter(rows)
+
+    if not headers:
+        first_row = next(rows, None)
+
+        if first_row is None:
+            raise ValueError("No deals provided for export")
+
+        headers = list(first_row.keys())
+        rows = chain([first_row], rows)
+
+    if max_rows_per_sheet < 2:
+        raise ValueError("max_rows_per_sheet must leave room for the header and one row")
+
+    written = 0
+
+    with XlsxStreamWriter(output_path) as writer:
+
+        def new_sheet(number: int) -> None:
+            suffix = "" if number == 1 else f" {number}"
+            writer.add_sheet(sheet_title[:MAX_SHEET_TITLE_LENGTH - len(suffix)] + suffix)
+            writer.write_row(headers)
+
+        sheet_number = 1
+        new_sheet(sheet_number)
+        sheet_rows = 1  # header
+
+        for row in rows:
+            if sheet_rows >= max_rows_per_sheet:
+                sheet_number += 1
+                new_sheet(sheet_number)
+                sheet_rows = 1
+
+            writer.write_row(typed_row(row, headers, column_types))
+            sheet_rows += 1
+            written += 1
+
+    return written
+
+
+def export_partitions_to_xlsx(
+    partitions: Dict[str, List[Dict[str, Any]]],
+    output_dir: str,
+    file_prefix: str = "deals_",
+) -> List[str]:
+    """
+    Exports each partition to its own XLSX file.
+
+    Example:
+        { "2025-01": [...] } -> <output_dir>/deals_2025-01.xlsx
+
+    Args:
+        partitions: { partition_key: list of normalized deal dictionaries }
+        output_dir: Directory receiving the files (created if missing)
+        file_prefix: Prefix of the file names
+
+    Returns:
+        Paths of the files written.
+    """
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    written: List[str] = []
+
+    for key, deals in sorted(partitions.items()):
+        if not deals:
+            continue
+
+        output_path = os.path.join(output_dir, f"{file_prefix}{key}.xlsx")
+        export_rows_to_xlsx_stream(rows=deals, output_path=output_path)
+        written.append(output_path)
+
+    return written
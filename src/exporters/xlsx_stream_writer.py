@@ -0,0 +1,257 @@
+"""
+Streaming XLSX writer.
+
+Responsible for:
+- Writing worksheets row by row straight into the XLSX zip container
+- Emitting typed cells (numbers, dates, inline strings)
+
+Unlike openpyxl (even in write-only mode), rows are serialized with plain
+string formatting, so memory stays constant and large files are generated
+several times faster. Only the features needed by the exporters are
+supported: several sheets, numbers, text and dd/mm/yyyy dates.
+
+The file is written to a temporary path and renamed when complete, so
+an export failing mid-stream never replaces the previous file.
+"""
+
+import os
+import re
+import zipfile
+
+from datetime import date, datetime
+from typing import Any, List
+from xml.sax.saxutils import escape
+
+
+# Characters not allowed in XML 1.0 (Excel refuses files containing them)
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Sheet titles Excel accepts: 1-31 characters, none of these
+MAX_SHEET_TITLE_LENGTH = 31
+_INVALID_SHEET_TITLE_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+# Excel date serial numbers count days since this date
+_EXCEL_EPOCH = date(1899, 12, 30)
+
+# Rows serialized before each write to the zip stream
+_WRITE_BUFFER_ROWS = 1000
+
+_CONTENT_TYPES_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+# Style 0: default; style 1: dd/mm/yyyy date
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="dd/mm/yyyy"/></numFmts>'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+)
+
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+def _cell_xml(value: Any) -> str:
+    """
+    Serializes one cell (references are implicit, cells are consecutive).
+    """
+
+    if value is None:
+        return "<c/>"
+
+    # bool is an int subclass, but must be written as text to stay readable
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value!r}</v></c>"
+
+    if isinstance(value, datetime):
+        value = value.date()
+
+    if isinstance(value, date):
+        return f'<c s="1"><v>{(value - _EXCEL_EPOCH).days}</v></c>'
+
+    text = escape(_ILLEGAL_XML_CHARS.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+class XlsxStreamWriter:
+    """
+    Writes an XLSX file sheet by sheet, row by row.
+
+    Usage:
+        with XlsxStreamWriter("deals.xlsx") as writer:
+            writer.add_sheet("Deals")
+            writer.write_row(["Renda", "Criado em"])
+            writer.write_row([1500.0, date(2025, 3, 15)])
+
+    Leaving the block with an exception discards the file (see abort()).
+    """
+
+    def __init__(self, output_path: str):
+        self._output_path = output_path
+        self._temp_path = f"{output_path}.tmp"
+        self._zip = zipfile.ZipFile(self._temp_path, "w", compression=zipfile.ZIP_DEFLATED)
+        self._sheet_titles: List[str] = []
+        self._stream = None
+        self._buffer: List[str] = []
+        self._row_number = 0
+
+    def add_sheet(self, title: str) -> None:
+        """
+        Starts a new worksheet; the previous one is finalized.
+
+        Raises:
+            ValueError: If Excel would reject the title (empty, longer than
+                31 characters, containing []:*?/\ or already used)
+        """
+
+        if not title or len(title) > MAX_SHEET_TITLE_LENGTH or _INVALID_SHEET_TITLE_CHARS.search(title):
+            raise ValueError(f"Invalid sheet title {title!r}: 1-{MAX_SHEET_TITLE_LENGTH} characters, none of []:*?/\\")
+
+        if title.lower() in (existing.lower() for existing in self._sheet_titles):
+            raise ValueError(f"Duplicate sheet title {title!r}")
+
+        self._close_sheet()
+
+        self._sheet_titles.append(title)
+        # Sizes are unknown while streaming: zip64 headers allow sheets over 2 GiB
+        self._stream = self._zip.open(
+            f"xl/worksheets/sheet{len(self._sheet_titles)}.xml", "w", force_zip64=True
+        )
+        self._stream.write(_SHEET_HEAD.encode("utf-8"))
+        self._row_number = 0
+
+    def write_row(self, values: List[Any]) -> None:
+        """
+        Appends a row of typed values to the current worksheet.
+        """
+
+        if self._stream is None:
+            raise RuntimeError("add_sheet() must be called before write_row()")
+
+        self._row_number += 1
+        cells = "".join(_cell_xml(value) for value in values)
+        self._buffer.append(f'<row r="{self._row_number}">{cells}</row>')
+
+        if len(self._buffer) >= _WRITE_BUFFER_ROWS:
+            self._flush()
+
+    def close(self) -> None:
+        """
+        Finalizes the current worksheet, writes the workbook parts and
+        publishes the file at output_path.
+        """
+
+        self._close_sheet()
+
+        sheet_count = len(self._sheet_titles)
+
+        content_types = _CONTENT_TYPES_HEAD + "".join(
+            f'<Override PartName="/xl/worksheets/sheet{number}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for number in range(1, sheet_count + 1)
+        ) + "</Types>"
+
+        workbook = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            "<sheets>"
+            + "".join(
+                f'<sheet name="{escape(title, {chr(34): "&quot;"})}" sheetId="{number}" r:id="rId{number}"/>'
+                for number, title in enumerate(self._sheet_titles, start=1)
+            )
+            + "</sheets></workbook>"
+        )
+
+        workbook_rels = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + "".join(
+                f'<Relationship Id="rId{number}" '
+                'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                f'Target="worksheets/sheet{number}.xml"/>'
+                for number in range(1, sheet_count + 1)
+            )
+            + f'<Relationship Id="rId{sheet_count + 1}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/>'
+            "</Relationships>"
+        )
+
+        self._zip.writestr("[Content_Types].xml", content_types)
+        self._zip.writestr("_rels/.rels", _ROOT_RELS)
+        self._zip.writestr("xl/workbook.xml", workbook)
+        self._zip.writestr("xl/_rels/workbook.xml.rels", workbook_rels)
+        self._zip.writestr("xl/styles.xml", _STYLES)
+        self._zip.close()
+
+        os.replace(self._temp_path, self._output_path)
+
+    def abort(self) -> None:
+        """
+        Discards the partial file; output_path keeps its previous contents.
+        """
+
+        try:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+            self._zip.close()
+        finally:
+            if os.path.exists(self._temp_path):
+                os.remove(self._temp_path)
+
+    def _flush(self) -> None:
+        if self._buffer:
+            self._stream.write("".join(self._buffer).encode("utf-8"))
+            self._buffer = []
+
+    def _close_sheet(self) -> None:
+        if self._stream is None:
+            return
+
+        self._flush()
+        self._stream.write(_SHEET_TAIL.encode("utf-8"))
+        self._stream.close()
+        self._stream = None
+
+    def __enter__(self) -> "XlsxStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
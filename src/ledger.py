@@ -0,0 +1,223 @@
+"""
+Run ledger and performance regression detection.
+
+Responsible for:
+- Appending one JSON line per export run: duration per stage, API call
+  counts per method, rows processed and peak memory
+- Comparing each run with a rolling baseline (median of the previous
+  successful runs with the same options) and flagging stages that got
+  significantly slower and API methods called significantly more often
+
+Runs with different options (targets, reports, hot/cold, ...) have a
+different signature and never share a baseline. Stages served from the
+stage cache are not compared.
+
+Like the state files, the ledger must be cached between CI runs
+(e.g. actions/cache) for the baseline to build up.
+"""
+
+import json
+import os
+
+from datetime import datetime
+from statistics import median
+from typing import Any, Dict, List
+
+from src.metrics import REGISTRY, MetricsRegistry
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+DEFAULT_LEDGER_PATH = "run_ledger.jsonl"
+
+# Previous successful runs forming the baseline, and the minimum needed
+BASELINE_RUNS = 7
+MIN_BASELINE_RUNS = 3
+
+# A stage is flagged when slower than baseline * ratio by at least the
+# given number of seconds (short stages are noisy)
+SLOWDOWN_RATIO = 1.5
+MIN_SLOWDOWN_SECONDS = 5.0
+
+# An API method is flagged when called more than baseline * ratio times,
+# with at least the given number of extra calls
+CALLS_RATIO = 1.5
+MIN_EXTRA_CALLS = 20
+
+
+def api_call_counts(registry: MetricsRegistry = REGISTRY) -> Dict[str, Dict[str, int]]:
+    """
+    Requests of the run per API and method, all outcomes included.
+
+    Returns:
+        { "bitrix": { "crm.deal.list": 120, ... }, "sheets": { ... } }
+    """
+
+    counters = registry.to_dict()["counters"]
+    counts: Dict[str, Dict[str, int]] = {}
+
+    for api, metric, label in (
+        ("bitrix", "bitrix_requests_total", "method"),
+        ("sheets", "sheets_requests_total", "operation"),
+    ):
+        per_method: Dict[str, int] = {}
+
+        for entry in counters.get(metric, []):
+            name = entry["labels"].get(label, "unknown")
+            per_method[name] = per_method.get(name, 0) + int(entry["value"])
+
+        counts[api] = dict(sorted(per_method.items()))
+
+    return counts
+
+
+def peak_rss_bytes() -> int | None:
+    """
+    Peak resident memory of the process (None where unavailable).
+    """
+
+    if resource is None:
+        return None
+
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def load_ledger(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+
+    with open(path, "r", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def append_run(path: str, record: Dict[str, Any]) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(json.dumps(record, ensure_ascii=False))
+        file.write("\n")
+
+
+def find_regressions(record: Dict[str, Any], history: List[Dict[str, Any]]) -> List[str]:
+    """
+    Compares a run with the median of the previous successful runs having
+    the same signature.
+
+    Returns:
+        Human-readable flags, e.g.
+        ["Stage 'enrich' took 48.2s (baseline 20.1s, x2.4)"]
+    """
+
+    baseline = [
+        run
+        for run in history
+        if run.get("signature") == record.get("signature") and run.get("status") == "ok"
+    ][-BASELINE_RUNS:]
+
+    if len(baseline) < MIN_BASELINE_RUNS:
+        return []
+
+    flags = []
+
+    for name, stage in record["stages"].items():
+        if stage["status"] != "ok":
+            continue
+
+        previous = [
+            run["stages"][name]["wall_seconds"]
+            for run in baseline
+            if run["stages"].get(name, {}).get("status") == "ok"
+        ]
+
+        if len(previous) < MIN_BASELINE_RUNS:
+            continue
+
+        expected = median(previous)
+        seconds = stage["wall_seconds"]
+
+        if seconds > expected * SLOWDOWN_RATIO and seconds - expected >= MIN_SLOWDOWN_SECONDS:
+            flags.append(
+                f"Stage '{name}' took {seconds:.1f}s "
+                f"(baseline {expected:.1f}s, x{seconds / max(expected, 1e-9):.1f})"
+            )
+
+    # Runs served partly from the stage cache made fewer calls
+    fresh = [
+        run
+        for run in baseline
+        if all(stage["status"] != "cached" for stage in run["stages"].values())
+    ]
+
+    if len(fresh) < MIN_BASELINE_RUNS:
+        return flags
+
+    for api, methods in record["api_calls"].items():
+        for method, calls in methods.items():
+            expected = median(run["api_calls"].get(api, {}).get(method, 0) for run in fresh)
+
+            if calls > expected * CALLS_RATIO and calls - expected >= MIN_EXTRA_CALLS:
+                flags.append(f"{api} {method}: {calls} calls (baseline {expected:.0f})")
+
+    return flags
+
+
+def record_run(
+    path: str,
+    signature: str,
+    status: str,
+    stage_rows: List[Dict[str, Any]],
+    started_at: datetime,
+    duration_seconds: float,
+    registry: MetricsRegistry = REGISTRY,
+) -> Dict[str, Any]:
+    """
+    Appends a run to the ledger and prints the regressions found against
+    the previous runs.
+
+    Args:
+        path: JSON Lines ledger file
+        signature: Identifies the run options (runs are only compared with
+                   runs of the same signature)
+        status: "ok", "aborted" or "failed"
+        stage_rows: Per-stage report (see PipelineExecutor.report_rows)
+        started_at: Start of the run
+        duration_seconds: Total duration of the run
+        registry: Request metrics of the run
+
+    Returns:
+        The recorded run, with its "regressions".
+    """
+
+    stage_peaks = [row["peak_memory_bytes"] for row in stage_rows if row.get("peak_memory_bytes")]
+
+    record = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "signature": signature,
+        "status": status,
+        "duration_seconds": round(duration_seconds, 3),
+        "stages": {
+            row["stage"]: {key: value for key, value in row.items() if key != "stage"}
+            for row in stage_rows
+        },
+        "api_calls": api_call_counts(registry),
+        "rows": next((row["rows"] for row in stage_rows if row["stage"] == "load"), None),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "peak_traced_bytes": max(stage_peaks) if stage_peaks else None,
+    }
+
+    record["regressions"] = find_regressions(record, load_ledger(path)) if status == "ok" else []
+
+    append_run(path, record)
+
+    if record["regressions"]:
+        print("\nPerformance regressions against the recent runs:")
+        for flag in record["regressions"]:
+            print(f"  - {flag}")
+
+    return record
@@ -0,0 +1,112 @@
+"""
+Deal activity counts loader.
+
+Responsible for:
+- Streaming deal activities (crm.activity.list) page by page
+- Aggregating them on the fly into counts per deal and activity type
+
+Raw activities are never kept: each page is folded into the counts and
+dropped. Pages are read by ID keyset ({">ID": last_id}, start=-1), so an
+incremental run resumes after the last activity already counted.
+
+Activities deleted after being counted are not subtracted; a full
+recount (empty cursor) fixes that.
+"""
+
+from typing import Any, Dict, Iterator, List, Tuple
+
+from src.bitrix_client import BitrixClient
+
+
+DEAL_OWNER_TYPE_ID = 2
+
+# Bitrix always returns pages of 50 items
+PAGE_SIZE = 50
+
+# Activity TYPE_ID -> count key
+ACTIVITY_TYPES = {
+    "1": "meetings",
+    "2": "calls",
+    "4": "emails",
+}
+
+OTHER_ACTIVITY_TYPE = "other"
+
+
+def iter_activity_pages(
+    client: BitrixClient,
+    since: str,
+    after_id: int = 0,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yields pages of deal activities created on or after `since`, with an
+    ID greater than `after_id`, in ID order.
+    """
+
+    last_id = after_id
+
+    while True:
+        data = client.call(
+            "crm.activity.list",
+            {
+                "order": {"ID": "ASC"},
+                "filter": {
+                    ">ID": last_id,
+                    "OWNER_TYPE_ID": DEAL_OWNER_TYPE_ID,
+                    ">=CREATED": since,
+                },
+                "select": ["ID", "OWNER_ID", "TYPE_ID"],
+                "start": -1,  # Keyset mode: no total count, no offset
+            },
+        )
+
+        page = data.get("result", [])
+
+        if not page:
+            return
+
+        yield page
+
+        last_id = int(page[-1]["ID"])
+
+        if len(page) < PAGE_SIZE:
+            return
+
+
+def fetch_activity_counts(
+    client: BitrixClient,
+    since: str,
+    after_id: int = 0,
+    counts: Dict[str, Dict[str, int]] | None = None,
+    progress_callback=None,
+) -> Tuple[Dict[str, Dict[str, int]], int]:
+    """
+    Counts deal activities per deal and type, adding to existing counts.
+
+    Args:
+        since: Start of the activity window (YYYY-MM-DD)
+        after_id: Last activity ID already counted (0 = full recount)
+        counts: Counts of previous runs, updated in place
+        progress_callback: Optional callback to report loading progress.
+
+    Returns:
+        ({ deal_id: { "calls": 3, "meetings": 1, ... } }, last activity ID)
+    """
+
+    counts = counts if counts is not None else {}
+    last_id = after_id
+    processed = 0
+
+    for page in iter_activity_pages(client, since, after_id):
+        for activity in page:
+            deal_counts = counts.setdefault(str(activity["OWNER_ID"]), {})
+            activity_type = ACTIVITY_TYPES.get(str(activity.get("TYPE_ID")), OTHER_ACTIVITY_TYPE)
+            deal_counts[activity_type] = deal_counts.get(activity_type, 0) + 1
+
+        last_id = int(page[-1]["ID"])
+        processed += len(page)
+
+        if progress_callback:
+            progress_callback(processed)
+
+    return counts, last_id
@@ -0,0 +1,224 @@
+"""
+Generic CRM item loader (crm.item.list).
+
+Responsible for:
+- Fetching any CRM entity (leads, contacts, companies, deals, smart
+  processes) by entityTypeId
+- Describing each entity with a schema: fields to select, their export
+  labels and the creation/modification date fields
+- Projecting fields (select), pushing filters down and paginating by ID
+  keyset, the same way for every entity
+
+Keyset pagination ({">id": last_id}, ordered by id, start=-1) skips the
+row count and offset scan of regular pagination, so every page costs the
+same whatever the entity size.
+
+crm.item.list uses camelCase field names (e.g. "createdTime",
+"assignedById", "ufCrm12_1700000000").
+"""
+
+from typing import Any, Dict, Iterator, List
+
+from src.bitrix_client import BitrixClient
+from src.loaders.filters import run_sub_queries, split_filter
+
+
+# Bitrix always returns pages of 50 items
+PAGE_SIZE = 50
+
+
+class EntitySchema:
+    """
+    Describes a CRM entity for crm.item.list.
+
+    Args:
+        name: Short name (e.g. "lead")
+        entity_type_id: Bitrix entityTypeId (1 lead, 2 deal, 3 contact,
+                        4 company, >= 128 smart processes)
+        fields: { field: export label }, in export order ("id" is always
+                selected)
+        created_field: Creation date field, used by start_date filters
+        modified_field: Modification date field, used by incremental loads
+    """
+
+    def __init__(
+        self,
+        name: str,
+        entity_type_id: int,
+        fields: Dict[str, str],
+        created_field: str = "createdTime",
+        modified_field: str = "updatedTime",
+    ):
+        self.name = name
+        self.entity_type_id = entity_type_id
+        self.fields = fields
+        self.created_field = created_field
+        self.modified_field = modified_field
+
+    @property
+    def select(self) -> List[str]:
+        return list(dict.fromkeys(["id", *self.fields]))
+
+
+_COMMON_FIELDS = {
+    "id": "ID",
+    "title": "Título",
+    "assignedById": "Responsável (ID)",
+    "createdTime": "Criado em",
+    "updatedTime": "Modificado em",
+}
+
+ENTITY_SCHEMAS: Dict[str, EntitySchema] = {
+    "lead": EntitySchema("lead", 1, {
+        **_COMMON_FIELDS,
+        "statusId": "Status",
+        "sourceId": "Fonte",
+        "opportunity": "Valor",
+        "name": "Nome",
+        "lastName": "Sobrenome",
+        "companyTitle": "Empresa",
+    }),
+    "deal": EntitySchema("deal", 2, {
+        **_COMMON_FIELDS,
+        "categoryId": "Pipeline (ID)",
+        "stageId": "Fase (ID)",
+        "opportunity": "Renda",
+        "companyId": "Empresa (ID)",
+    }),
+    "contact": EntitySchema("contact", 3, {
+        "id": "ID",
+        "name": "Nome",
+        "lastName": "Sobrenome",
+        "assignedById": "Responsável (ID)",
+        "companyId": "Empresa (ID)",
+        "createdTime": "Criado em",
+        "updatedTime": "Modificado em",
+    }),
+    "company": EntitySchema("company", 4, {
+        **_COMMON_FIELDS,
+        "companyTypeId": "Tipo",
+        "industry": "Setor",
+    }),
+}
+
+
+def smart_process_schema(
+    name: str,
+    entity_type_id: int,
+    extra_fields: Dict[str, str] | None = None,
+) -> EntitySchema:
+    """
+    Builds the schema of a smart process (common fields plus its own).
+
+    Example:
+        smart_process_schema("contratos", 1032, {"ufCrm5_1700000000": "Plano"})
+    """
+
+    if entity_type_id < 128:
+        raise ValueError(f"Smart process entityTypeId must be >= 128, got {entity_type_id}")
+
+    return EntitySchema(name, entity_type_id, {
+        **_COMMON_FIELDS,
+        "categoryId": "Pipeline (ID)",
+        "stageId": "Fase (ID)",
+        **(extra_fields or {}),
+    })
+
+
+def register_entity_schema(schema: EntitySchema) -> None:
+    """
+    Makes a schema (e.g. a smart process) available by name.
+    """
+
+    ENTITY_SCHEMAS[schema.name] = schema
+
+
+def get_entity_schema(name: str) -> EntitySchema:
+    try:
+        return ENTITY_SCHEMAS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown CRM entity '{name}'. Expected one of: {', '.join(ENTITY_SCHEMAS)}"
+        ) from None
+
+
+def iter_item_pages(
+    client: BitrixClient,
+    entity_type_id: int,
+    select: List[str],
+    item_filter: Dict[str, Any] | None = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yields pages of items matching the filter, in id order.
+    """
+
+    last_id = 0
+
+    while True:
+        data = client.call(
+            "crm.item.list",
+            {
+                "entityTypeId": entity_type_id,
+                "select": select,
+                "order": {"id": "ASC"},
+                "filter": {**(item_filter or {}), ">id": last_id},
+                "start": -1,  # Keyset mode: no total count, no offset
+            },
+        )
+
+        page = data.get("result", {}).get("items", [])
+
+        if not page:
+            return
+
+        yield page
+
+        last_id = int(page[-1]["id"])
+
+        if len(page) < PAGE_SIZE:
+            return
+
+
+def fetch_items(
+    client: BitrixClient,
+    schema: EntitySchema,
+    start_date: str | None = None,
+    modified_since: str | None = None,
+    filters: Dict[str, Any] | None = None,
+    select: List[str] | None = None,
+    progress_callback=None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetches the items of a CRM entity.
+
+    Args:
+        schema: Entity schema (see ENTITY_SCHEMAS / smart_process_schema)
+        start_date: Only items created on or after this date (YYYY-MM-DD)
+        modified_since: Only items modified after this datetime (incremental)
+        filters: Extra crm.item.list filter conditions (camelCase fields)
+        select: Fields to fetch (defaults to the schema fields)
+        progress_callback: Optional callback to report loading progress.
+
+    IN-lists longer than FILTER_IN_LIST_LIMIT are split into sub-queries,
+    fetched concurrently and concatenated in order.
+    """
+
+    item_filter: Dict[str, Any] = dict(filters or {})
+
+    if start_date:
+        item_filter[f">={schema.created_field}"] = start_date
+
+    if modified_since:
+        item_filter[f">{schema.modified_field}"] = modified_since
+
+    def fetch(sub_filter: Dict[str, Any], progress) -> List[Dict[str, Any]]:
+        items: List[Dict[str, Any]] = []
+
+        for page in iter_item_pages(client, schema.entity_type_id, select or schema.select, sub_filter):
+            items.extend(page)
+            progress(len(items))
+
+        return items
+
+    return run_sub_queries(split_filter(item_filter), fetch, progress_callback)
+
@@ -4,11 +4,15 @@ Deal loader utilities.
 Responsible for:
 - Fetching deals from Bitrix24 CRM
 - Handling pagination safely
+- Compiling typed filters into Bitrix filter syntax (server-side filtering)
 - Returning raw deal data for further enrichment
 """
 
-from typing import List, Dict, Any
+import re
+
+from typing import List, Dict, Any, Iterable, Tuple
 from src.bitrix_client import BitrixClient
+from src.loaders.filters import FILTER_IN_LIST_LIMIT, run_sub_queries, split_filter
 
 
 DEAL_SELECT_FIELDS = [
@@ -24,6 +28,7 @@ DEAL_SELECT_FIELDS = [
     "DATE_CREATE",
     "BEGINDATE",
     "CLOSEDATE",
+    "DATE_MODIFY",
 
     # Custom fields
     "UF_CRM_1750948742478",  # Descrição do Pedido
@@ -35,11 +40,121 @@ DEAL_SELECT_FIELDS = [
 ]
 
 
+class DealFilter:
+    """
+    Typed deal filter, compiled into Bitrix `filter` syntax by to_bitrix().
+
+    Args:
+        category_ids: Pipelines (CATEGORY_ID in ...)
+        stage_ids: Stages (STAGE_ID in ..., e.g. "C8:WON")
+        stage_semantic_ids: Stage semantics (STAGE_SEMANTIC_ID in ...):
+                            "P" in progress, "S" won, "F" lost
+        assigned_by_ids: Responsible users (ASSIGNED_BY_ID in ...)
+        date_ranges: { date field: (start, end) }, half-open [start, end)
+                     in YYYY-MM-DD (or ISO datetime); either bound may be None
+        custom_fields: { "UF_CRM_...": value or list of values }
+
+    Example:
+        DealFilter(category_ids=[8], date_ranges={"CLOSEDATE": ("2025-03-01", None)})
+        -> {"CATEGORY_ID": [8], ">=CLOSEDATE": "2025-03-01"}
+    """
+
+    def __init__(
+        self,
+        category_ids: Iterable[int] | None = None,
+        stage_ids: Iterable[str] | None = None,
+        stage_semantic_ids: Iterable[str] | None = None,
+        assigned_by_ids: Iterable[int] | None = None,
+        date_ranges: Dict[str, Tuple[str | None, str | None]] | None = None,
+        custom_fields: Dict[str, Any] | None = None,
+    ):
+        self.category_ids = _as_list(category_ids)
+        self.stage_ids = _as_list(stage_ids)
+        self.stage_semantic_ids = _as_list(stage_semantic_ids)
+        self.assigned_by_ids = _as_list(assigned_by_ids)
+        self.date_ranges = dict(date_ranges or {})
+        self.custom_fields = dict(custom_fields or {})
+
+        invalid_semantics = set(self.stage_semantic_ids or []) - {"P", "S", "F"}
+        if invalid_semantics:
+            raise ValueError(f"Invalid STAGE_SEMANTIC_ID value(s): {sorted(invalid_semantics)}")
+
+        invalid_fields = [field for field in self.custom_fields if not field.startswith("UF_")]
+        if invalid_fields:
+            raise ValueError(f"Custom fields must be UF_* fields: {invalid_fields}")
+
+    def to_bitrix(self) -> Dict[str, Any]:
+        """
+        Compiles the filter into a Bitrix filter dictionary.
+        """
+
+        compiled: Dict[str, Any] = {}
+
+        for field, values in (
+            ("CATEGORY_ID", self.category_ids),
+            ("STAGE_ID", self.stage_ids),
+            ("STAGE_SEMANTIC_ID", self.stage_semantic_ids),
+            ("ASSIGNED_BY_ID", self.assigned_by_ids),
+        ):
+            if values is not None:
+                compiled[field] = values
+
+        for field, (start, end) in self.date_ranges.items():
+            if start:
+                compiled[f">={field}"] = start
+            if end:
+                compiled[f"<{field}"] = end
+
+        for field, value in self.custom_fields.items():
+            compiled[field] = _as_list(value) if isinstance(value, (list, tuple, set)) else value
+
+        return compiled
+
+    def fields(self) -> List[str]:
+        """
+        Deal fields the filter refers to.
+        """
+
+        return [
+            field.lstrip("<>=!%")
+            for field in self.to_bitrix()
+        ]
+
+
+def _as_list(values: Iterable[Any] | None) -> List[Any] | None:
+    if values is None:
+        return None
+
+    # Deduplicated, keeping the given order
+    return list(dict.fromkeys(values))
+
+
+# YYYY-MM-DD, optionally followed by a time: compares as text
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def _later_date(first: str, second: str) -> str:
+    """
+    Returns the later of two ISO dates (or datetimes).
+
+    Raises:
+        ValueError: If either is not ISO, so they cannot be compared
+    """
+
+    for value in (first, second):
+        if not _ISO_DATE.match(str(value)):
+            raise ValueError(f"Cannot combine DATE_CREATE lower bounds '{first}' and '{second}': expected YYYY-MM-DD")
+
+    return max(str(first), str(second))
+
 
 def fetch_deals(
     client: BitrixClient,
     start_date: str | None = None,
     progress_callback=None,
+    filters: Dict[str, Any] | None = None,
+    select: List[str] | None = None,
+    deal_filter: DealFilter | None = None,
 ) -> List[Dict[str, Any]]:
     """
     Fetches CRM deals with optional date filtering.
@@ -47,22 +162,38 @@ def fetch_deals(
     Args:
         start_date: ISO date string (YYYY-MM-DD).
                     If provided, only deals created on or after this date are fetched.
+                    A DATE_CREATE lower bound in `filters`/`deal_filter` is kept
+                    when it is later (both restrict the deals).
         progress_callback: Optional callback to report loading progress.
+        filters: Extra Bitrix filter conditions (e.g. {"<DATE_CREATE": "2025-04-01"}).
+        select: Fields to fetch (defaults to DEAL_SELECT_FIELDS).
+        deal_filter: Typed filter (see DealFilter), combined with `filters`.
+
+    IN-lists longer than FILTER_IN_LIST_LIMIT are split into sub-queries,
+    fetched concurrently and concatenated in order.
     """
 
     payload: Dict[str, Any] = {
-        "select": DEAL_SELECT_FIELDS
+        "select": select or DEAL_SELECT_FIELDS
     }
 
+    bitrix_filter: Dict[str, Any] = dict(filters or {})
+
+    if deal_filter is not None:
+        bitrix_filter.update(deal_filter.to_bitrix())
+
     if start_date:
-        payload["filter"] = {
-            ">=DATE_CREATE": start_date
-        }
+        bound = bitrix_filter.get(">=DATE_CREATE")
+        bitrix_filter[">=DATE_CREATE"] = _later_date(start_date, bound) if bound else start_date
+
+    sub_filters = split_filter(bitrix_filter) if bitrix_filter else [{}]
 
-    # Delegate progress reporting to Bitrix client pagination
-    return client.call_all(
-        "crm.deal.list",
-        payload,
-        progress_callback=progress_callback,
-    )
+    def fetch(sub_filter: Dict[str, Any], progress) -> List[Dict[str, Any]]:
+        # Delegate progress reporting to Bitrix client pagination
+        return client.call_all(
+            "crm.deal.list",
+            {**payload, "filter": sub_filter} if sub_filter else payload,
+            progress_callback=progress,
+        )
 
+    return run_sub_queries(sub_filters, fetch, progress_callback)
@@ -0,0 +1,85 @@
+"""
+Shared filter utilities for CRM list loaders.
+
+Responsible for:
+- Splitting IN-lists too long for one request into disjoint sub-filters
+- Running the resulting sub-queries concurrently, with combined progress
+"""
+
+import itertools
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+
+# Maximum values of an IN-list sent in one request; longer lists are split
+# into sub-queries (keeps request bodies and portal-side queries small)
+FILTER_IN_LIST_LIMIT = 200
+
+# Sub-queries run concurrently (kept low: Bitrix rate limits per webhook)
+FILTER_QUERY_WORKERS = 3
+
+
+def split_filter(bitrix_filter: Dict[str, Any], limit: int = FILTER_IN_LIST_LIMIT) -> List[Dict[str, Any]]:
+    """
+    Splits IN-lists longer than `limit` into several filters.
+
+    The sub-filters select disjoint sets of items whose union is the
+    original selection (one list chunk per sub-filter, combined across
+    fields when several lists are too long).
+
+    Example:
+        {"ASSIGNED_BY_ID": [1..450]} with limit 200
+        -> [{"ASSIGNED_BY_ID": [1..200]}, {... [201..400]}, {... [401..450]}]
+    """
+
+    chunked_fields = {
+        key: [value[i:i + limit] for i in range(0, len(value), limit)]
+        for key, value in bitrix_filter.items()
+        if isinstance(value, list) and len(value) > limit and not key.startswith("!")
+    }
+
+    if not chunked_fields:
+        return [bitrix_filter]
+
+    keys = list(chunked_fields)
+
+    return [
+        {**bitrix_filter, **dict(zip(keys, chunks))}
+        for chunks in itertools.product(*(chunked_fields[key] for key in keys))
+    ]
+
+
+def run_sub_queries(
+    sub_filters: List[Dict[str, Any]],
+    fetch: Callable[[Dict[str, Any], Callable[[int], None]], List[Dict[str, Any]]],
+    progress_callback=None,
+) -> List[Dict[str, Any]]:
+    """
+    Runs fetch(sub_filter, progress) for every sub-filter and concatenates
+    the results in sub-filter order.
+
+    A single sub-filter runs in the calling thread; several run on
+    FILTER_QUERY_WORKERS threads, reporting their combined progress.
+    """
+
+    if len(sub_filters) == 1:
+        return fetch(sub_filters[0], progress_callback or (lambda count: None))
+
+    loaded_counts = [0] * len(sub_filters)
+    progress_lock = threading.Lock()
+
+    def fetch_sub_query(position: int) -> List[Dict[str, Any]]:
+        def report(count: int) -> None:
+            with progress_lock:
+                loaded_counts[position] = count
+                if progress_callback:
+                    progress_callback(sum(loaded_counts))
+
+        return fetch(sub_filters[position], report)
+
+    with ThreadPoolExecutor(max_workers=FILTER_QUERY_WORKERS) as executor:
+        results = list(executor.map(fetch_sub_query, range(len(sub_filters))))
+
+    return [item for result in results for item in result]
@@ -0,0 +1,77 @@
+"""
+Deal product rows loader.
+
+Responsible for:
+- Fetching product line items of deals (crm.deal.productrows.get)
+- Packing the per-deal calls into Bitrix batch requests
+
+crm.deal.productrows.get accepts a single deal ID, so the calls are sent
+BATCH_LIMIT (50) at a time through the "batch" method: one request (and
+one rate-limit delay) per 50 deals instead of one per deal.
+
+A deal deleted between the deal list and the batch has no product rows;
+other per-deal errors (e.g. access denied) are reported and the deal is
+left out, without failing the whole export.
+"""
+
+from typing import Any, Dict, Iterable, List
+
+from src.bitrix_client import BATCH_LIMIT, BitrixClient
+
+
+def _is_not_found(error: Any) -> bool:
+    """
+    Whether a batch command error means the deal does not exist (any more).
+    """
+
+    if not isinstance(error, dict):
+        return False
+
+    code = str(error.get("error") or "").upper()
+    description = str(error.get("error_description") or "").lower()
+
+    return (code.endswith("NOT_FOUND") and code != "ERROR_METHOD_NOT_FOUND") or "not found" in description
+
+
+def fetch_product_rows(
+    client: BitrixClient,
+    deal_ids: Iterable[int],
+    progress_callback=None,
+) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Fetches the product rows of the given deals.
+
+    Args:
+        client: Initialized BitrixClient
+        deal_ids: IDs of the deals to fetch
+        progress_callback: Optional callback to report loading progress.
+
+    Returns:
+        { deal_id: [product row, ...] } (deals without products, or deleted
+        meanwhile, map to []; deals whose call failed otherwise are absent)
+    """
+
+    unique_ids = sorted({int(deal_id) for deal_id in deal_ids})
+    product_rows: Dict[int, List[Dict[str, Any]]] = {}
+
+    for start in range(0, len(unique_ids), BATCH_LIMIT):
+        id_batch = unique_ids[start:start + BATCH_LIMIT]
+
+        results, errors = client.call_batch_with_errors({
+            f"deal_{deal_id}": ("crm.deal.productrows.get", {"id": deal_id})
+            for deal_id in id_batch
+        })
+
+        for deal_id in id_batch:
+            error = errors.get(f"deal_{deal_id}")
+
+            if error is not None and not _is_not_found(error):
+                print(f"\nProduct rows of deal {deal_id} skipped: {error}")
+                continue
+
+            product_rows[deal_id] = results.get(f"deal_{deal_id}") or []
+
+        if progress_callback:
+            progress_callback(len(product_rows))
+
+    return product_rows
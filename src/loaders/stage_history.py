@@ -0,0 +1,79 @@
+"""
+Deal stage history loader.
+
+Responsible for:
+- Fetching deal stage transitions (crm.stagehistory.list, entityTypeId 2)
+- Paginating by ID keyset, resuming after the last transition already seen
+
+Keyset pagination ({">ID": last_id}, ordered by ID, start=-1) skips the
+row count and offset scan of regular pagination, so every page costs the
+same whatever the history size, and a run only reads new transitions.
+"""
+
+from typing import Any, Dict, List
+
+from src.bitrix_client import BitrixClient
+
+
+DEAL_ENTITY_TYPE_ID = 2
+
+# Bitrix always returns pages of 50 items
+PAGE_SIZE = 50
+
+STAGE_HISTORY_SELECT_FIELDS = [
+    "ID",
+    "TYPE_ID",          # 1: deal created, 2: stage changed, 3: pipeline changed
+    "OWNER_ID",         # Deal ID
+    "CREATED_TIME",
+    "CATEGORY_ID",
+    "STAGE_ID",
+    "STAGE_SEMANTIC_ID",
+]
+
+
+def fetch_stage_history(
+    client: BitrixClient,
+    after_id: int = 0,
+    progress_callback=None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetches deal stage transitions with an ID greater than `after_id`.
+
+    Args:
+        after_id: Last transition ID already processed (0 = full history)
+        progress_callback: Optional callback to report loading progress.
+
+    Returns:
+        Transitions ordered by ID (ascending).
+    """
+
+    transitions: List[Dict[str, Any]] = []
+    last_id = after_id
+
+    while True:
+        data = client.call(
+            "crm.stagehistory.list",
+            {
+                "entityTypeId": DEAL_ENTITY_TYPE_ID,
+                "order": {"ID": "ASC"},
+                "filter": {">ID": last_id},
+                "select": STAGE_HISTORY_SELECT_FIELDS,
+                "start": -1,  # Keyset mode: no total count, no offset
+            },
+        )
+
+        items = data.get("result", {}).get("items", [])
+
+        if not items:
+            break
+
+        transitions.extend(items)
+        last_id = int(items[-1]["ID"])
+
+        if progress_callback:
+            progress_callback(len(transitions))
+
+        if len(items) < PAGE_SIZE:
+            break
+
+    return transitions
@@ -5,23 +5,144 @@ Allows running the full Bitrix24 deal export pipeline as a standalone script.
 
 To properly run this application, use the command below:
     $ python -m src.main
+
+To profile a run (cProfile + tracemalloc, written to profiles/):
+    $ python -m src.main --profile
+
+To dump the API request metrics (JSON, or Prometheus textfile for .prom):
+    $ python -m src.main --metrics metrics/export.prom
+
+To record the Bitrix/Sheets traffic of a run, then replay it offline:
+    $ python -m src.main --record-cassette cassettes/export.jsonl.gz
+    $ python -m src.main --replay-cassette cassettes/export.jsonl.gz --cassette-latency recorded
+
+To estimate the Bitrix/Sheets calls and duration of a run without writing anything:
+    $ python -m src.main --dry-run
 """
 
+import argparse
+
+from contextlib import nullcontext
+from typing import List
+
 from src.pipelines.deal_export_pipeline import run_export
 
 
-def main() -> None:
+def cassette_latency(value: str) -> float | str:
+    """
+    --cassette-latency value: seconds (float) or "recorded".
+    """
+
+    if value == "recorded":
+        return value
+
+    try:
+        return float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected seconds or 'recorded', got {value!r}") from None
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bitrix24 deal export")
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the run (cProfile and tracemalloc) and write a .prof file and a summary",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default="profiles",
+        help="Directory of the profile artifacts (default: profiles)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=30,
+        help="Entries per section of the profile summary (default: 30)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only estimate the API calls, bytes and duration of the run (count queries, nothing written)",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="Write the Bitrix/Sheets request metrics to PATH (.prom: Prometheus textfile, otherwise JSON)",
+    )
+
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument(
+        "--record-cassette",
+        metavar="PATH",
+        help="Record the Bitrix/Sheets requests of the run to a cassette (gzip JSON Lines)",
+    )
+    cassette.add_argument(
+        "--replay-cassette",
+        metavar="PATH",
+        help="Replay a recorded cassette offline instead of calling Bitrix and Google Sheets",
+    )
+    parser.add_argument(
+        "--cassette-latency",
+        type=cassette_latency,
+        metavar="SECONDS|recorded",
+        help="Simulated latency per replayed request: seconds, or 'recorded' (default: none)",
+    )
+    parser.add_argument(
+        "--cassette-rate-limit",
+        type=float,
+        metavar="RPS",
+        help="Simulated rate limit per API on replay, in requests per second (default: none)",
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> None:
     """
     Main execution entrypoint.
     """
 
+    args = parse_args(argv)
+
     print("=== Bitrix Deal Export ===\n")
 
     # Date from which the deals will be fetched (yyyy-mm-dd format).
     start_date = "2025-01-01"
 
+    if args.dry_run:
+        from src.planner import format_plan, plan_export
+
+        print(format_plan(plan_export(start_date=start_date)))
+        print("\n=== Execution finished ===")
+        return
+
+    cassette = nullcontext()
+
+    if args.record_cassette or args.replay_cassette:
+        from src.cassettes import use_cassette
+
+        cassette = use_cassette(
+            args.record_cassette or args.replay_cassette,
+            mode="record" if args.record_cassette else "replay",
+            latency=args.cassette_latency,
+            rate_limit=args.cassette_rate_limit,
+        )
+
     # Complete pipeline execution, from Bitrix24 API requests to export to Google Sheets.
-    run_export(start_date=start_date)
+    with cassette:
+        if args.profile:
+            # Imported only when requested: regular runs pay no profiling cost
+            from src.profiling import profile_run
+
+            profile_run(
+                lambda: run_export(start_date=start_date, metrics_path=args.metrics),
+                output_dir=args.profile_dir,
+                top=args.profile_top,
+            )
+        else:
+            run_export(start_date=start_date, metrics_path=args.metrics)
 
     print("\n=== Execution finished ===")
 
@@ -0,0 +1,262 @@
+"""
+Request-level metrics.
+
+Responsible for:
+- Counting API requests, retries, rate-limit waits, throttling sleeps and
+  bytes transferred, per API method
+- Recording request latencies in histograms, per API method
+- Dumping everything as JSON or as a Prometheus textfile
+
+Metrics are kept in a process-wide registry (REGISTRY) shared by the
+Bitrix client and the Google Sheets exporter. Labels are sorted tuples of
+(name, value) pairs.
+
+Example:
+    REGISTRY.inc("bitrix_requests_total", {"method": "crm.deal.list", "status": "ok"})
+    REGISTRY.observe("bitrix_request_seconds", {"method": "crm.deal.list"}, 0.21)
+    write_metrics("metrics.prom")
+"""
+
+import json
+import os
+import threading
+
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple
+
+
+# Upper bounds (seconds) of the latency histogram buckets (+Inf implied)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_HELP = {
+    "bitrix_requests_total": "Bitrix REST requests, by method and outcome",
+    "bitrix_request_seconds": "Bitrix REST request latency (HTTP round trip)",
+    "bitrix_retries_total": "Bitrix REST requests retried after a 429",
+    "bitrix_rate_limit_wait_seconds_total": "Time slept backing off after Bitrix 429 responses",
+    "bitrix_throttle_sleep_seconds_total": "Time slept between Bitrix requests (self-imposed throttling)",
+    "bitrix_request_bytes_total": "Bitrix request body bytes",
+    "bitrix_response_bytes_total": "Bitrix response body bytes",
+    "sheets_requests_total": "Google Sheets requests, by operation and outcome",
+    "sheets_request_seconds": "Google Sheets request latency",
+    "sheets_retries_total": "Google Sheets requests retried after a 429 or a timeout",
+    "sheets_rate_limit_wait_seconds_total": "Time slept backing off after Sheets 429 responses or timeouts",
+    "sheets_quota_wait_seconds_total": "Time blocked waiting for a slot of the local write quota",
+    "sheets_request_bytes_total": "Google Sheets request body bytes",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any] | None) -> Labels:
+    return tuple(sorted((str(key), str(value)) for key, value in (labels or {}).items()))
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and histograms.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+
+    def inc(self, name: str, labels: Dict[str, Any] | None = None, value: float = 1) -> None:
+        key = _labels(labels)
+
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, labels: Dict[str, Any] | None, value: float) -> None:
+        key = _labels(labels)
+
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+
+            if key not in series:
+                series[key] = _Histogram(self.buckets)
+
+            series[key].observe(value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def counter_total(self, name: str, **labels: Any) -> float:
+        """
+        Sum of a counter over the series matching the given labels.
+        """
+
+        wanted = set(_labels(labels))
+
+        with self._lock:
+            return sum(
+                value
+                for key, value in self._counters.get(name, {}).items()
+                if wanted <= set(key)
+            )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-friendly dump:
+        { "counters": { name: [{"labels": {...}, "value": 3}] },
+          "histograms": { name: [{"labels": {...}, "count", "sum", "buckets": {le: count}}] } }
+        """
+
+        with self._lock:
+            return {
+                "counters": {
+                    name: [
+                        {"labels": dict(key), "value": value}
+                        for key, value in sorted(series.items())
+                    ]
+                    for name, series in sorted(self._counters.items())
+                },
+                "histograms": {
+                    name: [
+                        {
+                            "labels": dict(key),
+                            "count": histogram.count,
+                            "sum": round(histogram.sum, 6),
+                            "buckets": dict(zip(
+                                [str(bound) for bound in histogram.buckets] + ["+Inf"],
+                                _cumulative(histogram.counts),
+                            )),
+                        }
+                        for key, histogram in sorted(series.items())
+                    ]
+                    for name, series in sorted(self._histograms.items())
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Prometheus text exposition format (for the node exporter textfile
+        collector).
+        """
+
+        lines: List[str] = []
+        dump = self.to_dict()
+
+        for name, series in dump["counters"].items():
+            lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} counter")
+
+            for entry in series:
+                lines.append(f"{name}{_format_labels(entry['labels'])} {_format_value(entry['value'])}")
+
+        for name, series in dump["histograms"].items():
+            lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+
+            for entry in series:
+                for bound, count in entry["buckets"].items():
+                    lines.append(f"{name}_bucket{_format_labels({**entry['labels'], 'le': bound})} {count}")
+
+                lines.append(f"{name}_sum{_format_labels(entry['labels'])} {_format_value(entry['sum'])}")
+                lines.append(f"{name}_count{_format_labels(entry['labels'])} {entry['count']}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _cumulative(counts: List[int]) -> List[int]:
+    total = 0
+    cumulative = []
+
+    for count in counts:
+        total += count
+        cumulative.append(total)
+
+    return cumulative
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else f"{value:.6f}"
+
+
+# Process-wide registry used by the API clients
+REGISTRY = MetricsRegistry()
+
+
+def write_metrics(path: str, registry: MetricsRegistry = REGISTRY) -> None:
+    """
+    Writes the metrics atomically: Prometheus text format for ".prom"
+    files, JSON otherwise.
+    """
+
+    if path.endswith(".prom"):
+        content = registry.to_prometheus()
+    else:
+        content = json.dumps(registry.to_dict(), indent=2, ensure_ascii=False)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.tmp"
+
+    with open(temp_path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+    os.replace(temp_path, path)
+
+
+def summary_lines(registry: MetricsRegistry = REGISTRY) -> List[str]:
+    """
+    One line per API: requests, time in requests and time slept.
+    """
+
+    dump = registry.to_dict()
+
+    def latency_total(name: str) -> float:
+        return sum(entry["sum"] for entry in dump["histograms"].get(name, []))
+
+    lines = []
+
+    bitrix_requests = registry.counter_total("bitrix_requests_total")
+    if bitrix_requests:
+        lines.append(
+            f"Bitrix: {int(bitrix_requests)} requests, "
+            f"{latency_total('bitrix_request_seconds'):.1f}s in requests, "
+            f"{registry.counter_total('bitrix_throttle_sleep_seconds_total'):.1f}s throttling, "
+            f"{registry.counter_total('bitrix_rate_limit_wait_seconds_total'):.1f}s rate-limit waits "
+            f"({int(registry.counter_total('bitrix_retries_total'))} retries), "
+            f"{registry.counter_total('bitrix_response_bytes_total') / 1024 / 1024:.1f} MB received"
+        )
+
+    sheets_requests = registry.counter_total("sheets_requests_total")
+    if sheets_requests:
+        lines.append(
+            f"Sheets: {int(sheets_requests)} requests, "
+            f"{latency_total('sheets_request_seconds'):.1f}s in requests, "
+            f"{registry.counter_total('sheets_quota_wait_seconds_total'):.1f}s quota waits, "
+            f"{registry.counter_total('sheets_rate_limit_wait_seconds_total'):.1f}s backoff "
+            f"({int(registry.counter_total('sheets_retries_total'))} retries), "
+            f"{registry.counter_total('sheets_request_bytes_total') / 1024 / 1024:.1f} MB sent"
+        )
+
+    return lines
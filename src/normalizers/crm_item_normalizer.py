@@ -0,0 +1,31 @@
+"""
+CRM item normalizer.
+
+Responsible for:
+- Projecting crm.item.list items onto their schema export labels
+- Flattening multiple-value fields into text
+"""
+
+from typing import Any, Dict
+
+from src.loaders.crm_items import EntitySchema
+
+
+def normalize_item(item: Dict[str, Any], schema: EntitySchema) -> Dict[str, Any]:
+    """
+    Converts a raw CRM item into an export-ready structure, with the
+    columns (and order) of its schema.
+    """
+
+    normalized: Dict[str, Any] = {}
+
+    for field, label in schema.fields.items():
+        value = item.get(field)
+
+        # Multiple fields (e.g. phones, multi-select UF) come as lists
+        if isinstance(value, list):
+            value = ", ".join(str(entry) for entry in value)
+
+        normalized[label] = "" if value is None else value
+
+    return normalized
@@ -28,6 +28,10 @@ FIELD_LABEL_MAP: Dict[str, str] = {
     "advanced_sale_type": "Tipo de Venda Avançados",
     "devices_total_value": "Valor Total de Aparelhos",
     "document_type": "Tipo de Documento",
+    "calls": "Ligações",
+    "meetings": "Reuniões",
+    "emails": "E-mails",
+    "activities_total": "Total de Atividades",
 }
 
 
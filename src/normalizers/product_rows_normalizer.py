@@ -0,0 +1,55 @@
+"""
+Deal product rows normalizer.
+
+Responsible for:
+- Flattening deal product rows into export-ready dictionaries
+- Labeling columns like the deal export (spreadsheet labels)
+"""
+
+from typing import Any, Dict
+
+from src.exporters.typed_values import NUMBER, parse_number
+
+
+PRODUCT_ROW_HEADERS = [
+    "ID do Negócio",
+    "Nome do Negócio",
+    "Produto",
+    "Preço",
+    "Quantidade",
+    "Unidade",
+    "Desconto",
+    "Imposto (%)",
+    "Total",
+]
+
+# Column types of the product rows export (see typed_values)
+PRODUCT_ROW_COLUMN_TYPES: Dict[str, str] = {
+    "ID do Negócio": NUMBER,
+    "Preço": NUMBER,
+    "Quantidade": NUMBER,
+    "Desconto": NUMBER,
+    "Imposto (%)": NUMBER,
+    "Total": NUMBER,
+}
+
+
+def normalize_product_row(deal: Dict[str, Any], product_row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converts a raw product row of a deal into an export-ready structure.
+    """
+
+    price = parse_number(product_row.get("PRICE")) or 0.0
+    quantity = parse_number(product_row.get("QUANTITY")) or 0.0
+
+    return {
+        "ID do Negócio": deal.get("ID", ""),
+        "Nome do Negócio": deal.get("TITLE") or "",
+        "Produto": product_row.get("PRODUCT_NAME") or "",
+        "Preço": product_row.get("PRICE", ""),
+        "Quantidade": product_row.get("QUANTITY", ""),
+        "Unidade": product_row.get("MEASURE_NAME") or "",
+        "Desconto": product_row.get("DISCOUNT_SUM", ""),
+        "Imposto (%)": product_row.get("TAX_RATE") or "",
+        "Total": f"{price * quantity:.2f}",
+    }
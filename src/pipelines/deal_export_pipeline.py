@@ -6,21 +6,95 @@ Responsible for:
 - Enriching deals with lookup data
 - Normalizing deals for export
 - Writing the final XLSX file
+
+Hot/cold mode (run_export(hot_months=N)):
+- Closed historical months (cold) are exported once to their own partition
+  (tab or XLSX file) and recorded as frozen in a local state file.
+- Each run refreshes only the last N months (hot window), plus any cold
+  month where a deal was modified since the previous run.
+- Deals deleted inside frozen months are only picked up by a full run
+  (or by removing the state file).
+- Options writing the full dataset (file datasets, summaries, reports,
+  ...) cannot be combined with it: run_export raises a ValueError.
+
+Stage history (run_export(stage_history_path=...)): only transitions newer
+than the persisted cursor are fetched and folded into per-deal stage
+durations, written to a "Tempo em Fase" tab.
+
+Product rows (run_export(product_rows_target=...)): line items are cached
+per deal with its DATE_MODIFY; only new or modified deals are refetched,
+50 per Bitrix batch request.
+
+Activity counts (run_export(activities_since=...)): calls, meetings and
+e-mails per deal, counted from a streamed activity list and kept in a
+state file with the last counted activity ID, so runs only read new ones.
+
+Stages: the non hot/cold export runs as named stages (load, lookups,
+companies, enrich, normalize, export, ...) through PipelineExecutor, so
+independent stages overlap (lookups, activity counts and stage history are
+fetched while deals load) and a per-stage timing report is printed at the
+end.
+
+Reports (run_export(reports_path=...)): extra tabs defined in a JSON file
+(filters, columns, target tab), all built from the same fetched dataset.
 """
 
-from datetime import datetime, timedelta
-from typing import List
+import hashlib
+import os
+import time
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
 
 from src.loaders import deals
 from src.bitrix_client import BitrixClient
-from src.config import BITRIX_URL, BITRIX_USER_ID, BITRIX_WEBHOOK, GOOGLE_SHEET_ID
+from src.cassettes import active_cassette
+from src.config import get_settings
+from src.ledger import record_run
+from src.metrics import REGISTRY, summary_lines, write_metrics
+from src.state import load_state, save_state
 
 from src.loaders.deals import fetch_deals
+from src.loaders.stage_history import fetch_stage_history
+from src.loaders.product_rows import fetch_product_rows
+from src.loaders.activities import fetch_activity_counts
 from src.enrichers.deals import enrich_deals
+from src.enrichers.stage_history import apply_stage_transitions, compute_stage_durations
 
 from src.normalizers.deal_export_normalizer import normalize_deal_for_export
-# from src.exporters.xlsx_exporter import export_deals_to_xlsx
-from src.exporters.google_sheets_exporter import export_to_google_sheets
+from src.normalizers.product_rows_normalizer import (
+    PRODUCT_ROW_COLUMN_TYPES,
+    PRODUCT_ROW_HEADERS,
+    normalize_product_row,
+)
+from src.exporters.xlsx_exporter import export_partitions_to_xlsx, export_rows_to_xlsx_stream
+from src.exporters.google_sheets_exporter import TRANSPORTS
+from src.exporters.partitioned_sheets_exporter import export_partitions_to_google_sheets
+from src.exporters.sinks import (
+    CsvSink,
+    GoogleSheetsSink,
+    LocalStoreSink,
+    ParquetSink,
+    PartitionedGoogleSheetsSink,
+    Sink,
+    SummarySheetsSink,
+    XlsxSink,
+)
+from src.pipelines.executor import PipelineAborted, PipelineExecutor, Stage
+from src.pipelines.fan_out import fan_out
+from src.pipelines.report_pipeline import (
+    build_report_tables,
+    export_report_tables,
+    fetch_report_deals,
+    plan_report_queries,
+    report_select_fields,
+)
+from src.reports.definitions import load_report_definitions
+from src.exporters.partitioning import (
+    UNKNOWN_PARTITION,
+    field_partition_key,
+    month_partition_key,
+)
 
 from src.lookups.pipelines import fetch_pipeline_map
 from src.lookups.stages import fetch_stage_map
@@ -29,37 +103,48 @@ from src.lookups.companies import fetch_company_map
 from src.lookups.statuses import fetch_status_map
 from src.lookups.userfield_enums import fetch_userfield_enum_map
 
-# Progress logger for deal loading
-def deal_progress(count: int) -> None:
-    print(f"\rLoading deals... {count} loaded", end="", flush=True)
+# Supported partition keys for the partitioned Google Sheets export
+PARTITION_KEYS = {
+    "month": month_partition_key("Criado em"),
+    "pipeline": field_partition_key("Pipeline"),
+}
 
-def run_export(start_date: str) -> None:
-    """
-    Runs the full deal export pipeline.
+# File dataset sinks (month-partitioned), by format name
+FILE_SINKS = {
+    "parquet": ParquetSink,
+    "csv": CsvSink,
+}
 
-    Args:
-        start_date: Date from which to fetch all deals.
+# Supported targets of the hot/cold export
+HOT_COLD_TARGETS = ("sheets", "xlsx")
+
+# Supported targets of the product rows export
+PRODUCT_ROWS_TARGETS = ("sheets", "xlsx")
+
+# Safety margin subtracted from the run start when recording the last sync,
+# so deals modified while a run is in progress are not missed
+SYNC_OVERLAP = timedelta(minutes=5)
+
+def main_spreadsheet_id() -> str:
+    """
+    GOOGLE_SHEET_ID, only required by the runs writing to Google Sheets.
     """
 
-    print("Starting deal export pipeline...\n")
+    return get_settings().require("google_sheet_id").google_sheet_id
 
-    client = BitrixClient(
-        base_url=BITRIX_URL,
-        user_id=BITRIX_USER_ID,
-        webhook=BITRIX_WEBHOOK,
-    )
+# Progress logger for deal loading
+def deal_progress(count: int) -> None:
+    print(f"\rLoading deals... {count} loaded", end="", flush=True)
 
-    # 1. Load deals
-    deals = fetch_deals(
-        client=client,
-        start_date=start_date,
-        progress_callback=deal_progress,
-    )
-    print(f"\nDeals loaded: {len(deals)}\n")
+def build_static_lookups(client: BitrixClient) -> Dict[str, Any]:
+    """
+    Builds the lookup maps that do not depend on the loaded deals, so they
+    can be fetched while the deals are still loading.
 
-    if not deals:
-        print("No deals found. Aborting export.")
-        return
+    Returns:
+        { "pipeline_map", "stage_map", "user_map", "source_status_map",
+          "management_enum_map" }
+    """
 
     # 2. Build lookup maps
     print("Building lookup maps...")
@@ -68,9 +153,6 @@ def run_export(start_date: str) -> None:
     stage_map = fetch_stage_map(client, pipeline_map)
     user_map = fetch_user_map(client)
 
-    company_ids = {deal.get("COMPANY_ID") for deal in deals if deal.get("COMPANY_ID")}
-    company_map = fetch_company_map(client, company_ids)
-
     SOURCE_ENTITY_ID = "SOURCE"
 
     source_status_map = fetch_status_map(
@@ -86,45 +168,848 @@ def run_export(start_date: str) -> None:
 
     print("Lookup maps ready.\n")
 
+    return {
+        "pipeline_map": pipeline_map,
+        "stage_map": stage_map,
+        "user_map": user_map,
+        "source_status_map": source_status_map,
+        "management_enum_map": gerencia_enum_map,
+    }
+
+def build_deal_company_map(client: BitrixClient, deals: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Builds the company lookup of the companies referenced by the deals.
+    """
+
+    company_ids = {deal.get("COMPANY_ID") for deal in deals if deal.get("COMPANY_ID")}
+    return fetch_company_map(client, company_ids)
+
+def build_lookup_maps(client: BitrixClient, deals: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Builds the lookup maps used to enrich the given deals.
+
+    Returns:
+        { "pipeline_map", "stage_map", "company_map", "user_map",
+          "source_status_map", "management_enum_map" }
+    """
+
+    return {
+        **build_static_lookups(client),
+        "company_map": build_deal_company_map(client, deals),
+    }
+
+def prepare_export_rows(
+    client: BitrixClient,
+    deals: List[Dict[str, Any]],
+    lookups: Dict[str, Any] | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Enriches and normalizes deals for export, building the lookup maps
+    first unless they are given (see build_lookup_maps).
+
+    The returned rows keep the order of the given deals.
+    """
+
+    if lookups is None:
+        lookups = build_lookup_maps(client, deals)
+
     # 3. Enrich deals
     print("Enriching deals...")
 
-    enriched_deals = enrich_deals(
-        deals=deals,
-        pipeline_map=pipeline_map,
-        stage_map=stage_map,
-        company_map=company_map,
-        user_map=user_map,
-        source_status_map=source_status_map,
-        management_enum_map=gerencia_enum_map,
-    )
+    enriched_deals = enrich_deals(deals=deals, **lookups)
 
     print(f"Deals enriched: {len(enriched_deals)}\n")
 
     # 4. Normalize for export
     print("Normalizing deals...")
-    normalized_deals = [
+    return [
         normalize_deal_for_export(deal)
         for deal in enriched_deals
     ]
 
-    # 5. Export to XLSX
+def build_sinks(
+    output_dir: str = "exports",
+    export_to_sheets: bool = True,
+    sheets_staging_swap: bool = False,
+    sheets_partition_by: str | None = None,
+    sheets_transport: str = "discovery",
+    sheets_summaries: Dict[str, List[str]] | None = None,
+    file_formats: Tuple[str, ...] = (),
+    xlsx_output: str | None = None,
+    local_store_path: str | None = None,
+    sheets_api_url: str | None = None,
+) -> List[Sink]:
+    """
+    Builds the export sinks enabled by the run options.
+
+    `sheets_api_url` points the deal Sheets sink (single-tab or
+    partitioned) to another Sheets API root (a local fake server, which
+    needs no credentials).
+    """
+
+    sinks: List[Sink] = []
+
+    if export_to_sheets and sheets_partition_by:
+        sinks.append(PartitionedGoogleSheetsSink(
+            spreadsheet_ids=[main_spreadsheet_id()] + get_settings().google_sheet_extra_ids,
+            partition_key=PARTITION_KEYS[sheets_partition_by],
+            credentials_path=None if sheets_api_url else "credentials.json",
+            transport=sheets_transport,
+            api_url=sheets_api_url,
+        ))
+    elif export_to_sheets:
+        sinks.append(GoogleSheetsSink(
+            spreadsheet_id=main_spreadsheet_id(),
+            sheet_name="Folha1",
+            credentials_path=None if sheets_api_url else "credentials.json",
+            use_staging_swap=sheets_staging_swap,
+            transport=sheets_transport,
+            api_url=sheets_api_url,
+        ))
+
+    if export_to_sheets and sheets_summaries:
+        sinks.append(SummarySheetsSink(
+            spreadsheet_id=main_spreadsheet_id(),
+            summaries=sheets_summaries,
+            credentials_path="credentials.json",
+            transport=sheets_transport,
+        ))
+
+    for file_format in file_formats:
+        sinks.append(FILE_SINKS[file_format](os.path.join(output_dir, file_format)))
+
+    if xlsx_output:
+        sinks.append(XlsxSink(xlsx_output))
+
+    if local_store_path:
+        sinks.append(LocalStoreSink(local_store_path))
+
+    return sinks
+
+def sync_stage_history(
+    client: BitrixClient,
+    state_path: str = "stage_history_state.json",
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetches stage transitions newer than the saved cursor and folds them
+    into the saved per-deal stage state.
+
+    Returns:
+        Per-deal stage state (see src.enrichers.stage_history)
     """
-    output_file = "bitrix_deals_export.xlsx"
-    print(f"Exporting to XLSX: {output_file}")
 
-    export_deals_to_xlsx(
-        deals=normalized_deals,
-        output_path=output_file,
+    state = load_state(state_path)
+    cursor = int(state.get("cursor", 0))
+
+    print("Loading stage history...")
+
+    transitions = fetch_stage_history(
+        client=client,
+        after_id=cursor,
+        progress_callback=lambda count: print(f"\rLoading stage history... {count} new", end="", flush=True),
+    )
+
+    deal_stages = apply_stage_transitions(state.get("deals", {}), transitions)
+
+    if transitions:
+        state["cursor"] = int(transitions[-1]["ID"])
+        state["deals"] = deal_stages
+        save_state(state_path, state)
+
+    print(f"\nStage transitions loaded: {len(transitions)} (cursor {state.get('cursor', 0)})\n")
+
+    return deal_stages
+
+def sync_product_rows(
+    client: BitrixClient,
+    deals: List[Dict[str, Any]],
+    state_path: str = "product_rows_state.json",
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Returns the product rows of the given deals, refetching only the deals
+    that are new or whose DATE_MODIFY changed since the cached copy.
+
+    Returns:
+        { deal_id: [product row, ...] } for every given deal, except those
+        whose product rows could not be fetched (see fetch_product_rows)
+    """
+
+    state = load_state(state_path)
+    cached: Dict[str, Dict[str, Any]] = state.get("deals", {})
+
+    stale_ids = [
+        deal["ID"]
+        for deal in deals
+        if cached.get(str(deal["ID"]), {}).get("modified") != deal.get("DATE_MODIFY")
+    ]
+
+    print(f"Product rows: {len(deals) - len(stale_ids)} cached, {len(stale_ids)} to fetch")
+
+    fetched = fetch_product_rows(
+        client=client,
+        deal_ids=stale_ids,
+        progress_callback=lambda count: print(f"\rLoading product rows... {count}/{len(stale_ids)}", end="", flush=True),
     )
+
+    if stale_ids:
+        print()
+
+    # Deals no longer exported are dropped from the cache; deals whose
+    # fetch failed keep their cached copy, if any, and are retried next run
+    refreshed = {}
+    for deal in deals:
+        deal_id = str(deal["ID"])
+        rows = fetched.get(int(deal_id))
+
+        if rows is not None:
+            refreshed[deal_id] = {"modified": deal.get("DATE_MODIFY"), "rows": rows}
+        elif deal_id in cached:
+            refreshed[deal_id] = cached[deal_id]
+
+    state["deals"] = refreshed
+    save_state(state_path, state)
+
+    return {deal_id: entry["rows"] for deal_id, entry in refreshed.items()}
+
+def sync_activity_counts(
+    client: BitrixClient,
+    since: str,
+    state_path: str = "activity_state.json",
+) -> Dict[str, Dict[str, int]]:
+    """
+    Updates the saved activity counts with activities newer than the saved
+    cursor. Changing the window start (`since`) triggers a full recount.
+
+    Returns:
+        { deal_id: { "calls": 3, "meetings": 1, "emails": 0, ... } }
     """
 
-    # 6. Export to Google Sheets
-    export_to_google_sheets(
-        spreadsheet_id=GOOGLE_SHEET_ID,
-        sheet_name="Folha1",
-        rows=normalized_deals,
-        credentials_path="credentials.json",
+    state = load_state(state_path)
+
+    if state.get("since") != since:
+        state = {"since": since, "cursor": 0, "counts": {}}
+
+    print("Counting deal activities...")
+
+    counts, cursor = fetch_activity_counts(
+        client=client,
+        since=since,
+        after_id=int(state["cursor"]),
+        counts=state["counts"],
+        progress_callback=lambda count: print(f"\rCounting deal activities... {count} new", end="", flush=True),
     )
 
+    if cursor != state["cursor"]:
+        state["cursor"] = cursor
+        state["counts"] = counts
+        save_state(state_path, state)
+
+    print(f"\nDeals with activities: {len(counts)}\n")
+
+    return counts
+
+def report_metrics(metrics_path: str | None = None) -> None:
+    """
+    Prints the API request summary of the run and, if a path is given,
+    dumps the request metrics there (".prom" for a Prometheus textfile,
+    JSON otherwise).
+    """
+
+    lines = summary_lines()
+
+    if lines:
+        print("\nAPI requests:")
+        for line in lines:
+            print(f"  {line}")
+
+    if metrics_path:
+        write_metrics(metrics_path)
+        print(f"Metrics written to {metrics_path}")
+
+def _month_ranges(first_day: date, end_day: date) -> List[Tuple[str, date, date]]:
+    """
+    Splits [first_day, end_day) into calendar months.
+
+    Returns:
+        [("2025-01", date(2025, 1, 1), date(2025, 2, 1)), ...]
+    """
+
+    ranges = []
+    current = first_day.replace(day=1)
+
+    while current < end_day:
+        next_month = (current + timedelta(days=32)).replace(day=1)
+        ranges.append((current.strftime("%Y-%m"), max(current, first_day), min(next_month, end_day)))
+        current = next_month
+
+    return ranges
+
+def _raw_month_key(deal: Dict[str, Any]) -> str:
+    """
+    Month partition of a raw deal, in portal time (same as the API filters).
+
+    Example:
+        "2025-03-31T23:10:00+03:00" -> "2025-03"
+    """
+
+    created = deal.get("DATE_CREATE") or ""
+    return created[:7] if len(created) >= 7 else UNKNOWN_PARTITION
+
+def run_hot_cold_export(
+    client: BitrixClient,
+    start_date: str,
+    hot_months: int,
+    target: str = "sheets",
+    state_path: str = "export_state.json",
+    output_dir: str = "exports",
+    sheets_transport: str = "discovery",
+    sheets_api_url: str | None = None,
+) -> None:
+    """
+    Exports deals as month partitions, refreshing only the hot window.
+
+    Args:
+        client: Initialized BitrixClient
+        start_date: Date from which to export deals (YYYY-MM-DD)
+        hot_months: Number of recent months (current month included)
+                    refreshed on every run
+        target: "sheets" (one tab per month) or "xlsx" (one file per month)
+        state_path: JSON file recording frozen months and the last sync
+        output_dir: Output directory for the "xlsx" target
+        sheets_transport: Google Sheets transport ("discovery" or "rest")
+        sheets_api_url: Sheets API root for the "rest" transport (e.g. a
+                        local fake server, which needs no credentials)
+    """
+
+    if hot_months < 1:
+        raise ValueError("hot_months must be at least 1")
+
+    run_started = datetime.now(timezone.utc)
+    state = load_state(state_path)
+    frozen: Dict[str, Dict[str, Any]] = state.get("frozen", {})
+    last_sync = state.get("last_sync")
+
+    first_day = date.fromisoformat(start_date)
+    today = date.today()
+    hot_start = today.replace(day=1)
+
+    for _ in range(hot_months - 1):
+        hot_start = (hot_start - timedelta(days=1)).replace(day=1)
+
+    cold_months = _month_ranges(first_day, hot_start)
+    cold_keys = {key for key, _, _ in cold_months}
+
+    # 1. Cold months to (re)write: never frozen, or with modified deals
+    dirty = {key for key in cold_keys if key not in frozen}
+
+    if last_sync and cold_months:
+        print("Checking frozen months for modified deals...")
+
+        modified = fetch_deals(
+            client=client,
+            start_date=start_date,
+            filters={
+                "<DATE_CREATE": hot_start.isoformat(),
+                ">DATE_MODIFY": last_sync,
+            },
+            select=["ID", "DATE_CREATE"],
+        )
+
+        dirty |= {_raw_month_key(deal) for deal in modified} & cold_keys
+
+    print(f"Hot window starts at {hot_start.isoformat()}; cold months to refresh: {len(dirty)}\n")
+
+    # 2. Load the hot window, then every dirty cold month
+    loaded: List[Dict[str, Any]] = fetch_deals(
+        client=client,
+        start_date=max(first_day, hot_start).isoformat(),
+        progress_callback=deal_progress,
+    )
+
+    for key, month_start, month_end in cold_months:
+        if key not in dirty:
+            continue
+
+        loaded_so_far = len(loaded)
+        loaded += fetch_deals(
+            client=client,
+            start_date=month_start.isoformat(),
+            filters={"<DATE_CREATE": month_end.isoformat()},
+            progress_callback=lambda count: deal_progress(loaded_so_far + count),
+        )
+
+    print(f"\nDeals loaded: {len(loaded)}\n")
+
+    if loaded:
+        rows = prepare_export_rows(client, loaded)
+
+        # Partition by the raw creation month, consistent with the API filters
+        partitions: Dict[str, List[Dict[str, Any]]] = {}
+        for deal, row in zip(loaded, rows):
+            partitions.setdefault(_raw_month_key(deal), []).append(row)
+
+        # 5. Export partitions
+        if target == "xlsx":
+            export_partitions_to_xlsx(partitions=partitions, output_dir=output_dir)
+        else:
+            export_partitions_to_google_sheets(
+                spreadsheet_ids=[main_spreadsheet_id()] + get_settings().google_sheet_extra_ids,
+                partitions=partitions,
+                credentials_path=None if sheets_api_url else "credentials.json",
+                keep_missing=True,
+                transport=sheets_transport,
+                api_url=sheets_api_url,
+            )
+    else:
+        partitions = {}
+        print("No deals found in the hot window or modified months.")
+
+    # 6. Freeze the cold months written by this run
+    frozen_at = run_started.isoformat(timespec="seconds")
+
+    for key in dirty:
+        frozen[key] = {
+            "frozen_at": frozen_at,
+            "rows": len(partitions.get(key, [])),
+        }
+
+    state["frozen"] = dict(sorted(frozen.items()))
+    state["last_sync"] = (run_started - SYNC_OVERLAP).isoformat(timespec="seconds")
+    save_state(state_path, state)
+
+    print(f"Frozen months: {len(frozen)}")
+
+def run_export(
+    start_date: str,
+    sheets_staging_swap: bool = False,
+    sheets_partition_by: str | None = None,
+    sheets_transport: str = "discovery",
+    sheets_summaries: Dict[str, List[str]] | None = None,
+    hot_months: int | None = None,
+    hot_cold_target: str = "sheets",
+    hot_cold_state_path: str = "export_state.json",
+    file_formats: Tuple[str, ...] = (),
+    output_dir: str = "exports",
+    export_to_sheets: bool = True,
+    xlsx_output: str | None = None,
+    local_store_path: str | None = None,
+    reports_path: str | None = None,
+    stage_history_path: str | None = None,
+    product_rows_target: str | None = None,
+    activities_since: str | None = None,
+    stage_cache_dir: str | None = None,
+    metrics_path: str | None = None,
+    ledger_path: str | None = "run_ledger.jsonl",
+    client: BitrixClient | None = None,
+    sheets_api_url: str | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Runs the full deal export pipeline.
+
+    Args:
+        start_date: Date from which to fetch all deals.
+        sheets_staging_swap: Refresh the Google Sheets tab through a hidden
+                             staging tab swapped in atomically.
+        sheets_partition_by: "month" or "pipeline" to export one tab per
+                             partition (plus an index tab) instead of a
+                             single "Folha1" tab.
+        sheets_transport: "discovery" (googleapiclient) or "rest" (pooled
+                          session calling the REST endpoints directly).
+        sheets_summaries: Summary tabs to write next to the deal tab,
+                          as { tab name: dimensions }, e.g.
+                          DEFAULT_SUMMARIES from src.aggregators.deals.
+        hot_months: Enables the hot/cold mode, refreshing only the last
+                    `hot_months` months plus modified frozen months. Only
+                    the Sheets transport/API, output_dir and the metrics
+                    and ledger options apply to it; options writing the
+                    full dataset raise a ValueError.
+        hot_cold_target: "sheets" or "xlsx" (one file per month in
+                         output_dir), target of the hot/cold mode.
+        hot_cold_state_path: State file of the hot/cold mode (frozen months
+                             and last sync).
+        file_formats: Extra month-partitioned datasets to write for BI
+                      tools ("parquet", "csv"), next to Google Sheets.
+        output_dir: Root directory of file exports.
+        export_to_sheets: Export to Google Sheets (disable for file-only runs).
+        xlsx_output: Path of an XLSX file to write, if any.
+        local_store_path: Path of a gzip JSON Lines snapshot to write, if any.
+        reports_path: JSON file of report definitions (see
+                      src.reports.definitions). All reports are built from
+                      the same fetched dataset; when no other target is
+                      enabled, report filters are pushed down to Bitrix.
+        stage_history_path: State file of the incremental stage history
+                            sync; enables the "Tempo em Fase" tab.
+        product_rows_target: Export deal product rows to a "Produtos" tab
+                             ("sheets") or to <output_dir>/product_rows.xlsx
+                             ("xlsx").
+        activities_since: Adds activity count columns (calls, meetings,
+                          e-mails) counting activities created since this
+                          date (YYYY-MM-DD).
+        stage_cache_dir: Caches the loaded deals and lookups in this
+                         directory, reused by later runs of the same day
+                         with the same portal, start date, report
+                         definitions (file contents) and full/report-only
+                         fetch (e.g. while iterating on exports). Not used
+                         in hot/cold mode.
+        metrics_path: Writes the Bitrix and Sheets request metrics of the
+                      run to this file: Prometheus textfile for ".prom",
+                      JSON otherwise (see src.metrics).
+        ledger_path: JSON Lines run ledger recording stage durations, API
+                     calls, rows and peak memory of every run, and flagging
+                     regressions against the recent runs (see src.ledger).
+                     None disables it.
+        client: Bitrix client to use (default: one built from the settings).
+        sheets_api_url: Sheets API root of the deal export, e.g. a
+                        local fake server (see tests/fake_sheets_server.py).
+
+    Returns:
+        Per-stage report rows (see PipelineExecutor.report_rows); empty in
+        hot/cold mode or when nothing runs.
+    """
+
+    if sheets_partition_by and sheets_partition_by not in PARTITION_KEYS:
+        raise ValueError(
+            f"Unknown partition key '{sheets_partition_by}'. "
+            f"Expected one of: {', '.join(PARTITION_KEYS)}"
+        )
+
+    if sheets_transport not in TRANSPORTS:
+        raise ValueError(
+            f"Unknown Sheets transport '{sheets_transport}'. "
+            f"Expected one of: {', '.join(TRANSPORTS)}"
+        )
+
+    if hot_months is not None and hot_cold_target not in HOT_COLD_TARGETS:
+        raise ValueError(
+            f"Unknown hot/cold target '{hot_cold_target}'. "
+            f"Expected one of: {', '.join(HOT_COLD_TARGETS)}"
+        )
+
+    unknown_formats = [name for name in file_formats if name not in FILE_SINKS]
+    if unknown_formats:
+        raise ValueError(
+            f"Unknown file format(s): {', '.join(unknown_formats)}. "
+            f"Expected any of: {', '.join(FILE_SINKS)}"
+        )
+
+    if product_rows_target and product_rows_target not in PRODUCT_ROWS_TARGETS:
+        raise ValueError(
+            f"Unknown product rows target '{product_rows_target}'. "
+            f"Expected one of: {', '.join(PRODUCT_ROWS_TARGETS)}"
+        )
+
+    if hot_months is not None:
+        # The hot/cold mode loads a subset of the deals: nothing needing the
+        # full dataset can run with it
+        unsupported = [
+            name
+            for name, value in [
+                # Month tabs, always refreshed through a staging swap
+                ("sheets_partition_by", sheets_partition_by not in (None, "month")),
+                ("sheets_summaries", sheets_summaries),
+                ("file_formats", file_formats),
+                ("export_to_sheets=False", hot_cold_target == "sheets" and not export_to_sheets),
+                ("xlsx_output", xlsx_output),
+                ("local_store_path", local_store_path),
+                ("reports_path", reports_path),
+                ("stage_history_path", stage_history_path),
+                ("product_rows_target", product_rows_target),
+                ("activities_since", activities_since),
+                ("stage_cache_dir", stage_cache_dir),
+            ]
+            if value
+        ]
+
+        if unsupported:
+            raise ValueError(f"Not supported in hot/cold mode: {', '.join(unsupported)}")
+
+    reports = load_report_definitions(reports_path) if reports_path else []
+
+    print("Starting deal export pipeline...\n")
+
+    # Request metrics describe this run only
+    REGISTRY.reset()
+    run_started = datetime.now(timezone.utc)
+    run_timer = time.perf_counter()
+
+    client = client or BitrixClient()
+
+    if hot_months is not None:
+        status = "failed"
+
+        try:
+            run_hot_cold_export(
+                client=client,
+                start_date=start_date,
+                hot_months=hot_months,
+                target=hot_cold_target,
+                state_path=hot_cold_state_path,
+                output_dir=output_dir,
+                sheets_transport=sheets_transport,
+                sheets_api_url=sheets_api_url,
+            )
+            status = "ok"
+        finally:
+            report_metrics(metrics_path)
+
+            if ledger_path:
+                record_run(
+                    path=ledger_path,
+                    signature=f"hot_cold|{hot_months}|{hot_cold_target}",
+                    status=status,
+                    stage_rows=[],
+                    started_at=run_started,
+                    duration_seconds=time.perf_counter() - run_timer,
+                )
+
+        print("\nDeal export pipeline completed successfully.")
+        return []
+
+    sinks = build_sinks(
+        output_dir=output_dir,
+        export_to_sheets=export_to_sheets,
+        sheets_staging_swap=sheets_staging_swap,
+        sheets_partition_by=sheets_partition_by,
+        sheets_transport=sheets_transport,
+        sheets_summaries=sheets_summaries,
+        file_formats=file_formats,
+        xlsx_output=xlsx_output,
+        local_store_path=local_store_path,
+        sheets_api_url=sheets_api_url,
+    )
+
+    if not sinks and not reports and not stage_history_path and not product_rows_target:
+        print("No export target enabled. Nothing to write.")
+        return []
+
+    def load_stage() -> Dict[str, Any]:
+        # 1. Load deals (only what the reports need when they are the only target)
+        if reports:
+            queries = plan_report_queries(reports, full_fetch=bool(sinks))
+            print(f"Report queries: {len(queries)}")
+
+            deals = fetch_report_deals(
+                client=client,
+                start_date=start_date,
+                queries=queries,
+                select=report_select_fields(reports),
+                progress_callback=deal_progress,
+            )
+        else:
+            deals = fetch_deals(
+                client=client,
+                start_date=start_date,
+                progress_callback=deal_progress,
+            )
+        print(f"\nDeals loaded: {len(deals)}\n")
+
+        if not deals:
+            print("No deals found. Aborting export.")
+            raise PipelineAborted()
+
+        return {"deals": deals}
+
+    def enrich_stage(deals, lookups, company_map, activity_counts=None) -> Dict[str, Any]:
+        # 3. Enrich deals
+        print("Enriching deals...")
+
+        enriched = enrich_deals(
+            deals=deals,
+            company_map=company_map,
+            activity_counts=activity_counts,
+            **lookups,
+        )
+
+        print(f"Deals enriched: {len(enriched)}\n")
+        return {"enriched": enriched}
+
+    def export_stage(rows) -> Dict[str, Any]:
+        # 5-6. Export: one pass over the rows, fanned out to every sink
+        print(f"Exporting to: {', '.join(sink.name for sink in sinks)}")
+        fan_out(rows, sinks)
+        return {"exported": len(rows)}
+
+    def product_rows_stage(deals) -> Dict[str, Any]:
+        product_rows = sync_product_rows(client, deals)
+        product_export_rows = [
+            normalize_product_row(deal, product_row)
+            for deal in deals
+            for product_row in product_rows.get(str(deal["ID"]), [])
+        ]
+
+        if product_rows_target == "xlsx":
+            os.makedirs(output_dir, exist_ok=True)
+            export_rows_to_xlsx_stream(
+                rows=product_export_rows,
+                output_path=os.path.join(output_dir, "product_rows.xlsx"),
+                headers=PRODUCT_ROW_HEADERS,
+                column_types=PRODUCT_ROW_COLUMN_TYPES,
+                sheet_title="Produtos",
+            )
+
+        return {"product_export_rows": product_export_rows}
+
+    def tables_stage(deals, rows, lookups, deal_stages=None, product_export_rows=None) -> Dict[str, Any]:
+        # 7. Reports (from the same dataset), stage durations and product rows
+        tables, split_tabs = build_report_tables(
+            reports=reports,
+            deals=deals,
+            rows=rows,
+            default_spreadsheet_id=main_spreadsheet_id(),
+        ) if reports else ({}, {})
+
+        if deal_stages is not None:
+            durations = compute_stage_durations(
+                deal_stages,
+                lookups["stage_map"],
+            )
+            exported_ids = {int(deal["ID"]) for deal in deals}
+
+            tables[(main_spreadsheet_id(), "Tempo em Fase")] = (
+                ["ID", "Fase", "Dias"],
+                [
+                    [deal_id, stage, days]
+                    for deal_id, stages in sorted(durations.items())
+                    if deal_id in exported_ids
+                    for stage, days in stages.items()
+                ],
+            )
+
+        if product_export_rows is not None:
+            tables[(main_spreadsheet_id(), "Produtos")] = (
+                PRODUCT_ROW_HEADERS,
+                [[row[header] for header in PRODUCT_ROW_HEADERS] for row in product_export_rows],
+            )
+
+        return {"tables": tables, "split_tabs": split_tabs}
+
+    def export_tables_stage(tables, split_tabs, exported=None) -> Dict[str, Any]:
+        export_report_tables(
+            tables=tables,
+            credentials_path="credentials.json",
+            transport=sheets_transport,
+            split_tabs=split_tabs,
+        )
+        return {"tables_written": len(tables)}
+
+    # Stages run as soon as their inputs are ready: lookups, activity counts
+    # and stage history are fetched while the deals are loading
+    stages = [
+        Stage("load", load_stage, outputs=["deals"], cacheable=True),
+        Stage("lookups", lambda: {"lookups": build_static_lookups(client)}, outputs=["lookups"], cacheable=True),
+        Stage(
+            "companies",
+            lambda deals: {"company_map": build_deal_company_map(client, deals)},
+            inputs=["deals"],
+            outputs=["company_map"],
+            cacheable=True,
+        ),
+        Stage(
+            "enrich",
+            enrich_stage,
+            inputs=["deals", "lookups", "company_map"] + (["activity_counts"] if activities_since else []),
+            outputs=["enriched"],
+        ),
+        Stage(
+            "normalize",
+            lambda enriched: {"rows": [normalize_deal_for_export(deal) for deal in enriched]},
+            inputs=["enriched"],
+            outputs=["rows"],
+        ),
+        Stage(
+            "tables",
+            tables_stage,
+            inputs=(
+                ["deals", "rows", "lookups"]
+                + (["deal_stages"] if stage_history_path else [])
+                + (["product_export_rows"] if product_rows_target == "sheets" else [])
+            ),
+            outputs=["tables", "split_tabs"],
+        ),
+        Stage(
+            "export_tables",
+            export_tables_stage,
+            # Sheets writes share the per-user write quota: tabs are written
+            # after the sinks are done
+            inputs=["tables", "split_tabs"] + (["exported"] if sinks else []),
+            outputs=["tables_written"],
+        ),
+    ]
+
+    if activities_since:
+        stages.append(Stage(
+            "activities",
+            lambda: {"activity_counts": sync_activity_counts(client, activities_since)},
+            outputs=["activity_counts"],
+        ))
+
+    if stage_history_path:
+        stages.append(Stage(
+            "stage_history",
+            lambda: {"deal_stages": sync_stage_history(client, stage_history_path)},
+            outputs=["deal_stages"],
+        ))
+
+    if sinks:
+        stages.append(Stage("export", export_stage, inputs=["rows"], outputs=["exported"]))
+
+    if product_rows_target:
+        stages.append(Stage("product_rows", product_rows_stage, inputs=["deals"], outputs=["product_export_rows"]))
+
+    # Cached deals are only reused for the same queries: report filters
+    # come from the definitions file, full fetches from the sinks
+    reports_digest = ""
+
+    if reports_path:
+        with open(reports_path, "rb") as file:
+            reports_digest = hashlib.sha256(file.read()).hexdigest()
+
+    executor = PipelineExecutor(
+        stages,
+        cache_dir=stage_cache_dir,
+        cache_key="|".join([
+            date.today().isoformat(),
+            client.base_url,
+            start_date or "",
+            f"full_fetch={bool(sinks)}",
+            f"reports={reports_digest}",
+        ]),
+    )
+
+    # Runs are only compared with runs of the same options (cassette
+    # replays and stage cache hits make fewer or no real calls)
+    cassette = active_cassette()
+    signature = "|".join([
+        ",".join(sorted(sink.name for sink in sinks)),
+        f"reports={reports_path or ''}",
+        f"stage_history={bool(stage_history_path)}",
+        f"product_rows={product_rows_target or ''}",
+        f"activities={bool(activities_since)}",
+        f"stage_cache={bool(stage_cache_dir)}",
+        f"cassette={cassette.mode if cassette else ''}",
+    ])
+    status = "failed"
+
+    try:
+        executor.run()
+        status = "aborted" if executor.aborted else "ok"
+    finally:
+        executor.print_report()
+        report_metrics(metrics_path)
+
+        if ledger_path:
+            record_run(
+                path=ledger_path,
+                signature=signature,
+                status=status,
+                stage_rows=executor.report_rows(),
+                started_at=run_started,
+                duration_seconds=time.perf_counter() - run_timer,
+            )
+
+    if executor.aborted:
+        return executor.report_rows()
+
     print("\nDeal export pipeline completed successfully.")
+
+    return executor.report_rows()
@@ -0,0 +1,170 @@
+"""
+Generic CRM entity export pipeline.
+
+Responsible for:
+- Loading any CRM entity (leads, contacts, smart processes, ...) with the
+  generic crm.item.list loader
+- Keeping a local snapshot, so incremental runs only fetch modified items
+- Exporting the normalized items to an XLSX file or a Google Sheets tab
+
+Incremental runs (incremental=True) fetch items modified since the last
+sync and merge them into the snapshot by ID. Items deleted in Bitrix are
+only dropped by a full run.
+"""
+
+import gzip
+import json
+import os
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from src.bitrix_client import BitrixClient
+from src.state import load_state, save_state
+
+from src.loaders.crm_items import fetch_items, get_entity_schema
+from src.normalizers.crm_item_normalizer import normalize_item
+from src.exporters.google_sheets_exporter import export_to_google_sheets
+from src.exporters.xlsx_exporter import export_rows_to_xlsx_stream
+from src.pipelines.deal_export_pipeline import SYNC_OVERLAP, main_spreadsheet_id
+
+# Supported targets of the entity export
+ENTITY_EXPORT_TARGETS = ("xlsx", "sheets")
+
+
+def _load_snapshot(path: str) -> Dict[str, Dict[str, Any]]:
+    if not os.path.exists(path):
+        return {}
+
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        return {str(item["id"]): item for item in map(json.loads, file)}
+
+
+def _save_snapshot(path: str, items: List[Dict[str, Any]]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.tmp"
+
+    with gzip.open(temp_path, "wt", encoding="utf-8") as file:
+        for item in items:
+            file.write(json.dumps(item, ensure_ascii=False))
+            file.write("\n")
+
+    os.replace(temp_path, path)
+
+
+def run_entity_export(
+    entity: str,
+    start_date: str | None = None,
+    target: str = "xlsx",
+    output_dir: str = "exports",
+    sheet_name: str | None = None,
+    incremental: bool = False,
+    state_path: str = "entity_state.json",
+    sheets_transport: str = "discovery",
+    client: BitrixClient | None = None,
+) -> int:
+    """
+    Exports a CRM entity.
+
+    Args:
+        entity: Entity name registered in ENTITY_SCHEMAS (e.g. "lead")
+        start_date: Only items created on or after this date (YYYY-MM-DD)
+        target: "xlsx" (<output_dir>/<entity>.xlsx) or "sheets" (one tab)
+        output_dir: Directory of the XLSX file and of the local snapshot
+        sheet_name: Google Sheets tab (defaults to the entity name)
+        incremental: Fetch only items modified since the last sync
+        state_path: JSON file recording the last sync per entity
+        sheets_transport: Google Sheets transport ("discovery" or "rest")
+        client: BitrixClient to use (defaults to the configured webhook)
+
+    Returns:
+        Number of exported items.
+    """
+
+    if target not in ENTITY_EXPORT_TARGETS:
+        raise ValueError(
+            f"Unknown entity export target '{target}'. "
+            f"Expected one of: {', '.join(ENTITY_EXPORT_TARGETS)}"
+        )
+
+    schema = get_entity_schema(entity)
+
+    client = client or BitrixClient()
+
+    run_started = datetime.now(timezone.utc)
+    state = load_state(state_path)
+    entity_state = state.get(entity, {})
+    snapshot_path = os.path.join(output_dir, f"{entity}.jsonl.gz")
+
+    def progress(count: int) -> None:
+        print(f"\rLoading {entity} items... {count} loaded", end="", flush=True)
+
+    can_resume = (
+        incremental
+        and entity_state.get("last_sync")
+        and entity_state.get("start_date") == start_date
+        and os.path.exists(snapshot_path)
+    )
+
+    # 1. Load items (only modified ones when resuming)
+    if can_resume:
+        items = _load_snapshot(snapshot_path)
+        modified = fetch_items(
+            client=client,
+            schema=schema,
+            start_date=start_date,
+            modified_since=entity_state["last_sync"],
+            progress_callback=progress,
+        )
+
+        for item in modified:
+            items[str(item["id"])] = item
+
+        print(f"\n{entity}: {len(modified)} modified, {len(items)} total\n")
+    else:
+        items = {
+            str(item["id"]): item
+            for item in fetch_items(
+                client=client,
+                schema=schema,
+                start_date=start_date,
+                progress_callback=progress,
+            )
+        }
+
+        print(f"\n{entity}: {len(items)} loaded\n")
+
+    ordered = sorted(items.values(), key=lambda item: int(item["id"]))
+    _save_snapshot(snapshot_path, ordered)
+
+    # 2. Normalize and export
+    rows = [normalize_item(item, schema) for item in ordered]
+    headers = list(schema.fields.values())
+
+    if target == "xlsx":
+        export_rows_to_xlsx_stream(
+            rows=rows,
+            output_path=os.path.join(output_dir, f"{entity}.xlsx"),
+            headers=headers,
+            column_types={},
+            sheet_title=sheet_name or entity,
+        )
+    else:
+        export_to_google_sheets(
+            spreadsheet_id=main_spreadsheet_id(),
+            sheet_name=sheet_name or entity,
+            rows=rows,
+            credentials_path="credentials.json",
+            headers=headers,
+            use_staging_swap=True,  # Also creates the tab on the first run
+            transport=sheets_transport,
+        )
+
+    state[entity] = {
+        "start_date": start_date,
+        "last_sync": (run_started - SYNC_OVERLAP).isoformat(timespec="seconds"),
+        "items": len(rows),
+    }
+    save_state(state_path, state)
+
+    return len(rows)
@@ -0,0 +1,324 @@
+"""
+Stage-based pipeline executor.
+
+Responsible for:
+- Running named stages with declared inputs and outputs
+- Starting every stage as soon as its inputs are available, so
+  independent stages run concurrently
+- Optionally caching stage outputs on disk between runs
+- Reporting wall time, CPU time and row count per stage
+
+A stage is a function called with its inputs as keyword arguments and
+returning a dictionary with its outputs:
+
+    Stage("load", load_deals, outputs=["deals"])
+    Stage("enrich", enrich, inputs=["deals", "lookups"], outputs=["enriched"])
+
+CPU time is the stage thread's own CPU time (threads started by the stage,
+e.g. export sinks, are not included).
+
+While tracemalloc is tracing (see src.profiling), the peak traced memory
+is also recorded per stage. Peaks are global, so stages running at the
+same time share the peak of their overlap.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+import tracemalloc
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Sequence
+
+
+# Stages running at the same time (Bitrix and Sheets calls share quotas)
+MAX_CONCURRENT_STAGES = 3
+
+
+class PipelineAborted(Exception):
+    """
+    Raised by a stage to stop the pipeline early without an error
+    (e.g. nothing to export). Running stages finish; no new stage starts.
+    """
+
+
+class Stage:
+    """
+    A named pipeline step.
+
+    Args:
+        name: Unique stage name
+        func: Callable receiving the inputs as keyword arguments and
+              returning { output name: value }
+        inputs: Names of the values the stage needs
+        outputs: Names of the values the stage produces
+        cacheable: Whether outputs may be cached on disk (see cache_dir)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Dict[str, Any]],
+        inputs: Sequence[str] = (),
+        outputs: Sequence[str] = (),
+        cacheable: bool = False,
+    ):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.cacheable = cacheable
+
+
+class StageReport:
+    """
+    Measurements of one stage run.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = "pending"  # ok, cached, failed, aborted, skipped
+        self.started_at: float | None = None
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.rows: int | None = None
+        self.peak_memory_bytes: int | None = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.name,
+            "status": self.status,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "rows": self.rows,
+            "peak_memory_bytes": self.peak_memory_bytes,
+        }
+
+
+def _row_count(outputs: Dict[str, Any]) -> int | None:
+    """
+    Size of the first sized output (list/dict), or the first integer output
+    (e.g. a number of written rows), used as the stage row count.
+    """
+
+    for value in outputs.values():
+        if isinstance(value, (list, dict, tuple, set)):
+            return len(value)
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+
+    return None
+
+
+class PipelineExecutor:
+    """
+    Runs stages in dependency order, concurrently when possible.
+
+    Args:
+        stages: Stages to run (order does not matter)
+        max_workers: Stages running at the same time
+        cache_dir: Directory of cached outputs of cacheable stages
+                   (None disables caching)
+        cache_key: Identifies the run parameters; cached outputs are only
+                   reused for the same key
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        max_workers: int = MAX_CONCURRENT_STAGES,
+        cache_dir: str | None = None,
+        cache_key: str = "",
+    ):
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Stage names must be unique: {names}")
+
+        producers: Dict[str, str] = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"Output '{output}' produced by '{producers[output]}' and '{stage.name}'")
+                producers[output] = stage.name
+
+        self.stages = stages
+        self.producers = producers
+        self.max_workers = max(1, max_workers)
+        self.cache_dir = cache_dir
+        self.cache_key = cache_key
+        self.reports: Dict[str, StageReport] = {stage.name: StageReport(stage.name) for stage in stages}
+        self.aborted = False
+        self._memory_lock = threading.Lock()
+        self._running_names: set = set()
+
+    def _cache_path(self, stage: Stage) -> str:
+        digest = hashlib.sha256(f"{stage.name}|{self.cache_key}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{stage.name}-{digest}.pickle")
+
+    def _memory_checkpoint(self, starting: str | None = None, finished: str | None = None) -> None:
+        """
+        Assigns the traced memory peak since the last checkpoint to the
+        stages running meanwhile, then resets it. No-op unless tracing.
+        """
+
+        if not tracemalloc.is_tracing():
+            return
+
+        with self._memory_lock:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+
+            for name in self._running_names:
+                report = self.reports[name]
+                report.peak_memory_bytes = max(report.peak_memory_bytes or 0, peak)
+
+            if starting:
+                self._running_names.add(starting)
+            if finished:
+                self._running_names.discard(finished)
+
+    def _run_stage(self, stage: Stage, values: Dict[str, Any]) -> Dict[str, Any]:
+        report = self.reports[stage.name]
+        self._memory_checkpoint(starting=stage.name)
+        report.started_at = time.perf_counter()
+        cpu_started = time.thread_time()
+
+        try:
+            cache_path = self._cache_path(stage) if self.cache_dir and stage.cacheable else None
+
+            if cache_path and os.path.exists(cache_path):
+                with open(cache_path, "rb") as file:
+                    outputs = pickle.load(file)
+                report.status = "cached"
+            else:
+                outputs = stage.func(**{name: values[name] for name in stage.inputs}) or {}
+
+                missing = set(stage.outputs) - set(outputs)
+                if missing:
+                    raise RuntimeError(f"Stage '{stage.name}' did not produce: {sorted(missing)}")
+
+                if cache_path:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    with open(f"{cache_path}.tmp", "wb") as file:
+                        pickle.dump(outputs, file, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(f"{cache_path}.tmp", cache_path)
+
+                report.status = "ok"
+
+            report.rows = _row_count(outputs)
+            return outputs
+        except PipelineAborted:
+            report.status = "aborted"
+            raise
+        except BaseException:
+            report.status = "failed"
+            raise
+        finally:
+            report.wall_seconds = time.perf_counter() - report.started_at
+            report.cpu_seconds = time.thread_time() - cpu_started
+            self._memory_checkpoint(finished=stage.name)
+
+    def run(self, initial: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        """
+        Runs every stage and returns all produced values (plus `initial`).
+
+        Raises the first stage error after running stages have finished.
+        When a stage raises PipelineAborted, remaining stages are skipped
+        and the values produced so far are returned.
+        """
+
+        values: Dict[str, Any] = dict(initial or {})
+        available = set(values)
+
+        for stage in self.stages:
+            unknown = [name for name in stage.inputs if name not in self.producers and name not in available]
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' needs unknown input(s): {unknown}")
+
+        pending = list(self.stages)
+        running: Dict[Any, Stage] = {}
+        lock = threading.Lock()
+        error: BaseException | None = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as pool:
+            while pending or running:
+                if error is None and not self.aborted:
+                    for stage in [stage for stage in pending if all(name in available for name in stage.inputs)]:
+                        pending.remove(stage)
+                        running[pool.submit(self._run_stage, stage, values)] = stage
+
+                if not running:
+                    break  # Nothing runnable is left (aborted or failed)
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    stage = running.pop(future)
+
+                    try:
+                        outputs = future.result()
+                    except PipelineAborted:
+                        self.aborted = True
+                        continue
+                    except BaseException as exc:
+                        error = error or exc
+                        continue
+
+                    with lock:
+                        values.update(outputs)
+                        available.update(outputs)
+
+        for stage in pending:
+            self.reports[stage.name].status = "skipped"
+
+        if error is not None:
+            raise error
+
+        return values
+
+    def report_rows(self) -> List[Dict[str, Any]]:
+        """
+        Per-stage measurements, in start order.
+        """
+
+        reports = sorted(
+            self.reports.values(),
+            key=lambda report: (report.started_at is None, report.started_at or 0.0),
+        )
+        return [report.as_dict() for report in reports]
+
+    def print_report(self) -> None:
+        print()
+        print(format_stage_report(self.report_rows()))
+
+
+def format_stage_report(rows: List[Dict[str, Any]]) -> str:
+    """
+    Formats report rows (see PipelineExecutor.report_rows) as a text table,
+    with a peak memory column when memory was traced.
+    """
+
+    with_memory = any(row.get("peak_memory_bytes") is not None for row in rows)
+
+    lines = [
+        "Stage report:",
+        f"  {'Stage':<18} {'Status':<8} {'Wall (s)':>9} {'CPU (s)':>9} {'Rows':>9}"
+        + (f" {'Peak (MB)':>10}" if with_memory else ""),
+    ]
+
+    for row in rows:
+        count = "" if row["rows"] is None else row["rows"]
+        line = (
+            f"  {row['stage']:<18} {row['status']:<8} "
+            f"{row['wall_seconds']:>9.2f} {row['cpu_seconds']:>9.2f} {count:>9}"
+        )
+
+        if with_memory:
+            peak = row.get("peak_memory_bytes")
+            line += f" {peak / 1024 / 1024:>10.1f}" if peak is not None else f" {'':>10}"
+
+        lines.append(line)
+
+    return "\n".join(lines)
@@ -0,0 +1,146 @@
+"""
+Single-pass fan-out of a row stream to several sinks.
+
+Responsible for:
+- Iterating the normalized rows once and feeding every sink concurrently
+- Bounding memory with per-sink queues (backpressure on the producer)
+- Isolating sink failures and reporting per-sink results and timings
+
+Each sink runs in its own thread and reads row batches from a bounded
+queue. The producer blocks only when a sink's queue is full, so a sink
+that is slow to finish (e.g. Google Sheets uploading after the stream
+ended) never delays the others.
+"""
+
+import queue
+import threading
+import time
+
+from typing import Any, Dict, Iterable, Iterator, List
+
+from src.exporters.sinks import Sink
+
+
+# Rows per batch put on the sink queues (amortizes queue overhead)
+FANOUT_BATCH_ROWS = 500
+
+# Maximum number of rows buffered per sink before the producer blocks
+FANOUT_BUFFER_ROWS = 20_000
+
+# Mark the end of the row stream on a sink queue (complete or aborted)
+_END = object()
+_ABORT = object()
+
+
+def fan_out(
+    rows: Iterable[Dict[str, Any]],
+    sinks: List[Sink],
+    batch_rows: int = FANOUT_BATCH_ROWS,
+    buffer_rows: int = FANOUT_BUFFER_ROWS,
+) -> Dict[str, Any]:
+    """
+    Feeds the same row stream to every sink concurrently.
+
+    Args:
+        rows: Iterable of normalized rows (iterated once)
+        sinks: Sinks to feed
+        batch_rows: Rows per queued batch
+        buffer_rows: Rows buffered per sink before applying backpressure
+
+    Returns:
+        { sink name: value returned by its consume() }
+
+    Raises a RuntimeError naming every failed sink, after all sinks finished.
+    """
+
+    if not sinks:
+        return {}
+
+    names = [sink.name for sink in sinks]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Sink names must be unique: {names}")
+
+    max_batches = max(1, buffer_rows // max(1, batch_rows))
+    queues = {sink.name: queue.Queue(maxsize=max_batches) for sink in sinks}
+
+    results: Dict[str, Any] = {}
+    errors: Dict[str, BaseException] = {}
+    durations: Dict[str, float] = {}
+
+    def run_sink(sink: Sink) -> None:
+        sink_queue = queues[sink.name]
+        stream_ended = False
+
+        def queued_rows() -> Iterator[Dict[str, Any]]:
+            nonlocal stream_ended
+
+            while True:
+                batch = sink_queue.get()
+
+                if batch is _END:
+                    stream_ended = True
+                    return
+
+                if batch is _ABORT:
+                    # Fail inside the sink, so it never publishes partial output
+                    stream_ended = True
+                    raise RuntimeError("Row stream aborted by the producer")
+
+                yield from batch
+
+        started = time.perf_counter()
+
+        try:
+            results[sink.name] = sink.consume(queued_rows())
+        except BaseException as exc:
+            errors[sink.name] = exc
+        finally:
+            durations[sink.name] = time.perf_counter() - started
+
+            # Keep draining, so the producer never blocks on a failed sink
+            while not stream_ended:
+                if sink_queue.get() in (_END, _ABORT):
+                    stream_ended = True
+
+    threads = [
+        threading.Thread(target=run_sink, args=(sink,), name=f"sink-{sink.name}", daemon=True)
+        for sink in sinks
+    ]
+
+    for thread in threads:
+        thread.start()
+
+    def publish(batch) -> None:
+        for sink_queue in queues.values():
+            sink_queue.put(batch)  # Blocks while the sink is behind
+
+    batch: List[Dict[str, Any]] = []
+    end_marker = _ABORT
+
+    try:
+        for row in rows:
+            batch.append(row)
+
+            if len(batch) >= batch_rows:
+                publish(batch)
+                batch = []
+
+        if batch:
+            publish(batch)
+
+        end_marker = _END
+    finally:
+        publish(end_marker)
+
+        for thread in threads:
+            thread.join()
+
+    for name in names:
+        status = "failed" if name in errors else "ok"
+        print(f"Sink {name}: {status} in {durations.get(name, 0.0):.1f}s")
+
+    if errors:
+        details = "; ".join(f"{name}: {error!r}" for name, error in errors.items())
+        raise RuntimeError(f"Export failed for sink(s): {details}") from next(iter(errors.values()))
+
+    return results
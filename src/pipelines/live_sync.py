@@ -0,0 +1,281 @@
+"""
+Live (warm) deal sync.
+
+Responsible for:
+- Keeping the loaded deals, their export rows and the lookup maps in
+  memory between syncs of a long-running process (see src.daemon)
+- Fetching only the deals modified since the previous sync
+- Re-enriching only the deals that changed, and exporting to the sinks
+  only when something changed
+- Refreshing given deals by ID (see src.webhooks) and sending row-level
+  updates to the sinks supporting them
+
+Static lookups (pipelines, stages, users, sources, gerência) are rebuilt
+every `lookup_ttl`; companies are fetched once, when a deal first
+references them. Deals deleted in Bitrix are dropped by the periodic full
+sync (`full_sync_interval`), like the hot/cold mode does with full runs.
+
+Rows are exported in deal ID order. While the exported order only grows at
+the end (changed deals and new deals with higher IDs, the usual case),
+sinks with row updates (Sheets tab) get only the changed rows; a removed
+or out-of-order deal triggers a full export instead.
+"""
+
+import threading
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Set
+
+from src.bitrix_client import BitrixClient
+from src.enrichers.deals import enrich_deals
+from src.exporters.sinks import Sink
+from src.loaders.deals import fetch_deals
+from src.lookups.companies import fetch_company_map
+from src.normalizers.deal_export_normalizer import normalize_deal_for_export
+from src.pipelines.deal_export_pipeline import SYNC_OVERLAP, build_static_lookups
+from src.pipelines.fan_out import fan_out
+
+
+DEFAULT_LOOKUP_TTL = timedelta(hours=1)
+DEFAULT_FULL_SYNC_INTERVAL = timedelta(hours=24)
+
+
+class LiveDealSync:
+    """
+    Incremental deal sync over warm in-memory caches.
+
+    Args:
+        client: BitrixClient (ideally with a pooled session)
+        start_date: Only deals created on or after this date (YYYY-MM-DD)
+        sinks: Export targets, refreshed whenever deals change
+        lookup_ttl: Age after which the static lookups are rebuilt
+        full_sync_interval: Age after which all deals are reloaded (drops
+                            deals deleted in Bitrix)
+    """
+
+    def __init__(
+        self,
+        client: BitrixClient,
+        start_date: str,
+        sinks: List[Sink],
+        lookup_ttl: timedelta = DEFAULT_LOOKUP_TTL,
+        full_sync_interval: timedelta = DEFAULT_FULL_SYNC_INTERVAL,
+    ):
+        self.client = client
+        self.start_date = start_date
+        self.sinks = sinks
+        self.lookup_ttl = lookup_ttl
+        self.full_sync_interval = full_sync_interval
+
+        self.deals: Dict[str, Dict[str, Any]] = {}
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.lookups: Dict[str, Any] | None = None
+        self.company_map: Dict[int, str] = {}
+        self.requested_company_ids: Set[int] = set()
+
+        self.lookups_built_at: datetime | None = None
+        self.last_full_sync: datetime | None = None
+        self.last_sync: str | None = None
+
+        # Deal IDs in the order of the last full export (None: not exported yet)
+        self.exported_ids: List[str] | None = None
+
+        # Serializes syncs with other writers of the caches (e.g. webhooks)
+        self.lock = threading.Lock()
+
+    def _refresh_lookups(self, now: datetime, force: bool = False) -> bool:
+        if not force and self.lookups is not None and now - self.lookups_built_at < self.lookup_ttl:
+            return False
+
+        self.lookups = build_static_lookups(self.client)
+        self.lookups_built_at = now
+        return True
+
+    def _fetch_missing_companies(self, deals: List[Dict[str, Any]]) -> None:
+        # Companies not found in Bitrix are not requested again either
+        missing = {
+            int(deal["COMPANY_ID"]) for deal in deals if deal.get("COMPANY_ID")
+        } - self.requested_company_ids
+
+        if missing:
+            self.company_map.update(fetch_company_map(self.client, missing))
+            self.requested_company_ids |= missing
+
+    def _build_rows(self, deals: List[Dict[str, Any]]) -> None:
+        """
+        Enriches and normalizes the given deals into the row cache.
+        """
+
+        if not deals:
+            return
+
+        self._fetch_missing_companies(deals)
+
+        enriched = enrich_deals(deals=deals, company_map=self.company_map, **self.lookups)
+
+        for deal, enriched_deal in zip(deals, enriched):
+            self.rows[str(deal["ID"])] = normalize_deal_for_export(enriched_deal)
+
+    def apply_deals(self, deals: List[Dict[str, Any]], deleted_ids: Iterable[str] = ()) -> List[str]:
+        """
+        Merges fetched deals (and deletions) into the caches.
+
+        Returns:
+            IDs of the deals that actually changed or were removed.
+        """
+
+        changed = [deal for deal in deals if self.deals.get(str(deal["ID"])) != deal]
+
+        for deal in changed:
+            self.deals[str(deal["ID"])] = deal
+
+        removed = []
+        for deal_id in deleted_ids:
+            if self.deals.pop(str(deal_id), None) is not None:
+                self.rows.pop(str(deal_id), None)
+                removed.append(str(deal_id))
+
+        self._build_rows(changed)
+
+        return [str(deal["ID"]) for deal in changed] + removed
+
+    def export_rows(self) -> List[Dict[str, Any]]:
+        """
+        Cached export rows, in deal ID order.
+        """
+
+        return [self.rows[deal_id] for deal_id in sorted(self.rows, key=int)]
+
+    def export(self) -> Dict[str, Any]:
+        """
+        Full export of the cached rows to every sink.
+        """
+
+        self.exported_ids = sorted(self.rows, key=int)
+        return fan_out(self.export_rows(), self.sinks) if self.sinks else {}
+
+    def publish(self, changed_ids: Iterable[str]) -> str:
+        """
+        Sends the given changed deals to the sinks: row-level updates where
+        possible, full export otherwise.
+
+        Returns:
+            "rows" or "full".
+        """
+
+        order = sorted(self.rows, key=int)
+        exported = self.exported_ids
+
+        if exported is None or order[:len(exported)] != exported:
+            self.export()
+            return "full"
+
+        positions = {deal_id: position for position, deal_id in enumerate(exported)}
+        updates = {
+            positions[deal_id]: self.rows[deal_id]
+            for deal_id in set(changed_ids)
+            if deal_id in positions
+        }
+        appended = [self.rows[deal_id] for deal_id in order[len(exported):]]
+
+        row_sinks = [sink for sink in self.sinks if sink.supports_row_updates]
+        other_sinks = [sink for sink in self.sinks if not sink.supports_row_updates]
+
+        for sink in row_sinks:
+            sink.update_rows(updates, appended, row_count=len(exported))
+            print(f"Sink {sink.name}: {len(updates)} rows updated, {len(appended)} appended")
+
+        if other_sinks:
+            fan_out(self.export_rows(), other_sinks)
+
+        self.exported_ids = order
+        return "rows"
+
+    def refresh_deals(self, deal_ids: Iterable[str], deleted_ids: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        Refetches the given deals (batched ID filters) and publishes the
+        changes.
+
+        Deals reported as deleted are refetched like the others: events
+        are not trusted to remove rows. Requested deals not returned by
+        Bitrix (deleted, or created before start_date) are dropped.
+
+        Returns:
+            { "requested": int, "changed": int, "published": "rows" | "full" | None }
+        """
+
+        deal_ids = list(dict.fromkeys([str(deal_id) for deal_id in deal_ids] + [str(deal_id) for deal_id in deleted_ids]))
+
+        with self.lock:
+            if self.last_full_sync is None:
+                raise RuntimeError("Deals must be loaded with sync() before refreshing deals by ID")
+
+            deals = fetch_deals(
+                client=self.client,
+                start_date=self.start_date,
+                filters={"ID": deal_ids},
+            ) if deal_ids else []
+
+            returned = {str(deal["ID"]) for deal in deals}
+            missing = [deal_id for deal_id in deal_ids if deal_id not in returned]
+
+            changed = self.apply_deals(deals, deleted_ids=missing)
+            published = self.publish(changed) if changed and self.sinks else None
+
+            return {
+                "requested": len(deal_ids),
+                "changed": len(changed),
+                "published": published,
+            }
+
+    def sync(self, now: datetime | None = None) -> Dict[str, Any]:
+        """
+        Runs one sync: full on the first call and every full_sync_interval,
+        otherwise only the deals modified since the previous sync.
+
+        Returns:
+            { "mode": "full" | "incremental", "changed": int,
+              "deals": int, "exported": bool }
+        """
+
+        now = now or datetime.now(timezone.utc)
+
+        with self.lock:
+            full = self.last_full_sync is None or now - self.last_full_sync >= self.full_sync_interval
+            lookups_refreshed = self._refresh_lookups(now, force=full)
+
+            if full:
+                deals = fetch_deals(client=self.client, start_date=self.start_date)
+
+                self.deals = {str(deal["ID"]): deal for deal in deals}
+                self.rows = {}
+                self._build_rows(deals)
+
+                changed = list(self.deals)
+                self.last_full_sync = now
+            else:
+                modified = fetch_deals(
+                    client=self.client,
+                    start_date=self.start_date,
+                    filters={">DATE_MODIFY": self.last_sync},
+                )
+                changed = self.apply_deals(modified)
+
+                if lookups_refreshed:
+                    self._build_rows(list(self.deals.values()))
+
+            # Overlap so deals modified during this sync are seen again
+            self.last_sync = (now - SYNC_OVERLAP).isoformat(timespec="seconds")
+
+            exported = bool(full or changed or lookups_refreshed)
+            if full or lookups_refreshed:
+                self.export()
+            elif changed:
+                self.publish(changed)
+
+            return {
+                "mode": "full" if full else "incremental",
+                "changed": len(changed),
+                "deals": len(self.deals),
+                "exported": exported,
+            }
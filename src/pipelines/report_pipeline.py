@@ -0,0 +1,284 @@
+"""
+Multi-report generation.
+
+Responsible for:
+- Planning the deal queries shared by every report (filter push-down)
+- Building every report from one fetched, enriched and normalized dataset
+- Writing the report tabs with a single Sheets client and write quota
+- Deleting the split tabs of values no longer present (report index tab)
+
+When every report is filtered (and no full export runs alongside), each
+distinct report filter is sent to Bitrix as its own query and the results
+are merged by deal ID, so only the deals some report needs are fetched,
+enriched and normalized. Otherwise one full fetch serves all reports and
+their filters are evaluated locally.
+
+Split reports get one tab per value, so a value disappearing (e.g. a
+pipeline without deals any more) would leave a stale tab behind. Each
+spreadsheet holding split tabs has an index tab listing them per report;
+tabs listed for a report but not written by the current run are deleted.
+"""
+
+import json
+
+from typing import Any, Dict, List, Tuple
+
+from src.bitrix_client import BitrixClient
+from src.loaders.deals import DEAL_SELECT_FIELDS, fetch_deals
+from src.normalizers.deal_export_normalizer import FIELD_LABEL_MAP
+from src.exporters.google_sheets_exporter import (
+    MAX_CONCURRENT_WRITES,
+    a1_range,
+    build_sheets_api,
+    delete_tabs,
+    execute_with_retry,
+    http_error_types,
+    shared_write_quota,
+    write_via_staging_swap,
+)
+from src.exporters.partitioning import field_partition_key
+from src.reports.definitions import ReportDefinition
+from src.reports.filters import filter_fields, matches_filter
+
+
+REPORT_INDEX_SHEET_NAME = "Índice de relatórios"
+
+REPORT_INDEX_HEADERS = ["Relatório", "Aba"]
+
+
+def plan_report_queries(
+    reports: List[ReportDefinition],
+    full_fetch: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Returns the Bitrix filters to fetch so that every report is covered.
+
+    Example:
+        two reports filtered on {"CATEGORY_ID": 1} and {"CATEGORY_ID": 3}
+        -> [{"CATEGORY_ID": 1}, {"CATEGORY_ID": 3}]
+        any unfiltered report (or full_fetch) -> [{}]
+    """
+
+    if full_fetch or any(not report.filters for report in reports):
+        return [{}]
+
+    queries: Dict[str, Dict[str, Any]] = {}
+
+    for report in reports:
+        queries.setdefault(json.dumps(report.filters, sort_keys=True), report.filters)
+
+    return list(queries.values())
+
+
+def report_select_fields(reports: List[ReportDefinition]) -> List[str]:
+    """
+    Deal fields to select: the export fields plus any field used by a filter.
+    """
+
+    fields = list(DEAL_SELECT_FIELDS)
+
+    for report in reports:
+        for field in filter_fields(report.filters):
+            if field not in fields:
+                fields.append(field)
+
+    return fields
+
+
+def fetch_report_deals(
+    client: BitrixClient,
+    start_date: str,
+    queries: List[Dict[str, Any]],
+    select: List[str],
+    progress_callback=None,
+) -> List[Dict[str, Any]]:
+    """
+    Runs the planned queries and merges their deals by ID (first seen wins).
+    """
+
+    merged: Dict[str, Dict[str, Any]] = {}
+
+    for filters in queries:
+        loaded_so_far = len(merged)
+
+        deals = fetch_deals(
+            client=client,
+            start_date=start_date,
+            filters=filters,
+            select=select,
+            progress_callback=(
+                (lambda count: progress_callback(loaded_so_far + count))
+                if progress_callback else None
+            ),
+        )
+
+        for deal in deals:
+            merged.setdefault(str(deal.get("ID")), deal)
+
+    return list(merged.values())
+
+
+def build_report_tables(
+    reports: List[ReportDefinition],
+    deals: List[Dict[str, Any]],
+    rows: List[Dict[str, Any]],
+    default_spreadsheet_id: str,
+) -> Tuple[
+    Dict[Tuple[str, str], Tuple[List[str], List[List[Any]]]],
+    Dict[str, Tuple[str, List[str]]],
+]:
+    """
+    Builds the tabs of every report.
+
+    Args:
+        reports: Report definitions
+        deals: Raw deals (filters are evaluated on them)
+        rows: Normalized rows, aligned with `deals`
+        default_spreadsheet_id: Spreadsheet of reports without their own
+
+    Returns:
+        ({ (spreadsheet_id, tab name): (headers, values) },
+         { split report name: (spreadsheet_id, [tab names]) })
+    """
+
+    tables: Dict[Tuple[str, str], Tuple[List[str], List[List[Any]]]] = {}
+    split_tabs: Dict[str, Tuple[str, List[str]]] = {}
+    all_headers = list(rows[0].keys()) if rows else list(FIELD_LABEL_MAP.values())
+
+    for report in reports:
+        headers = report.columns or all_headers
+        spreadsheet_id = report.spreadsheet_id or default_spreadsheet_id
+
+        selected = [
+            row
+            for deal, row in zip(deals, rows)
+            if matches_filter(deal, report.filters)
+        ]
+
+        if report.split_by:
+            split_key = field_partition_key(report.split_by)
+            groups: Dict[str, List[Dict[str, Any]]] = {}
+
+            for row in selected:
+                groups.setdefault(split_key(row), []).append(row)
+
+            named_groups = {f"{report.sheet} {key}": group for key, group in sorted(groups.items())}
+            split_tabs[report.name] = (spreadsheet_id, list(named_groups))
+        else:
+            named_groups = {report.sheet: selected}
+
+        for tab, group in named_groups.items():
+            if (spreadsheet_id, tab) in tables:
+                raise ValueError(f"Report '{report.name}' writes to tab '{tab}' used by another report")
+
+            tables[(spreadsheet_id, tab)] = (
+                headers,
+                [[row.get(header, "") for header in headers] for row in group],
+            )
+
+        print(f"Report {report.name}: {len(selected)} deals, {len(named_groups)} tab(s)")
+
+    return tables, split_tabs
+
+
+def _read_report_index(sheets_api, spreadsheet_id: str) -> List[Tuple[str, str]]:
+    """
+    Reads the report index tab and returns its (report name, tab) entries.
+
+    A missing index tab (first run) yields an empty index.
+    """
+
+    try:
+        response = execute_with_retry(
+            sheets_api.values().get(
+                spreadsheetId=spreadsheet_id,
+                range=a1_range(REPORT_INDEX_SHEET_NAME, "A2:B"),
+            )
+        )
+    except http_error_types() as e:
+        if e.resp.status == 400:
+            return []
+        raise
+
+    return [tuple((row + ["", ""])[:2]) for row in response.get("values", [])]
+
+
+def export_report_tables(
+    tables: Dict[Tuple[str, str], Tuple[List[str], List[List[Any]]]],
+    credentials_path: str,
+    transport: str = "discovery",
+    api_url: str | None = None,
+    split_tabs: Dict[str, Tuple[str, List[str]]] | None = None,
+) -> None:
+    """
+    Writes report tabs, each one refreshed through a staging swap (which
+    also creates tabs that do not exist yet). One client and write quota
+    are shared by all tabs.
+
+    split_tabs (see build_report_tables) updates the report index tab of
+    each spreadsheet and deletes the split tabs listed there for a report
+    but not written now. Entries of reports absent from this run are kept.
+    """
+
+    split_tabs = split_tabs or {}
+
+    if not tables and not split_tabs:
+        return
+
+    sheets_api, get_http = build_sheets_api(credentials_path, transport, api_url)
+    quota = shared_write_quota(credentials_path)
+
+    total = len(tables)
+    print(f"Exporting report tabs... 0/{total}", end="", flush=True)
+
+    for position, ((spreadsheet_id, tab), (headers, values)) in enumerate(tables.items(), start=1):
+        write_via_staging_swap(
+            sheets_api=sheets_api,
+            spreadsheet_id=spreadsheet_id,
+            sheet_name=tab,
+            headers=headers,
+            values=values,
+            get_http=get_http,
+            quota=quota,
+            max_workers=MAX_CONCURRENT_WRITES,
+        )
+
+        # Dynamic progress update
+        print(f"\rExporting report tabs... {position}/{total}", end="", flush=True)
+
+    print()
+
+    reports_by_spreadsheet: Dict[str, Dict[str, List[str]]] = {}
+
+    for name, (spreadsheet_id, tabs) in split_tabs.items():
+        reports_by_spreadsheet.setdefault(spreadsheet_id, {})[name] = tabs
+
+    for spreadsheet_id, report_tabs in reports_by_spreadsheet.items():
+        written = {tab for table_spreadsheet_id, tab in tables if table_spreadsheet_id == spreadsheet_id}
+        previous_index = _read_report_index(sheets_api, spreadsheet_id)
+
+        # Tabs of values gone from a report (unless another table reuses them)
+        stale_tabs = [
+            tab
+            for name, tab in previous_index
+            if name in report_tabs and tab not in report_tabs[name] and tab not in written
+        ]
+
+        if stale_tabs:
+            delete_tabs(sheets_api, spreadsheet_id, stale_tabs, quota)
+            print(f"Stale report tabs deleted: {', '.join(stale_tabs)}")
+
+        index_rows = [[name, tab] for name, tab in previous_index if name not in report_tabs]
+        index_rows += [[name, tab] for name, tabs in report_tabs.items() for tab in tabs]
+
+        # The index is tiny, so it is always rewritten
+        write_via_staging_swap(
+            sheets_api=sheets_api,
+            spreadsheet_id=spreadsheet_id,
+            sheet_name=REPORT_INDEX_SHEET_NAME,
+            headers=REPORT_INDEX_HEADERS,
+            values=sorted(index_rows),
+            get_http=get_http,
+            quota=quota,
+            max_workers=1,
+        )
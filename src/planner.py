@@ -0,0 +1,365 @@
+"""
+API cost planner (dry run of the deal export).
+
+Responsible for:
+- Running a few cheap count queries: the `total` of the first page of the
+  deal, company, user, pipeline (and optional activity / stage history)
+  listings
+- Building the request plan of every stage of run_export from them:
+  Bitrix and Google Sheets calls, bytes and duration under the rate limits
+- Writing nothing: no Sheets request, no state file, no run ledger
+
+Example:
+    plan = plan_export(start_date="2023-01-01")
+    print(format_plan(plan))
+
+Estimates assume a cold run: incremental states (product rows, activities,
+stage history) are ignored, so those stages are upper bounds. Distinct
+companies are extrapolated from the first page of deals, capped by the
+number of companies of the portal.
+"""
+
+import json
+import math
+import time
+
+from typing import Any, Dict, List, Tuple
+
+from src.bitrix_client import BATCH_LIMIT, BitrixClient
+from src.exporters.google_sheets_exporter import (
+    CHUNK_SIZE,
+    MAX_CONCURRENT_WRITES,
+    WRITE_REQUESTS_PER_MINUTE,
+)
+from src.loaders.deals import DEAL_SELECT_FIELDS
+
+
+# Bitrix leaky bucket: burst of 50 requests, drained at 2 requests/s
+BITRIX_BURST = 50
+BITRIX_REQUESTS_PER_SECOND = 2.0
+
+# Items per page of Bitrix listings
+PAGE_SIZE = 50
+
+# Assumed sizes and latency of the requests the planner does not probe
+LOOKUP_RESPONSE_BYTES = 2_000
+PRODUCT_ROWS_BYTES_PER_DEAL = 600
+SHEETS_SECONDS_PER_WRITE = 1.5
+
+# Sheets requests of a single-tab export besides the row chunks:
+# clear, header and grid resize (writes), two metadata reads
+SHEETS_EXTRA_WRITES = 3
+SHEETS_METADATA_READS = 2
+
+
+class PlannedStage:
+    """
+    Estimated cost of one run_export stage.
+    """
+
+    def __init__(self, name: str, api: str, calls: int, bytes: int, seconds: float, note: str = ""):
+        self.name = name
+        self.api = api
+        self.calls = calls
+        self.bytes = bytes
+        self.seconds = seconds
+        self.note = note
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.name,
+            "api": self.api,
+            "calls": self.calls,
+            "bytes": self.bytes,
+            "seconds": round(self.seconds, 1),
+            "note": self.note,
+        }
+
+
+class ExportPlan:
+    """
+    Request plan of a run: the counts it was built from, the per-stage
+    estimates and the estimated wall time.
+    """
+
+    def __init__(self, start_date: str | None, counts: Dict[str, int], stages: List[PlannedStage], seconds: float, probe_calls: int):
+        self.start_date = start_date
+        self.counts = counts
+        self.stages = stages
+        self.seconds = seconds
+        self.probe_calls = probe_calls
+
+    def calls(self, api: str) -> int:
+        return sum(stage.calls for stage in self.stages if stage.api == api)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "start_date": self.start_date,
+            "counts": self.counts,
+            "stages": [stage.as_dict() for stage in self.stages],
+            "bitrix_calls": self.calls("bitrix"),
+            "sheets_calls": self.calls("sheets"),
+            "bytes": sum(stage.bytes for stage in self.stages),
+            "seconds": round(self.seconds, 1),
+            "probe_calls": self.probe_calls,
+        }
+
+
+def _probe(client: BitrixClient, method: str, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], int, float]:
+    """
+    One count query.
+
+    Returns:
+        (response, approximate response bytes, latency in seconds without
+        the client throttle)
+    """
+
+    started = time.perf_counter()
+    data = client.call(method, {**payload, "start": 0})
+    latency = max(0.0, time.perf_counter() - started - client.throttle_seconds)
+
+    return data, len(json.dumps(data, ensure_ascii=False).encode("utf-8")), latency
+
+
+def _total(data: Dict[str, Any]) -> int:
+    if "total" in data:
+        return int(data["total"])
+
+    result = data.get("result", [])
+    items = result.get("items", []) if isinstance(result, dict) else result
+    return len(items)
+
+
+def _format_bytes(value: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+
+def plan_export(
+    client: BitrixClient | None = None,
+    start_date: str | None = None,
+    export_to_sheets: bool = True,
+    product_rows: bool = False,
+    activities_since: str | None = None,
+    stage_history: bool = False,
+) -> ExportPlan:
+    """
+    Estimates the API cost of run_export with the given options (see
+    run_export for their meaning), with one count query per listing.
+
+    Args:
+        client: Bitrix client (default: one built from the settings)
+        start_date: Date from which deals would be fetched
+        export_to_sheets: Plan the single-tab Google Sheets export
+        product_rows: Plan the product rows stage
+        activities_since: Plan the activity counts stage from this date
+        stage_history: Plan the stage history stage (full history)
+    """
+
+    client = client or BitrixClient()
+    probe_calls = 0
+    latencies: List[float] = []
+
+    def probe(method: str, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        nonlocal probe_calls
+        data, size, latency = _probe(client, method, payload)
+        probe_calls += 1
+        latencies.append(latency)
+        return data, size
+
+    print("Planning deal export (dry run)...")
+
+    deal_filter = {">=DATE_CREATE": start_date} if start_date else {}
+    deals_page, deals_page_bytes = probe("crm.deal.list", {"filter": deal_filter, "select": DEAL_SELECT_FIELDS})
+    companies_page, companies_page_bytes = probe("crm.company.list", {"select": ["ID", "TITLE"]})
+    users_page, users_page_bytes = probe("user.get", {})
+    categories_page, categories_page_bytes = probe("crm.dealcategory.list", {})
+
+    sample = deals_page.get("result", [])
+    deals = _total(deals_page)
+    portal_companies = _total(companies_page)
+
+    # Distinct companies of the sample, extrapolated and capped
+    sample_companies = {deal.get("COMPANY_ID") for deal in sample if str(deal.get("COMPANY_ID") or "0") != "0"}
+    companies = min(portal_companies, math.ceil(deals * len(sample_companies) / len(sample))) if sample else 0
+
+    counts = {
+        "deals": deals,
+        "companies": companies,
+        "portal_companies": portal_companies,
+        "users": _total(users_page),
+        "sample_users": len({deal.get("ASSIGNED_BY_ID") for deal in sample}),
+        "pipelines": _total(categories_page),
+    }
+
+    if activities_since:
+        activities_page, activities_page_bytes = probe("crm.activity.list", {
+            "filter": {"OWNER_TYPE_ID": 2, ">=CREATED": activities_since},
+            "select": ["ID", "OWNER_ID", "TYPE_ID"],
+        })
+        counts["activities"] = _total(activities_page)
+
+    if stage_history:
+        history_page, history_page_bytes = probe("crm.stagehistory.list", {"entityTypeId": 2})
+        counts["stage_transitions"] = _total(history_page)
+
+    # Every Bitrix call waits for the response, then the client throttle
+    per_call = (sum(latencies) / len(latencies) if latencies else 0.0) + client.throttle_seconds
+
+    def pages(items: int) -> int:
+        return max(1, math.ceil(items / PAGE_SIZE))
+
+    def page_bytes(items: int, first_page_bytes: int, first_page_items: int) -> int:
+        return round(first_page_bytes * items / first_page_items) if first_page_items else first_page_bytes
+
+    def bitrix_stage(name: str, calls: int, bytes: int, note: str = "") -> PlannedStage:
+        return PlannedStage(name, "bitrix", calls, bytes, calls * per_call, note)
+
+    load = bitrix_stage(
+        "load",
+        pages(deals),
+        page_bytes(deals, deals_page_bytes, len(sample)),
+        f"{deals} deals, pages of {PAGE_SIZE}",
+    )
+
+    lookup_calls = {
+        "crm.dealcategory.list": pages(counts["pipelines"]),
+        "crm.dealcategory.stage.list": counts["pipelines"],
+        "user.get": pages(counts["users"]),
+        "crm.status.list": 1,
+        "crm.deal.userfield.get": 1,
+    }
+    lookups = bitrix_stage(
+        "lookups",
+        sum(lookup_calls.values()),
+        page_bytes(counts["users"], users_page_bytes, len(users_page.get("result", [])))
+        + categories_page_bytes
+        + (counts["pipelines"] + 2) * LOOKUP_RESPONSE_BYTES,
+        f"{counts['users']} users, {counts['pipelines']} pipelines",
+    )
+
+    # One call_all per batch of 50 company IDs
+    company_bytes = page_bytes(companies, companies_page_bytes, len(companies_page.get("result", [])))
+    companies_stage = bitrix_stage(
+        "companies",
+        math.ceil(companies / 50),
+        company_bytes,
+        f"~{companies} distinct companies",
+    )
+
+    stages = [load, lookups, companies_stage]
+    parallel = [load, lookups]    # Fetched while the deals load
+    after_load = [companies_stage]
+
+    if activities_since:
+        # Keyset pagination: one more (empty or short) page after the last full one
+        activities = bitrix_stage(
+            "activities",
+            counts["activities"] // PAGE_SIZE + 1,
+            page_bytes(counts["activities"], activities_page_bytes, len(activities_page.get("result", []))),
+            f"{counts['activities']} activities",
+        )
+        stages.append(activities)
+        parallel.append(activities)
+
+    if stage_history:
+        history_items = history_page.get("result", {}).get("items", [])
+        history = bitrix_stage(
+            "stage_history",
+            counts["stage_transitions"] // PAGE_SIZE + 1,
+            page_bytes(counts["stage_transitions"], history_page_bytes, len(history_items)),
+            f"{counts['stage_transitions']} transitions (full history)",
+        )
+        stages.append(history)
+        parallel.append(history)
+
+    if product_rows:
+        product_stage = bitrix_stage(
+            "product_rows",
+            math.ceil(deals / BATCH_LIMIT),
+            deals * PRODUCT_ROWS_BYTES_PER_DEAL,
+            f"batches of {BATCH_LIMIT} deals (no cache)",
+        )
+        stages.append(product_stage)
+        after_load.append(product_stage)
+
+    # Stages run concurrently, but all share the Bitrix leaky bucket
+    bitrix_calls = sum(stage.calls for stage in stages)
+    bitrix_seconds = max(
+        max(stage.seconds for stage in parallel) + max(stage.seconds for stage in after_load),
+        max(0, bitrix_calls - BITRIX_BURST) / BITRIX_REQUESTS_PER_SECOND,
+    )
+    seconds = bitrix_seconds
+
+    if export_to_sheets:
+        chunks = math.ceil(deals / CHUNK_SIZE)
+        writes = chunks + SHEETS_EXTRA_WRITES
+
+        # Approximate size of an exported row: the values of a sample deal
+        row_bytes = (
+            sum(len(json.dumps(list(deal.values()), ensure_ascii=False).encode("utf-8")) for deal in sample) / len(sample)
+            if sample else 0
+        )
+
+        # Writes beyond the per-minute quota wait for the next window
+        sheets_seconds = max(
+            chunks * SHEETS_SECONDS_PER_WRITE / MAX_CONCURRENT_WRITES,
+            (writes - 1) // WRITE_REQUESTS_PER_MINUTE * 60.0,
+        )
+
+        stages.append(PlannedStage(
+            "export",
+            "sheets",
+            writes + SHEETS_METADATA_READS,
+            round(deals * row_bytes),
+            sheets_seconds,
+            f"{chunks} chunks of {CHUNK_SIZE} rows, {WRITE_REQUESTS_PER_MINUTE} writes/min",
+        ))
+        seconds += sheets_seconds
+
+    return ExportPlan(start_date, counts, stages, seconds, probe_calls)
+
+
+def format_plan(plan: ExportPlan) -> str:
+    """
+    Formats a plan as a text table.
+    """
+
+    lines = [
+        f"Export plan (dry run, start date {plan.start_date or 'none'}):",
+        "  " + ", ".join(f"{name}: {value}" for name, value in plan.counts.items()),
+        "",
+        f"  {'Stage':<14} {'API':<7} {'Calls':>8} {'Bytes':>10} {'Duration':>9}  Notes",
+    ]
+
+    for stage in plan.stages:
+        lines.append(
+            f"  {stage.name:<14} {stage.api:<7} {stage.calls:>8} {_format_bytes(stage.bytes):>10} "
+            f"{_format_duration(stage.seconds):>9}  {stage.note}"
+        )
+
+    total_bytes = sum(stage.bytes for stage in plan.stages)
+
+    lines += [
+        "",
+        f"  Bitrix calls: {plan.calls('bitrix')}, Sheets calls: {plan.calls('sheets')}, "
+        f"transfer: {_format_bytes(total_bytes)}",
+        f"  Estimated duration: {_format_duration(plan.seconds)} "
+        f"(Bitrix limit {BITRIX_REQUESTS_PER_SECOND:.0f} req/s, burst {BITRIX_BURST})",
+        f"  Count queries made: {plan.probe_calls}. Nothing was written.",
+    ]
+
+    return "\n".join(lines)
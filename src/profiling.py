@@ -0,0 +1,191 @@
+"""
+Profiling of export runs.
+
+Responsible for:
+- Running a pipeline under cProfile (every thread started meanwhile
+  included) and tracemalloc
+- Writing the profile artifact (.prof, readable with pstats or snakeviz)
+- Writing a text summary: per-stage timings and peak memory, top functions
+  by cumulative and own time, top allocation sites
+
+Nothing here is imported unless profiling is requested, so regular runs
+pay no overhead.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.pipelines.executor import format_stage_report
+
+
+DEFAULT_PROFILE_DIR = "profiles"
+
+# Entries listed in each section of the summary
+DEFAULT_TOP = 30
+
+# Frames kept per allocation traceback
+TRACEMALLOC_FRAMES = 5
+
+# Since Python 3.12 cProfile is built on sys.monitoring: a single profiler
+# may be active per process, and it already sees every thread
+PROCESS_WIDE_PROFILER = sys.version_info >= (3, 12)
+
+
+class RunProfiler:
+    """
+    Context manager profiling the current thread and every thread started
+    while it is active (stage and sink threads): one profiler per thread
+    before Python 3.12, the single process-wide profiler since.
+
+    Example:
+        with RunProfiler() as profiler:
+            run_export(...)
+        profiler.stats().sort_stats("cumulative").print_stats(20)
+    """
+
+    def __init__(self):
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self.peak_memory_bytes = 0
+        self.snapshot: tracemalloc.Snapshot | None = None
+
+    def _profile_new_thread(self, frame, event, arg) -> None:
+        # Installed by threading.setprofile: runs once in each new thread,
+        # replacing itself with a dedicated profiler
+        profile = cProfile.Profile()
+
+        with self._lock:
+            self._profiles.append(profile)
+
+        profile.enable()
+
+    def __enter__(self) -> "RunProfiler":
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+
+        main_profile = cProfile.Profile()
+        self._profiles.append(main_profile)
+
+        if not PROCESS_WIDE_PROFILER:
+            threading.setprofile(self._profile_new_thread)
+
+        main_profile.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._profiles[0].disable()
+
+        if not PROCESS_WIDE_PROFILER:
+            threading.setprofile(None)
+
+        with self._lock:
+            for profile in self._profiles[1:]:
+                profile.disable()
+
+        # The executor resets the peak at stage boundaries; its per-stage
+        # peaks are merged by write_profile
+        self.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+        self.snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+    def stats(self) -> pstats.Stats:
+        stats = pstats.Stats(self._profiles[0])
+
+        for profile in self._profiles[1:]:
+            try:
+                stats.add(profile)
+            except TypeError:
+                pass  # Thread profiler that recorded nothing
+
+        return stats
+
+
+def _stats_section(stats: pstats.Stats, sort_key: str, top: int) -> str:
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats(sort_key).print_stats(top)
+    return stream.getvalue().strip()
+
+
+def write_profile(
+    profiler: RunProfiler,
+    stage_rows: List[Dict[str, Any]],
+    output_dir: str = DEFAULT_PROFILE_DIR,
+    top: int = DEFAULT_TOP,
+    name: str = "export",
+) -> Tuple[str, str]:
+    """
+    Writes the profile artifact and its text summary.
+
+    Returns:
+        (path of the .prof file, path of the .txt summary)
+    """
+
+    os.makedirs(output_dir, exist_ok=True)
+    base = os.path.join(output_dir, f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+
+    stats = profiler.stats()
+    stats.dump_stats(f"{base}.prof")
+
+    peak = max(
+        [profiler.peak_memory_bytes] + [row.get("peak_memory_bytes") or 0 for row in stage_rows]
+    )
+
+    sections = [
+        f"Profile of {name} run ({base}.prof)",
+        f"Peak traced memory: {peak / 1024 / 1024:.1f} MB",
+    ]
+
+    if stage_rows:
+        sections.append(format_stage_report(stage_rows))
+
+    sections.append(f"Top {top} functions by cumulative time:\n{_stats_section(stats, 'cumulative', top)}")
+    sections.append(f"Top {top} functions by own time:\n{_stats_section(stats, 'tottime', top)}")
+
+    if profiler.snapshot is not None:
+        allocations = profiler.snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ]).statistics("lineno")[:top]
+
+        sections.append(
+            f"Top {top} allocation sites still alive at the end of the run:\n"
+            + "\n".join(f"  {statistic}" for statistic in allocations)
+        )
+
+    with open(f"{base}.txt", "w", encoding="utf-8") as file:
+        file.write("\n\n".join(sections))
+        file.write("\n")
+
+    return f"{base}.prof", f"{base}.txt"
+
+
+def profile_run(
+    func: Callable[[], List[Dict[str, Any]]],
+    output_dir: str = DEFAULT_PROFILE_DIR,
+    top: int = DEFAULT_TOP,
+    name: str = "export",
+) -> List[Dict[str, Any]]:
+    """
+    Runs `func` (returning stage report rows, e.g. run_export) under the
+    profiler and writes the artifacts, even when the run fails.
+    """
+
+    stage_rows: List[Dict[str, Any]] = []
+    profiler = RunProfiler()
+
+    try:
+        with profiler:
+            stage_rows = func() or []
+    finally:
+        profile_path, summary_path = write_profile(profiler, stage_rows, output_dir, top, name)
+        print(f"\nProfile written to {profile_path} (summary: {summary_path})")
+
+    return stage_rows
@@ -0,0 +1,134 @@
+"""
+Report definitions.
+
+Responsible for:
+- Loading report definitions from a JSON config file
+- Validating them and resolving date placeholders in their filters
+
+A report selects deals with a Bitrix filter, keeps a subset of the export
+columns and is written to a target tab (or one tab per value of a column):
+
+    {
+        "reports": [
+            {"name": "por-pipeline", "sheet": "Pipeline", "split_by": "Pipeline"},
+            {
+                "name": "ganhos-do-mes",
+                "sheet": "Ganhos do mês",
+                "filters": {"STAGE_SEMANTIC_ID": "S", ">=CLOSEDATE": "{month_start}"},
+                "columns": ["Pipeline", "Responsável", "Nome do Negócio", "Renda"]
+            }
+        ]
+    }
+
+Placeholders available in filter values: {today}, {month_start},
+{year_start} (YYYY-MM-DD, resolved when the definitions are loaded).
+"""
+
+import json
+
+from datetime import date
+from typing import Any, Dict, List
+
+from src.reports.filters import parse_filter_key
+
+
+REPORT_KEYS = {"name", "sheet", "filters", "columns", "split_by", "spreadsheet_id"}
+
+
+class ReportDefinition:
+    """
+    A report generated from the shared deal dataset.
+
+    Attributes:
+        name: Unique report name (used in logs)
+        sheet: Target tab name, or tab prefix when split_by is set
+        filters: Bitrix filter selecting the report deals ({} = all deals)
+        columns: Export columns to keep, in order (None = all columns)
+        split_by: Column whose values get one tab each (None = single tab)
+        spreadsheet_id: Target spreadsheet (None = GOOGLE_SHEET_ID)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sheet: str,
+        filters: Dict[str, Any] | None = None,
+        columns: List[str] | None = None,
+        split_by: str | None = None,
+        spreadsheet_id: str | None = None,
+    ):
+        self.name = name
+        self.sheet = sheet
+        self.filters = filters or {}
+        self.columns = columns
+        self.split_by = split_by
+        self.spreadsheet_id = spreadsheet_id
+
+
+def resolve_placeholders(filters: Dict[str, Any], today: date | None = None) -> Dict[str, Any]:
+    """
+    Replaces date placeholders in filter values.
+
+    Example:
+        {">=CLOSEDATE": "{month_start}"} -> {">=CLOSEDATE": "2025-03-01"}
+    """
+
+    today = today or date.today()
+    placeholders = {
+        "today": today.isoformat(),
+        "month_start": today.replace(day=1).isoformat(),
+        "year_start": today.replace(month=1, day=1).isoformat(),
+    }
+
+    def resolve(value: Any) -> Any:
+        if isinstance(value, str):
+            return value.format_map(placeholders)
+        if isinstance(value, list):
+            return [resolve(item) for item in value]
+        return value
+
+    return {key: resolve(value) for key, value in filters.items()}
+
+
+def load_report_definitions(path: str, today: date | None = None) -> List[ReportDefinition]:
+    """
+    Loads and validates report definitions from a JSON file.
+
+    Raises a ValueError describing the first invalid definition.
+    """
+
+    with open(path, "r", encoding="utf-8") as file:
+        config = json.load(file)
+
+    reports: List[ReportDefinition] = []
+    names = set()
+
+    for position, entry in enumerate(config.get("reports", []), start=1):
+        unknown = set(entry) - REPORT_KEYS
+        if unknown:
+            raise ValueError(f"Report #{position}: unknown keys {sorted(unknown)}")
+
+        if not entry.get("name") or not entry.get("sheet"):
+            raise ValueError(f"Report #{position}: 'name' and 'sheet' are required")
+
+        if entry["name"] in names:
+            raise ValueError(f"Duplicate report name '{entry['name']}'")
+        names.add(entry["name"])
+
+        filters = entry.get("filters") or {}
+        if not isinstance(filters, dict) or not all(parse_filter_key(key)[1] for key in filters):
+            raise ValueError(f"Report '{entry['name']}': invalid filters {filters!r}")
+
+        reports.append(ReportDefinition(
+            name=entry["name"],
+            sheet=entry["sheet"],
+            filters=resolve_placeholders(filters, today),
+            columns=entry.get("columns"),
+            split_by=entry.get("split_by"),
+            spreadsheet_id=entry.get("spreadsheet_id"),
+        ))
+
+    if not reports:
+        raise ValueError(f"No reports defined in {path}")
+
+    return reports
@@ -0,0 +1,111 @@
+"""
+Local evaluation of Bitrix filters.
+
+Responsible for:
+- Matching raw deals against Bitrix filter dictionaries, the same way the
+  API would (so one shared fetch can serve several filtered reports)
+- Listing the fields a filter needs, so they can be added to the select
+
+Supported syntax (crm.*.list filters):
+    {"CATEGORY_ID": [1, 3]}          equal / IN list
+    {"=STAGE_SEMANTIC_ID": "S"}      equal
+    {"!STAGE_ID": "C1:LOSE"}         not equal / NOT IN list
+    {">=CLOSEDATE": "2025-03-01"}    >, >=, <, <= (numbers, ISO dates)
+    {"%TITLE": "Fibra"}              case-insensitive substring
+"""
+
+from typing import Any, Dict, List, Tuple
+
+
+# Longest prefixes first, so ">=" is not read as ">"
+_OPERATORS = (">=", "<=", "!=", "!%", ">", "<", "=", "!", "%")
+
+
+def parse_filter_key(key: str) -> Tuple[str, str]:
+    """
+    Splits a filter key into (operator, field).
+
+    Example:
+        ">=DATE_CREATE" -> (">=", "DATE_CREATE")
+        "CATEGORY_ID" -> ("=", "CATEGORY_ID")
+    """
+
+    for operator in _OPERATORS:
+        if key.startswith(operator):
+            return operator, key[len(operator):]
+
+    return "=", key
+
+
+def filter_fields(filters: Dict[str, Any]) -> List[str]:
+    """
+    Returns the deal fields referenced by a filter.
+    """
+
+    return [parse_filter_key(key)[1] for key in filters]
+
+
+def _as_number(value: Any) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _compare(actual: Any, expected: Any) -> int | None:
+    """
+    Compares two values as numbers when both are numeric, otherwise as
+    strings (ISO dates and datetimes sort correctly as text).
+
+    Returns -1, 0 or 1, or None when the actual value is empty.
+    """
+
+    if actual is None or actual == "":
+        return None
+
+    left, right = _as_number(actual), _as_number(expected)
+
+    if left is None or right is None:
+        left, right = str(actual), str(expected)
+
+    return (left > right) - (left < right)
+
+
+def _equals(actual: Any, expected: Any) -> bool:
+    if isinstance(expected, (list, tuple, set)):
+        return any(_equals(actual, item) for item in expected)
+
+    return _compare(actual, expected) == 0 or (
+        (actual in (None, "")) and expected in (None, "")
+    )
+
+
+def matches_filter(deal: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """
+    Tells whether a raw deal satisfies every condition of a Bitrix filter.
+    """
+
+    for key, expected in filters.items():
+        operator, field = parse_filter_key(key)
+        actual = deal.get(field)
+
+        if operator == "=":
+            matched = _equals(actual, expected)
+        elif operator in ("!", "!="):
+            matched = not _equals(actual, expected)
+        elif operator in ("%", "!%"):
+            matched = str(expected).lower() in str(actual or "").lower()
+            matched = matched if operator == "%" else not matched
+        else:
+            comparison = _compare(actual, expected)
+            matched = comparison is not None and {
+                ">": comparison > 0,
+                ">=": comparison >= 0,
+                "<": comparison < 0,
+                "<=": comparison <= 0,
+            }[operator]
+
+        if not matched:
+            return False
+
+    return True
@@ -0,0 +1,46 @@
+"""
+Local run state persistence.
+
+Responsible for:
+- Loading small JSON state files between runs (cursors, frozen partitions)
+- Saving them atomically, so a crashed run never leaves a corrupt file
+
+In GitHub Actions, state files must be cached between runs
+(e.g. actions/cache), otherwise each run starts from an empty state.
+"""
+
+import json
+import os
+
+from typing import Any, Dict
+
+
+def load_state(path: str) -> Dict[str, Any]:
+    """
+    Loads a JSON state file.
+
+    Returns an empty dictionary when the file does not exist yet.
+    """
+
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_state(path: str, state: Dict[str, Any]) -> None:
+    """
+    Saves a JSON state file atomically (write to temp file, then rename).
+    """
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temp_path = f"{path}.tmp"
+
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(state, file, ensure_ascii=False, indent=2)
+
+    os.replace(temp_path, path)
@@ -0,0 +1,290 @@
+"""
+Bitrix outbound events (event-driven deal refresh).
+
+Responsible for:
+- Parsing the deal events posted by the Bitrix outbound webhook
+  (ONCRMDEALADD, ONCRMDEALUPDATE, ONCRMDEALDELETE)
+- Deduplicating and debouncing the deal IDs of bursts of events
+- Periodically refreshing only the queued deals and sending row-level
+  updates to the sinks (see LiveDealSync.refresh_deals). Deleted deals
+  are refetched too, and only dropped once Bitrix no longer returns them.
+
+Bitrix posts one form-encoded request per event, e.g.:
+    event=ONCRMDEALUPDATE&data[FIELDS][ID]=4211&ts=1736935000
+    &auth[application_token]=...
+
+The receiver endpoint is served by the daemon (POST /bitrix/events, see
+src.daemon). The scheduled incremental syncs keep running as a safety net
+for lost events.
+"""
+
+import hmac
+import threading
+import time
+import traceback
+
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.parse import parse_qs
+
+from src.pipelines.live_sync import LiveDealSync
+
+
+# Event -> queued action
+DEAL_EVENTS = {
+    "ONCRMDEALADD": "update",
+    "ONCRMDEALUPDATE": "update",
+    "ONCRMDEALDELETE": "delete",
+}
+
+# A deal is refreshed once no event was received for it for this long...
+DEFAULT_DEBOUNCE_SECONDS = 10.0
+
+# ...or at the latest this long after its first queued event
+DEFAULT_MAX_DELAY_SECONDS = 60.0
+
+# Seconds between two checks of the queue
+DEFAULT_FLUSH_INTERVAL_SECONDS = 2.0
+
+
+def parse_event(body: str) -> Tuple[str, str, str | None]:
+    """
+    Parses a form-encoded Bitrix outbound event.
+
+    Returns:
+        (event name, deal ID, application token)
+
+    Raises a ValueError for unsupported events or events without a deal ID.
+    """
+
+    fields = parse_qs(body)
+
+    def first(name: str) -> str | None:
+        values = fields.get(name)
+        return values[0] if values else None
+
+    event = (first("event") or "").upper()
+    if event not in DEAL_EVENTS:
+        raise ValueError(f"Unsupported event: {event or '(none)'}")
+
+    deal_id = first("data[FIELDS][ID]")
+    if not deal_id or not deal_id.isdigit():
+        raise ValueError(f"Event {event} without a valid deal ID")
+
+    return event, deal_id, first("auth[application_token]")
+
+
+class DealEventQueue:
+    """
+    Thread-safe queue of deal IDs to refresh, one entry per deal.
+
+    Repeated events of a deal are merged (the last action wins) and the
+    deal is only released once its events stop for `debounce_seconds`, or
+    `max_delay_seconds` after its first event for deals that keep changing.
+    """
+
+    def __init__(
+        self,
+        debounce_seconds: float = DEFAULT_DEBOUNCE_SECONDS,
+        max_delay_seconds: float = DEFAULT_MAX_DELAY_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.clock = clock
+
+        # deal ID -> [action, first event time, last event time]
+        self._pending: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+
+        self.received = 0
+        self.deduplicated = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def add(self, event: str, deal_id: str) -> bool:
+        """
+        Queues an event.
+
+        Returns:
+            False when merged into an already queued event of the deal.
+        """
+
+        action = DEAL_EVENTS[event]
+        now = self.clock()
+
+        with self._lock:
+            self.received += 1
+            entry = self._pending.get(deal_id)
+
+            if entry is not None:
+                entry[0] = action
+                entry[2] = now
+                self.deduplicated += 1
+                return False
+
+            self._pending[deal_id] = [action, now, now]
+            return True
+
+    def drain(self, force: bool = False) -> Tuple[List[str], List[str]]:
+        """
+        Removes and returns the deals ready to be refreshed (every queued
+        deal when forced).
+
+        Returns:
+            (deal IDs to refetch, deal IDs reported deleted, refetched too)
+        """
+
+        now = self.clock()
+        updated: List[str] = []
+        deleted: List[str] = []
+
+        with self._lock:
+            for deal_id, (action, first_seen, last_seen) in list(self._pending.items()):
+                ready = (
+                    force
+                    or now - last_seen >= self.debounce_seconds
+                    or now - first_seen >= self.max_delay_seconds
+                )
+
+                if ready:
+                    del self._pending[deal_id]
+                    (deleted if action == "delete" else updated).append(deal_id)
+
+        return updated, deleted
+
+    def requeue(self, updated: List[str], deleted: List[str]) -> None:
+        """
+        Puts back deals whose refresh failed (newer events are kept).
+        """
+
+        now = self.clock()
+
+        with self._lock:
+            for action, deal_ids in (("update", updated), ("delete", deleted)):
+                for deal_id in deal_ids:
+                    self._pending.setdefault(deal_id, [action, now, now])
+
+
+class DealEventProcessor:
+    """
+    Refreshes the queued deals every `flush_interval` seconds in a
+    background thread.
+
+    Args:
+        live_sync: Warm deal caches and sinks (refreshed with refresh_deals)
+        queue: Event queue filled by the receiver
+        application_token: When set, events carrying another token are
+                           rejected (see accepts())
+        flush_interval: Seconds between two checks of the queue
+    """
+
+    def __init__(
+        self,
+        live_sync: LiveDealSync,
+        queue: DealEventQueue | None = None,
+        application_token: str | None = None,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+    ):
+        self.live_sync = live_sync
+        self.queue = queue or DealEventQueue()
+        self.application_token = application_token
+        self.flush_interval = flush_interval
+
+        self.refreshes = 0
+        self.failures = 0
+        self.last_result: Dict[str, Any] | None = None
+        self.last_error: str | None = None
+
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def accepts(self, application_token: str | None) -> bool:
+        if not self.application_token:
+            return True
+
+        # Constant-time comparison: response times must not leak the token
+        return hmac.compare_digest((application_token or "").encode(), self.application_token.encode())
+
+    def receive(self, body: str) -> bool:
+        """
+        Parses and queues a posted event.
+
+        Returns:
+            False when merged into an already queued event of the deal.
+
+        Raises a PermissionError for a wrong application token and a
+        ValueError for invalid events.
+        """
+
+        event, deal_id, application_token = parse_event(body)
+
+        if not self.accepts(application_token):
+            raise PermissionError("Invalid application token")
+
+        return self.queue.add(event, deal_id)
+
+    def flush(self, force: bool = False) -> Dict[str, Any] | None:
+        """
+        Refreshes the deals ready in the queue.
+
+        Returns:
+            The refresh result, or None when nothing was ready (or the
+            deals were not loaded yet by a first sync).
+        """
+
+        if self.live_sync.last_full_sync is None:
+            return None
+
+        updated, deleted = self.queue.drain(force=force)
+
+        if not updated and not deleted:
+            return None
+
+        try:
+            result = self.live_sync.refresh_deals(updated, deleted_ids=deleted)
+        except Exception as error:
+            self.queue.requeue(updated, deleted)
+            self.failures += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            raise
+
+        self.refreshes += 1
+        self.last_result = result
+        self.last_error = None
+
+        print(
+            f"Event refresh: {result['requested']} deals, {result['changed']} changed "
+            f"({result['published'] or 'nothing'} published)"
+        )
+
+        return result
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                traceback.print_exc()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="deal-events", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self.queue),
+            "received": self.queue.received,
+            "deduplicated": self.queue.deduplicated,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,106 @@
+"""
+Local Bitrix outbound event replayer.
+
+Stands in for the portal: posts ONCRMDEALADD/UPDATE/DELETE events,
+form-encoded like the Bitrix outbound webhook, to a receiver (the daemon's
+POST /bitrix/events, see src.webhooks).
+
+    replayer = BitrixEventReplayer(url, application_token="secret")
+    replayer.send("ONCRMDEALUPDATE", 4211)
+    replayer.replay([{"event": "ONCRMDEALUPDATE", "deal_id": 4211, "delay": 0.5}])
+
+Recorded events (JSON Lines with the same keys) can be replayed with:
+    $ python -m tests.bitrix_event_replayer http://127.0.0.1:8080/bitrix/events events.jsonl
+
+It is a test helper, not a test: run the tests that use it instead.
+"""
+
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from typing import Any, Dict, Iterable, List, Tuple
+from urllib.parse import urlencode
+
+
+def encode_event(event: str, deal_id: int | str, application_token: str = "", ts: int | None = None) -> bytes:
+    """
+    Form-encodes an event like the Bitrix outbound webhook does.
+    """
+
+    return urlencode({
+        "event": event,
+        "event_handler_id": "1",
+        "data[FIELDS][ID]": str(deal_id),
+        "ts": str(ts or int(time.time())),
+        "auth[domain]": "example.bitrix24.com",
+        "auth[client_endpoint]": "https://example.bitrix24.com/rest/",
+        "auth[application_token]": application_token,
+    }).encode("utf-8")
+
+
+class BitrixEventReplayer:
+    """
+    Posts events to a receiver URL.
+
+    Attributes:
+        responses: (status, body) of every posted event
+    """
+
+    def __init__(self, url: str, application_token: str = ""):
+        self.url = url
+        self.application_token = application_token
+        self.responses: List[Tuple[int, str]] = []
+
+    def send(self, event: str, deal_id: int | str, application_token: str | None = None) -> int:
+        """
+        Posts one event.
+
+        Returns:
+            HTTP status of the receiver.
+        """
+
+        token = self.application_token if application_token is None else application_token
+        request = urllib.request.Request(
+            self.url,
+            data=encode_event(event, deal_id, token),
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            method="POST",
+        )
+
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                status, body = response.status, response.read().decode("utf-8")
+        except urllib.error.HTTPError as error:
+            status, body = error.code, error.read().decode("utf-8")
+
+        self.responses.append((status, body))
+        return status
+
+    def replay(self, events: Iterable[Dict[str, Any]], speed: float = 1.0) -> List[int]:
+        """
+        Posts events in order, waiting their optional "delay" (seconds
+        before the event, divided by `speed`).
+        """
+
+        statuses = []
+
+        for event in events:
+            delay = float(event.get("delay", 0)) / speed
+            if delay > 0:
+                time.sleep(delay)
+
+            statuses.append(self.send(event["event"], event["deal_id"], event.get("application_token")))
+
+        return statuses
+
+
+if __name__ == "__main__":
+    url, path = sys.argv[1], sys.argv[2]
+
+    with open(path, "r", encoding="utf-8") as file:
+        recorded = [json.loads(line) for line in file if line.strip()]
+
+    print(BitrixEventReplayer(url).replay(recorded))
@@ -0,0 +1,499 @@
+"""
+Local fake Bitrix24 REST server with synthetic CRM data.
+
+Serves the methods used by the deal export, at any scale:
+- crm.deal.list (filters by field with the =, >, >=, <, <=, ! operators
+  and ID lists; select; pages of 50 with "next" and "total")
+- crm.company.list, user.get, crm.dealcategory.list (paginated)
+- crm.dealcategory.stage.list, crm.status.list, crm.deal.userfield.get
+- batch (commands encoded as PHP query strings, see build_query)
+
+Deals are generated deterministically from their ID when requested, so a
+million deals cost no memory. DATE_CREATE grows with the ID over `days`
+days, which keeps date-filtered listings cheap. An optional leaky bucket
+(Bitrix allows a burst of 50 requests, drained at 2 per second) answers
+overflowing requests with 429 QUERY_LIMIT_EXCEEDED.
+
+Used with BitrixClient:
+
+    server = FakeBitrixServer(deals=10_000).start()
+    client = BitrixClient(base_url=server.url, user_id="1", webhook="fake", throttle_seconds=0)
+    server.stop()
+
+It is a test helper, not a test: run the tests that use it instead.
+"""
+
+import json
+import re
+import threading
+
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+from urllib.parse import parse_qsl
+
+from src.cassettes import LeakyBucket
+
+
+PAGE_SIZE = 50
+
+# Portal time zone of the generated dates
+PORTAL_TZ = timezone(timedelta(hours=-3))
+
+BASE_DATE = datetime(2024, 1, 1, 8, 0, tzinfo=PORTAL_TZ)
+
+CATEGORIES = {1: "Vendas", 2: "Renovação", 3: "Pós-venda"}
+
+STAGES = [
+    ("NEW", "Novo"),
+    ("PREPARATION", "Proposta"),
+    ("EXECUTING", "Negociação"),
+    ("WON", "Ganho"),
+    ("LOSE", "Perdido"),
+]
+
+SOURCES = [
+    ("WEB", "Site"),
+    ("CALL", "Chamada"),
+    ("EMAIL", "E-mail"),
+    ("WEBFORM", "Formulário de CRM"),
+    ("PARTNER", "Parceiro"),
+    ("OTHER", "Outro"),
+]
+
+TYPES = ["SALE", "COMPLEX", "GOODS", "SERVICES"]
+
+# Userfield 261 (Gerência) and its enum values
+GERENCIA_FIELD_ID = 261
+GERENCIA_VALUES = [("427", "Inside Sales"), ("429", "Field Sales"), ("431", "Corporativo"), ("433", "Varejo")]
+
+DOCUMENT_TYPES = ["509", "511"]
+
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Hugo", "Isabela", "João"]
+LAST_NAMES = ["Lima", "Souza", "Costa", "Pereira", "Almeida", "Ribeiro", "Carvalho", "Gomes"]
+
+_FILTER_KEY = re.compile(r"^(>=|<=|!=|>|<|=|!)?(.+)$")
+_QUERY_PATH = re.compile(r"\[([^\]]*)\]")
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "": lambda value, expected: value == expected,
+    "=": lambda value, expected: value == expected,
+    "!": lambda value, expected: value != expected,
+    "!=": lambda value, expected: value != expected,
+    ">": lambda value, expected: value > expected,
+    ">=": lambda value, expected: value >= expected,
+    "<": lambda value, expected: value < expected,
+    "<=": lambda value, expected: value <= expected,
+}
+
+
+class BitrixApiError(Exception):
+    def __init__(self, code: str, description: str, status: int = 400):
+        super().__init__(description)
+        self.code = code
+        self.description = description
+        self.status = status
+
+
+def parse_php_query(query: str) -> Dict[str, Any]:
+    """
+    Decodes "filter[ID][0]=1&select[0]=ID" into nested dicts and lists
+    (values stay strings, as Bitrix receives them).
+    """
+
+    root: Dict[str, Any] = {}
+
+    for name, value in parse_qsl(query, keep_blank_values=True):
+        base = name.split("[", 1)[0]
+        path = [base] + _QUERY_PATH.findall(name[len(base):])
+
+        node = root
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+
+    def listify(node):
+        if not isinstance(node, dict):
+            return node
+
+        node = {key: listify(value) for key, value in node.items()}
+
+        if node and all(key.isdigit() for key in node):
+            return [node[key] for key in sorted(node, key=int)]
+
+        return node
+
+    return listify(root)
+
+
+def _parse_date(value: Any) -> datetime:
+    parsed = datetime.fromisoformat(str(value))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=PORTAL_TZ)
+
+
+def _comparable(field: str, value: Any) -> Any:
+    if field.startswith("DATE_") or field in ("BEGINDATE", "CLOSEDATE"):
+        return _parse_date(value)
+
+    if field == "ID" or field.endswith("_ID"):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return str(value)
+
+    return str(value)
+
+
+def _is_range(operator: str, field: str, value: Any) -> bool:
+    """
+    Conditions resolved as ID bounds (see FakeBitrixServer._id_bounds).
+    """
+
+    return operator in (">", ">=", "<", "<=") and (
+        field == "DATE_CREATE" or (field == "ID" and not isinstance(value, list))
+    )
+
+
+def _page(items: Sequence[Any], start: Any, transform=None) -> Dict[str, Any]:
+    start = int(start or 0)
+    page = items[start:start + PAGE_SIZE]
+
+    data: Dict[str, Any] = {
+        "result": [transform(item) for item in page] if transform else list(page),
+        "total": len(items),
+    }
+
+    if start + PAGE_SIZE < len(items):
+        data["next"] = start + PAGE_SIZE
+
+    return data
+
+
+class FakeBitrixServer:
+    """
+    In-memory Bitrix24 portal.
+
+    Args:
+        deals: Number of deals (IDs 1..deals)
+        companies: Number of companies (default: one per 10 deals)
+        users: Number of users
+        days: Period over which the deals were created, from 2024-01-01
+        rate_limit: Leaky-bucket drain in requests per second (None: unlimited)
+        burst: Capacity of the bucket
+    """
+
+    def __init__(
+        self,
+        deals: int = 1000,
+        companies: int | None = None,
+        users: int = 50,
+        days: int = 730,
+        rate_limit: float | None = None,
+        burst: float = 50,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.deal_count = deals
+        self.company_count = companies or max(1, deals // 10)
+        self.user_count = users
+        self.seconds_per_deal = days * 86400 / max(1, deals)
+
+        self.bucket = LeakyBucket(rate_limit, burst) if rate_limit else None
+        self.request_counts: Counter = Counter()
+        self.rate_limited = 0
+
+        self._lock = threading.Lock()
+        self._matches: "OrderedDict[str, Sequence[int]]" = OrderedDict()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self._httpd.server_address[0]}:{self._httpd.server_address[1]}"
+
+    def start(self) -> "FakeBitrixServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    # Synthetic entities
+
+    def created_at(self, deal_id: int) -> datetime:
+        return BASE_DATE + timedelta(seconds=int((deal_id - 1) * self.seconds_per_deal))
+
+    def deal(self, deal_id: int) -> Dict[str, Any]:
+        created = self.created_at(deal_id)
+        category_id = 1 + deal_id % len(CATEGORIES)
+        stage = STAGES[(deal_id * 7) % len(STAGES)][0]
+        modified = created + timedelta(hours=deal_id % 72)
+
+        return {
+            "ID": str(deal_id),
+            "TITLE": f"Negócio {deal_id}",
+            "TYPE_ID": TYPES[deal_id % len(TYPES)],
+            "STAGE_ID": stage if category_id == 1 else f"C{category_id}:{stage}",
+            "CATEGORY_ID": str(category_id),
+            "COMPANY_ID": str(1 + (deal_id * 2654435761) % self.company_count),
+            "ASSIGNED_BY_ID": str(1 + (deal_id * 31) % self.user_count),
+            "SOURCE_ID": SOURCES[deal_id % len(SOURCES)][0],
+            "OPPORTUNITY": f"{(deal_id * 7919) % 100000 + 100:.2f}",
+            "DATE_CREATE": created.isoformat(),
+            "BEGINDATE": created.replace(hour=0, minute=0, second=0).isoformat(),
+            "CLOSEDATE": (created + timedelta(days=30)).replace(hour=0, minute=0, second=0).isoformat(),
+            "DATE_MODIFY": modified.isoformat(),
+            "UF_CRM_1750948742478": f"Pedido {deal_id:06d}",
+            "UF_CRM_1750950619818": FIRST_NAMES[deal_id % len(FIRST_NAMES)],
+            "UF_CRM_1750951091402": GERENCIA_VALUES[deal_id % len(GERENCIA_VALUES)][0],
+            "UF_CRM_1751306725382": "Sim" if deal_id % 5 == 0 else "Não",
+            "UF_CRM_1751332724412": f"{(deal_id * 104729) % 5000:.2f}",
+            "UF_CRM_1753968931293": DOCUMENT_TYPES[deal_id % len(DOCUMENT_TYPES)],
+        }
+
+    def company(self, company_id: int) -> Dict[str, Any]:
+        return {"ID": str(company_id), "TITLE": f"Empresa {company_id} Ltda"}
+
+    def user(self, user_id: int) -> Dict[str, Any]:
+        return {
+            "ID": str(user_id),
+            "NAME": FIRST_NAMES[user_id % len(FIRST_NAMES)],
+            "LAST_NAME": LAST_NAMES[user_id % len(LAST_NAMES)],
+        }
+
+    # Filtering
+
+    def _id_bounds(self, conditions: List[Tuple[str, str, Any]]) -> Tuple[int, int]:
+        """
+        ID range implied by the ID and DATE_CREATE conditions (DATE_CREATE
+        grows with the ID).
+        """
+
+        low, high = 1, self.deal_count
+
+        for operator, field, value in conditions:
+            if not _is_range(operator, field, value):
+                continue
+
+            if field == "ID":
+                value = int(value)
+                if operator in (">", ">="):
+                    low = max(low, value + (operator == ">"))
+                else:
+                    high = min(high, value - (operator == "<"))
+            else:
+                # First ID created at or after the date
+                seconds = (_parse_date(value) - BASE_DATE).total_seconds()
+                first = max(1, int(seconds // self.seconds_per_deal) + 1)
+
+                while first > 1 and self.created_at(first - 1) >= _parse_date(value):
+                    first -= 1
+                while first <= self.deal_count and self.created_at(first) < _parse_date(value):
+                    first += 1
+
+                if operator in (">", ">="):
+                    low = max(low, first)
+                else:
+                    high = min(high, first - 1)
+
+        return low, high
+
+    def matching_deal_ids(self, bitrix_filter: Dict[str, Any]) -> Sequence[int]:
+        """
+        IDs of the deals matching a filter, in ID order (cached per filter,
+        since every page of a listing repeats it).
+        """
+
+        cache_key = json.dumps(bitrix_filter, sort_keys=True, default=str)
+
+        with self._lock:
+            if cache_key in self._matches:
+                self._matches.move_to_end(cache_key)
+                return self._matches[cache_key]
+
+        conditions = []
+        for key, value in bitrix_filter.items():
+            operator, field = _FILTER_KEY.match(key).groups()
+            conditions.append((operator or "", field, value))
+
+        low, high = self._id_bounds(conditions)
+        candidates: Sequence[int] = range(low, high + 1)
+
+        remaining = []
+
+        for operator, field, value in conditions:
+            if field == "ID" and isinstance(value, list) and operator in ("", "="):
+                # ID lists narrow the candidates directly
+                wanted = sorted({int(deal_id) for deal_id in value})
+                candidates = [deal_id for deal_id in wanted if deal_id in candidates]
+            elif not _is_range(operator, field, value):
+                remaining.append((operator, field, value))
+
+        if remaining:
+            candidates = [deal_id for deal_id in candidates if self._matches_conditions(self.deal(deal_id), remaining)]
+
+        with self._lock:
+            self._matches[cache_key] = candidates
+            while len(self._matches) > 32:
+                self._matches.popitem(last=False)
+
+        return candidates
+
+    def _matches_conditions(self, deal: Dict[str, Any], conditions: List[Tuple[str, str, Any]]) -> bool:
+        for operator, field, expected in conditions:
+            value = deal.get(field)
+            if value is None:
+                return False
+
+            value = _comparable(field, value)
+
+            if isinstance(expected, list):
+                found = value in {_comparable(field, item) for item in expected}
+                if found == (operator in ("!", "!=")):
+                    return False
+            elif not _OPERATORS[operator](value, _comparable(field, expected)):
+                return False
+
+        return True
+
+    # Methods
+
+    def handle(self, method: str, payload: Dict[str, Any]) -> Any:
+        """
+        Runs one API method; returns the JSON response body.
+        """
+
+        if method == "batch":
+            return {"result": self._batch(payload.get("cmd") or {})}
+
+        return self._call(method, payload)
+
+    def _call(self, method: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if method == "crm.deal.list":
+            deal_ids = self.matching_deal_ids(payload.get("filter") or {})
+            select = payload.get("select") or []
+
+            def render(deal_id: int) -> Dict[str, Any]:
+                deal = self.deal(deal_id)
+                if select and "*" not in select:
+                    return {field: deal.get(field) for field in select}
+                return deal
+
+            return _page(deal_ids, payload.get("start"), render)
+
+        if method == "crm.company.list":
+            ids = (payload.get("filter") or {}).get("ID")
+            if ids is None:
+                company_ids: Sequence[int] = range(1, self.company_count + 1)
+            else:
+                ids = ids if isinstance(ids, list) else [ids]
+                company_ids = sorted({int(value) for value in ids if 1 <= int(value) <= self.company_count})
+
+            return _page(company_ids, payload.get("start"), self.company)
+
+        if method == "user.get":
+            return _page(range(1, self.user_count + 1), payload.get("start"), self.user)
+
+        if method == "crm.dealcategory.list":
+            categories = [{"ID": str(category_id), "NAME": name} for category_id, name in CATEGORIES.items()]
+            return _page(categories, payload.get("start"))
+
+        if method == "crm.dealcategory.stage.list":
+            category_id = int(payload.get("id", 0))
+            if category_id not in CATEGORIES:
+                return {"result": []}
+
+            prefix = "" if category_id == 1 else f"C{category_id}:"
+            return {"result": [{"STATUS_ID": f"{prefix}{status_id}", "NAME": name} for status_id, name in STAGES]}
+
+        if method == "crm.status.list":
+            entity_id = (payload.get("filter") or {}).get("ENTITY_ID")
+            statuses = SOURCES if entity_id == "SOURCE" else []
+            return {"result": [{"ENTITY_ID": entity_id, "STATUS_ID": status_id, "NAME": name} for status_id, name in statuses]}
+
+        if method == "crm.deal.userfield.get":
+            if int(payload.get("id", 0)) != GERENCIA_FIELD_ID:
+                raise BitrixApiError("ERROR_NOT_FOUND", "The user field is not found")
+
+            return {"result": {
+                "ID": str(GERENCIA_FIELD_ID),
+                "FIELD_NAME": "UF_CRM_1750951091402",
+                "LIST": [{"ID": value_id, "VALUE": value} for value_id, value in GERENCIA_VALUES],
+            }}
+
+        raise BitrixApiError("ERROR_METHOD_NOT_FOUND", f"Method '{method}' not found", status=404)
+
+    def _batch(self, commands: Dict[str, str]) -> Dict[str, Any]:
+        if len(commands) > PAGE_SIZE:
+            raise BitrixApiError("ERROR_BATCH_LENGTH_EXCEEDED", "Max batch length exceeded")
+
+        results: Dict[str, Any] = {}
+        errors: Dict[str, Any] = {}
+        totals: Dict[str, Any] = {}
+        nexts: Dict[str, Any] = {}
+
+        for key, command in commands.items():
+            method, _, query = command.partition("?")
+
+            with self._lock:
+                self.request_counts[f"batch:{method}"] += 1
+
+            try:
+                data = self._call(method, parse_php_query(query))
+            except BitrixApiError as error:
+                errors[key] = {"error": error.code, "error_description": error.description}
+                continue
+
+            results[key] = data["result"]
+            if "total" in data:
+                totals[key] = data["total"]
+            if "next" in data:
+                nexts[key] = data["next"]
+
+        # PHP serializes empty associative arrays as lists
+        return {
+            "result": results or [],
+            "result_error": errors or [],
+            "result_total": totals or [],
+            "result_next": nexts or [],
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                method = self.path.rstrip("/").rsplit("/", 1)[-1]
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length) if length else b""
+
+                with server._lock:
+                    server.request_counts[method] += 1
+
+                if server.bucket is not None and server.bucket.try_acquire():
+                    with server._lock:
+                        server.rate_limited += 1
+                    return self._send(429, {"error": "QUERY_LIMIT_EXCEEDED", "error_description": "Too many requests"})
+
+                try:
+                    payload = json.loads(raw) if raw else {}
+                    self._send(200, server.handle(method, payload))
+                except BitrixApiError as error:
+                    self._send(error.status, {"error": error.code, "error_description": error.description})
+
+            def _send(self, status: int, data: Any) -> None:
+                body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,358 @@
+"""
+Local fake Google Sheets v4 REST server.
+
+Implements the subset of endpoints used by the exporters, in memory:
+- GET  /v4/spreadsheets/{id}
+- POST /v4/spreadsheets/{id}:batchUpdate (addSheet, deleteSheet,
+       updateSheetProperties, appendDimension, copyPaste, updateCells)
+- GET  /v4/spreadsheets/{id}/values/{range}
+- PUT  /v4/spreadsheets/{id}/values/{range}
+- POST /v4/spreadsheets/{id}/values/{range}:clear
+- POST /v4/spreadsheets/{id}/values:batchUpdate
+- POST /v4/spreadsheets/{id}/values:batchClear
+
+Used with the "rest" Sheets transport:
+
+    server = FakeSheetsServer()
+    server.start()
+    export_to_google_sheets(..., transport="rest", api_url=server.api_url)
+    server.stop()
+
+It is a test helper, not a test: run the tests that use it instead.
+"""
+
+import json
+import re
+import threading
+
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+_CELL_REF = re.compile(r"^([A-Z]+)?(\d+)?$")
+
+
+def _parse_range(value_range: str):
+    """
+    Parses "'Tab'!A2" / "Tab!A:Z" into (title, start_row) with 1-based rows.
+    """
+
+    if "!" in value_range:
+        title, cells = value_range.rsplit("!", 1)
+    else:
+        title, cells = value_range, "A1"
+
+    if title.startswith("'") and title.endswith("'"):
+        title = title[1:-1].replace("''", "'")
+
+    start = cells.split(":", 1)[0]
+    match = _CELL_REF.match(start)
+    row = int(match.group(2)) if match and match.group(2) else 1
+
+    return title, row
+
+
+class FakeSpreadsheet:
+    """
+    In-memory spreadsheet: tabs with properties and sparse row values.
+    """
+
+    def __init__(self, spreadsheet_id: str):
+        self.spreadsheet_id = spreadsheet_id
+        self.next_sheet_id = 1
+        self.sheets: List[Dict[str, Any]] = []
+        self.add_sheet({"title": "Folha1"})
+
+    def add_sheet(self, properties: Dict[str, Any]) -> Dict[str, Any]:
+        grid = properties.get("gridProperties", {})
+        sheet = {
+            "properties": {
+                "sheetId": self.next_sheet_id,
+                "title": properties["title"],
+                "index": len(self.sheets),
+                "hidden": properties.get("hidden", False),
+                "gridProperties": {
+                    "rowCount": grid.get("rowCount", 1000),
+                    "columnCount": grid.get("columnCount", 26),
+                },
+            },
+            "values": {},
+        }
+        self.next_sheet_id += 1
+        self.sheets.append(sheet)
+        return sheet
+
+    def find(self, title: str) -> Dict[str, Any] | None:
+        return next((s for s in self.sheets if s["properties"]["title"] == title), None)
+
+    def find_by_id(self, sheet_id: int) -> Dict[str, Any]:
+        return next(s for s in self.sheets if s["properties"]["sheetId"] == sheet_id)
+
+    def reindex(self) -> None:
+        self.sheets.sort(key=lambda s: s["properties"]["index"])
+        for index, sheet in enumerate(self.sheets):
+            sheet["properties"]["index"] = index
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "spreadsheetId": self.spreadsheet_id,
+            "sheets": [{"properties": dict(s["properties"])} for s in self.sheets],
+        }
+
+    def rows(self, title: str) -> List[List[Any]]:
+        """
+        Returns the values of a tab as a dense list of rows (test helper).
+        """
+
+        sheet = self.find(title)
+        if sheet is None or not sheet["values"]:
+            return []
+
+        last_row = max(sheet["values"])
+        return [sheet["values"].get(row, []) for row in range(1, last_row + 1)]
+
+
+class FakeSheetsServer:
+    """
+    Threaded HTTP server exposing FakeSpreadsheet objects.
+
+    Attributes:
+        spreadsheets: { spreadsheet_id: FakeSpreadsheet } (created on first use)
+        request_counts: Counter of "METHOD endpoint" calls
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.spreadsheets: Dict[str, FakeSpreadsheet] = {}
+        self.request_counts: Counter = Counter()
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.thread = None
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v4/spreadsheets"
+
+    def start(self) -> "FakeSheetsServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def spreadsheet(self, spreadsheet_id: str) -> FakeSpreadsheet:
+        if spreadsheet_id not in self.spreadsheets:
+            self.spreadsheets[spreadsheet_id] = FakeSpreadsheet(spreadsheet_id)
+        return self.spreadsheets[spreadsheet_id]
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: Dict[str, Any]):
+        """
+        Dispatches a request; returns (status, response body).
+        """
+
+        batch_values = re.match(r"^/v4/spreadsheets/([^/:]+)/values:(batchUpdate|batchClear)$", path)
+        if batch_values:
+            spreadsheet_id, operation = batch_values.groups()
+
+            with self.lock:
+                spreadsheet = self.spreadsheet(unquote(spreadsheet_id))
+                self.request_counts[f"values.{operation}"] += 1
+                return self._batch_values(spreadsheet, operation, body)
+
+        match = re.match(r"^/v4/spreadsheets/([^/:]+)(:batchUpdate)?(?:/values/([^:]+)(:clear)?)?$", path)
+        if not match:
+            return 404, {"error": {"code": 404, "message": f"Unknown path {path}"}}
+
+        spreadsheet_id, batch_update, value_range, clear = match.groups()
+
+        with self.lock:
+            spreadsheet = self.spreadsheet(unquote(spreadsheet_id))
+
+            if value_range is not None:
+                endpoint = "values.clear" if clear else f"values.{method.lower()}"
+                self.request_counts[endpoint] += 1
+                return self._values(spreadsheet, method, unquote(value_range), bool(clear), body)
+
+            if batch_update:
+                self.request_counts["batchUpdate"] += 1
+                return self._batch_update(spreadsheet, body)
+
+            self.request_counts["get"] += 1
+            return 200, spreadsheet.metadata()
+
+    def _values(self, spreadsheet: FakeSpreadsheet, method: str, value_range: str, clear: bool, body):
+        title, start_row = _parse_range(value_range)
+        sheet = spreadsheet.find(title)
+
+        if sheet is None:
+            return 400, {"error": {"code": 400, "message": f"Unable to parse range: {value_range}"}}
+
+        if clear:
+            sheet["values"] = {}
+            return 200, {"clearedRange": value_range}
+
+        if method == "GET":
+            rows = [
+                sheet["values"][row]
+                for row in sorted(sheet["values"])
+                if row >= start_row
+            ]
+            return 200, {"range": value_range, "values": rows}
+
+        values = body.get("values", [])
+        row_count = sheet["properties"]["gridProperties"]["rowCount"]
+
+        if start_row + len(values) - 1 > row_count:
+            return 400, {"error": {"code": 400, "message": "Range exceeds grid limits"}}
+
+        for offset, row in enumerate(values):
+            sheet["values"][start_row + offset] = row
+
+        return 200, {"updatedRows": len(values)}
+
+    def _batch_values(self, spreadsheet: FakeSpreadsheet, operation: str, body: Dict[str, Any]):
+        if operation == "batchClear":
+            for value_range in body.get("ranges", []):
+                status, payload = self._values(spreadsheet, "POST", value_range, True, {})
+                if status != 200:
+                    return status, payload
+            return 200, {"clearedRanges": body.get("ranges", [])}
+
+        for data in body.get("data", []):
+            status, payload = self._values(spreadsheet, "PUT", data["range"], False, data)
+            if status != 200:
+                return status, payload
+
+        return 200, {"totalUpdatedSheets": len(body.get("data", []))}
+
+    def _batch_update(self, spreadsheet: FakeSpreadsheet, body: Dict[str, Any]):
+        replies = []
+
+        for request in body.get("requests", []):
+            if "addSheet" in request:
+                properties = request["addSheet"]["properties"]
+                if spreadsheet.find(properties["title"]):
+                    return 400, {"error": {"code": 400, "message": "Sheet already exists"}}
+                sheet = spreadsheet.add_sheet(properties)
+                replies.append({"addSheet": {"properties": dict(sheet["properties"])}})
+
+            elif "deleteSheet" in request:
+                sheet_id = request["deleteSheet"]["sheetId"]
+
+                # Sheets refuses to leave a spreadsheet without a visible tab
+                if not any(
+                    not s["properties"].get("hidden") and s["properties"]["sheetId"] != sheet_id
+                    for s in spreadsheet.sheets
+                ):
+                    return 400, {"error": {"code": 400, "message": "You can't remove all the visible sheets in a document."}}
+
+                spreadsheet.sheets = [
+                    s for s in spreadsheet.sheets if s["properties"]["sheetId"] != sheet_id
+                ]
+                spreadsheet.reindex()
+                replies.append({})
+
+            elif "updateSheetProperties" in request:
+                properties = request["updateSheetProperties"]["properties"]
+                fields = request["updateSheetProperties"]["fields"].split(",")
+                sheet = next(
+                    s for s in spreadsheet.sheets
+                    if s["properties"]["sheetId"] == properties["sheetId"]
+                )
+                for field in fields:
+                    if field == "index":
+                        sheet["properties"]["index"] = properties["index"] - 0.5
+                    elif field.startswith("gridProperties."):
+                        name = field.split(".", 1)[1]
+                        sheet["properties"]["gridProperties"][name] = properties["gridProperties"][name]
+                    else:
+                        sheet["properties"][field] = properties[field]
+                spreadsheet.reindex()
+                replies.append({})
+
+            elif "copyPaste" in request:
+                copy = request["copyPaste"]
+                source = spreadsheet.find_by_id(copy["source"]["sheetId"])
+                destination = spreadsheet.find_by_id(copy["destination"]["sheetId"])
+                start_column = copy["source"].get("startColumnIndex", 0)
+                end_column = copy["source"].get("endColumnIndex")
+
+                for row in range(copy["source"].get("startRowIndex", 0), copy["source"].get("endRowIndex", 0)):
+                    target = row - copy["source"].get("startRowIndex", 0) + copy["destination"].get("startRowIndex", 0)
+                    values = source["values"].get(row + 1, [])[start_column:end_column]
+                    current = destination["values"].get(target + 1, [])
+                    destination["values"][target + 1] = values + current[len(values):]
+                replies.append({})
+
+            elif "updateCells" in request:
+                # Without rows, updateCells clears the values of the range
+                cells = request["updateCells"]["range"]
+                sheet = spreadsheet.find_by_id(cells["sheetId"])
+                end_row = cells.get("endRowIndex", sheet["properties"]["gridProperties"]["rowCount"])
+
+                for row in range(cells.get("startRowIndex", 0) + 1, end_row + 1):
+                    if row not in sheet["values"]:
+                        continue
+                    values = sheet["values"][row]
+                    end_column = cells.get("endColumnIndex", len(values))
+                    values[cells.get("startColumnIndex", 0):end_column] = []
+                    if values:
+                        sheet["values"][row] = values
+                    else:
+                        del sheet["values"][row]
+                replies.append({})
+
+            elif "appendDimension" in request:
+                append = request["appendDimension"]
+                sheet = next(
+                    s for s in spreadsheet.sheets
+                    if s["properties"]["sheetId"] == append["sheetId"]
+                )
+                sheet["properties"]["gridProperties"]["rowCount"] += append["length"]
+                replies.append({})
+
+            else:
+                replies.append({})
+
+        response = {"spreadsheetId": spreadsheet.spreadsheet_id, "replies": replies}
+
+        if body.get("includeSpreadsheetInResponse"):
+            response["updatedSpreadsheet"] = spreadsheet.metadata()
+
+        return 200, response
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _dispatch(self, method: str) -> None:
+                parsed = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+                status, payload = server.handle(method, parsed.path, parse_qs(parsed.query), body)
+                data = json.dumps(payload).encode("utf-8")
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def do_PUT(self):
+                self._dispatch("PUT")
+
+            def log_message(self, format, *args):
+                pass  # Keep test output readable
+
+        return Handler
@@ -0,0 +1,87 @@
+"""
+Deal activity counts integration test.
+
+Validates, offline (fake Bitrix client):
+- Activities are streamed by ID keyset and counted per deal and type
+- An incremental run only reads activities after the saved cursor
+- Counts are joined into the enriched deals as extra columns
+
+Run this test with:
+    $ python -m tests.test_activity_counts
+"""
+
+from src.enrichers.deals import enrich_deals
+from src.loaders.activities import PAGE_SIZE, fetch_activity_counts
+from src.normalizers.deal_export_normalizer import normalize_deal_for_export
+
+
+class FakeBitrixClient:
+    """
+    Serves activities cycling through calls, meetings, e-mails and tasks
+    over 10 deals.
+    """
+
+    def __init__(self, activity_count: int):
+        self.calls = []
+        self.activities = [
+            {"ID": str(index), "OWNER_ID": str(index % 10), "TYPE_ID": str((2, 1, 4, 3)[index // 10 % 4])}
+            for index in range(1, activity_count + 1)
+        ]
+
+    def add(self, count: int) -> None:
+        last_id = len(self.activities)
+        self.activities += [
+            {"ID": str(last_id + index), "OWNER_ID": "1", "TYPE_ID": "2"}
+            for index in range(1, count + 1)
+        ]
+
+    def call(self, method, payload=None):
+        assert method == "crm.activity.list"
+        assert payload["filter"]["OWNER_TYPE_ID"] == 2
+        self.calls.append(payload["filter"][">ID"])
+
+        after_id = payload["filter"][">ID"]
+        page = [item for item in self.activities if int(item["ID"]) > after_id][:PAGE_SIZE]
+        return {"result": page}
+
+
+def run() -> None:
+    print("Starting activity counts test...\n")
+
+    client = FakeBitrixClient(activity_count=400)
+
+    # 1. Full count
+    counts, cursor = fetch_activity_counts(client, since="2025-01-01")
+    assert cursor == 400
+    assert sum(sum(deal.values()) for deal in counts.values()) == 400
+    assert counts["1"] == {"calls": 10, "meetings": 10, "emails": 10, "other": 10}, counts["1"]
+
+    # 2. Incremental: only new activities are read
+    client.calls.clear()
+    client.add(3)
+    counts, cursor = fetch_activity_counts(client, since="2025-01-01", after_id=cursor, counts=counts)
+    assert client.calls == [400], client.calls
+    assert cursor == 403 and counts["1"]["calls"] == 13
+
+    # 3. Join into enriched deals
+    enriched = enrich_deals(
+        deals=[{"ID": "1", "CATEGORY_ID": "0"}, {"ID": "99", "CATEGORY_ID": "0"}],
+        pipeline_map={},
+        stage_map={},
+        company_map={},
+        user_map={},
+        source_status_map={},
+        management_enum_map={},
+        activity_counts=counts,
+    )
+    rows = [normalize_deal_for_export(deal) for deal in enriched]
+
+    assert rows[0]["Ligações"] == 13 and rows[0]["Total de Atividades"] == 43, rows[0]
+    assert rows[1]["Reuniões"] == 0 and rows[1]["Total de Atividades"] == 0
+
+    print(f"Deals with activities: {len(counts)}")
+    print("\nActivity counts test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
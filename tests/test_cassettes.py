@@ -0,0 +1,154 @@
+"""
+Record/replay cassette test.
+
+Validates, against local fake servers (no Bitrix portal or Google account):
+- Bitrix and Google Sheets requests are recorded to a gzip cassette,
+  without the webhook secret
+- A replay serves the same responses offline, with any portal settings
+- Unrecorded requests fail with CassetteMiss
+- Sheets writes replay with other rows (matched by tab and sequence)
+- Simulated latency and rate limits (429s retried by the clients)
+
+Run this test with:
+    $ python -m tests.test_cassettes
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.bitrix_client import BitrixClient
+from src.cassettes import CassetteMiss, use_cassette
+from src.exporters.google_sheets_exporter import export_to_google_sheets
+from src.metrics import REGISTRY
+from tests.fake_sheets_server import FakeSheetsServer
+
+
+class FakeBitrixHandler(BaseHTTPRequestHandler):
+    """
+    crm.deal.list in two pages of 50 deals; user.get with one user.
+    """
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+        if self.path.endswith("crm.deal.list"):
+            start = payload.get("start", 0)
+            data = {"result": [{"ID": str(index)} for index in range(start + 1, start + 51)], "total": 100}
+            if start == 0:
+                data["next"] = 50
+        else:
+            data = {"result": [{"ID": "1", "NAME": "Ana"}]}
+
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def workload(client: BitrixClient, sheets_url: str, credentials_path: str | None):
+    deals = client.call_all("crm.deal.list", {"select": ["ID"]})
+    users = client.call("user.get")["result"]
+
+    export_to_google_sheets(
+        spreadsheet_id="cassette-spreadsheet",
+        sheet_name="Folha1",
+        rows=[{"ID": deal["ID"]} for deal in deals],
+        credentials_path=credentials_path,
+        transport="discovery",  # Forced to "rest" under a cassette
+        api_url=sheets_url,
+    )
+
+    return deals, users
+
+
+def run() -> None:
+    print("Starting cassette test...\n")
+
+    bitrix = ThreadingHTTPServer(("127.0.0.1", 0), FakeBitrixHandler)
+    threading.Thread(target=bitrix.serve_forever, daemon=True).start()
+    sheets = FakeSheetsServer().start()
+    sheets.spreadsheet("cassette-spreadsheet").add_sheet({"title": "Folha1"})
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "export.jsonl.gz")
+
+        # 1. Record against the servers
+        try:
+            client = BitrixClient(base_url=f"http://127.0.0.1:{bitrix.server_port}", user_id="1", webhook="s3cret")
+
+            with use_cassette(path, mode="record") as cassette:
+                recorded = workload(client, sheets.api_url, credentials_path=None)
+
+            recorded_requests = sum(sheets.request_counts.values()) + 3
+        finally:
+            bitrix.shutdown()
+            bitrix.server_close()
+            sheets.stop()
+
+        assert len(recorded[0]) == 100
+        assert len(cassette.interactions) == recorded_requests, (len(cassette.interactions), recorded_requests)
+
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            content = file.read()
+        assert "s3cret" not in content and "bitrix:/crm.deal.list" in content
+
+        # 2. Replay offline, with other portal settings
+        REGISTRY.reset()
+        client = BitrixClient(base_url="https://other.bitrix24.com", user_id="7", webhook="other")
+
+        with use_cassette(path) as cassette:
+            # Replays need no credentials
+            replayed = workload(client, sheets.api_url, credentials_path="missing-credentials.json")
+
+            try:
+                client.call("crm.lead.list")
+                raise AssertionError("Expected a CassetteMiss")
+            except CassetteMiss:
+                pass
+
+        assert replayed == recorded
+        assert cassette.replayed == recorded_requests
+        assert REGISTRY.counter_total("bitrix_requests_total", method="crm.deal.list", status="ok") == 2
+        assert REGISTRY.counter_total("sheets_requests_total", status="ok") == recorded_requests - 3
+
+        # 3. Sheets writes of other rows still replay
+        with use_cassette(path):
+            export_to_google_sheets(
+                spreadsheet_id="cassette-spreadsheet",
+                sheet_name="Folha1",
+                rows=[{"ID": deal["ID"], "Extra": "x"} for deal in reversed(recorded[0][:60])],
+                credentials_path="missing-credentials.json",
+                api_url=sheets.api_url,
+            )
+
+        # 4. Simulated latency
+        with use_cassette(path, latency=0.2):
+            started = time.perf_counter()
+            client.call("user.get")
+            assert time.perf_counter() - started >= 0.2
+
+        # 5. Simulated rate limit: 2 requests/s, bucket of 1, Bitrix calls every 0.4s
+        REGISTRY.reset()
+
+        with use_cassette(path, rate_limit=2, burst=1) as cassette:
+            assert len(client.call_all("crm.deal.list", {"select": ["ID"]})) == 100
+
+        assert cassette.rate_limited >= 1
+        assert REGISTRY.counter_total("bitrix_retries_total") == cassette.rate_limited
+
+    print("\nCassette test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,103 @@
+"""
+Generic CRM entity export integration test.
+
+Validates, offline (fake crm.item.list endpoint):
+- Keyset pagination, field projection and filter push-down for any entity
+- Smart process schemas
+- Incremental runs fetch only modified items and merge them by ID
+
+Run this test with:
+    $ python -m tests.test_crm_items_export
+"""
+
+import os
+import tempfile
+
+from openpyxl import load_workbook
+
+from src.loaders.crm_items import PAGE_SIZE, fetch_items, register_entity_schema, smart_process_schema
+from src.pipelines.entity_export_pipeline import run_entity_export
+
+
+class FakeBitrixClient:
+    """
+    Serves crm.item.list for leads (entityTypeId 1) and a smart process.
+    """
+
+    def __init__(self, count: int):
+        self.calls = []
+        self.items = {
+            entity_type_id: [
+                {
+                    "id": index,
+                    "title": f"Item {index}",
+                    "stageId": "NEW" if index % 2 else "WON",
+                    "createdTime": "2025-03-01T10:00:00+03:00",
+                    "updatedTime": "2025-03-01T10:00:00+03:00",
+                    "ufCrm5_1700000000": ["A", "B"],
+                }
+                for index in range(1, count + 1)
+            ]
+            for entity_type_id in (1, 1032)
+        }
+
+    def call(self, method, payload=None):
+        assert method == "crm.item.list" and payload["start"] == -1
+        self.calls.append(payload)
+
+        item_filter = payload["filter"]
+        matching = [
+            {field: item.get(field) for field in payload["select"]}
+            for item in self.items[payload["entityTypeId"]]
+            if item["id"] > item_filter[">id"]
+            and item["updatedTime"] > item_filter.get(">updatedTime", "")
+            and item["stageId"] in item_filter.get("stageId", [item["stageId"]])
+        ]
+        return {"result": {"items": matching[:PAGE_SIZE]}}
+
+
+def run() -> None:
+    print("Starting CRM items export test...\n")
+
+    client = FakeBitrixClient(count=130)
+
+    # 1. Projection and filter push-down on a smart process
+    contracts = smart_process_schema("contratos", 1032, {"ufCrm5_1700000000": "Plano"})
+    register_entity_schema(contracts)
+
+    won = fetch_items(client, contracts, filters={"stageId": ["WON"]})
+    assert len(won) == 65 and all(item["stageId"] == "WON" for item in won)
+    assert "ufCrm5_1700000000" in won[0] and "createdTime" in won[0]
+    assert len(client.calls) == 2, len(client.calls)
+
+    with tempfile.TemporaryDirectory() as directory:
+        state_path = os.path.join(directory, "entity_state.json")
+
+        # 2. Full export
+        client.calls.clear()
+        count = run_entity_export("lead", target="xlsx", output_dir=directory, state_path=state_path, client=client)
+        assert count == 130 and len(client.calls) == 3
+
+        # 3. Incremental export: only the modified lead is fetched
+        client.calls.clear()
+        client.items[1][9]["title"] = "Renomeado"
+        client.items[1][9]["updatedTime"] = "2999-01-01T00:00:00+03:00"
+
+        count = run_entity_export(
+            "lead", target="xlsx", output_dir=directory, state_path=state_path, client=client, incremental=True,
+        )
+        assert count == 130 and len(client.calls) == 1
+
+        sheet = load_workbook(os.path.join(directory, "lead.xlsx")).active
+        assert sheet.cell(row=11, column=2).value == "Renomeado"
+
+        # Smart process export with a multiple field flattened to text
+        run_entity_export("contratos", target="xlsx", output_dir=directory, state_path=state_path, client=client)
+        sheet = load_workbook(os.path.join(directory, "contratos.xlsx")).active
+        assert sheet.cell(row=2, column=8).value == "A, B"
+
+    print("\nCRM items export test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,218 @@
+"""
+Sync daemon test.
+
+Validates, offline (fake Bitrix client, local store sink):
+- The first sync loads every deal; later syncs fetch only modified deals
+- Only changed deals are re-enriched, and companies are fetched once
+- Nothing is exported when no deal changed
+- Syncs never overlap
+- The /health, /status, /metrics and /sync endpoints
+- POST /sync requires the sync token when one is set
+
+Run this test with:
+    $ python -m tests.test_daemon
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer
+
+from src.daemon import SyncScheduler, make_handler
+from src.exporters.sinks import LocalStoreSink
+from src.pipelines.live_sync import LiveDealSync
+
+
+class FakeBitrixClient:
+    """
+    Serves the deal list (with >DATE_MODIFY and ID filters), companies and
+    the static lookups.
+    """
+
+    def __init__(self, count: int):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self.deals = {
+            str(index): {
+                "ID": str(index),
+                "TITLE": f"Deal {index}",
+                "CATEGORY_ID": "1",
+                "STAGE_ID": "C1:NEW",
+                "COMPANY_ID": str(100 + index % 3),
+                "ASSIGNED_BY_ID": "1",
+                "OPPORTUNITY": "10.00",
+                "DATE_CREATE": "2025-03-01T10:00:00+03:00",
+                "DATE_MODIFY": "2025-03-01T10:00:00+03:00",
+            }
+            for index in range(1, count + 1)
+        }
+
+    def modify(self, deal_id: str, **fields) -> None:
+        self.deals[deal_id] = {**self.deals[deal_id], **fields}
+
+    def add(self, deal_id: str, **fields) -> None:
+        self.deals[deal_id] = {**self.deals["1"], "ID": deal_id, **fields}
+
+    def call(self, method, payload=None):
+        self.calls.append(method)
+
+        if method == "crm.dealcategory.stage.list":
+            return {"result": [{"STATUS_ID": "C1:NEW", "NAME": "Novo"}]}
+        if method == "crm.status.list":
+            return {"result": [{"STATUS_ID": "WEB", "NAME": "Site"}]}
+        if method == "crm.deal.userfield.get":
+            return {"result": {"LIST": [{"ID": "1", "VALUE": "Inside Sales"}]}}
+
+        raise AssertionError(f"Unexpected call: {method}")
+
+    def call_all(self, method, payload=None, progress_callback=None):
+        self.calls.append(method)
+
+        if method == "crm.dealcategory.list":
+            return [{"ID": "1", "NAME": "Vendas"}]
+        if method == "user.get":
+            return [{"ID": "1", "NAME": "Ana", "LAST_NAME": "Lima"}]
+        if method == "crm.company.list":
+            return [{"ID": str(company_id), "TITLE": f"Company {company_id}"} for company_id in payload["filter"]["ID"]]
+        if method == "crm.deal.list":
+            self.release.wait(5)
+            modified_after = payload["filter"].get(">DATE_MODIFY", "")
+            deal_ids = payload["filter"].get("ID")
+            return [
+                dict(deal)
+                for deal in self.deals.values()
+                if deal["DATE_MODIFY"] > modified_after and (deal_ids is None or deal["ID"] in deal_ids)
+            ]
+
+        raise AssertionError(f"Unexpected call: {method}")
+
+
+def read_store(path: str):
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def get(url: str):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, response.read().decode("utf-8")
+    except urllib.error.HTTPError as error:
+        return error.code, error.read().decode("utf-8")
+
+
+def post(url: str, token: str | None = None):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, method="POST", headers=headers), timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as error:
+        return error.code
+
+
+def run() -> None:
+    print("Starting sync daemon test...\n")
+
+    client = FakeBitrixClient(count=30)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store_path = os.path.join(directory, "deals.jsonl.gz")
+        live_sync = LiveDealSync(client=client, start_date="2025-01-01", sinks=[LocalStoreSink(store_path)])
+
+        # 1. First sync is full
+        now = datetime(2025, 3, 2, 12, 0, tzinfo=timezone.utc)
+        result = live_sync.sync(now=now)
+        assert result == {"mode": "full", "changed": 30, "deals": 30, "exported": True}, result
+        assert len(read_store(store_path)) == 30
+        assert client.calls.count("crm.company.list") == 1
+
+        # 2. Nothing modified: no export, lookups and companies stay warm
+        os.remove(store_path)
+        client.calls.clear()
+        result = live_sync.sync(now=now + timedelta(minutes=5))
+        assert result == {"mode": "incremental", "changed": 0, "deals": 30, "exported": False}, result
+        assert not os.path.exists(store_path)
+        assert client.calls == ["crm.deal.list"], client.calls
+        assert live_sync.last_sync == (now + timedelta(minutes=5) - timedelta(minutes=5)).isoformat()
+
+        # 3. One deal modified (and re-seen within the overlap): only it changes
+        client.modify("7", TITLE="Deal 7 renamed", DATE_MODIFY="2025-03-02T12:07:00+00:00")
+        client.calls.clear()
+        result = live_sync.sync(now=now + timedelta(minutes=10))
+        assert result["changed"] == 1 and result["exported"], result
+        assert "crm.company.list" not in client.calls
+
+        rows = read_store(store_path)
+        assert len(rows) == 30
+        assert [row for row in rows if row["Nome do Negócio"] == "Deal 7 renamed"]
+
+        result = live_sync.sync(now=now + timedelta(minutes=11))
+        assert result["changed"] == 0, result
+
+        # 4. New company referenced: fetched once
+        client.modify("8", COMPANY_ID="555", DATE_MODIFY="2025-03-02T12:20:00+00:00")
+        client.calls.clear()
+        live_sync.sync(now=now + timedelta(minutes=20))
+        assert client.calls.count("crm.company.list") == 1
+        assert live_sync.company_map[555] == "Company 555"
+
+        # 5. Full sync again once the interval elapsed
+        result = live_sync.sync(now=now + timedelta(hours=25))
+        assert result["mode"] == "full", result
+
+        # 6. Syncs never overlap
+        scheduler = SyncScheduler(live_sync, interval=3600)
+        live_sync.last_full_sync = datetime.now(timezone.utc)
+        client.release.clear()
+
+        worker = threading.Thread(target=scheduler.run_once)
+        worker.start()
+
+        while not scheduler.running:
+            pass
+
+        assert scheduler.run_once() is None
+
+        # 7. Endpoints
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(scheduler, sync_token="sync-secret"))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        try:
+            assert post(f"{base_url}/sync") == 403
+            assert post(f"{base_url}/sync", token="wrong") == 403
+            assert post(f"{base_url}/sync", token="sync-secret") == 409
+
+            client.release.set()
+            worker.join(5)
+
+            status, body = get(f"{base_url}/status")
+            status_data = json.loads(body)
+            assert status == 200 and status_data["cycles"] == 1 and status_data["deals"] == 30, status_data
+            assert status_data["last_result"]["mode"] == "incremental" and not status_data["running"]
+
+            assert get(f"{base_url}/health") == (200, '{"healthy": true}')
+            assert get(f"{base_url}/metrics")[0] == 200
+            assert get(f"{base_url}/missing")[0] == 404
+
+            # Stale syncs make the daemon unhealthy
+            scheduler.last_success_at -= timedelta(hours=4)
+            assert get(f"{base_url}/health")[0] == 503
+
+            assert post(f"{base_url}/sync", token="sync-secret") == 202
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    print("\nSync daemon test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,94 @@
+"""
+Deal aggregates integration test.
+
+Validates, offline (local fake Sheets server):
+- Counts and revenue grouped by several dimension sets in one pass
+- Derived month dimension and unparseable revenue handling
+- Summary tabs are created, then refreshed in place when they shrink
+
+Run this test with:
+    $ python -m tests.test_deal_aggregates
+"""
+
+from src.aggregators.deals import aggregate_deals
+from src.exporters.summary_sheets_exporter import export_summaries_to_google_sheets
+from tests.fake_sheets_server import FakeSheetsServer
+
+
+SPREADSHEET_ID = "fake-spreadsheet"
+
+SUMMARIES = {
+    "Resumo Pipeline x Fase": ["Pipeline", "Fase"],
+    "Resumo Mensal": ["Mês", "Pipeline"],
+}
+
+
+def generate_deals(count: int):
+    for index in range(count):
+        yield {
+            "Pipeline": "Vendas" if index % 2 else "Pré vendas",
+            "Fase": "Ganho" if index % 3 == 0 else "Em andamento",
+            "Renda": "100.50" if index % 5 else "",
+            "Criado em": "15/03/2025" if index < count // 2 else "02/04/2025",
+        }
+
+
+def run() -> None:
+    print("Starting deal aggregates test...\n")
+
+    # 1. Aggregation
+    tables = aggregate_deals(generate_deals(1000), SUMMARIES)
+
+    headers, values = tables["Resumo Pipeline x Fase"]
+    assert headers == ["Pipeline", "Fase", "Negócios", "Renda Total"], headers
+    assert sum(row[2] for row in values) == 1000
+    assert round(sum(row[3] for row in values), 2) == 800 * 100.50
+
+    headers, values = tables["Resumo Mensal"]
+    assert [row[:2] for row in values] == [
+        ["2025-03", "Pré vendas"],
+        ["2025-03", "Vendas"],
+        ["2025-04", "Pré vendas"],
+        ["2025-04", "Vendas"],
+    ], values
+    assert all(row[2] == 250 for row in values)
+
+    print(f"Aggregated: {', '.join(f'{name} ({len(rows)} rows)' for name, (_, rows) in tables.items())}")
+
+    # 2. Summary tabs
+    server = FakeSheetsServer().start()
+
+    try:
+        export_summaries_to_google_sheets(
+            spreadsheet_id=SPREADSHEET_ID,
+            tables=tables,
+            credentials_path=None,
+            transport="rest",
+            api_url=server.api_url,
+        )
+
+        spreadsheet = server.spreadsheets[SPREADSHEET_ID]
+        assert len(spreadsheet.rows("Resumo Mensal")) == 5
+        sheet_id = spreadsheet.find("Resumo Mensal")["properties"]["sheetId"]
+
+        # Smaller dataset: tabs are kept (same sheetId) and stale rows cleared
+        export_summaries_to_google_sheets(
+            spreadsheet_id=SPREADSHEET_ID,
+            tables=aggregate_deals(generate_deals(2), SUMMARIES),
+            credentials_path=None,
+            transport="rest",
+            api_url=server.api_url,
+        )
+
+        assert spreadsheet.find("Resumo Mensal")["properties"]["sheetId"] == sheet_id
+        assert len(spreadsheet.rows("Resumo Mensal")) == 3, spreadsheet.rows("Resumo Mensal")
+
+        print(f"Requests: {dict(server.request_counts)}")
+    finally:
+        server.stop()
+
+    print("\nDeal aggregates test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
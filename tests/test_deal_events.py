@@ -0,0 +1,157 @@
+"""
+Event-driven deal refresh test.
+
+Validates, offline (event replayer standing in for the portal, fake
+Bitrix client, local fake Google Sheets server):
+- Repeated events of a deal are deduplicated and debounced
+- Deals that keep changing are still refreshed after the maximum delay
+- Events with a wrong application token or without a deal ID are rejected
+- Only the queued deals are refetched, with an ID filter
+- Changed and appended deals are sent to Sheets as row-level updates;
+  a deleted deal triggers a full refresh
+- Delete events are checked against Bitrix before removing a deal
+
+Run this test with:
+    $ python -m tests.test_deal_events
+"""
+
+import json
+import threading
+
+from http.server import ThreadingHTTPServer
+
+from src.daemon import SyncScheduler, make_handler
+from src.exporters.sinks import GoogleSheetsSink
+from src.pipelines.live_sync import LiveDealSync
+from src.webhooks import DealEventProcessor, DealEventQueue
+from tests.bitrix_event_replayer import BitrixEventReplayer
+from tests.fake_sheets_server import FakeSheetsServer
+from tests.test_daemon import FakeBitrixClient, get
+
+
+SPREADSHEET_ID = "events-test"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run() -> None:
+    print("Starting deal events test...\n")
+
+    # 1. Deduplication and debouncing
+    clock = FakeClock()
+    queue = DealEventQueue(debounce_seconds=10, max_delay_seconds=60, clock=clock)
+
+    assert queue.add("ONCRMDEALUPDATE", "5")
+    clock.now += 4
+    assert not queue.add("ONCRMDEALUPDATE", "5")
+    queue.add("ONCRMDEALDELETE", "6")
+
+    clock.now += 9
+    assert queue.drain() == ([], []), "still debouncing"
+
+    clock.now += 1
+    assert queue.drain() == (["5"], ["6"])
+    assert len(queue) == 0 and queue.received == 3 and queue.deduplicated == 1
+
+    # 2. A deal updated continuously is released after the maximum delay
+    for _ in range(13):
+        queue.add("ONCRMDEALUPDATE", "9")
+        clock.now += 5
+
+    assert queue.drain() == (["9"], [])
+
+    # 3. End to end: replayed events refresh only those deals
+    client = FakeBitrixClient(count=30)
+    server = FakeSheetsServer().start()
+    server.spreadsheet(SPREADSHEET_ID).add_sheet({"title": "Folha1"})
+
+    live_sync = LiveDealSync(
+        client=client,
+        start_date="2025-01-01",
+        sinks=[GoogleSheetsSink(SPREADSHEET_ID, "Folha1", credentials_path=None, transport="rest", api_url=server.api_url)],
+    )
+    events = DealEventProcessor(live_sync, DealEventQueue(debounce_seconds=60), application_token="secret")
+    scheduler = SyncScheduler(live_sync, interval=3600)
+
+    receiver = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(scheduler, events))
+    threading.Thread(target=receiver.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{receiver.server_address[1]}"
+
+    try:
+        # Events before the first full sync stay queued
+        replayer = BitrixEventReplayer(f"{base_url}/bitrix/events", application_token="secret")
+        assert replayer.send("ONCRMDEALUPDATE", 3) == 200
+        assert events.flush(force=True) is None and len(events.queue) == 1
+
+        scheduler.run_once()
+        tab = server.spreadsheets[SPREADSHEET_ID]
+        assert len(tab.rows("Folha1")) == 31
+
+        client.modify("7", TITLE="Deal 7 renamed")
+        client.add("31", TITLE="Deal 31")
+
+        statuses = replayer.replay([
+            {"event": "ONCRMDEALUPDATE", "deal_id": 7},
+            {"event": "ONCRMDEALUPDATE", "deal_id": 7},
+            {"event": "ONCRMDEALADD", "deal_id": 31},
+            {"event": "ONCRMDEALUPDATE", "deal_id": 7, "application_token": "wrong"},
+            {"event": "ONCRMDEALUPDATE", "deal_id": "abc"},
+            {"event": "ONCRMLEADADD", "deal_id": 1},
+        ])
+        assert statuses == [200, 200, 200, 403, 400, 400], statuses
+        assert json.loads(replayer.responses[2][1]) == {"queued": False}
+
+        # Debouncing: nothing is ready yet
+        assert events.flush() is None
+
+        client.calls.clear()
+        server.request_counts.clear()
+
+        # Deals 3 (queued before the first sync, unchanged), 7 and 31
+        result = events.flush(force=True)
+        assert result == {"requested": 3, "changed": 2, "published": "rows"}, result
+        assert client.calls == ["crm.deal.list"], client.calls
+
+        # One values.batchUpdate (plus the grid check for the appended row), no clear
+        assert server.request_counts["values.batchUpdate"] == 1, server.request_counts
+        assert server.request_counts["values.clear"] == 0 and server.request_counts["values.put"] == 0
+
+        values = tab.rows("Folha1")
+        assert len(values) == 32, len(values)
+        name_column = values[0].index("Nome do Negócio")
+        assert values[7][name_column] == "Deal 7 renamed"
+        assert values[31][name_column] == "Deal 31"
+
+        # 4. A forged delete event of an existing deal removes nothing
+        assert replayer.send("ONCRMDEALDELETE", 5) == 200
+
+        result = events.flush(force=True)
+        assert result == {"requested": 1, "changed": 0, "published": None}, result
+        assert len(tab.rows("Folha1")) == 32
+
+        # 5. A deleted deal shifts the rows: full refresh
+        del client.deals["4"]
+        assert replayer.send("ONCRMDEALDELETE", 4) == 200
+
+        result = events.flush(force=True)
+        assert result == {"requested": 1, "changed": 1, "published": "full"}, result
+        assert len(tab.rows("Folha1")) == 31
+
+        status = json.loads(get(f"{base_url}/status")[1])
+        assert status["events"]["received"] == 6 and status["events"]["refreshes"] == 3, status["events"]
+    finally:
+        receiver.shutdown()
+        receiver.server_close()
+        server.stop()
+
+    print("\nDeal events test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
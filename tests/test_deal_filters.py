@@ -0,0 +1,112 @@
+"""
+Deal filter push-down test.
+
+Validates, offline (fake Bitrix client):
+- Typed filters compile into Bitrix filter syntax
+- Long IN-lists are split into disjoint sub-queries
+- Sub-query results are merged in order, with combined progress
+- start_date and a filter's DATE_CREATE lower bound combine to the later one
+
+Run this test with:
+    $ python -m tests.test_deal_filters
+"""
+
+import threading
+
+from src.loaders.deals import FILTER_IN_LIST_LIMIT, DealFilter, fetch_deals, split_filter
+
+
+class FakeBitrixClient:
+    """
+    Records crm.deal.list filters and returns one deal per ASSIGNED_BY_ID.
+    """
+
+    def __init__(self):
+        self.filters = []
+        self.lock = threading.Lock()
+
+    def call_all(self, method, payload=None, progress_callback=None):
+        with self.lock:
+            self.filters.append(payload.get("filter"))
+
+        deals = [{"ID": str(user_id)} for user_id in payload["filter"]["ASSIGNED_BY_ID"]]
+
+        if progress_callback:
+            progress_callback(len(deals))
+
+        return deals
+
+
+def run() -> None:
+    print("Starting deal filter test...\n")
+
+    # 1. Compilation
+    compiled = DealFilter(
+        category_ids=[8, 1, 8],
+        stage_semantic_ids=["S"],
+        date_ranges={"CLOSEDATE": ("2025-03-01", "2025-04-01"), "DATE_MODIFY": (None, "2025-05-01")},
+        custom_fields={"UF_CRM_1750951091402": ["261", "263"]},
+    ).to_bitrix()
+
+    assert compiled == {
+        "CATEGORY_ID": [8, 1],
+        "STAGE_SEMANTIC_ID": ["S"],
+        ">=CLOSEDATE": "2025-03-01",
+        "<CLOSEDATE": "2025-04-01",
+        "<DATE_MODIFY": "2025-05-01",
+        "UF_CRM_1750951091402": ["261", "263"],
+    }, compiled
+
+    for invalid in ({"stage_semantic_ids": ["WON"]}, {"custom_fields": {"TITLE": "x"}}):
+        try:
+            DealFilter(**invalid)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"Invalid filter accepted: {invalid}")
+
+    # 2. Splitting
+    parts = split_filter({"ASSIGNED_BY_ID": list(range(450)), "CATEGORY_ID": [1]}, limit=200)
+    assert [len(part["ASSIGNED_BY_ID"]) for part in parts] == [200, 200, 50]
+    assert all(part["CATEGORY_ID"] == [1] for part in parts)
+
+    # 3. Parallel sub-queries
+    user_count = 2 * FILTER_IN_LIST_LIMIT + 7
+    client = FakeBitrixClient()
+    progress = []
+
+    deals = fetch_deals(
+        client=client,
+        start_date="2025-01-01",
+        progress_callback=progress.append,
+        deal_filter=DealFilter(assigned_by_ids=range(user_count)),
+    )
+
+    assert len(client.filters) == 3, len(client.filters)
+    assert all(f[">=DATE_CREATE"] == "2025-01-01" for f in client.filters)
+    assert [deal["ID"] for deal in deals] == [str(user_id) for user_id in range(user_count)]
+    assert max(progress) == user_count
+
+    print(f"Sub-queries: {len(client.filters)}, deals: {len(deals)}")
+
+    # 4. start_date does not widen a later DATE_CREATE bound of the filter
+    for created_from, expected in [("2025-03-01", "2025-03-01"), ("2024-06-01", "2025-01-01")]:
+        client = FakeBitrixClient()
+        fetch_deals(
+            client=client,
+            start_date="2025-01-01",
+            deal_filter=DealFilter(assigned_by_ids=[1], date_ranges={"DATE_CREATE": (created_from, None)}),
+        )
+        assert client.filters[0][">=DATE_CREATE"] == expected, client.filters
+
+    try:
+        fetch_deals(client=client, start_date="2025-01-01", filters={">=DATE_CREATE": "01.03.2025"})
+        raise AssertionError("Expected a ValueError")
+    except ValueError:
+        pass
+
+    print("\nDeal filter test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
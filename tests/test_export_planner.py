@@ -0,0 +1,87 @@
+"""
+API cost planner test.
+
+Validates, against local fake servers (synthetic Bitrix portal, fake
+Google Sheets API):
+- The dry run only makes count queries (one first page per listing) and
+  writes nothing
+- Its counts match the portal, and its Bitrix and Sheets call estimates
+  match an actual export
+- Estimated durations respect the Bitrix rate limit
+
+Run this test with:
+    $ python -m tests.test_export_planner
+"""
+
+import os
+
+from src.bitrix_client import BitrixClient
+from src.ledger import api_call_counts
+from src.metrics import REGISTRY
+from src.pipelines.deal_export_pipeline import run_export
+from src.planner import BITRIX_BURST, BITRIX_REQUESTS_PER_SECOND, format_plan, plan_export
+from tests.fake_bitrix_server import FakeBitrixServer
+from tests.fake_sheets_server import FakeSheetsServer
+
+
+SPREADSHEET_ID = "planner-test"
+
+
+def run() -> None:
+    print("Starting API cost planner test...\n")
+
+    os.environ["GOOGLE_SHEET_ID"] = SPREADSHEET_ID
+
+    bitrix = FakeBitrixServer(deals=3000).start()
+    sheets = FakeSheetsServer().start()
+    sheets.spreadsheet(SPREADSHEET_ID).add_sheet({"title": "Folha1"})
+
+    try:
+        client = BitrixClient(base_url=bitrix.url, user_id="1", webhook="planner", throttle_seconds=0)
+
+        # 1. Dry run: count queries only, nothing written
+        plan = plan_export(client, start_date="2025-01-01", product_rows=True)
+        print(format_plan(plan))
+
+        assert plan.probe_calls == 4 and sum(bitrix.request_counts.values()) == 4, bitrix.request_counts
+        assert sum(sheets.request_counts.values()) == 0, sheets.request_counts
+
+        deals = len(bitrix.matching_deal_ids({">=DATE_CREATE": "2025-01-01"}))
+        assert plan.counts["deals"] == deals and plan.counts["users"] == 50 and plan.counts["pipelines"] == 3, plan.counts
+        assert plan.counts["companies"] <= plan.counts["portal_companies"] == 300
+
+        stages = {stage.name: stage for stage in plan.stages}
+        assert stages["product_rows"].calls == -(-deals // 50)
+
+        # 2. The estimates match an actual export
+        run_export(
+            start_date="2025-01-01",
+            sheets_transport="rest",
+            ledger_path=None,
+            client=client,
+            sheets_api_url=sheets.api_url,
+        )
+        calls = api_call_counts(REGISTRY)
+
+        expected_bitrix = plan.calls("bitrix") - stages["product_rows"].calls
+        assert sum(calls["bitrix"].values()) == expected_bitrix, (calls["bitrix"], expected_bitrix)
+        assert sum(calls["sheets"].values()) == plan.calls("sheets"), (calls["sheets"], plan.calls("sheets"))
+        assert len(sheets.spreadsheets[SPREADSHEET_ID].rows("Folha1")) == deals + 1
+
+        # 3. With the real throttle, durations respect the leaky bucket
+        plan = plan_export(
+            BitrixClient(base_url=bitrix.url, user_id="1", webhook="planner"),
+            start_date="2024-01-01",
+            product_rows=True,
+        )
+        bitrix_calls = plan.calls("bitrix")
+        assert plan.seconds >= (bitrix_calls - BITRIX_BURST) / BITRIX_REQUESTS_PER_SECOND, plan.as_dict()
+    finally:
+        bitrix.stop()
+        sheets.stop()
+
+    print("\nAPI cost planner test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
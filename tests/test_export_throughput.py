@@ -0,0 +1,211 @@
+"""
+Export throughput benchmark.
+
+Validates, against local fake servers (synthetic Bitrix portal, fake
+Google Sheets API), at several scales:
+- run_export loads, enriches and writes every deal to Sheets
+- Bitrix and Sheets API calls match the baseline exactly (they are
+  deterministic for a given scale)
+- Prints the wall time, deals per second, API calls and peak memory of
+  each scale, next to the baseline (tests/baselines/export_throughput.json)
+
+Each scale runs in a fresh interpreter, so its peak memory is its own; the
+fake servers run in this process. Timings depend on the machine: slower
+runs are reported, not failed.
+
+Run this test with:
+    $ python -m tests.test_export_throughput
+    $ python -m tests.test_export_throughput --scales 1000 10000 100000
+    $ python -m tests.test_export_throughput --bitrix-rate 2  # Bitrix limits
+    $ python -m tests.test_export_throughput --update-baseline
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from typing import Any, Dict, List
+
+from tests.fake_bitrix_server import FakeBitrixServer
+from tests.fake_sheets_server import FakeSheetsServer
+
+
+DEFAULT_SCALES = [1_000, 10_000]
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "export_throughput.json")
+
+SPREADSHEET_ID = "throughput-benchmark"
+
+# Reported when slower / heavier than baseline * ratio
+THROUGHPUT_RATIO = 0.7
+MEMORY_RATIO = 1.3
+
+
+def worker(bitrix_url: str, sheets_url: str) -> None:
+    """
+    Runs one export (in a child interpreter) and prints its measurements
+    as the last line of output.
+    """
+
+    os.environ["GOOGLE_SHEET_ID"] = SPREADSHEET_ID
+
+    from src.bitrix_client import BitrixClient
+    from src.ledger import api_call_counts, peak_rss_bytes
+    from src.metrics import REGISTRY
+    from src.pipelines.deal_export_pipeline import run_export
+
+    started = time.perf_counter()
+
+    stage_rows = run_export(
+        start_date="2024-01-01",
+        sheets_transport="rest",
+        ledger_path=None,
+        client=BitrixClient(base_url=bitrix_url, user_id="1", webhook="benchmark", throttle_seconds=0),
+        sheets_api_url=sheets_url,
+    )
+
+    calls = api_call_counts(REGISTRY)
+
+    print(json.dumps({
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "bitrix_calls": sum(calls["bitrix"].values()),
+        "sheets_calls": sum(calls["sheets"].values()),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "stages": {row["stage"]: row["wall_seconds"] for row in stage_rows},
+    }))
+
+
+def measure(deals: int, bitrix_rate: float | None) -> Dict[str, Any]:
+    bitrix = FakeBitrixServer(deals=deals, rate_limit=bitrix_rate).start()
+    sheets = FakeSheetsServer().start()
+    sheets.spreadsheet(SPREADSHEET_ID).add_sheet({"title": "Folha1"})
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-m", "tests.test_export_throughput", "--worker", bitrix.url, sheets.api_url],
+            cwd=root,
+            capture_output=True,
+            text=True,
+        )
+
+        if completed.returncode != 0:
+            raise RuntimeError(f"Export of {deals} deals failed:\n{completed.stdout[-2000:]}\n{completed.stderr[-2000:]}")
+
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+
+        written = sheets.spreadsheets[SPREADSHEET_ID].rows("Folha1")
+        assert len(written) == deals + 1, f"{len(written) - 1} rows written for {deals} deals"
+        assert bitrix.rate_limited == 0 or bitrix_rate, "429s without a rate limit"
+
+        result["deals"] = deals
+        result["deals_per_second"] = round(deals / result["wall_seconds"], 1)
+        result["rate_limited"] = bitrix.rate_limited
+
+        return result
+    finally:
+        bitrix.stop()
+        sheets.stop()
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_baseline(path: str, results: List[Dict[str, Any]]) -> None:
+    baseline = load_baseline(path)
+
+    for result in results:
+        baseline[str(result["deals"])] = {
+            "deals_per_second": result["deals_per_second"],
+            "wall_seconds": result["wall_seconds"],
+            "bitrix_calls": result["bitrix_calls"],
+            "sheets_calls": result["sheets_calls"],
+            "peak_rss_bytes": result["peak_rss_bytes"],
+        }
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(dict(sorted(baseline.items(), key=lambda item: int(item[0]))), file, indent=2)
+        file.write("\n")
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any] | None) -> List[str]:
+    """
+    Differences from the baseline of the same scale worth reporting.
+    """
+
+    if not baseline:
+        return ["no baseline"]
+
+    notes = []
+
+    if result["deals_per_second"] < baseline["deals_per_second"] * THROUGHPUT_RATIO:
+        notes.append(f"slower: {result['deals_per_second']} vs {baseline['deals_per_second']} deals/s")
+
+    if result["peak_rss_bytes"] and baseline.get("peak_rss_bytes"):
+        if result["peak_rss_bytes"] > baseline["peak_rss_bytes"] * MEMORY_RATIO:
+            notes.append(
+                f"more memory: {result['peak_rss_bytes'] / 1e6:.0f} MB "
+                f"vs {baseline['peak_rss_bytes'] / 1e6:.0f} MB"
+            )
+
+    return notes
+
+
+def run(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Export throughput benchmark")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="Numbers of deals")
+    parser.add_argument("--bitrix-rate", type=float, default=None, help="Fake Bitrix limit in requests/s")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    args = parser.parse_args(argv)
+
+    print("Starting export throughput benchmark...\n")
+
+    baseline = load_baseline(args.baseline)
+    results = []
+
+    for deals in args.scales:
+        result = measure(deals, args.bitrix_rate)
+        results.append(result)
+
+        expected = baseline.get(str(deals))
+
+        # API calls are deterministic, unlike timings (rate limits add retries)
+        if expected and not args.update_baseline and not args.bitrix_rate:
+            for key in ("bitrix_calls", "sheets_calls"):
+                assert result[key] == expected[key], f"{deals} deals: {key} {result[key]} != baseline {expected[key]}"
+
+        peak = f"{result['peak_rss_bytes'] / 1e6:.0f} MB" if result["peak_rss_bytes"] else "n/a"
+        print(
+            f"{deals:>9} deals: {result['wall_seconds']:>7.2f} s, {result['deals_per_second']:>8.0f} deals/s, "
+            f"Bitrix {result['bitrix_calls']} calls ({result['rate_limited']} rate limited), "
+            f"Sheets {result['sheets_calls']} calls, peak {peak}"
+        )
+        print("           stages: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in result["stages"].items()))
+
+        for note in compare(result, expected):
+            print(f"           {note}")
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline updated: {args.baseline}")
+
+    print("\nExport throughput benchmark completed successfully.")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--worker"]:
+        worker(*sys.argv[2:4])
+    else:
+        run(sys.argv[1:])
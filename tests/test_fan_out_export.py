@@ -0,0 +1,91 @@
+"""
+Fan-out export integration test.
+
+Validates:
+- A single pass over the rows feeds several sinks concurrently
+- Every sink receives the full row stream
+- A failing sink does not block the others and is reported at the end
+- A failing producer never replaces a previous XLSX export
+
+Run this test with:
+    $ python -m tests.test_fan_out_export
+"""
+
+import os
+import tempfile
+
+from openpyxl import load_workbook
+
+from src.exporters.sinks import CsvSink, LocalStoreSink, Sink, XlsxSink
+from src.pipelines.fan_out import fan_out
+
+
+class FailingSink(Sink):
+    name = "failing"
+
+    def consume(self, rows):
+        next(rows)
+        raise ValueError("Simulated sink failure")
+
+
+def generate_deals(count: int):
+    for index in range(count):
+        yield {
+            "Nome do Negócio": f"Negócio {index}",
+            "Renda": "1500.00",
+            "Criado em": "15/03/2025" if index % 2 else "15/04/2025",
+        }
+
+
+def failing_deals(count: int):
+    yield from generate_deals(count)
+    raise ValueError("Simulated producer failure")
+
+
+def run() -> None:
+    print("Starting fan-out export test...\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = fan_out(
+            generate_deals(2000),
+            [
+                XlsxSink(os.path.join(directory, "deals.xlsx")),
+                CsvSink(os.path.join(directory, "csv")),
+                LocalStoreSink(os.path.join(directory, "deals.jsonl.gz")),
+            ],
+        )
+
+        if results["xlsx"] != 2000 or results["local_store"] != 2000:
+            raise RuntimeError(f"Unexpected sink results: {results}")
+
+        if results["csv"] != {"2025-03": 1000, "2025-04": 1000}:
+            raise RuntimeError(f"Unexpected CSV partitions: {results['csv']}")
+
+        try:
+            fan_out(
+                generate_deals(2000),
+                [FailingSink(), CsvSink(os.path.join(directory, "csv_with_failure"))],
+            )
+        except RuntimeError as exc:
+            print(f"\nFailure reported as expected: {exc}")
+        else:
+            raise RuntimeError("Failing sink was not reported")
+
+        # The producer fails mid-stream: the previous workbook stays
+        try:
+            fan_out(failing_deals(1200), [XlsxSink(os.path.join(directory, "deals.xlsx"))])
+            raise RuntimeError("Producer failure was not raised")
+        except ValueError as exc:
+            print(f"Producer failure raised as expected: {exc}")
+
+        if load_workbook(os.path.join(directory, "deals.xlsx"))["Deals"].max_row != 2001:
+            raise RuntimeError("Partial XLSX export replaced the previous file")
+
+        if os.path.exists(os.path.join(directory, "deals.xlsx.tmp")):
+            raise RuntimeError("Partial XLSX export was left behind")
+
+    print("\nFan-out export test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,140 @@
+"""
+Partitioned file dataset export integration test.
+
+Validates:
+- Gzip CSV export partitioned by month
+- Parquet export partitioned by month (when pyarrow is installed)
+- Typed columns (revenue as number, dates as dates)
+- Months absent from a new export are removed
+- A failed export leaves no partial files and keeps the published ones
+
+Run this test with:
+    $ python -m tests.test_file_dataset_export
+"""
+
+import csv
+import gzip
+import os
+import tempfile
+
+from datetime import date
+
+from src.exporters.csv_exporter import export_rows_to_csv_partitions
+from src.exporters.parquet_exporter import export_rows_to_parquet_partitions
+
+
+def generate_deals(dates=("10/01/2025", "20/01/2025", "05/02/2025")):
+    for created_at in dates:
+        yield {
+            "Pipeline": "Inside Sales",
+            "Renda": "1500.00",
+            "Criado em": created_at,
+        }
+
+
+def failing_deals():
+    """
+    Deals of a new month followed by a loader error, mid-export.
+    """
+
+    yield from generate_deals(["10/01/2025", "15/03/2025"])
+    raise RuntimeError("Bitrix listing failed")
+
+
+def check_failed_export(export, output_dir: str, file_name: str) -> None:
+    """
+    A failed export must leave no *.tmp file nor new partition, and keep
+    the files published by the previous export.
+    """
+
+    published = sorted(os.listdir(output_dir))
+
+    try:
+        export(rows=failing_deals(), output_dir=output_dir)
+        raise AssertionError("Expected the export to fail")
+    except RuntimeError as exc:
+        assert str(exc) == "Bitrix listing failed", exc
+
+    assert sorted(os.listdir(output_dir)) == published, os.listdir(output_dir)
+
+    for partition in published:
+        assert os.listdir(os.path.join(output_dir, partition)) == [file_name], partition
+
+
+def export_datasets(output_dir: str) -> None:
+    """
+    Exports the CSV and Parquet datasets under output_dir and checks them.
+    """
+
+    csv_counts = export_rows_to_csv_partitions(
+        rows=generate_deals(),
+        output_dir=os.path.join(output_dir, "csv"),
+    )
+
+    if csv_counts != {"2025-01": 2, "2025-02": 1}:
+        raise RuntimeError(f"Unexpected CSV partitions: {csv_counts}")
+
+    csv_path = os.path.join(output_dir, "csv", "month=2025-01", "deals.csv.gz")
+
+    with gzip.open(csv_path, "rt", encoding="utf-8") as file:
+        first_row = next(csv.DictReader(file))
+
+    if first_row["Criado em"] != "2025-01-10" or first_row["Renda"] != "1500.0":
+        raise RuntimeError(f"Unexpected CSV values: {first_row}")
+
+    print(f"CSV partitions: {csv_counts}")
+
+    # February deals were deleted: its partition must not keep them
+    export_rows_to_csv_partitions(
+        rows=generate_deals(["10/01/2025"]),
+        output_dir=os.path.join(output_dir, "csv"),
+    )
+
+    if os.path.exists(os.path.join(output_dir, "csv", "month=2025-02")):
+        raise RuntimeError("Stale CSV partition was not removed")
+
+    check_failed_export(export_rows_to_csv_partitions, os.path.join(output_dir, "csv"), "deals.csv.gz")
+
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow not installed, skipping Parquet export.")
+        return
+
+    parquet_counts = export_rows_to_parquet_partitions(
+        rows=generate_deals(),
+        output_dir=os.path.join(output_dir, "parquet"),
+    )
+
+    table = pq.read_table(
+        os.path.join(output_dir, "parquet", "month=2025-02", "deals.parquet")
+    )
+    row = table.to_pylist()[0]
+
+    if row["Renda"] != 1500.0 or row["Criado em"] != date(2025, 2, 5):
+        raise RuntimeError(f"Unexpected Parquet values: {row}")
+
+    print(f"Parquet partitions: {parquet_counts}")
+
+    export_rows_to_parquet_partitions(
+        rows=generate_deals(["05/02/2025"]),
+        output_dir=os.path.join(output_dir, "parquet"),
+    )
+
+    if os.path.exists(os.path.join(output_dir, "parquet", "month=2025-01")):
+        raise RuntimeError("Stale Parquet partition was not removed")
+
+    check_failed_export(export_rows_to_parquet_partitions, os.path.join(output_dir, "parquet"), "deals.parquet")
+
+
+def run() -> None:
+    print("Starting partitioned dataset export test...\n")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        export_datasets(output_dir)
+
+    print("\nPartitioned dataset export test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,175 @@
+"""
+Hot/cold export test.
+
+Validates, against local fake servers (synthetic Bitrix portal, fake
+Google Sheets API):
+- The first run exports every month to its own tab and freezes the cold
+  (closed) months
+- A later run probes frozen months with a >DATE_MODIFY filter and reloads
+  only the cold month where a deal was edited
+- Frozen months not reloaded keep their tab and index entry (keep_missing)
+- Options needing the full dataset are rejected in hot/cold mode
+
+Run this test with:
+    $ python -m tests.test_hot_cold_export
+"""
+
+import json
+import os
+import tempfile
+
+from datetime import date, datetime, timezone
+
+from src.bitrix_client import BitrixClient
+from src.exporters.partitioned_sheets_exporter import INDEX_SHEET_NAME
+from src.pipelines.deal_export_pipeline import run_export
+from tests.fake_bitrix_server import BASE_DATE, FakeBitrixServer
+from tests.fake_sheets_server import FakeSheetsServer
+
+
+SPREADSHEET_ID = "hot-cold-spreadsheet"
+
+
+class EditableBitrixServer(FakeBitrixServer):
+    """
+    Fake portal whose deals can be edited, recording the deal filters used.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.edits = {}
+        self.filters = set()
+
+    def edit(self, edits):
+        """
+        Replaces the deal edits, dropping the cached filter matches.
+        """
+
+        with self._lock:
+            self.edits = edits
+            self._matches.clear()
+
+    def deal(self, deal_id):
+        deal = super().deal(deal_id)
+        deal.update(self.edits.get(deal_id, {}))
+        return deal
+
+    def matching_deal_ids(self, bitrix_filter):
+        self.filters.add(json.dumps(bitrix_filter, sort_keys=True, default=str))
+        return super().matching_deal_ids(bitrix_filter)
+
+    def cold_month_loads(self):
+        """
+        Start dates of the cold month listings (not the >DATE_MODIFY probe).
+        """
+
+        loads = [json.loads(value) for value in self.filters]
+
+        return sorted(
+            conditions[">=DATE_CREATE"][:7]
+            for conditions in loads
+            if "<DATE_CREATE" in conditions and ">DATE_MODIFY" not in conditions
+        )
+
+    def probed(self):
+        return any(">DATE_MODIFY" in json.loads(value) for value in self.filters)
+
+
+def months_before(day: date, count: int) -> date:
+    month = day.year * 12 + day.month - 1 - count
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def run() -> None:
+    print("Starting hot/cold export test...\n")
+
+    os.environ["GOOGLE_SHEET_ID"] = SPREADSHEET_ID
+
+    # About 10 deals per month, from 2024-01-01 to today
+    days = (date.today() - BASE_DATE.date()).days
+    bitrix = EditableBitrixServer(deals=days // 3, days=days).start()
+    sheets = FakeSheetsServer().start()
+
+    start = months_before(date.today(), 3)
+    cold_months = [months_before(date.today(), count).strftime("%Y-%m") for count in (3, 2, 1)]
+    hot_month = date.today().strftime("%Y-%m")
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            state_path = os.path.join(directory, "export_state.json")
+            client = BitrixClient(base_url=bitrix.url, user_id="1", webhook="hot-cold", throttle_seconds=0)
+
+            def export():
+                bitrix.filters.clear()
+                run_export(
+                    start_date=start.isoformat(),
+                    hot_months=1,
+                    hot_cold_state_path=state_path,
+                    sheets_transport="rest",
+                    sheets_api_url=sheets.api_url,
+                    ledger_path=None,
+                    client=client,
+                )
+
+            spreadsheet = sheets.spreadsheet(SPREADSHEET_ID)
+
+            # 1. First run: every month exported, cold months frozen
+            export()
+
+            with open(state_path, encoding="utf-8") as file:
+                state = json.load(file)
+
+            assert sorted(state["frozen"]) == cold_months, state
+            assert not bitrix.probed()
+            assert bitrix.cold_month_loads() == cold_months, bitrix.cold_month_loads()
+
+            for month in cold_months + [hot_month]:
+                assert len(spreadsheet.rows(f"Deals {month}")) > 1, month
+
+            # 2. A deal of the middle cold month is edited: only that month is reloaded
+            edited_id = next(
+                deal_id
+                for deal_id in range(1, bitrix.deal_count + 1)
+                if bitrix.created_at(deal_id).strftime("%Y-%m") == cold_months[1]
+            )
+            bitrix.edit({
+                edited_id: {
+                    "TITLE": "Negócio editado",
+                    "DATE_MODIFY": datetime.now(timezone.utc).astimezone(BASE_DATE.tzinfo).isoformat(),
+                },
+            })
+
+            export()
+
+            assert bitrix.probed()
+            assert bitrix.cold_month_loads() == [cold_months[1]], bitrix.cold_month_loads()
+            assert any("Negócio editado" in row for row in spreadsheet.rows(f"Deals {cold_months[1]}"))
+
+            # Frozen months not reloaded are kept, in their tab and in the index
+            for month in (cold_months[0], cold_months[2]):
+                assert len(spreadsheet.rows(f"Deals {month}")) > 1, month
+
+            index = spreadsheet.rows(INDEX_SHEET_NAME)
+            assert [row[0] for row in index[1:]] == cold_months + [hot_month], index
+
+            # 3. Nothing edited since: no cold month is reloaded
+            bitrix.edit({})
+            export()
+
+            assert bitrix.probed() and bitrix.cold_month_loads() == [], bitrix.cold_month_loads()
+
+        # 4. Options needing the full dataset are rejected
+        try:
+            run_export(start_date=start.isoformat(), hot_months=1, file_formats=("csv",), ledger_path=None)
+            raise AssertionError("Expected a ValueError")
+        except ValueError as exc:
+            assert "file_formats" in str(exc), exc
+    finally:
+        bitrix.stop()
+        sheets.stop()
+
+    print("\nHot/cold export test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,110 @@
+"""
+Partitioned Google Sheets export test.
+
+Validates, against a local fake Sheets API (no Google account):
+- Partitions past the cell budget overflow into the next spreadsheet
+- The "Índice" tab lists every partition with its tab, spreadsheet and rows
+- A rerun with the same data rewrites nothing (content hashes)
+- A changed partition is the only one rewritten
+- A vanished partition loses its tab and its index entry
+- Rows without a month or a column value get their own partition keys
+
+Run this test with:
+    $ python -m tests.test_partitioned_sheets_export
+"""
+
+from src.exporters import partitioned_sheets_exporter
+from src.exporters.partitioning import (
+    EMPTY_VALUE_PARTITION,
+    UNKNOWN_PARTITION,
+    field_partition_key,
+    month_partition_key,
+)
+from src.exporters.partitioned_sheets_exporter import INDEX_SHEET_NAME, export_partitions_to_google_sheets
+from tests.fake_sheets_server import FakeSheetsServer
+
+
+SPREADSHEET_IDS = ["partitions-1", "partitions-2"]
+
+# 3 partitions of 10 rows x 2 columns (22 cells with the header): with the
+# index tab and a swap reserved, only two fit in the first spreadsheet
+CELL_LIMIT = 100
+
+
+def build_partitions(months, revenue: str = "1500.00"):
+    return {
+        month: [{"Nome do Negócio": f"Negócio {month} {index}", "Renda": revenue} for index in range(10)]
+        for month in months
+    }
+
+
+def export(server: FakeSheetsServer, partitions):
+    return export_partitions_to_google_sheets(
+        spreadsheet_ids=SPREADSHEET_IDS,
+        partitions=partitions,
+        credentials_path=None,
+        transport="rest",
+        api_url=server.api_url,
+    )
+
+
+def tabs(server: FakeSheetsServer, spreadsheet_id: str):
+    return [sheet["properties"]["title"] for sheet in server.spreadsheets[spreadsheet_id].sheets]
+
+
+def run() -> None:
+    print("Starting partitioned Google Sheets export test...\n")
+
+    server = FakeSheetsServer().start()
+    default_limit = partitioned_sheets_exporter.SPREADSHEET_CELL_LIMIT
+    partitioned_sheets_exporter.SPREADSHEET_CELL_LIMIT = CELL_LIMIT
+
+    try:
+        # 1. First export: the third month overflows into the second spreadsheet
+        written = export(server, build_partitions(["2025-01", "2025-02", "2025-03"]))
+        assert written == ["2025-01", "2025-02", "2025-03"], written
+
+        assert tabs(server, "partitions-1") == ["Folha1", "Deals 2025-01", "Deals 2025-02", INDEX_SHEET_NAME]
+        assert tabs(server, "partitions-2") == ["Folha1", "Deals 2025-03"]
+        assert len(server.spreadsheets["partitions-2"].rows("Deals 2025-03")) == 11
+
+        index = server.spreadsheets["partitions-1"].rows(INDEX_SHEET_NAME)
+        assert index[0][:4] == ["Partição", "Aba", "Planilha", "Linhas"], index[0]
+        assert [row[:4] for row in index[1:]] == [
+            ["2025-01", "Deals 2025-01", "partitions-1", 10],
+            ["2025-02", "Deals 2025-02", "partitions-1", 10],
+            ["2025-03", "Deals 2025-03", "partitions-2", 10],
+        ], index
+
+        # 2. Same data: every partition is skipped
+        requests_before = dict(server.request_counts)
+        assert export(server, build_partitions(["2025-01", "2025-02", "2025-03"])) == []
+        assert server.request_counts["values.put"] == requests_before["values.put"] + 1  # The index only
+
+        # 3. One changed partition is the only one rewritten
+        partitions = build_partitions(["2025-01", "2025-02", "2025-03"])
+        partitions["2025-02"][0]["Renda"] = "2000.00"
+        assert export(server, partitions) == ["2025-02"]
+        assert server.spreadsheets["partitions-1"].rows("Deals 2025-02")[1] == ["Negócio 2025-02 0", "2000.00"]
+
+        # 4. January vanished: its tab and index entry are removed
+        partitions.pop("2025-01")
+        assert export(server, partitions) == []
+
+        assert "Deals 2025-01" not in tabs(server, "partitions-1")
+        index = server.spreadsheets["partitions-1"].rows(INDEX_SHEET_NAME)
+        assert [row[0] for row in index[1:]] == ["2025-02", "2025-03"], index
+    finally:
+        partitioned_sheets_exporter.SPREADSHEET_CELL_LIMIT = default_limit
+        server.stop()
+
+    # 5. Partition keys of rows without a date or a value
+    assert month_partition_key("Criado em")({"Criado em": ""}) == UNKNOWN_PARTITION == "sem-data"
+    assert field_partition_key("Pipeline")({"Pipeline": ""}) == EMPTY_VALUE_PARTITION == "sem-valor"
+    assert field_partition_key("Pipeline")({"Pipeline": "Inside Sales"}) == "Inside Sales"
+
+    print("\nPartitioned Google Sheets export test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
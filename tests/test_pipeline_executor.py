@@ -0,0 +1,133 @@
+"""
+Stage-based pipeline executor test.
+
+Validates, offline:
+- Stages run in dependency order and independent stages overlap
+- Stage outputs are cached on disk and reused for the same cache key
+- A stage raising PipelineAborted skips the remaining stages
+- Stage errors are raised after the running stages finish
+- The stage report records status, timings and row counts
+
+Run this test with:
+    $ python -m tests.test_pipeline_executor
+"""
+
+import tempfile
+import time
+
+from src.pipelines.executor import PipelineAborted, PipelineExecutor, Stage
+
+
+def build_stages(calls):
+    def load():
+        calls.append("load")
+        time.sleep(0.3)
+        return {"deals": list(range(100))}
+
+    def lookups():
+        calls.append("lookups")
+        time.sleep(0.3)
+        return {"lookups": {"a": 1}}
+
+    def enrich(deals, lookups):
+        calls.append("enrich")
+        return {"enriched": [deal + lookups["a"] for deal in deals]}
+
+    return [
+        Stage("enrich", enrich, inputs=["deals", "lookups"], outputs=["enriched"]),
+        Stage("load", load, outputs=["deals"], cacheable=True),
+        Stage("lookups", lookups, outputs=["lookups"], cacheable=True),
+    ]
+
+
+def run() -> None:
+    print("Starting pipeline executor test...\n")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # 1. Dependency order and overlap of independent stages
+        calls = []
+        executor = PipelineExecutor(build_stages(calls), cache_dir=cache_dir, cache_key="2025-01-01")
+
+        started = time.perf_counter()
+        values = executor.run()
+        elapsed = time.perf_counter() - started
+
+        assert values["enriched"] == list(range(1, 101))
+        assert calls[-1] == "enrich"
+        assert elapsed < 0.55, f"load and lookups should overlap, took {elapsed:.2f}s"
+
+        report = {row["stage"]: row for row in executor.report_rows()}
+        assert report["load"]["status"] == "ok"
+        assert report["load"]["rows"] == 100
+        assert report["load"]["wall_seconds"] >= 0.3
+        assert report["enrich"]["rows"] == 100
+
+        executor.print_report()
+        print()
+
+        # 2. Cached outputs are reused for the same key only
+        calls = []
+        executor = PipelineExecutor(build_stages(calls), cache_dir=cache_dir, cache_key="2025-01-01")
+        assert executor.run()["enriched"] == list(range(1, 101))
+        assert calls == ["enrich"], calls
+        assert executor.reports["load"].status == "cached"
+
+        calls = []
+        PipelineExecutor(build_stages(calls), cache_dir=cache_dir, cache_key="2025-02-01").run()
+        assert sorted(calls) == ["enrich", "load", "lookups"], calls
+
+    # 3. Abort skips the remaining stages
+    def empty_load():
+        raise PipelineAborted()
+
+    executor = PipelineExecutor([
+        Stage("load", empty_load, outputs=["deals"]),
+        Stage("enrich", lambda deals: {"enriched": deals}, inputs=["deals"], outputs=["enriched"]),
+    ])
+    values = executor.run()
+
+    assert executor.aborted
+    assert "enriched" not in values
+    assert executor.reports["load"].status == "aborted"
+    assert executor.reports["enrich"].status == "skipped"
+
+    # 4. Errors are raised once running stages are done
+    def broken():
+        raise RuntimeError("lookup failed")
+
+    def slow():
+        time.sleep(0.2)
+        return {"deals": []}
+
+    executor = PipelineExecutor([
+        Stage("lookups", broken, outputs=["lookups"]),
+        Stage("load", slow, outputs=["deals"]),
+        Stage("enrich", lambda deals, lookups: {}, inputs=["deals", "lookups"], outputs=["enriched"]),
+    ])
+
+    try:
+        executor.run()
+        raise AssertionError("Expected the stage error to be raised")
+    except RuntimeError as exc:
+        assert str(exc) == "lookup failed"
+
+    assert executor.reports["lookups"].status == "failed"
+    assert executor.reports["load"].status == "ok"
+    assert executor.reports["enrich"].status == "skipped"
+
+    # 5. Invalid graphs are rejected before running
+    for stages in (
+        [Stage("a", dict, outputs=["x"]), Stage("b", dict, outputs=["x"])],
+        [Stage("a", dict, inputs=["missing"], outputs=["x"])],
+    ):
+        try:
+            PipelineExecutor(stages).run()
+            raise AssertionError("Expected an invalid pipeline to be rejected")
+        except ValueError:
+            pass
+
+    print("\nPipeline executor test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
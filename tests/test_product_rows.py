@@ -0,0 +1,110 @@
+"""
+Deal product rows integration test.
+
+Validates, offline (fake Bitrix "batch" endpoint):
+- Per-deal crm.deal.productrows.get calls are packed 50 per batch request
+- Only new deals or deals with a changed DATE_MODIFY are refetched
+- Product rows are flattened into export rows
+- A failing command does not fail its batch: a deleted deal has no rows,
+  other errors skip the deal until the next run
+
+Run this test with:
+    $ python -m tests.test_product_rows
+"""
+
+import os
+import tempfile
+
+from urllib.parse import parse_qs
+
+from src.bitrix_client import BitrixClient, build_query
+from src.normalizers.product_rows_normalizer import normalize_product_row
+from src.pipelines.deal_export_pipeline import sync_product_rows
+
+
+class FakeBitrixClient(BitrixClient):
+    """
+    Answers "batch" calls with one product row per deal; deals listed in
+    `errors` fail with the given Bitrix error.
+    """
+
+    def __init__(self):
+        super().__init__(base_url="http://bitrix.test", user_id="1", webhook="fake")
+        self.batches = []
+        self.errors = {}
+
+    def call(self, method, payload=None):
+        assert method == "batch"
+        self.batches.append(payload["cmd"])
+
+        result = {}
+        result_error = {}
+        for key, command in payload["cmd"].items():
+            method_name, query = command.split("?", 1)
+            assert method_name == "crm.deal.productrows.get"
+            deal_id = parse_qs(query)["id"][0]
+
+            if deal_id in self.errors:
+                result_error[key] = self.errors[deal_id]
+                continue
+
+            result[key] = [{"PRODUCT_NAME": f"Plano {deal_id}", "PRICE": "99.90", "QUANTITY": "2"}]
+
+        return {"result": {"result": result, "result_error": result_error or []}}
+
+
+def generate_deals(count: int, modified: str):
+    return [{"ID": str(deal_id), "TITLE": f"Negócio {deal_id}", "DATE_MODIFY": modified} for deal_id in range(1, count + 1)]
+
+
+def run() -> None:
+    print("Starting product rows test...\n")
+
+    assert build_query({"id": 10, "filter": {">ID": 5}}) == "id=10&filter%5B%3EID%5D=5"
+
+    client = FakeBitrixClient()
+    deals = generate_deals(120, "2025-03-01T10:00:00+03:00")
+
+    with tempfile.TemporaryDirectory() as directory:
+        state_path = os.path.join(directory, "product_rows_state.json")
+
+        # 1. First run: every deal, 50 per batch
+        product_rows = sync_product_rows(client, deals, state_path)
+        assert [len(batch) for batch in client.batches] == [50, 50, 20]
+        assert product_rows["7"][0]["PRODUCT_NAME"] == "Plano 7"
+
+        # 2. Second run: only the modified deal and the new one
+        client.batches.clear()
+        deals[3]["DATE_MODIFY"] = "2025-03-02T10:00:00+03:00"
+        deals.append({"ID": "500", "TITLE": "Novo", "DATE_MODIFY": "2025-03-02T10:00:00+03:00"})
+
+        product_rows = sync_product_rows(client, deals, state_path)
+        assert len(client.batches) == 1
+        assert sorted(client.batches[0]) == ["deal_4", "deal_500"], client.batches[0]
+        assert len(product_rows) == 121
+
+        # 3. One failing command per kind: deal 5 deleted meanwhile, no access to 6
+        client.errors = {
+            "5": {"error": "NOT_FOUND", "error_description": "Not found"},
+            "6": {"error": "ACCESS_DENIED", "error_description": "Access denied"},
+        }
+        deals[4]["DATE_MODIFY"] = deals[5]["DATE_MODIFY"] = deals[6]["DATE_MODIFY"] = "2025-03-03T10:00:00+03:00"
+
+        product_rows = sync_product_rows(client, deals, state_path)
+        assert product_rows["5"] == [] and product_rows["7"][0]["PRODUCT_NAME"] == "Plano 7"
+        assert product_rows["6"][0]["PRODUCT_NAME"] == "Plano 6"  # Cached copy kept
+
+        # Retried on the next run, once the error is gone
+        client.errors = {}
+        client.batches.clear()
+        sync_product_rows(client, deals, state_path)
+        assert [sorted(batch) for batch in client.batches] == [["deal_6"]], client.batches
+
+    row = normalize_product_row(deals[0], product_rows["1"][0])
+    assert row["Total"] == "199.80" and row["ID do Negócio"] == "1", row
+
+    print("\nProduct rows test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
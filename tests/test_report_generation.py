@@ -0,0 +1,151 @@
+"""
+Config-driven report generation integration test.
+
+Validates, offline (local fake Sheets server):
+- Report definitions load from JSON, with date placeholders resolved
+- Filters are pushed down as one query per distinct filter when possible
+- Local filter evaluation, column subsets and one tab per split value
+- Report tabs are written with a single Sheets client
+- Split tabs of values gone from a report are deleted (report index tab)
+
+Run this test with:
+    $ python -m tests.test_report_generation
+"""
+
+import json
+import os
+import tempfile
+
+from datetime import date
+
+from src.pipelines.report_pipeline import (
+    REPORT_INDEX_SHEET_NAME,
+    build_report_tables,
+    export_report_tables,
+    plan_report_queries,
+    report_select_fields,
+)
+from src.reports.definitions import load_report_definitions
+from src.reports.filters import matches_filter
+from tests.fake_sheets_server import FakeSheetsServer
+
+
+SPREADSHEET_ID = "fake-spreadsheet"
+
+CONFIG = {
+    "reports": [
+        {"name": "pipelines", "sheet": "Pipeline", "split_by": "Pipeline", "filters": {"CATEGORY_ID": [1, 3]}},
+        {
+            "name": "won",
+            "sheet": "Ganhos do mês",
+            "filters": {"STAGE_SEMANTIC_ID": "S", ">=CLOSEDATE": "{month_start}"},
+            "columns": ["Pipeline", "Renda"],
+        },
+    ]
+}
+
+
+def generate_data():
+    deals, rows = [], []
+
+    for index in range(12):
+        category_id = index % 3 + 1
+        deals.append({
+            "ID": str(index),
+            "CATEGORY_ID": str(category_id),
+            "STAGE_SEMANTIC_ID": "S" if index % 2 else "P",
+            "CLOSEDATE": "2025-03-20T03:00:00+03:00" if index < 6 else "2025-02-10T03:00:00+03:00",
+        })
+        rows.append({"Pipeline": f"Pipeline {category_id}", "Renda": str(index * 100), "Fase": "X"})
+
+    return deals, rows
+
+
+def run() -> None:
+    print("Starting report generation test...\n")
+
+    # 1. Definitions
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "reports.json")
+
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(CONFIG, file)
+
+        reports = load_report_definitions(path, today=date(2025, 3, 18))
+
+    assert reports[1].filters[">=CLOSEDATE"] == "2025-03-01", reports[1].filters
+    assert "STAGE_SEMANTIC_ID" in report_select_fields(reports)
+
+    # 2. Push-down plan
+    assert len(plan_report_queries(reports)) == 2
+    assert plan_report_queries(reports, full_fetch=True) == [{}]
+
+    # 3. Local filters
+    assert matches_filter({"CATEGORY_ID": "3"}, {"CATEGORY_ID": [1, 3]})
+    assert not matches_filter({"CATEGORY_ID": "2"}, {"CATEGORY_ID": [1, 3]})
+    assert matches_filter({"OPPORTUNITY": "1500.00"}, {">OPPORTUNITY": 1000})
+    assert not matches_filter({"CLOSEDATE": ""}, {">=CLOSEDATE": "2025-03-01"})
+    assert matches_filter({"STAGE_ID": "C1:WON"}, {"!STAGE_ID": "C1:LOSE"})
+
+    # 4. Tables
+    deals, rows = generate_data()
+    tables, split_tabs = build_report_tables(reports, deals, rows, SPREADSHEET_ID)
+
+    tabs = sorted(tab for _, tab in tables)
+    assert tabs == ["Ganhos do mês", "Pipeline Pipeline 1", "Pipeline Pipeline 3"], tabs
+    assert split_tabs == {"pipelines": (SPREADSHEET_ID, ["Pipeline Pipeline 1", "Pipeline Pipeline 3"])}, split_tabs
+
+    headers, values = tables[(SPREADSHEET_ID, "Ganhos do mês")]
+    assert headers == ["Pipeline", "Renda"]
+    assert [value[1] for value in values] == ["100", "300", "500"], values
+
+    # 5. Export
+    server = FakeSheetsServer().start()
+
+    try:
+        export_report_tables(
+            tables,
+            credentials_path=None,
+            transport="rest",
+            api_url=server.api_url,
+            split_tabs=split_tabs,
+        )
+
+        spreadsheet = server.spreadsheets[SPREADSHEET_ID]
+        assert spreadsheet.rows("Ganhos do mês")[0] == ["Pipeline", "Renda"]
+        assert len(spreadsheet.rows("Pipeline Pipeline 1")) == 5
+        assert spreadsheet.rows(REPORT_INDEX_SHEET_NAME)[1:] == [
+            ["pipelines", "Pipeline Pipeline 1"],
+            ["pipelines", "Pipeline Pipeline 3"],
+        ]
+
+        # 6. Pipeline 3 has no deals any more: its split tab is deleted
+        kept = [index for index, deal in enumerate(deals) if deal["CATEGORY_ID"] != "3"]
+        tables, split_tabs = build_report_tables(
+            reports,
+            [deals[index] for index in kept],
+            [rows[index] for index in kept],
+            SPREADSHEET_ID,
+        )
+        export_report_tables(
+            tables,
+            credentials_path=None,
+            transport="rest",
+            api_url=server.api_url,
+            split_tabs=split_tabs,
+        )
+
+        titles = [sheet["properties"]["title"] for sheet in spreadsheet.sheets]
+        assert "Pipeline Pipeline 3" not in titles, titles
+        assert {"Pipeline Pipeline 1", "Ganhos do mês"} <= set(titles), titles
+        assert spreadsheet.rows(REPORT_INDEX_SHEET_NAME)[1:] == [["pipelines", "Pipeline Pipeline 1"]]
+
+        print(f"Requests: {dict(server.request_counts)}")
+    finally:
+        server.stop()
+
+    print("\nReport generation test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
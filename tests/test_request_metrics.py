@@ -0,0 +1,157 @@
+"""
+Request metrics test.
+
+Validates, against local fake servers (no Bitrix portal or Google account):
+- BitrixClient.call counts requests per method, 429 retries and waits,
+  throttling sleeps, bytes and latencies
+- Google Sheets writes count requests, latencies and bytes per operation
+- Metrics dump as JSON and as a Prometheus textfile
+- Threads and clients calling one portal share the throttle
+
+Run this test with:
+    $ python -m tests.test_request_metrics
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.bitrix_client import BitrixClient
+from src.exporters.google_sheets_exporter import export_to_google_sheets
+from src.metrics import REGISTRY, summary_lines, write_metrics
+from tests.fake_sheets_server import FakeSheetsServer
+
+
+class FakeBitrixHandler(BaseHTTPRequestHandler):
+    """
+    Answers every method with a small result; the first crm.deal.list call
+    is rejected with a 429.
+    """
+
+    rate_limited = False
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if self.path.endswith("crm.deal.list") and not FakeBitrixHandler.rate_limited:
+            FakeBitrixHandler.rate_limited = True
+            self.send_response(429)
+            self.end_headers()
+            return
+
+        body = json.dumps({"result": [{"ID": "1", "TITLE": "Negócio"}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run() -> None:
+    print("Starting request metrics test...\n")
+
+    REGISTRY.reset()
+
+    bitrix = ThreadingHTTPServer(("127.0.0.1", 0), FakeBitrixHandler)
+    threading.Thread(target=bitrix.serve_forever, daemon=True).start()
+    sheets = FakeSheetsServer().start()
+
+    try:
+        client = BitrixClient(base_url=f"http://127.0.0.1:{bitrix.server_port}", user_id="1", webhook="w")
+
+        client.call("crm.deal.list", {"select": ["ID"]})
+        client.call("crm.deal.list", {"select": ["ID"]})
+        client.call("user.get")
+
+        export_to_google_sheets(
+            spreadsheet_id="fake-spreadsheet",
+            sheet_name="Folha1",
+            rows=[{"ID": index, "Nome": f"Negócio {index}"} for index in range(1200)],
+            credentials_path=None,
+            transport="rest",
+            api_url=sheets.api_url,
+        )
+    finally:
+        bitrix.shutdown()
+        sheets.stop()
+
+    # 1. Bitrix counters
+    assert REGISTRY.counter_total("bitrix_requests_total", method="crm.deal.list", status="ok") == 2
+    assert REGISTRY.counter_total("bitrix_requests_total", method="crm.deal.list", status="http_429") == 1
+    assert REGISTRY.counter_total("bitrix_requests_total", method="user.get") == 1
+    assert REGISTRY.counter_total("bitrix_retries_total") == 1
+    assert abs(REGISTRY.counter_total("bitrix_rate_limit_wait_seconds_total") - 0.8) < 1e-9
+    assert abs(REGISTRY.counter_total("bitrix_throttle_sleep_seconds_total") - 3 * 0.4) < 1e-9
+    assert REGISTRY.counter_total("bitrix_response_bytes_total", method="user.get") > 0
+    assert REGISTRY.counter_total("bitrix_request_bytes_total", method="crm.deal.list") > 0
+
+    dump = REGISTRY.to_dict()
+    latencies = {
+        entry["labels"]["method"]: entry["count"]
+        for entry in dump["histograms"]["bitrix_request_seconds"]
+    }
+    assert latencies == {"crm.deal.list": 3, "user.get": 1}, latencies
+
+    # 2. Sheets counters, per operation
+    update_requests = REGISTRY.counter_total(
+        "sheets_requests_total",
+        operation="sheets.spreadsheets.values.update",
+        status="ok",
+    )
+    assert update_requests == 4, update_requests  # Headers + 3 chunks of rows
+    assert REGISTRY.counter_total("sheets_request_bytes_total", operation="sheets.spreadsheets.values.update") > 0
+
+    # 3. Dumps
+    with tempfile.TemporaryDirectory() as output_dir:
+        write_metrics(os.path.join(output_dir, "metrics.json"))
+        write_metrics(os.path.join(output_dir, "metrics.prom"))
+
+        with open(os.path.join(output_dir, "metrics.json"), encoding="utf-8") as file:
+            assert json.load(file)["counters"]["bitrix_retries_total"][0]["value"] == 1
+
+        with open(os.path.join(output_dir, "metrics.prom"), encoding="utf-8") as file:
+            text = file.read()
+
+    assert "# TYPE bitrix_request_seconds histogram" in text
+    assert 'bitrix_requests_total{method="crm.deal.list",status="http_429"} 1' in text
+    assert 'bitrix_request_seconds_count{method="crm.deal.list"} 3' in text
+    assert 'bitrix_request_seconds_bucket{method="crm.deal.list",le="+Inf"} 3' in text
+
+    for line in summary_lines():
+        print(line)
+
+    # 4. 4 threads x 3 calls on one portal, two clients: 12 throttle slots
+    bitrix = ThreadingHTTPServer(("127.0.0.1", 0), FakeBitrixHandler)
+    threading.Thread(target=bitrix.serve_forever, daemon=True).start()
+
+    try:
+        url = f"http://127.0.0.1:{bitrix.server_port}"
+        clients = [BitrixClient(base_url=url, user_id="1", webhook="w", throttle_seconds=0.1) for _ in range(2)]
+
+        def calls(client: BitrixClient) -> None:
+            for _ in range(3):
+                client.call("user.get")
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=calls, args=(clients[index % 2],)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert time.perf_counter() - started >= 12 * 0.1 - 0.05, time.perf_counter() - started
+    finally:
+        bitrix.shutdown()
+
+    print("\nRequest metrics test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,98 @@
+"""
+Run ledger test.
+
+Validates, offline:
+- Every run is appended to the ledger with stages, API calls and memory
+- No regression is flagged until enough baseline runs exist
+- Slower stages and methods called much more often are flagged
+- Runs with other options, failed runs and cached stages are not compared
+- Runs with cached stages are not an API call baseline
+
+Run this test with:
+    $ python -m tests.test_run_ledger
+"""
+
+import os
+import tempfile
+
+from datetime import datetime, timezone
+
+from src.ledger import MIN_BASELINE_RUNS, load_ledger, record_run
+from src.metrics import MetricsRegistry
+
+
+def stage_rows(load_seconds: float, enrich_seconds: float, enrich_status: str = "ok"):
+    return [
+        {"stage": "load", "status": "ok", "wall_seconds": load_seconds, "cpu_seconds": 1.0,
+         "rows": 5000, "peak_memory_bytes": None},
+        {"stage": "enrich", "status": enrich_status, "wall_seconds": enrich_seconds, "cpu_seconds": 1.0,
+         "rows": 5000, "peak_memory_bytes": None},
+    ]
+
+
+def registry_with_calls(deal_list_calls: int) -> MetricsRegistry:
+    registry = MetricsRegistry()
+    registry.inc("bitrix_requests_total", {"method": "crm.deal.list", "status": "ok"}, deal_list_calls)
+    registry.inc("bitrix_requests_total", {"method": "user.get", "status": "ok"}, 3)
+    registry.inc("sheets_requests_total", {"operation": "sheets.spreadsheets.values.update", "status": "ok"}, 11)
+    return registry
+
+
+def record(path, rows, calls=100, signature="xlsx", status="ok"):
+    return record_run(
+        path=path,
+        signature=signature,
+        status=status,
+        stage_rows=rows,
+        started_at=datetime.now(timezone.utc),
+        duration_seconds=sum(row["wall_seconds"] for row in rows),
+        registry=registry_with_calls(calls),
+    )
+
+
+def run() -> None:
+    print("Starting run ledger test...\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "run_ledger.jsonl")
+
+        # 1. Baseline runs; a slow run before the baseline is complete is not flagged
+        for index in range(MIN_BASELINE_RUNS):
+            flags = record(path, stage_rows(30.0 + index, 10.0))["regressions"]
+            assert flags == [], flags
+
+        entry = load_ledger(path)[0]
+        assert entry["api_calls"]["bitrix"] == {"crm.deal.list": 100, "user.get": 3}
+        assert entry["api_calls"]["sheets"] == {"sheets.spreadsheets.values.update": 11}
+        assert entry["rows"] == 5000
+        assert entry["stages"]["load"]["wall_seconds"] == 30.0
+
+        # 2. Normal noise is not flagged
+        assert record(path, stage_rows(33.0, 12.0), calls=110)["regressions"] == []
+
+        # 3. Slower stage and more calls are flagged
+        flags = record(path, stage_rows(31.0, 40.0), calls=300)["regressions"]
+        assert len(flags) == 2, flags
+        assert flags[0].startswith("Stage 'enrich' took 40.0s"), flags
+        assert flags[1].startswith("bitrix crm.deal.list: 300 calls"), flags
+
+        # 4. Small absolute slowdowns of short stages are ignored
+        assert record(path, stage_rows(31.0, 14.0))["regressions"] == []
+
+        # 5. Other options, failed runs and cached stages are not compared
+        assert record(path, stage_rows(300.0, 10.0), signature="sheets")["regressions"] == []
+        assert record(path, stage_rows(300.0, 10.0), status="failed")["regressions"] == []
+        assert record(path, stage_rows(31.0, 99.0, enrich_status="cached"))["regressions"] == []
+
+        # 6. Runs with cached stages made fewer calls: not an API call baseline
+        for _ in range(MIN_BASELINE_RUNS):
+            record(path, stage_rows(30.0, 10.0, enrich_status="cached"), calls=5, signature="cache")
+        assert record(path, stage_rows(30.0, 10.0), signature="cache")["regressions"] == []
+
+        assert len(load_ledger(path)) == 2 * MIN_BASELINE_RUNS + 7
+
+    print("\nRun ledger test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
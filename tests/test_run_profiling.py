@@ -0,0 +1,64 @@
+"""
+Run profiling test.
+
+Validates, offline:
+- A profiled run writes a .prof artifact readable by pstats and a summary
+- Functions running in stage threads appear in the profile
+- Peak memory is recorded per stage while profiling, and not otherwise
+
+Run this test with:
+    $ python -m tests.test_run_profiling
+"""
+
+import os
+import pstats
+import tempfile
+
+from src.pipelines.executor import PipelineExecutor, Stage
+from src.profiling import profile_run
+
+
+def build_rows(count: int):
+    return [{"ID": index, "TITLE": f"Deal {index}" * 10} for index in range(count)]
+
+
+def run_pipeline():
+    executor = PipelineExecutor([
+        Stage("small", lambda: {"small": build_rows(1_000)}, outputs=["small"]),
+        Stage("large", lambda small: {"large": build_rows(50_000)}, inputs=["small"], outputs=["large"]),
+    ])
+    executor.run()
+    return executor.report_rows()
+
+
+def artifacts(output_dir: str, extension: str):
+    return [os.path.join(output_dir, name) for name in os.listdir(output_dir) if name.endswith(extension)]
+
+
+def run() -> None:
+    print("Starting run profiling test...\n")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        stage_rows = profile_run(run_pipeline, output_dir=output_dir, top=10, name="test")
+
+        peaks = {row["stage"]: row["peak_memory_bytes"] for row in stage_rows}
+        assert peaks["large"] > 5 * peaks["small"] > 0, peaks
+
+        stats = pstats.Stats(*artifacts(output_dir, ".prof"))
+        functions = {function for _, _, function in stats.stats}
+        assert "build_rows" in functions, "stage thread functions must be profiled"
+
+        with open(artifacts(output_dir, ".txt")[0], encoding="utf-8") as file:
+            summary = file.read()
+
+        assert "Peak (MB)" in summary
+        assert "Top 10 functions by cumulative time" in summary
+
+    # Without profiling no memory is traced
+    assert all(row["peak_memory_bytes"] is None for row in run_pipeline())
+
+    print("\nRun profiling test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
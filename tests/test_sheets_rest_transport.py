@@ -0,0 +1,110 @@
+"""
+Google Sheets REST transport integration test.
+
+Validates, against a local fake Sheets server (no Google account needed):
+- The "rest" transport writes headers and every row
+- Large uploads expand the grid and are split into chunks
+- The staging-swap refresh replaces the data of the live tab, keeping
+  its sheetId (formulas pointing at it survive), and creates missing tabs
+
+Run this test with:
+    $ python -m tests.test_sheets_rest_transport
+"""
+
+import time
+
+from src.exporters.google_sheets_exporter import CHUNK_SIZE, export_to_google_sheets
+from tests.fake_sheets_server import FakeSheetsServer
+
+
+SPREADSHEET_ID = "fake-spreadsheet"
+ROW_COUNT = 3 * CHUNK_SIZE + 17
+
+
+def generate_rows(count: int, label: str):
+    return [
+        {
+            "Nome do Negócio": f"{label} {index}",
+            "Renda": "1500.00",
+            "Criado em": "15/03/2025",
+        }
+        for index in range(count)
+    ]
+
+
+def run() -> None:
+    print("Starting Google Sheets REST transport test...\n")
+
+    server = FakeSheetsServer().start()
+
+    try:
+        # 1. Full refresh through the REST transport
+        started = time.perf_counter()
+
+        export_to_google_sheets(
+            spreadsheet_id=SPREADSHEET_ID,
+            sheet_name="Folha1",
+            rows=generate_rows(ROW_COUNT, "Negócio"),
+            credentials_path=None,
+            transport="rest",
+            api_url=server.api_url,
+        )
+
+        elapsed = time.perf_counter() - started
+        values = server.spreadsheets[SPREADSHEET_ID].rows("Folha1")
+
+        assert values[0] == ["Nome do Negócio", "Renda", "Criado em"], values[0]
+        assert len(values) == ROW_COUNT + 1, len(values)
+        assert values[-1][0] == f"Negócio {ROW_COUNT - 1}"
+        assert server.request_counts["values.put"] == 1 + -(-ROW_COUNT // CHUNK_SIZE)
+
+        print(f"Full refresh: {ROW_COUNT} rows in {elapsed:.2f}s")
+        print(f"Requests: {dict(server.request_counts)}\n")
+
+        # 2. Staging-swap refresh replaces the live tab data (the only visible tab)
+        live_sheet_id = server.spreadsheets[SPREADSHEET_ID].find("Folha1")["properties"]["sheetId"]
+
+        export_to_google_sheets(
+            spreadsheet_id=SPREADSHEET_ID,
+            sheet_name="Folha1",
+            rows=generate_rows(10, "Novo"),
+            credentials_path=None,
+            use_staging_swap=True,
+            transport="rest",
+            api_url=server.api_url,
+        )
+
+        spreadsheet = server.spreadsheets[SPREADSHEET_ID]
+        values = spreadsheet.rows("Folha1")
+        titles = [sheet["properties"]["title"] for sheet in spreadsheet.sheets]
+
+        assert titles == ["Folha1"], titles
+        assert spreadsheet.find("Folha1")["properties"]["sheetId"] == live_sheet_id
+        assert not spreadsheet.find("Folha1")["properties"]["hidden"]
+        assert len(values) == 11 and values[1][0] == "Novo 0", values[:2]
+
+        # 3. Staging-swap refresh of a missing tab creates it
+        export_to_google_sheets(
+            spreadsheet_id=SPREADSHEET_ID,
+            sheet_name="Resumo",
+            rows=generate_rows(5, "Resumo"),
+            credentials_path=None,
+            use_staging_swap=True,
+            transport="rest",
+            api_url=server.api_url,
+        )
+
+        titles = [sheet["properties"]["title"] for sheet in spreadsheet.sheets]
+        assert titles == ["Folha1", "Resumo"], titles
+        assert not spreadsheet.find("Resumo")["properties"]["hidden"]
+        assert len(spreadsheet.rows("Resumo")) == 6
+
+        print("Staging-swap refresh: live tab replaced")
+    finally:
+        server.stop()
+
+    print("\nGoogle Sheets REST transport test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
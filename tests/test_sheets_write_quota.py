@@ -0,0 +1,141 @@
+"""
+Google Sheets write quota test.
+
+Validates, offline (scaled-down window instead of a real minute):
+- Concurrent workers never exceed the write budget in any sliding window
+- A 429 pauses the shared budget, holding the other workers back too
+- execute_with_retry honours the Retry-After header of a 429
+
+Run this test with:
+    $ python -m tests.test_sheets_write_quota
+"""
+
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from src.exporters.google_sheets_exporter import (
+    MAX_CONCURRENT_WRITES,
+    RETRY_BASE_SECONDS,
+    WRITE_REQUESTS_PER_MINUTE,
+    WriteQuota,
+    execute_with_retry,
+    shared_write_quota,
+)
+from src.exporters.sheets_rest_transport import SheetsHttpError
+
+
+# 6 writes per half second: the 60 per minute budget, scaled down
+REQUESTS_PER_WINDOW = 6
+WINDOW_SECONDS = 0.5
+
+WRITES_PER_WORKER = 6
+
+RETRY_AFTER_SECONDS = 0.4
+
+# Scheduling slack for timing assertions
+TOLERANCE = 0.02
+
+
+class RecordingQuota(WriteQuota):
+    """
+    WriteQuota recording when (and for how long) it was paused.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.paused = threading.Event()
+        self.pauses = []
+
+    def pause(self, seconds: float) -> None:
+        super().pause(seconds)
+        self.pauses.append((time.monotonic(), seconds))
+        self.paused.set()
+
+
+class FakeRequest:
+    """
+    Sheets request failing with a 429 (and a Retry-After) the first times
+    it is executed.
+    """
+
+    methodId = "sheets.spreadsheets.values.update"
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.executed_at = []
+
+    def execute(self, http=None):
+        self.executed_at.append(time.monotonic())
+
+        if len(self.executed_at) <= self.failures:
+            raise SheetsHttpError(429, {"Retry-After": str(RETRY_AFTER_SECONDS)}, b"RESOURCE_EXHAUSTED", "fake")
+
+        return {"updatedRows": 1}
+
+
+def run() -> None:
+    print("Starting Google Sheets write quota test...\n")
+
+    # 1. The shared budget is the per-user quota: 60 writes per minute
+    quota = shared_write_quota("write-quota-test.json")
+    assert quota is shared_write_quota("write-quota-test.json")
+    assert (quota.requests_per_minute, quota.window_seconds) == (WRITE_REQUESTS_PER_MINUTE, 60.0)
+
+    # 2. Concurrent workers stay within the budget in every sliding window
+    quota = WriteQuota(requests_per_minute=REQUESTS_PER_WINDOW, window_seconds=WINDOW_SECONDS)
+    acquired = []
+    acquired_lock = threading.Lock()
+
+    def write(_):
+        for _ in range(WRITES_PER_WORKER):
+            execute_with_retry(FakeRequest(), quota=quota)
+            with acquired_lock:
+                acquired.append(time.monotonic())
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_WRITES) as executor:
+        list(executor.map(write, range(MAX_CONCURRENT_WRITES)))
+    elapsed = time.monotonic() - started
+
+    acquired.sort()
+    total = MAX_CONCURRENT_WRITES * WRITES_PER_WORKER
+    assert len(acquired) == total
+
+    for first, following in zip(acquired, acquired[REQUESTS_PER_WINDOW:]):
+        assert following - first >= WINDOW_SECONDS - TOLERANCE, (first, following)
+
+    expected = (total // REQUESTS_PER_WINDOW - 1) * WINDOW_SECONDS
+    assert elapsed >= expected - TOLERANCE, elapsed
+    print(f"{total} writes by {MAX_CONCURRENT_WRITES} workers in {elapsed:.2f}s (at least {expected:.2f}s)")
+
+    # 3. A 429 pauses every worker for Retry-After
+    quota = RecordingQuota(requests_per_minute=100, window_seconds=WINDOW_SECONDS)
+    limited = FakeRequest(failures=1)
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_WRITES) as executor:
+        limited_write = executor.submit(execute_with_retry, limited, quota=quota)
+        assert quota.paused.wait(timeout=5)
+
+        others = [FakeRequest() for _ in range(MAX_CONCURRENT_WRITES - 1)]
+        for request in others:
+            executor.submit(execute_with_retry, request, quota=quota).result()
+
+        assert limited_write.result() == {"updatedRows": 1}
+
+    paused_at, pause_seconds = quota.pauses[0]
+    assert RETRY_AFTER_SECONDS <= pause_seconds <= RETRY_AFTER_SECONDS + RETRY_BASE_SECONDS, pause_seconds
+
+    # The limited worker retried after Retry-After, the others waited for the pause
+    assert limited.executed_at[1] - limited.executed_at[0] >= RETRY_AFTER_SECONDS
+    for request in others:
+        assert request.executed_at[0] >= paused_at + pause_seconds - TOLERANCE, request.executed_at
+
+    print(f"429 paused every worker for {pause_seconds:.2f}s (Retry-After {RETRY_AFTER_SECONDS}s)")
+
+    print("\nGoogle Sheets write quota test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
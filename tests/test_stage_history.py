@@ -0,0 +1,88 @@
+"""
+Deal stage history integration test.
+
+Validates, offline (fake Bitrix client):
+- Keyset pagination of crm.stagehistory.list resumes after a cursor
+- Folding transitions incrementally gives the same durations as a full fold
+- Durations use stage names and stop counting once a deal is closed
+
+Run this test with:
+    $ python -m tests.test_stage_history
+"""
+
+import copy
+
+from datetime import datetime, timedelta, timezone
+
+from src.enrichers.stage_history import apply_stage_transitions, compute_stage_durations
+from src.loaders.stage_history import PAGE_SIZE, fetch_stage_history
+
+
+START = datetime(2025, 3, 1, 12, 0, tzinfo=timezone(timedelta(hours=3)))
+
+STAGE_MAP = {8: {"NEW": "Novo", "PREPARATION": "Preparação", "WON": "Ganho"}}
+
+
+class FakeBitrixClient:
+    """
+    Serves a stage history: each deal goes NEW -> PREPARATION (1 day later)
+    -> WON (2.5 days later).
+    """
+
+    def __init__(self, deal_count: int):
+        self.calls = []
+        self.items = []
+
+        for deal_id in range(1, deal_count + 1):
+            for stage, semantic, offset in (("C8:NEW", "P", 0), ("C8:PREPARATION", "P", 1), ("C8:WON", "S", 3.5)):
+                self.items.append({
+                    "ID": str(len(self.items) + 1),
+                    "OWNER_ID": str(deal_id),
+                    "CATEGORY_ID": "8",
+                    "STAGE_ID": stage,
+                    "STAGE_SEMANTIC_ID": semantic,
+                    "CREATED_TIME": (START + timedelta(days=offset)).isoformat(),
+                })
+
+    def call(self, method, payload=None):
+        self.calls.append(payload)
+        after_id = payload["filter"][">ID"]
+        page = [item for item in self.items if int(item["ID"]) > after_id][:PAGE_SIZE]
+        return {"result": {"items": page}}
+
+
+def run() -> None:
+    print("Starting stage history test...\n")
+
+    client = FakeBitrixClient(deal_count=40)  # 120 transitions
+
+    # 1. Full history, then nothing new after the cursor
+    transitions = fetch_stage_history(client)
+    assert len(transitions) == 120
+    assert len(client.calls) == 3, len(client.calls)  # 50 + 50 + 20
+    assert fetch_stage_history(client, after_id=120) == []
+
+    # 2. Incremental fold == full fold
+    full = apply_stage_transitions({}, transitions)
+
+    incremental = apply_stage_transitions({}, fetch_stage_history(client, after_id=0)[:70])
+    incremental = apply_stage_transitions(incremental, fetch_stage_history(client, after_id=70))
+
+    assert incremental == full
+
+    # 3. Durations
+    later = START + timedelta(days=30)
+    durations = compute_stage_durations(copy.deepcopy(full), STAGE_MAP, now=later)
+    assert durations[1] == {"Novo": 1.0, "Preparação": 2.5}, durations[1]
+
+    # An open deal keeps counting its current stage
+    open_deal = apply_stage_transitions({}, transitions[:2])
+    durations = compute_stage_durations(open_deal, STAGE_MAP, now=START + timedelta(days=3))
+    assert durations[1] == {"Novo": 1.0, "Preparação": 2.0}, durations[1]
+
+    print(f"Deals: {len(full)}, calls: {len(client.calls)}")
+    print("\nStage history test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
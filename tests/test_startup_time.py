@@ -0,0 +1,80 @@
+"""
+Startup time benchmark.
+
+Validates, in fresh interpreters without any configuration:
+- The pipelines import without environment variables or a .env file
+- googleapiclient, google.oauth2, openpyxl, pyarrow, requests and dotenv
+  are not imported until they are used
+- Prints the median import time of each entry module
+
+Run this test with:
+    $ python -m tests.test_startup_time
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+ENTRY_MODULES = [
+    "src.main",
+    "src.pipelines.deal_export_pipeline",
+    "src.pipelines.entity_export_pipeline",
+]
+
+HEAVY_MODULES = [
+    "googleapiclient",
+    "google.oauth2",
+    "openpyxl",
+    "pyarrow",
+    "requests",
+    "dotenv",
+]
+
+RUNS = 5
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def probe(module: str) -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    # No configuration at all: a clean environment, run outside the repo
+    # so no .env file is found
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=os.path.dirname(root),
+        env={"PATH": os.environ.get("PATH", ""), "PYTHONPATH": root},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run() -> None:
+    print("Starting startup time benchmark...\n")
+
+    for module in ENTRY_MODULES:
+        results = [probe(module) for _ in range(RUNS)]
+
+        loaded = results[0]["loaded"]
+        assert loaded == [], f"{module} eagerly imports: {', '.join(loaded)}"
+
+        median = statistics.median(result["seconds"] for result in results)
+        print(f"{module}: {median * 1000:.0f} ms (median of {RUNS})")
+
+    print("\nStartup time benchmark completed successfully.")
+
+
+if __name__ == "__main__":
+    run()
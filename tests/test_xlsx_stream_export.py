@@ -0,0 +1,115 @@
+"""
+Streaming XLSX export integration test.
+
+Validates:
+- Streaming export from a generator of normalized deals
+- Typed cells (numbers and dates instead of strings)
+- Rollover to extra sheets past the row limit
+- Values that are not valid numbers are kept as text
+- Sheet titles Excel would reject fail early; rollover titles fit
+- A failing row source keeps the previous file (no partial workbook)
+
+Run this test with:
+    $ python -m tests.test_xlsx_stream_export
+"""
+
+import os
+import tempfile
+
+from datetime import datetime
+
+from openpyxl import load_workbook
+
+from src.exporters.xlsx_exporter import export_rows_to_xlsx_stream
+from src.exporters.xlsx_stream_writer import XlsxStreamWriter
+
+
+
+def generate_deals(count: int):
+    for index in range(count):
+        yield {
+            "Pipeline": "Inside Sales",
+            "Nome do Negócio": f"Negócio {index}",
+            "Renda": "1500.00" if index < 4 else "a combinar",
+            "Criado em": "15/03/2025",
+            "Valor Total de Aparelhos": "1000|BRL",
+        }
+
+
+def failing_deals(count: int):
+    yield from generate_deals(count)
+    raise ValueError("Simulated row source failure")
+
+
+def run() -> None:
+    print("Starting streaming XLSX export test...\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        output_file = os.path.join(directory, "deals.xlsx")
+
+        written = export_rows_to_xlsx_stream(
+            rows=generate_deals(5),
+            output_path=output_file,
+            max_rows_per_sheet=3,  # header + 2 rows per sheet
+        )
+
+        if written != 5:
+            raise RuntimeError(f"Expected 5 rows written, got {written}")
+
+        workbook = load_workbook(output_file)
+
+        if workbook.sheetnames != ["Deals", "Deals 2", "Deals 3"]:
+            raise RuntimeError(f"Unexpected sheets: {workbook.sheetnames}")
+
+        sheet = workbook["Deals"]
+
+        if sheet["C2"].value != 1500.0:
+            raise RuntimeError("Revenue was not written as a number")
+
+        if sheet["D2"].value != datetime(2025, 3, 15):
+            raise RuntimeError("Creation date was not written as a date")
+
+        if sheet["E2"].value != 1000.0:
+            raise RuntimeError("Money field was not written as a number")
+
+        if workbook["Deals 3"]["C2"].value != "a combinar":
+            raise RuntimeError("Invalid revenue was not kept as text")
+
+        # A row source failing mid-stream keeps the previous file
+        try:
+            export_rows_to_xlsx_stream(rows=failing_deals(1200), output_path=output_file)
+            raise RuntimeError("Row source failure was not raised")
+        except ValueError:
+            pass
+
+        if load_workbook(output_file).sheetnames != ["Deals", "Deals 2", "Deals 3"]:
+            raise RuntimeError("Partial export replaced the previous file")
+
+        if os.listdir(directory) != ["deals.xlsx"]:
+            raise RuntimeError(f"Partial export left files behind: {os.listdir(directory)}")
+
+        long_title = "Negócios do Pipeline Inside Sales"
+
+        export_rows_to_xlsx_stream(
+            rows=generate_deals(3),
+            output_path=output_file,
+            sheet_title=long_title[:31],
+            max_rows_per_sheet=3,
+        )
+
+        if load_workbook(output_file).sheetnames != [long_title[:31], long_title[:29] + " 2"]:
+            raise RuntimeError(f"Unexpected sheets: {load_workbook(output_file).sheetnames}")
+
+        for title in [long_title, "2025/03", ""]:
+            try:
+                with XlsxStreamWriter(os.path.join(directory, "titles.xlsx")) as writer:
+                    writer.add_sheet(title)
+                raise RuntimeError(f"Sheet title {title!r} was accepted")
+            except ValueError:
+                pass
+
+    print("Streaming XLSX export test completed successfully.")
+
+
+if __name__ == "__main__":
+    run()